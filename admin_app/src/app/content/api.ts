@@ -170,6 +170,18 @@ const bulkUploadContents = async (file: File, token: string) => {
   }
 };
 
+const getCsvImportStatus = async (jobId: string, token: string) => {
+  try {
+    const response = await api.get(`/content/csv-upload/${jobId}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    return response.data;
+  } catch (error) {
+    let errorMessage = "Error fetching CSV import status";
+    handleApiError(error, errorMessage);
+  }
+};
+
 const createTag = async (tag: string, token: string) => {
   try {
     const response = await api.post(
@@ -369,6 +381,7 @@ export {
   editContent,
   createContent,
   bulkUploadContents,
+  getCsvImportStatus,
   createTag,
   getTagList,
   deleteTag,
@@ -14,13 +14,15 @@ import { LoadingButton } from "@mui/lab";
 import NoteAddIcon from "@mui/icons-material/NoteAdd";
 import { Layout } from "@/components/Layout";
 import { appColors, sizes } from "@/utils";
-import { bulkUploadContents } from "../api";
+import { bulkUploadContents, getCsvImportStatus } from "../api";
 
 interface CustomError {
   type: string;
   description: string;
 }
 
+const CSV_IMPORT_POLL_INTERVAL_MS = 2000;
+
 const ImportFromCSVModal = ({
   open,
   onClose,
@@ -56,8 +58,30 @@ const ImportFromCSVModal = ({
       await new Promise((resolve) => setTimeout(resolve, 500));
       try {
         const response = await bulkUploadContents(selectedFile, token!);
-        if (response.status === 200) {
-          setImportSuccess(true);
+        if (response.status === 202) {
+          // Wait for the import job to ingest the contents
+          let jobStatus = response.data;
+          while (!["Success", "Failed"].includes(jobStatus.job_status)) {
+            await new Promise((resolve) =>
+              setTimeout(resolve, CSV_IMPORT_POLL_INTERVAL_MS),
+            );
+            jobStatus = await getCsvImportStatus(jobStatus.job_id, token!);
+          }
+          if (jobStatus.job_status === "Failed") {
+            setImportErrorMessages([
+              `Import failed after ${jobStatus.rows_processed} of ` +
+                `${jobStatus.rows_total} rows: ${jobStatus.error_trace}`,
+            ]);
+          } else if (jobStatus.failures.length > 0) {
+            setImportErrorMessages(
+              jobStatus.failures.map(
+                (failure: { content_title: string; error: string }) =>
+                  `Could not import "${failure.content_title}": ${failure.error}`,
+              ),
+            );
+          } else {
+            setImportSuccess(true);
+          }
           setSelectedFile(null);
         } else {
           console.error("Error uploading file:", response.detail);
@@ -1,5 +1,6 @@
 """This module contains the FastAPI application for the backend."""
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Callable
 
@@ -35,7 +36,14 @@ from .config import (
     SENTRY_TRACES_SAMPLE_RATE,
     USE_CROSS_ENCODER,
 )
+from .dashboard.config import (
+    DASHBOARD_QUERY_CONCURRENCY,
+    TOPIC_MODELING_MAX_PROCESSES,
+)
+from .docmuncher.config import DOCMUNCHER_OCR_MAX_CONCURRENCY
+from .docmuncher.job_index import run_job_index_pruner
 from .prometheus_middleware import PrometheusMiddleware
+from .question_answer.routers import QUERY_EMBEDDING_TASKS
 from .utils import setup_logger
 
 logger = setup_logger()
@@ -110,9 +118,14 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     1. Connect to redis.
     2. Load the cross-encoder model if enabled.
     3. Set up HTTPX client for making HTTP requests.
-    4. Yield control to the application.
-    5. Close the Redis connection when the application finishes.
-    6. Close the HTTPX client when the application finishes.
+    4. Start pruning expired jobs from the docmuncher job indexes.
+    5. Create the semaphores limiting the concurrent dashboard queries, topic modeling
+        processes and docmuncher LLM calls and OCR requests.
+    6. Yield control to the application.
+    7. Stop pruning the docmuncher job indexes when the application finishes.
+    8. Wait for the query embeddings being saved when the application finishes.
+    9. Close the Redis connection when the application finishes.
+    10. Close the HTTPX client when the application finishes.
 
     Parameters
     ----------
@@ -138,14 +151,35 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("Finished setting up HTTPX client!")
 
     # 4.
-    yield
+    job_index_pruner = asyncio.create_task(run_job_index_pruner(redis=app.state.redis))
 
     # 5.
+    app.state.dashboard_query_semaphore = asyncio.Semaphore(DASHBOARD_QUERY_CONCURRENCY)
+    app.state.topic_modeling_process_semaphore = asyncio.Semaphore(
+        TOPIC_MODELING_MAX_PROCESSES
+    )
+    app.state.docmuncher_llm_semaphores = {}
+    app.state.docmuncher_ocr_semaphore = asyncio.Semaphore(
+        DOCMUNCHER_OCR_MAX_CONCURRENCY
+    )
+
+    # 6.
+    yield
+
+    # 7.
+    job_index_pruner.cancel()
+
+    # 8.
+    if QUERY_EMBEDDING_TASKS:
+        logger.info("Waiting for the query embeddings being saved...")
+        await asyncio.gather(*QUERY_EMBEDDING_TASKS, return_exceptions=True)
+
+    # 9.
     logger.info("Closing Redis connection...")
     await app.state.redis.aclose()
     logger.info("Redis connection closed!")
 
-    # 6.
+    # 10.
     logger.info("Closing HTTPX client...")
     await app.state.httpx_client.aclose()
     logger.info("HTTPX client closed!")
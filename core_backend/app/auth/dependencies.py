@@ -12,6 +12,7 @@ from fastapi.security import (
     OAuth2PasswordBearer,
 )
 from jwt.exceptions import InvalidTokenError
+from redis import asyncio as aioredis
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -354,37 +355,28 @@ async def get_workspace_by_api_key(
         ) from err
 
 
-async def rate_limiter(
-    request: Request, workspace_db: WorkspaceDB = Depends(authenticate_key)
+async def consume_api_quota(
+    *, n_calls: int, redis: aioredis.Redis, workspace_db: WorkspaceDB
 ) -> None:
-    """Rate limiter for the API calls. Gets daily quota and decrement it.
-
-    This is used by the following packages:
-
-    1. Question answering
-    2. Urgency detection
+    """Decrement the daily API quota of a workspace by `n_calls`.
 
     Parameters
     ----------
-    request
-        The request object.
+    n_calls
+        The number of API calls to charge against the daily quota.
+    redis
+        The Redis instance.
     workspace_db
         The workspace object.
 
     Raises
     ------
     HTTPException
-        If the API call limit is reached.
-    RuntimeError
-        If the user belongs to multiple workspaces.
+        If the remaining API calls are fewer than `n_calls`.
     """
 
-    if CHECK_API_LIMIT is False:
-        return
-
     workspace_name = workspace_db.workspace_name
     key = f"remaining-calls:{workspace_name}"
-    redis = request.app.state.redis
     ttl = await redis.ttl(key)
 
     # If key does not exist, set the key and value.
@@ -399,11 +391,44 @@ async def rate_limiter(
 
     if nb_remaining != b"None":
         nb_remaining = int(nb_remaining)
-        if nb_remaining <= 0:
+        if nb_remaining < n_calls:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"API call limit reached for workspace: {workspace_name}.",
             )
         await update_api_limits(
-            api_daily_quota=nb_remaining - 1, redis=redis, workspace_name=workspace_name
+            api_daily_quota=nb_remaining - n_calls,
+            redis=redis,
+            workspace_name=workspace_name,
         )
+
+
+async def rate_limiter(
+    request: Request, workspace_db: WorkspaceDB = Depends(authenticate_key)
+) -> None:
+    """Rate limiter for the API calls. Gets daily quota and decrement it.
+
+    This is used by the following packages:
+
+    1. Question answering
+    2. Urgency detection
+
+    Parameters
+    ----------
+    request
+        The request object.
+    workspace_db
+        The workspace object.
+
+    Raises
+    ------
+    HTTPException
+        If the API call limit is reached.
+    """
+
+    if CHECK_API_LIMIT is False:
+        return
+
+    await consume_api_quota(
+        n_calls=1, redis=request.app.state.redis, workspace_db=workspace_db
+    )
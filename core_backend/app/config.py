@@ -87,6 +87,18 @@ DEFAULT_API_QUOTA = int(os.environ.get("DEFAULT_API_QUOTA", 100))
 CHECK_API_LIMIT = os.environ.get("CHECK_API_LIMIT", True)
 PAGES_TO_CARDS_CONVERSION = int(os.environ.get("PAGES_TO_CARDS_CONVERSION", 2))
 
+# Bulk content ingestion: number of cards embedded per embedding call
+CONTENT_EMBEDDING_BATCH_SIZE = int(os.environ.get("CONTENT_EMBEDDING_BATCH_SIZE", 100))
+# CSV import: number of rows checked and ingested at a time
+CSV_IMPORT_CHUNK_SIZE = int(os.environ.get("CSV_IMPORT_CHUNK_SIZE", 1000))
+# CSV import: seconds without a heartbeat after which a running job is reported failed
+CSV_IMPORT_STALE_TIMEOUT = int(os.environ.get("CSV_IMPORT_STALE_TIMEOUT", 600))
+# Re-embedding job: rows embedded per embedding call, and embedding calls per minute
+REEMBED_BATCH_SIZE = int(os.environ.get("REEMBED_BATCH_SIZE", 100))
+REEMBED_MAX_REQUESTS_PER_MINUTE = int(
+    os.environ.get("REEMBED_MAX_REQUESTS_PER_MINUTE", 60)
+)
+
 # Alignment Score variables
 ALIGN_SCORE_THRESHOLD = os.environ.get("ALIGN_SCORE_THRESHOLD", 0.7)
 
@@ -108,6 +120,7 @@ DB_POOL_SIZE = os.environ.get("DB_POOL_SIZE", 20)  # Number of connections in th
 REDIS_HOST = os.environ.get("REDIS_HOST", "redis://localhost:6379")
 REDIS_CHAT_CACHE_EXPIRY_TIME = 3600
 REDIS_DOC_INGEST_EXPIRY_TIME = 3600 * 24
+REDIS_CSV_IMPORT_EXPIRY_TIME = 3600 * 24
 
 # Google Cloud storage
 GCS_SPEECH_BUCKET = os.environ.get("GCS_SPEECH_BUCKET", "aaq-speech-test")
@@ -0,0 +1,474 @@
+"""This module contains the asynchronous CSV import of contents.
+
+The uploaded CSV file is spooled to disk and checked in chunks by the
+`/content/csv-upload` endpoint, which then returns a job ID right away. The contents
+are ingested by a background task that reads the file again in chunks of
+`CSV_IMPORT_CHUNK_SIZE` rows and saves each chunk with `save_contents_to_db_bulk`,
+reporting its progress in Redis.
+
+The background task runs in the API process, so it is lost if the process restarts.
+A running job keeps a heartbeat in its status, and a job whose heartbeat is older
+than `CSV_IMPORT_STALE_TIMEOUT` seconds is reported as failed and its spooled file
+deleted when its status is read.
+"""
+
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+import pandas as pd
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import (
+    CSV_IMPORT_CHUNK_SIZE,
+    CSV_IMPORT_STALE_TIMEOUT,
+    REDIS_CSV_IMPORT_EXPIRY_TIME,
+)
+from ..database import with_new_session
+from ..tags.models import TagDB, get_list_of_tag_from_db, save_tag_to_db
+from ..tags.schemas import TagCreate, TagRetrieve
+from ..utils import delete_spooled_file, setup_logger, spool_stream
+from .models import save_contents_to_db_bulk
+from .schemas import ContentCreate, CsvImportStatus, CsvImportStatusEnum
+
+CSV_IMPORT_FILE_KEY_PREFIX = "csv_import_file:"
+CSV_IMPORT_KEY_PREFIX = "csv_import:"
+TAGS_COL = "tags"
+
+logger = setup_logger()
+
+
+async def spool_csv_upload(*, stream: BinaryIO) -> Path:
+    """Spool an uploaded CSV file to disk without blocking the event loop.
+
+    The file must outlive the request, since it is read again by the import job.
+
+    Parameters
+    ----------
+    stream
+        The file-like object of the upload.
+
+    Returns
+    -------
+    Path
+        The path of the spooled file.
+    """
+
+    return await asyncio.to_thread(
+        spool_stream,
+        directory=tempfile.gettempdir(),
+        extension=".csv",
+        stream=stream,
+    )
+
+
+def read_csv_chunks(*, file_path: Path | str) -> Iterator[pd.DataFrame]:
+    """Read a CSV file in chunks of `CSV_IMPORT_CHUNK_SIZE` rows.
+
+    Parameters
+    ----------
+    file_path
+        The path of the CSV file.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        The chunks of the CSV file, with all values read as strings.
+
+    Raises
+    ------
+    EmptyDataError
+        If the CSV file is empty.
+    ParserError
+        If the CSV file cannot be parsed.
+    UnicodeDecodeError
+        If the CSV file is not UTF-8 encoded.
+    """
+
+    return pd.read_csv(file_path, dtype=str, chunksize=CSV_IMPORT_CHUNK_SIZE)
+
+
+def clean_dataframe(*, df: pd.DataFrame) -> None:
+    """Clean the DataFrame by stripping whitespace and replacing empty strings.
+
+    Parameters
+    ----------
+    df
+        The DataFrame to clean.
+    """
+
+    df["title"] = df["title"].str.strip()
+    df["text"] = df["text"].str.strip()
+    df.replace("", None, inplace=True)
+
+
+async def save_csv_import_status(
+    *, job_status: CsvImportStatus, redis: aioredis.Redis
+) -> None:
+    """Save the status of a CSV import job in Redis.
+
+    Parameters
+    ----------
+    job_status
+        The status of the job.
+    redis
+        The Redis instance.
+    """
+
+    await redis.set(
+        f"{CSV_IMPORT_KEY_PREFIX}{job_status.job_id}",
+        job_status.model_dump_json(),
+        ex=REDIS_CSV_IMPORT_EXPIRY_TIME,
+    )
+
+
+async def create_csv_import_job(
+    *, file_path: str, job_status: CsvImportStatus, redis: aioredis.Redis
+) -> None:
+    """Save the status of a new CSV import job and the path of its spooled file, so
+    that the file can be deleted if the job is lost.
+
+    Parameters
+    ----------
+    file_path
+        The path of the spooled CSV file.
+    job_status
+        The status of the job.
+    redis
+        The Redis instance.
+    """
+
+    await redis.set(
+        f"{CSV_IMPORT_FILE_KEY_PREFIX}{job_status.job_id}",
+        file_path,
+        ex=REDIS_CSV_IMPORT_EXPIRY_TIME,
+    )
+    await save_csv_import_status(job_status=job_status, redis=redis)
+
+
+def is_csv_import_stale(*, job_status: CsvImportStatus) -> bool:
+    """Check whether an unfinished CSV import job has stopped sending heartbeats,
+    e.g. because the process running it restarted.
+
+    Parameters
+    ----------
+    job_status
+        The status of the job.
+
+    Returns
+    -------
+    bool
+        Specifies whether the job is unfinished and its last heartbeat, or its
+        creation if it never started, is older than `CSV_IMPORT_STALE_TIMEOUT`
+        seconds.
+    """
+
+    if job_status.job_status not in (
+        CsvImportStatusEnum.not_started,
+        CsvImportStatusEnum.in_progress,
+    ):
+        return False
+    last_seen_datetime_utc = (
+        job_status.heartbeat_datetime_utc or job_status.created_datetime_utc
+    )
+    return datetime.now(timezone.utc) - last_seen_datetime_utc > timedelta(
+        seconds=CSV_IMPORT_STALE_TIMEOUT
+    )
+
+
+async def fail_stale_csv_import(
+    *, job_status: CsvImportStatus, redis: aioredis.Redis
+) -> None:
+    """Mark a stale CSV import job as failed and delete its spooled file.
+
+    Parameters
+    ----------
+    job_status
+        The status of the job.
+    redis
+        The Redis instance.
+    """
+
+    logger.error(f"CSV import job {job_status.job_id} stopped without finishing.")
+    job_status.job_status = CsvImportStatusEnum.failed
+    job_status.error_trace = (
+        "The import job stopped without finishing, e.g. because the server "
+        "restarted. Contents saved before it stopped were kept."
+    )
+    job_status.finished_datetime_utc = datetime.now(timezone.utc)
+    await save_csv_import_status(job_status=job_status, redis=redis)
+    await _delete_csv_import_file(job_id=job_status.job_id, redis=redis)
+
+
+async def get_csv_import_status(
+    *, job_id: str, redis: aioredis.Redis, workspace_id: int
+) -> Optional[CsvImportStatus]:
+    """Get the status of a CSV import job from Redis. A job that stopped sending
+    heartbeats before finishing is reported as failed, see `is_csv_import_stale`.
+
+    Parameters
+    ----------
+    job_id
+        The ID of the job.
+    redis
+        The Redis instance.
+    workspace_id
+        The ID of the workspace requesting the status.
+
+    Returns
+    -------
+    Optional[CsvImportStatus]
+        The status of the job, or `None` if the job does not exist in the workspace.
+    """
+
+    job_status = await redis.get(f"{CSV_IMPORT_KEY_PREFIX}{job_id}")
+    if job_status is None:
+        return None
+    csv_import_status = CsvImportStatus.model_validate_json(job_status)
+    if csv_import_status.workspace_id != workspace_id:
+        return None
+    if is_csv_import_stale(job_status=csv_import_status):
+        await fail_stale_csv_import(job_status=csv_import_status, redis=redis)
+    return csv_import_status
+
+
+@with_new_session
+async def import_csv_contents(
+    *,
+    asession: AsyncSession | None = None,
+    file_path: str,
+    job_status: CsvImportStatus,
+    redis: aioredis.Redis,
+) -> None:
+    """Ingest the contents of a checked CSV file, one chunk at a time.
+
+    The tags and contents of each chunk are committed before the next chunk is read,
+    and the progress of the job is saved in Redis after each chunk. A heartbeat is
+    saved every third of `CSV_IMPORT_STALE_TIMEOUT` while the job runs. The spooled
+    CSV file is deleted once the job has finished.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections. The default
+        for this should be `None` since it is provided by the `with_new_session`
+        decorator.
+    file_path
+        The path of the spooled CSV file.
+    job_status
+        The status of the job.
+    redis
+        The Redis instance.
+    """
+
+    assert asession is not None
+    workspace_id = job_status.workspace_id
+    job_status.job_status = CsvImportStatusEnum.in_progress
+    job_status.heartbeat_datetime_utc = datetime.now(timezone.utc)
+    await save_csv_import_status(job_status=job_status, redis=redis)
+    heartbeat = asyncio.create_task(_heartbeat(job_status=job_status, redis=redis))
+
+    try:
+        tags_in_db = await get_list_of_tag_from_db(
+            asession=asession, workspace_id=workspace_id
+        )
+        tag_name_to_tag_map = {tag.tag_name: tag for tag in tags_in_db}
+
+        for chunk in read_csv_chunks(file_path=file_path):
+            if chunk.empty:
+                continue
+            clean_dataframe(df=chunk)
+
+            # Create each new tag of the chunk in the database.
+            has_tags = TAGS_COL in chunk.columns and not chunk[TAGS_COL].isnull().all()
+            if has_tags:
+                incoming_tags = _extract_unique_tags(tags_col=chunk[TAGS_COL])
+                for tag in _get_tags_not_in_db(
+                    incoming_tags=incoming_tags,
+                    tags_in_db=list(tag_name_to_tag_map.values()),
+                ):
+                    tag_db = await save_tag_to_db(
+                        asession=asession,
+                        tag=TagCreate(tag_name=tag),
+                        workspace_id=workspace_id,
+                    )
+                    tag_name_to_tag_map[tag_db.tag_name] = tag_db
+                    job_status.tags_created.append(
+                        _convert_tag_record_to_schema(record=tag_db)
+                    )
+
+            contents = []
+            for _, row in chunk.iterrows():
+                content_tags: list = []  # Should be list[TagDB]; clashes with schema
+                if has_tags and not pd.isna(row[TAGS_COL]):
+                    tag_names = [
+                        tag_name.strip().upper()
+                        for tag_name in row[TAGS_COL].split(",")
+                    ]
+                    content_tags = [
+                        tag_name_to_tag_map[tag_name] for tag_name in tag_names
+                    ]
+                contents.append(
+                    ContentCreate(
+                        content_tags=content_tags,
+                        content_text=row["text"],
+                        content_title=row["title"],
+                        content_metadata={},
+                        related_contents_id=[],
+                    )
+                )
+
+            contents_db, failures = await save_contents_to_db_bulk(
+                asession=asession, contents=contents, workspace_id=workspace_id
+            )
+            for failure in failures:
+                failure.index += job_status.rows_processed
+                logger.error(
+                    f"Failed to save content '{failure.content_title}' from row "
+                    f"{failure.index} of the CSV file: {failure.error}"
+                )
+
+            job_status.contents_created += len(contents_db)
+            job_status.failures.extend(failures)
+            job_status.rows_processed += len(chunk)
+            await save_csv_import_status(job_status=job_status, redis=redis)
+
+        job_status.job_status = CsvImportStatusEnum.success
+    except Exception as e:
+        logger.error(f"CSV import job {job_status.job_id} failed: {str(e)}")
+        await asession.rollback()
+        job_status.job_status = CsvImportStatusEnum.failed
+        job_status.error_trace = str(e)
+    finally:
+        heartbeat.cancel()
+        delete_spooled_file(file_path)
+
+    job_status.finished_datetime_utc = datetime.now(timezone.utc)
+    await save_csv_import_status(job_status=job_status, redis=redis)
+    await redis.delete(f"{CSV_IMPORT_FILE_KEY_PREFIX}{job_status.job_id}")
+
+
+async def _delete_csv_import_file(*, job_id: str, redis: aioredis.Redis) -> None:
+    """Delete the spooled file of a CSV import job, if it still exists.
+
+    Parameters
+    ----------
+    job_id
+        The ID of the job.
+    redis
+        The Redis instance.
+    """
+
+    file_path = await redis.get(f"{CSV_IMPORT_FILE_KEY_PREFIX}{job_id}")
+    if file_path is not None:
+        delete_spooled_file(
+            file_path.decode("utf-8") if isinstance(file_path, bytes) else file_path
+        )
+        await redis.delete(f"{CSV_IMPORT_FILE_KEY_PREFIX}{job_id}")
+
+
+async def _heartbeat(*, job_status: CsvImportStatus, redis: aioredis.Redis) -> None:
+    """Periodically save the status of a running CSV import job with a new heartbeat,
+    so that it is not reported as stale.
+
+    Parameters
+    ----------
+    job_status
+        The status of the job, shared with the job.
+    redis
+        The Redis instance.
+    """
+
+    interval = max(1, CSV_IMPORT_STALE_TIMEOUT // 3)
+    while True:
+        await asyncio.sleep(interval)
+        job_status.heartbeat_datetime_utc = datetime.now(timezone.utc)
+        try:
+            await save_csv_import_status(job_status=job_status, redis=redis)
+        except Exception as e:
+            logger.error(
+                f"Heartbeat failed for CSV import job {job_status.job_id}: {e}"
+            )
+
+
+def _extract_unique_tags(*, tags_col: pd.Series) -> list[str]:
+    """Get unique UPPERCASE tags from a DataFrame column (comma-separated within
+    column).
+
+    Parameters
+    ----------
+    tags_col
+        The column containing tags.
+
+    Returns
+    -------
+    list[str]
+        A list of unique tags.
+    """
+
+    # Prep the column.
+    tags_col = tags_col.dropna().astype(str)
+
+    # Split and explode to have one tag per row.
+    tags_flat = tags_col.str.split(",").explode()
+
+    # Strip and uppercase.
+    tags_flat = tags_flat.str.strip().str.upper()
+
+    # Get unique tags as a list.
+    tags_unique_list = list(tags_flat.unique())
+
+    return tags_unique_list
+
+
+def _get_tags_not_in_db(
+    *, incoming_tags: list[str], tags_in_db: list[TagDB]
+) -> list[str]:
+    """Compare tags fetched from the DB with incoming tags and return tags not in the
+    DB.
+
+    Parameters
+    ----------
+    incoming_tags
+        List of incoming tags.
+    tags_in_db
+        List of `TagDB` objects fetched from the database.
+
+    Returns
+    -------
+    list[str]
+        List of tags not in the database.
+    """
+
+    tags_in_db_list: list[str] = [tag_json.tag_name for tag_json in tags_in_db]
+    tags_not_in_db_list: list[str] = list(set(incoming_tags) - set(tags_in_db_list))
+
+    return tags_not_in_db_list
+
+
+def _convert_tag_record_to_schema(*, record: TagDB) -> TagRetrieve:
+    """Convert `models.TagDB` models to `TagRetrieve` schema.
+
+    Parameters
+    ----------
+    record
+        `TagDB` object to convert.
+
+    Returns
+    -------
+    TagRetrieve
+        `TagRetrieve` object of the converted record.
+    """
+
+    tag_retrieve = TagRetrieve(
+        created_datetime_utc=record.created_datetime_utc,
+        tag_id=record.tag_id,
+        tag_name=record.tag_name,
+        updated_datetime_utc=record.updated_datetime_utc,
+        workspace_id=record.workspace_id,
+    )
+
+    return tag_retrieve
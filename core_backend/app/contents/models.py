@@ -2,10 +2,13 @@
 database helper functions such as saving, updating, deleting, and retrieving content.
 """
 
+import hashlib
 from datetime import datetime, timezone
-from typing import Optional
+from functools import lru_cache
+from typing import Literal, Optional
 
 from pgvector.sqlalchemy import Vector
+from prometheus_client import Counter
 from sqlalchemy import (
     JSON,
     Boolean,
@@ -14,21 +17,34 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    Select,
+    String,
     Text,
+    bindparam,
     column,
     delete,
     false,
     func,
+    insert,
+    or_,
     select,
     true,
+    tuple_,
     update,
 )
 from sqlalchemy.dialects.postgresql import ARRAY  # or JSON
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+    relationship,
+    selectinload,
+    validates,
+)
 from sqlalchemy.sql import case
 
 from ..config import (
+    CONTENT_EMBEDDING_BATCH_SIZE,
     PGVECTOR_DISTANCE,
     PGVECTOR_EF_CONSTRUCTION,
     PGVECTOR_M,
@@ -37,8 +53,20 @@ from ..config import (
 from ..models import Base, JSONDict
 from ..schemas import FeedbackSentiment, QuerySearchResult
 from ..tags.models import content_tags_table
-from ..utils import embedding
-from .schemas import ContentCreate, ContentUpdate
+from ..utils import (
+    EmbeddingCallException,
+    embedding,
+    embedding_batch,
+    get_embedding_model_name,
+)
+from .schemas import ContentBulkFailure, ContentCreate, ContentUpdate
+
+# Embedding calls skipped because a stored vector has the same embedding fingerprint.
+EMBEDDINGS_SKIPPED = Counter(
+    "content_embeddings_skipped",
+    "Number of content embedding calls skipped by reusing a stored vector",
+    ["generation_name"],
+)
 
 
 class ContentDB(Base):
@@ -60,10 +88,25 @@ class ContentDB(Base):
             },
             postgresql_ops={"embedding": {PGVECTOR_DISTANCE}},
         ),
+        Index("ix_content_embedding_fingerprint", "content_embedding_fingerprint"),
+        Index(
+            "ix_content_workspace_id_display_number",
+            "workspace_id",
+            "display_number",
+            "content_id",
+        ),
+        Index("ix_content_workspace_id_text_hash", "workspace_id", "content_text_hash"),
+        Index(
+            "ix_content_workspace_id_title_hash", "workspace_id", "content_title_hash"
+        ),
     )
 
+    # Deferred, since no read path of content records needs the vector itself.
     content_embedding: Mapped[Vector] = mapped_column(
-        Vector(int(PGVECTOR_VECTOR_SIZE)), nullable=False
+        Vector(int(PGVECTOR_VECTOR_SIZE)), deferred=True, nullable=False
+    )
+    content_embedding_fingerprint: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True
     )
     content_id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
     content_metadata: Mapped[JSONDict] = mapped_column(JSON, nullable=False)
@@ -71,7 +114,9 @@ class ContentDB(Base):
         "TagDB", secondary=content_tags_table, back_populates="contents"
     )
     content_text: Mapped[str] = mapped_column(Text, nullable=False)
+    content_text_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     content_title: Mapped[str] = mapped_column(Text, nullable=False)
+    content_title_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     created_datetime_utc: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False
     )
@@ -103,6 +148,26 @@ class ContentDB(Base):
         nullable=False,
     )
 
+    @validates("content_text", "content_title")
+    def _set_content_hash(self, key: str, value: str) -> str:
+        """Keep the normalized hash of the content title and text in sync.
+
+        Parameters
+        ----------
+        key
+            The name of the attribute being set.
+        value
+            The new value of the attribute.
+
+        Returns
+        -------
+        str
+            The new value of the attribute, unchanged.
+        """
+
+        setattr(self, f"{key}_hash", hash_content_value(value))
+        return value
+
     def __repr__(self) -> str:
         """Construct the string representation of the `ContentDB` object.
 
@@ -129,6 +194,28 @@ class ContentDB(Base):
         )
 
 
+def hash_content_value(value: str) -> str:
+    """Get the normalized hash of a content title or text, for duplicate checks.
+
+    NB: The `content` migration that added the hash columns backfills them with the
+    same normalization. Changing it requires a migration that recomputes the hashes.
+
+    Parameters
+    ----------
+    value
+        The content title or text.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 of the value, with leading and trailing whitespace
+        stripped and inner runs of whitespace collapsed to a single space.
+    """
+
+    normalized_value = " ".join(value.split())
+    return hashlib.sha256(normalized_value.encode("utf-8")).hexdigest()
+
+
 async def save_content_to_db(
     *,
     asession: AsyncSession,
@@ -163,14 +250,18 @@ async def save_content_to_db(
         "generation_name": "save_content_to_db",
     }
 
-    content_embedding = await _get_content_embeddings(
-        content=content, metadata=metadata
+    content_embedding, fingerprint = await _get_or_reuse_content_embedding(
+        asession=asession,
+        content=content,
+        metadata=metadata,
+        workspace_id=workspace_id,
     )
     latest_display_number = await get_latest_display_number(
         asession=asession, workspace_id=workspace_id
     )
     content_db = ContentDB(
         content_embedding=content_embedding,
+        content_embedding_fingerprint=fingerprint,
         content_metadata=content.content_metadata,
         content_tags=content.content_tags,
         content_text=content.content_text,
@@ -197,6 +288,153 @@ async def save_content_to_db(
     return result or content_db
 
 
+async def save_contents_to_db_bulk(
+    *,
+    asession: AsyncSession,
+    batch_size: int = CONTENT_EMBEDDING_BATCH_SIZE,
+    commit: bool = True,
+    contents: list[ContentCreate],
+    workspace_id: int,
+) -> tuple[list[ContentDB], list[ContentBulkFailure]]:
+    """Vectorize contents in batches and save them to the database in bulk.
+
+    Contents whose embedding fingerprint matches a stored vector reuse it, and the
+    other distinct contents are embedded `batch_size` at a time, with a single
+    embedding call per batch. Contents that cannot be embedded are reported as failures
+    instead of aborting the whole batch. The rows and tag associations of all other
+    contents are then inserted with one statement each.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    batch_size
+        The number of contents to embed per embedding call.
+    commit
+        Specifies whether to commit the changes to the database.
+        If `False`, the changes will not be committed.
+    contents
+        The contents to save.
+    workspace_id
+        The ID of the workspace to save the contents to.
+
+    Returns
+    -------
+    tuple[list[ContentDB], list[ContentBulkFailure]]
+        The saved content objects, in the order of `contents`, and the contents that
+        failed to be saved.
+    """
+
+    metadata = {
+        "generation_name": "save_contents_to_db_bulk",
+    }
+
+    # Reuse the stored vectors of contents with the same embedding fingerprint, and
+    # embed every other distinct text once.
+    model = await get_embedding_model_name()
+    fingerprints = [
+        get_embedding_fingerprint(
+            model=model, text_to_embed=_get_text_to_embed(content=content)
+        )
+        for content in contents
+    ]
+    content_embeddings: dict[str, list[float] | EmbeddingCallException] = dict(
+        await get_stored_embeddings(
+            asession=asession, fingerprints=fingerprints, workspace_id=workspace_id
+        )
+    )
+    contents_to_embed = list(
+        {
+            fingerprint: content
+            for fingerprint, content in zip(fingerprints, contents)
+            if fingerprint not in content_embeddings
+        }.items()
+    )
+    n_skipped = len(contents) - len(contents_to_embed)
+    if n_skipped > 0:
+        EMBEDDINGS_SKIPPED.labels(generation_name=metadata["generation_name"]).inc(
+            n_skipped
+        )
+
+    for start in range(0, len(contents_to_embed), batch_size):
+        batch = contents_to_embed[start : start + batch_size]
+        batch_embeddings = await _get_content_embeddings_batch(
+            contents=[content for _, content in batch], metadata=metadata
+        )
+        content_embeddings.update(
+            zip([fingerprint for fingerprint, _ in batch], batch_embeddings)
+        )
+
+    embedded_contents: list[tuple[ContentCreate, list[float], str]] = []
+    failures: list[ContentBulkFailure] = []
+    for i, (content, fingerprint) in enumerate(zip(contents, fingerprints)):
+        content_embedding = content_embeddings[fingerprint]
+        if isinstance(content_embedding, EmbeddingCallException):
+            failures.append(
+                ContentBulkFailure(
+                    content_title=content.content_title,
+                    error=str(content_embedding),
+                    index=i,
+                )
+            )
+        else:
+            embedded_contents.append((content, content_embedding, fingerprint))
+
+    if not embedded_contents:
+        return [], failures
+
+    latest_display_number = await get_latest_display_number(
+        asession=asession, workspace_id=workspace_id
+    )
+    now = datetime.now(timezone.utc)
+    content_rows = [
+        {
+            "content_embedding": content_embedding,
+            "content_embedding_fingerprint": fingerprint,
+            "content_metadata": content.content_metadata,
+            "content_text": content.content_text,
+            "content_text_hash": hash_content_value(content.content_text),
+            "content_title": content.content_title,
+            "content_title_hash": hash_content_value(content.content_title),
+            "created_datetime_utc": now,
+            "display_number": latest_display_number + i + 1,
+            "is_archived": False,
+            "is_validated": content.is_validated,
+            "related_contents_id": content.related_contents_id or [],
+            "updated_datetime_utc": now,
+            "workspace_id": workspace_id,
+        }
+        for i, (content, content_embedding, fingerprint) in enumerate(embedded_contents)
+    ]
+    content_stmt = insert(ContentDB).returning(
+        ContentDB.content_id, sort_by_parameter_order=True
+    )
+    content_ids = list(
+        (await asession.execute(content_stmt, content_rows)).scalars().all()
+    )
+
+    tag_rows = [
+        {"content_id": content_id, "tag_id": tag_id}
+        for content_id, (content, _, _) in zip(content_ids, embedded_contents)
+        for tag_id in dict.fromkeys(tag.tag_id for tag in content.content_tags)
+    ]
+    if tag_rows:
+        await asession.execute(insert(content_tags_table), tag_rows)
+
+    if commit:
+        await asession.commit()
+
+    stmt = (
+        select(ContentDB)
+        .options(selectinload(ContentDB.content_tags))
+        .where(ContentDB.workspace_id == workspace_id)
+        .where(ContentDB.content_id.in_(content_ids))
+        .order_by(ContentDB.display_number)
+    )
+    contents_db = list((await asession.execute(stmt)).scalars().all())
+    return contents_db, failures
+
+
 async def update_content_in_db(
     *,
     asession: AsyncSession,
@@ -206,6 +444,9 @@ async def update_content_in_db(
 ) -> ContentDB:
     """Update content and content embedding in the database.
 
+    The content is only re-embedded if its embedding fingerprint changed, e.g., not
+    when only its tags, metadata or validation status changed.
+
     NB: The path operation that invokes this function should disallow archived content
     to be updated.
 
@@ -230,11 +471,15 @@ async def update_content_in_db(
         "generation_name": "update_content_in_db",
     }
 
-    content_embedding = await _get_content_embeddings(
-        content=content, metadata=metadata
+    content_embedding, fingerprint = await _get_or_reuse_content_embedding(
+        asession=asession,
+        content=content,
+        metadata=metadata,
+        workspace_id=workspace_id,
     )
     content_db = ContentDB(
         content_embedding=content_embedding,
+        content_embedding_fingerprint=fingerprint,
         content_id=content_id,
         content_metadata=content.content_metadata,
         content_tags=content.content_tags,
@@ -387,17 +632,31 @@ async def get_content_from_db(
 
 async def get_list_of_content_from_db(
     *,
+    after_content_id: Optional[int] = None,
+    after_display_number: Optional[int] = None,
     asession: AsyncSession,
     exclude_archived: bool = True,
     exclude_unvalidated: bool = True,
     limit: Optional[int] = None,
     offset: int = 0,
+    search: Optional[str] = None,
+    tag_ids: Optional[list[int]] = None,
     workspace_id: int,
 ) -> list[ContentDB]:
     """Retrieve all content from the database for the specified workspace.
 
+    Content is ordered by display number then content ID. Pass the display number
+    and content ID of the last content of a page as `after_display_number` and
+    `after_content_id` to get the next page, which unlike `offset` does not scan the
+    skipped content.
+
     Parameters
     ----------
+    after_content_id
+        The content ID of the last content of the previous page. Only used with
+        `after_display_number`.
+    after_display_number
+        The display number of the last content of the previous page.
     asession
         The SQLAlchemy async session to use for all database connections.
     exclude_archived
@@ -409,6 +668,10 @@ async def get_list_of_content_from_db(
         content items are retrieved.
     offset
         The number of content items to skip.
+    search
+        Case-insensitive text that must appear in the title or text of the content.
+    tag_ids
+        If specified, only content with at least one of these tags is retrieved.
     workspace_id
         The ID of the workspace to retrieve content from.
 
@@ -423,12 +686,34 @@ async def get_list_of_content_from_db(
         select(ContentDB)
         .options(selectinload(ContentDB.content_tags))
         .where(ContentDB.workspace_id == workspace_id)
-        .order_by(ContentDB.display_number)
+        .order_by(ContentDB.display_number, ContentDB.content_id)
     )
     if exclude_archived:
         stmt = stmt.where(ContentDB.is_archived == false())
     if exclude_unvalidated:
         stmt = stmt.where(ContentDB.is_validated == true())
+    if after_display_number is not None:
+        if after_content_id is None:
+            stmt = stmt.where(ContentDB.display_number > after_display_number)
+        else:
+            stmt = stmt.where(
+                tuple_(ContentDB.display_number, ContentDB.content_id)
+                > tuple_(after_display_number, after_content_id)
+            )
+    if search:
+        stmt = stmt.where(
+            or_(
+                ContentDB.content_title.icontains(search, autoescape=True),
+                ContentDB.content_text.icontains(search, autoescape=True),
+            )
+        )
+    if tag_ids:
+        stmt = stmt.where(
+            select(content_tags_table.c.content_id)
+            .where(content_tags_table.c.content_id == ContentDB.content_id)
+            .where(content_tags_table.c.tag_id.in_(tag_ids))
+            .exists()
+        )
     if offset > 0:
         stmt = stmt.offset(offset)
     if isinstance(limit, int) and limit > 0:
@@ -437,6 +722,133 @@ async def get_list_of_content_from_db(
     return [c[0] for c in content_rows] if content_rows else []
 
 
+def _get_text_to_embed(*, content: ContentCreate | ContentUpdate) -> str:
+    """Get the text that is embedded for the content.
+
+    Parameters
+    ----------
+    content
+        The content to embed.
+
+    Returns
+    -------
+    str
+        The text to embed.
+    """
+
+    return content.content_title + "\n" + content.content_text
+
+
+def get_embedding_fingerprint(
+    *,
+    model: str,
+    text_to_embed: str,
+    vector_size: Optional[int] = None,
+) -> str:
+    """Get the fingerprint of an embedding, from the embedded text and the model.
+
+    Two contents with the same fingerprint have the same embedding, so the stored
+    vector of one can be reused for the other.
+
+    Parameters
+    ----------
+    model
+        The name of the provider model that the embedding model resolves to, from
+        `get_embedding_model_name`.
+    text_to_embed
+        The embedded text.
+    vector_size
+        The size of the embedding vector. Defaults to `PGVECTOR_VECTOR_SIZE`.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 of the embedding model, vector size and text.
+    """
+
+    vector_size = vector_size or int(PGVECTOR_VECTOR_SIZE)
+    payload = f"{model}:{vector_size}\n{text_to_embed}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def get_stored_embeddings(
+    *, asession: AsyncSession, fingerprints: list[str], workspace_id: int
+) -> dict[str, list[float]]:
+    """Get the stored vectors of contents in a workspace with the given embedding
+    fingerprints.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    fingerprints
+        The embedding fingerprints to look up.
+    workspace_id
+        The ID of the workspace to look up the contents in.
+
+    Returns
+    -------
+    dict[str, list[float]]
+        The stored vector of each fingerprint that was found.
+    """
+
+    if not fingerprints:
+        return {}
+
+    stmt = (
+        select(ContentDB.content_embedding_fingerprint, ContentDB.content_embedding)
+        .distinct(ContentDB.content_embedding_fingerprint)
+        .where(ContentDB.content_embedding_fingerprint.in_(set(fingerprints)))
+        .where(ContentDB.workspace_id == workspace_id)
+    )
+    rows = (await asession.execute(stmt)).all()
+    return {fingerprint: content_embedding for fingerprint, content_embedding in rows}
+
+
+async def _get_or_reuse_content_embedding(
+    *,
+    asession: AsyncSession,
+    content: ContentCreate | ContentUpdate,
+    metadata: dict,
+    workspace_id: int,
+) -> tuple[list[float], str]:
+    """Vectorize the content, unless a vector with the same fingerprint is stored in
+    the workspace.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    content
+        The content to vectorize.
+    metadata
+        The metadata to use for the embedding generation.
+    workspace_id
+        The ID of the workspace of the content.
+
+    Returns
+    -------
+    tuple[list[float], str]
+        The content embedding and its fingerprint.
+    """
+
+    fingerprint = get_embedding_fingerprint(
+        model=await get_embedding_model_name(),
+        text_to_embed=_get_text_to_embed(content=content),
+    )
+    stored_embeddings = await get_stored_embeddings(
+        asession=asession, fingerprints=[fingerprint], workspace_id=workspace_id
+    )
+    if fingerprint in stored_embeddings:
+        EMBEDDINGS_SKIPPED.labels(generation_name=metadata["generation_name"]).inc()
+        return stored_embeddings[fingerprint], fingerprint
+
+    content_embedding = await _get_content_embeddings(
+        content=content, metadata=metadata
+    )
+    return content_embedding, fingerprint
+
+
 async def _get_content_embeddings(
     *, content: ContentCreate | ContentUpdate, metadata: Optional[dict] = None
 ) -> list[float]:
@@ -455,10 +867,55 @@ async def _get_content_embeddings(
         The vectorized content embedding.
     """
 
-    text_to_embed = content.content_title + "\n" + content.content_text
+    text_to_embed = _get_text_to_embed(content=content)
     return await embedding(metadata=metadata, text_to_embed=text_to_embed)
 
 
+async def _get_content_embeddings_batch(
+    *, contents: list[ContentCreate], metadata: Optional[dict] = None
+) -> list[list[float] | EmbeddingCallException]:
+    """Vectorize a batch of contents with a single embedding call.
+
+    If the call fails, each content is vectorized on its own so that a single
+    content that cannot be embedded does not fail the rest of the batch.
+
+    Parameters
+    ----------
+    contents
+        The contents to vectorize.
+    metadata
+        The metadata to use for the embedding generation.
+
+    Returns
+    -------
+    list[list[float] | EmbeddingCallException]
+        The embedding of each content, or the exception raised when vectorizing it.
+    """
+
+    try:
+        return list(
+            await embedding_batch(
+                metadata=metadata,
+                texts_to_embed=[
+                    _get_text_to_embed(content=content) for content in contents
+                ],
+            )
+        )
+    except EmbeddingCallException as e:
+        if len(contents) == 1:
+            return [e]
+
+    content_embeddings: list[list[float] | EmbeddingCallException] = []
+    for content in contents:
+        try:
+            content_embeddings.append(
+                await _get_content_embeddings(content=content, metadata=metadata)
+            )
+        except EmbeddingCallException as e:
+            content_embeddings.append(e)
+    return content_embeddings
+
+
 async def get_similar_content_async(
     *,
     asession: AsyncSession,
@@ -543,33 +1000,72 @@ async def get_search_results(
         dictionary.
     """
 
-    distance = ContentDB.content_embedding.cosine_distance(question_embedding).label(
-        "distance"
+    query = _get_search_statement(
+        exclude_archived=exclude_archived, exclude_unvalidated=exclude_unvalidated
     )
-
-    query = select(ContentDB, distance).where(ContentDB.workspace_id == workspace_id)
-
-    if exclude_archived:
-        query = query.where(ContentDB.is_archived == false())
-    if exclude_unvalidated:
-        query = query.where(ContentDB.is_validated == true())
-
-    query = query.order_by(distance).limit(n_similar)
-
-    search_result = (await asession.execute(query)).all()
+    search_result = (
+        await asession.execute(
+            query,
+            {
+                "n_similar": n_similar,
+                "question_embedding": question_embedding,
+                "workspace_id": workspace_id,
+            },
+        )
+    ).all()
 
     results_dict = {}
     for i, r in enumerate(search_result):
         results_dict[i] = QuerySearchResult(
-            distance=r[1],
-            id=r[0].content_id,
-            text=r[0].content_text,
-            title=r[0].content_title,
+            distance=r.distance,
+            id=r.content_id,
+            text=r.content_text,
+            title=r.content_title,
         )
 
     return results_dict
 
 
+@lru_cache
+def _get_search_statement(
+    *, exclude_archived: bool, exclude_unvalidated: bool
+) -> Select:
+    """Get the vector search statement of `get_search_results`.
+
+    The statement selects only the columns of the search results, and takes the
+    question embedding, workspace ID and number of results as bound parameters. It is
+    built once per combination of filters, so that SQLAlchemy reuses its compiled form
+    and asyncpg its prepared statement across requests.
+
+    Parameters
+    ----------
+    exclude_archived
+        Specifies whether to exclude archived content.
+    exclude_unvalidated
+        Specifies whether to exclude unvalidated content.
+
+    Returns
+    -------
+    Select
+        The search statement.
+    """
+
+    distance = ContentDB.content_embedding.cosine_distance(
+        bindparam("question_embedding", type_=Vector(int(PGVECTOR_VECTOR_SIZE)))
+    ).label("distance")
+
+    query = select(
+        ContentDB.content_id, ContentDB.content_title, ContentDB.content_text, distance
+    ).where(ContentDB.workspace_id == bindparam("workspace_id"))
+
+    if exclude_archived:
+        query = query.where(ContentDB.is_archived == false())
+    if exclude_unvalidated:
+        query = query.where(ContentDB.is_validated == true())
+
+    return query.order_by(distance).limit(bindparam("n_similar", type_=Integer))
+
+
 async def increment_query_count(
     *,
     asession: AsyncSession,
@@ -672,6 +1168,49 @@ async def get_latest_display_number(
     return latest_display_number or 0
 
 
+async def get_existing_content_hashes(
+    *,
+    asession: AsyncSession,
+    hash_column: Literal["content_text_hash", "content_title_hash"],
+    hashes: list[str],
+    workspace_id: int,
+) -> set[str]:
+    """Get the hashes, among the given ones, of active contents in the workspace.
+
+    This is a single lookup on the per-workspace hash index.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    hash_column
+        The name of the hash column to look up.
+    hashes
+        The hashes to look up, from `hash_content_value`.
+    workspace_id
+        The ID of the workspace to look up the hashes in.
+
+    Returns
+    -------
+    set[str]
+        The hashes that already exist in the workspace.
+    """
+
+    if not hashes:
+        return set()
+
+    column_ = getattr(ContentDB, hash_column)
+    stmt = (
+        select(column_)
+        .distinct()
+        .where(ContentDB.workspace_id == workspace_id)
+        .where(column_.in_(hashes))
+        .where(ContentDB.is_archived == false())
+        .where(ContentDB.is_validated == true())
+    )
+    return set((await asession.execute(stmt)).scalars().all())
+
+
 async def validate_related_contents(
     *, asession: AsyncSession, related_contents: list[int], workspace_id: int
 ) -> tuple[bool, list[int]]:
@@ -1,48 +1,68 @@
 """This module contains FastAPI routers for content management endpoints."""
 
-from typing import Annotated, Optional
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Annotated, Literal, Optional
+from uuid import uuid4
 
 import pandas as pd
 import sqlalchemy.exc
-from fastapi import APIRouter, Depends, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
 from fastapi.exceptions import HTTPException
 from langfuse.decorators import observe  # type: ignore
 from pandas.errors import EmptyDataError, ParserError
-from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth.dependencies import get_current_user, get_current_workspace_name
 from ..config import CHECK_CONTENT_LIMIT
 from ..database import get_async_session
-from ..tags.models import (
-    TagDB,
-    get_list_of_tag_from_db,
-    save_tag_to_db,
-    validate_tags,
-)
-from ..tags.schemas import TagCreate, TagRetrieve
+from ..tags.models import validate_tags
 from ..users.models import UserDB, user_has_required_role_in_workspace
 from ..users.schemas import UserRoles
-from ..utils import EmbeddingCallException, setup_logger
+from ..utils import EmbeddingCallException, delete_spooled_file, setup_logger
 from ..workspaces.utils import (
     get_content_quota_by_workspace_id,
     get_workspace_by_workspace_name,
 )
+from .csv_import import (
+    clean_dataframe,
+    create_csv_import_job,
+    get_csv_import_status,
+    import_csv_contents,
+    read_csv_chunks,
+    spool_csv_upload,
+)
 from .models import (
     ContentDB,
     archive_content_from_db,
     delete_content_from_db,
     get_content_from_db,
+    get_existing_content_hashes,
     get_list_of_content_from_db,
     get_next_unvalidated_content_card,
     get_unvalidated_count,
+    hash_content_value,
     mark_content_as_validated,
     save_content_to_db,
     update_content_in_db,
     validate_related_contents,
 )
-from .schemas import ContentCreate, ContentRetrieve, CustomError, CustomErrorList
+from .schemas import (
+    ContentCreate,
+    ContentRetrieve,
+    CsvImportStatus,
+    CustomError,
+    CustomErrorList,
+)
 
 TAG_METADATA = {
     "name": "Content management",
@@ -50,17 +70,24 @@ TAG_METADATA = {
     "question answering.",
 }
 
+# Order in which the CSV errors are reported.
+CSV_CHECK_ORDER = [
+    "missing_columns",
+    "exceeds_quota",
+    "empty_title",
+    "empty_text",
+    "title_too_long",
+    "texts_too_long",
+    "duplicate_titles",
+    "duplicate_texts",
+    "title_in_db",
+    "text_in_db",
+]
+
 router = APIRouter(prefix="/content", tags=[TAG_METADATA["name"]])
 logger = setup_logger()
 
 
-class BulkUploadResponse(BaseModel):
-    """Pydantic model for the CSV-upload response."""
-
-    contents: list[ContentRetrieve]
-    tags: list[TagRetrieve]
-
-
 class ExceedsContentQuotaError(Exception):
     """Exception raised when a user is attempting to add more content that their quota
     allows.
@@ -302,10 +329,18 @@ async def retrieve_content(
     limit: int = 50,
     exclude_archived: bool = True,
     exclude_unvalidated: bool = True,
+    after_display_number: Optional[int] = None,
+    after_content_id: Optional[int] = None,
+    search: Optional[str] = None,
+    tag_ids: Annotated[Optional[list[int]], Query()] = None,
     asession: AsyncSession = Depends(get_async_session),
 ) -> list[ContentRetrieve]:
     """Retrieve all contents for the specified workspace.
 
+    Contents are ordered by display number. To page through a large workspace, pass
+    the `display_number` and `content_id` of the last content of a page as
+    `after_display_number` and `after_content_id` to get the next page.
+
     Parameters
     ----------
     workspace_name
@@ -318,6 +353,14 @@ async def retrieve_content(
         Specifies whether to exclude archived contents.
     exclude_unvalidated
         Specifies whether to exclude unvalidated contents.
+    after_display_number
+        The display number of the last content of the previous page.
+    after_content_id
+        The content ID of the last content of the previous page.
+    search
+        Case-insensitive text that must appear in the title or text of the contents.
+    tag_ids
+        If specified, only contents with at least one of these tags are retrieved.
     asession
         The SQLAlchemy async session to use for all database connections.
 
@@ -330,11 +373,15 @@ async def retrieve_content(
         asession=asession, workspace_name=workspace_name
     )
     records = await get_list_of_content_from_db(
+        after_content_id=after_content_id,
+        after_display_number=after_display_number,
         asession=asession,
         exclude_archived=exclude_archived,
         exclude_unvalidated=exclude_unvalidated,
         limit=limit,
         offset=skip,
+        search=search,
+        tag_ids=tag_ids,
         workspace_id=workspace_db.workspace_id,
     )
     contents = [_convert_record_to_schema(record=c) for c in records]
@@ -686,48 +733,62 @@ async def retrieve_content_by_id(
     return _convert_record_to_schema(record=record)
 
 
-@router.post("/csv-upload", response_model=BulkUploadResponse)
+@router.post(
+    "/csv-upload",
+    response_model=CsvImportStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def bulk_upload_contents(
+    request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile,
     calling_user_db: Annotated[UserDB, Depends(get_current_user)],
     workspace_name: Annotated[str, Depends(get_current_workspace_name)],
-    exclude_archived: bool = True,
-    exclude_unvalidated: bool = True,
     asession: AsyncSession = Depends(get_async_session),
-) -> BulkUploadResponse:
-    """Upload, check, and ingest contents in bulk from a CSV file.
+) -> CsvImportStatus:
+    """Upload and check a CSV file, and start a job to ingest its contents in bulk.
 
     Note: If there are any issues with the CSV, the endpoint will return a 400 error
     with the list of issues under 'detail' in the response body.
 
+    The process is as follows:
+
+    1. Parameters for the endpoint are checked first, and the CSV file is spooled to
+        disk.
+    2. The CSV file is checked in chunks.
+    3. A background job is started to ingest the contents in chunks, with batched
+        embeddings. Its progress is reported by `GET /content/csv-upload/{job_id}`.
+    4. Return the job status.
+
     Parameters
     ----------
+    request
+        The FastAPI request object.
+    background_tasks
+        The FastAPI background tasks object.
     file
         The CSV file to upload.
     calling_user_db
         The user object associated with the user that is uploading the CSV.
     workspace_name
         The name of the workspace to upload the contents to.
-    exclude_archived
-        Specifies whether to exclude archived contents.
-    exclude_unvalidated
-        Specifies whether to exclude unvalidated contents.
     asession
         The SQLAlchemy async session to use for all database connections.
 
     Returns
     -------
-    BulkUploadResponse
-        The response containing the created tags and contents.
+    CsvImportStatus
+        The status of the CSV import job.
 
     Raises
     ------
     HTTPException
         If the user does not have the required role to upload content in the workspace.
         If the file is not a CSV.
-        If the CSV file is empty or unreadable.
+        If the CSV file is empty, unreadable, or does not pass the checks.
     """
 
+    # 1.
     workspace_db = await get_workspace_by_workspace_name(
         asession=asession, workspace_name=workspace_name
     )
@@ -759,124 +820,138 @@ async def bulk_upload_contents(
             detail=error_list_model.model_dump(),
         )
 
-    df = _load_csv(file=file)
+    file_path = await spool_csv_upload(stream=file.file)
     workspace_id = workspace_db.workspace_id
-    await _csv_checks(asession=asession, df=df, workspace_id=workspace_id)
-
-    # Create each new tag in the database.
-    tags_col = "tags"
-    created_tags: list[TagRetrieve] = []
-    tag_name_to_id_map: dict[str, int] = {}
-    skip_tags = tags_col not in df.columns or df[tags_col].isnull().all()
-    if not skip_tags:
-        incoming_tags = _extract_unique_tags(tags_col=df[tags_col])
-        tags_in_db = await get_list_of_tag_from_db(
-            asession=asession, workspace_id=workspace_id
-        )
-        tags_to_create = _get_tags_not_in_db(
-            incoming_tags=incoming_tags, tags_in_db=tags_in_db
-        )
-        for tag in tags_to_create:
-            tag_create = TagCreate(tag_name=tag)
-            tag_db = await save_tag_to_db(
-                asession=asession, tag=tag_create, workspace_id=workspace_id
-            )
-            tags_in_db.append(tag_db)
-
-            # Convert the tag record to a schema (for response).
-            tag_retrieve = _convert_tag_record_to_schema(record=tag_db)
-            created_tags.append(tag_retrieve)
-
-        # Tag name to tag ID mapping.
-        tag_name_to_id_map = {tag.tag_name: tag.tag_id for tag in tags_in_db}
-
-    # Add each row to the content database.
-    created_contents = []
-    for _, row in df.iterrows():
-        content_tags: list = []  # Should be list[TagDB] but clashes with validate_tags
-        if tag_name_to_id_map and not pd.isna(row[tags_col]):
-            tag_names = [
-                tag_name.strip().upper() for tag_name in row[tags_col].split(",")
-            ]
-            tag_ids = [tag_name_to_id_map[tag_name] for tag_name in tag_names]
-            _, content_tags = await validate_tags(
-                asession=asession, tags=tag_ids, workspace_id=workspace_id
-            )
 
-        content = ContentCreate(
-            content_tags=content_tags,
-            content_text=row["text"],
-            content_title=row["title"],
-            content_metadata={},
-            related_contents_id=[],
+    # 2.
+    try:
+        n_rows = await _csv_checks(
+            asession=asession, file_path=file_path, workspace_id=workspace_id
         )
+    except Exception:
+        delete_spooled_file(file_path)
+        raise
 
-        content_db = await save_content_to_db(
-            asession=asession,
-            content=content,
-            exclude_archived=exclude_archived,
-            workspace_id=workspace_id,
-        )
-        content_retrieve = _convert_record_to_schema(record=content_db)
-        created_contents.append(content_retrieve)
+    # 3.
+    job_status = CsvImportStatus(
+        job_id=str(uuid4()),
+        user_id=calling_user_db.user_id,
+        workspace_id=workspace_id,
+        file_name=file.filename,
+        created_datetime_utc=datetime.now(timezone.utc),
+        rows_total=n_rows,
+    )
+    redis = request.app.state.redis
+    await create_csv_import_job(
+        file_path=str(file_path), job_status=job_status, redis=redis
+    )
+    background_tasks.add_task(
+        import_csv_contents,
+        file_path=str(file_path),
+        job_status=job_status.model_copy(deep=True),
+        redis=redis,
+    )
 
-    return BulkUploadResponse(tags=created_tags, contents=created_contents)
+    # 4.
+    return job_status
 
 
-def _load_csv(*, file: UploadFile) -> pd.DataFrame:
-    """Load the CSV file into a pandas DataFrame.
+@router.get("/csv-upload/{job_id}", response_model=CsvImportStatus)
+async def get_csv_upload_status(
+    request: Request,
+    job_id: str,
+    calling_user_db: Annotated[UserDB, Depends(get_current_user)],
+    workspace_name: Annotated[str, Depends(get_current_workspace_name)],
+    asession: AsyncSession = Depends(get_async_session),
+) -> CsvImportStatus:
+    """Get the status of a CSV import job. A job that stopped without finishing,
+    e.g. because the server restarted, is reported as failed.
 
     Parameters
     ----------
-    file
-        The CSV file to load.
+    request
+        The FastAPI request object.
+    job_id
+        The ID of the CSV import job.
+    calling_user_db
+        The user object associated with the user requesting the status.
+    workspace_name
+        The name of the workspace the contents are being uploaded to.
+    asession
+        The SQLAlchemy async session to use for all database connections.
 
     Returns
     -------
-    pd.DataFrame
-        The loaded DataFrame.
+    CsvImportStatus
+        The status of the CSV import job.
 
     Raises
     ------
     HTTPException
-        If the CSV file is empty or unreadable.
+        If the user does not have the required role to upload content in the workspace.
+        If the job does not exist in the workspace.
     """
 
-    try:
-        df = pd.read_csv(file.file, dtype=str)
-    except (EmptyDataError, ParserError, UnicodeDecodeError) as e:
-        error_type = {
-            EmptyDataError: "empty_data",
-            ParserError: "parse_error",
-            UnicodeDecodeError: "encoding_error",
-        }.get(type(e), "unknown_error")
-        error_description = {
-            "empty_data": "The CSV file is empty",
-            "parse_error": "CSV is unreadable (parsing error)",
-            "encoding_error": "CSV is unreadable (encoding error)",
-        }.get(error_type, "An unknown error occurred")
-        error_list_model = CustomErrorList(
-            errors=[CustomError(type=error_type, description=error_description)]
-        )
+    workspace_db = await get_workspace_by_workspace_name(
+        asession=asession, workspace_name=workspace_name
+    )
+
+    if not await user_has_required_role_in_workspace(
+        allowed_user_roles=[UserRoles.ADMIN],
+        asession=asession,
+        user_db=calling_user_db,
+        workspace_db=workspace_db,
+    ):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=error_list_model.model_dump(),
-        ) from e
-    if df.empty:
-        error_list_model = CustomErrorList(
-            errors=[
-                CustomError(
-                    type="no_rows_csv",
-                    description="The CSV file is empty",
-                )
-            ]
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User does not have the required role to upload content in the "
+            "workspace.",
         )
+
+    job_status = await get_csv_import_status(
+        job_id=job_id,
+        redis=request.app.state.redis,
+        workspace_id=workspace_db.workspace_id,
+    )
+    if job_status is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=error_list_model.model_dump(),
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"CSV import job '{job_id}' not found",
         )
+    return job_status
+
+
+def _read_error_to_http_exception(*, error: Exception) -> HTTPException:
+    """Convert an error raised when reading a CSV file to an HTTP exception.
+
+    Parameters
+    ----------
+    error
+        The error raised by `pandas` when reading the CSV file.
+
+    Returns
+    -------
+    HTTPException
+        The HTTP exception with the list of issues under 'detail'.
+    """
 
-    return df
+    error_type = {
+        EmptyDataError: "empty_data",
+        ParserError: "parse_error",
+        UnicodeDecodeError: "encoding_error",
+    }.get(type(error), "unknown_error")
+    error_description = {
+        "empty_data": "The CSV file is empty",
+        "parse_error": "CSV is unreadable (parsing error)",
+        "encoding_error": "CSV is unreadable (encoding error)",
+    }.get(error_type, "An unknown error occurred")
+    error_list_model = CustomErrorList(
+        errors=[CustomError(type=error_type, description=error_description)]
+    )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=error_list_model.model_dump(),
+    )
 
 
 async def check_content_quota(
@@ -918,7 +993,11 @@ async def check_db_duplicates(
     error_list: list[CustomError],
     workspace_id: int,
 ) -> None:
-    """Check for duplicates between the CSV and the database.
+    """Check for duplicates between a chunk of the CSV and the database.
+
+    The normalized hashes of the titles and texts of the chunk are looked up with the
+    per-workspace hash indexes, and each lookup is skipped once a duplicate of its kind
+    has been found.
 
     Parameters
     ----------
@@ -932,73 +1011,140 @@ async def check_db_duplicates(
         The ID of the workspace to check for content duplicates in.
     """
 
-    contents_in_db = await get_list_of_content_from_db(
-        asession=asession, limit=None, offset=0, workspace_id=workspace_id
-    )
-    content_titles_in_db = {c.content_title.strip() for c in contents_in_db}
-    content_texts_in_db = {c.content_text.strip() for c in contents_in_db}
-
-    if df["title"].isin(content_titles_in_db).any():
-        error_list.append(
+    error_types = {error.type for error in error_list}
+    checks: list[
+        tuple[str, Literal["content_text_hash", "content_title_hash"], CustomError]
+    ] = [
+        (
+            "title",
+            "content_title_hash",
             CustomError(
                 type="title_in_db",
                 description="One or more content titles already exist in the database.",
-            )
-        )
-    if df["text"].isin(content_texts_in_db).any():
-        error_list.append(
+            ),
+        ),
+        (
+            "text",
+            "content_text_hash",
             CustomError(
                 type="text_in_db",
                 description="One or more content texts already exist in the database.",
-            )
+            ),
+        ),
+    ]
+    for col, hash_column, error in checks:
+        if error.type in error_types:
+            continue
+        existing_hashes = await get_existing_content_hashes(
+            asession=asession,
+            hash_column=hash_column,
+            hashes=list({hash_content_value(value) for value in df[col].dropna()}),
+            workspace_id=workspace_id,
         )
+        if existing_hashes:
+            error_list.append(error)
 
 
 async def _csv_checks(
-    *, asession: AsyncSession, df: pd.DataFrame, workspace_id: int
-) -> None:
+    *, asession: AsyncSession, file_path: Path, workspace_id: int
+) -> int:
     """Perform checks on the CSV file to ensure it meets the requirements.
 
+    The CSV file is read and checked in chunks of `CSV_IMPORT_CHUNK_SIZE` rows, so
+    that it is never loaded in memory as a whole. Each type of error is reported once,
+    in the same order as if the whole file had been checked at once.
+
     Parameters
     ----------
     asession
         The SQLAlchemy async session to use for all database connections.
-    df
-        The DataFrame to check.
+    file_path
+        The path of the spooled CSV file.
     workspace_id
         The ID of the workspace that the CSV contents are being uploaded to.
 
+    Returns
+    -------
+    int
+        The number of rows in the CSV file.
+
     Raises
     ------
     HTTPException
-        If the CSV file does not meet the requirements.
+        If the CSV file is empty or unreadable, or does not meet the requirements.
     """
 
     error_list: list[CustomError] = []
-    check_required_columns(df=df, error_list=error_list)
+    n_rows = 0
+    seen_texts: set[str] = set()
+    seen_titles: set[str] = set()
+    try:
+        for df in read_csv_chunks(file_path=file_path):
+            if df.empty:
+                continue
+            check_required_columns(df=df, error_list=error_list)
+            n_rows += len(df)
+            clean_dataframe(df=df)
+            check_empty_values(df=df, error_list=error_list)
+            check_length_constraints(df=df, error_list=error_list)
+            check_duplicates(
+                df=df,
+                error_list=error_list,
+                seen_texts=seen_texts,
+                seen_titles=seen_titles,
+            )
+            await check_db_duplicates(
+                asession=asession,
+                df=df,
+                error_list=error_list,
+                workspace_id=workspace_id,
+            )
+    except (EmptyDataError, ParserError, UnicodeDecodeError) as e:
+        raise _read_error_to_http_exception(error=e) from e
+
+    if n_rows == 0:
+        error_list_model = CustomErrorList(
+            errors=[
+                CustomError(
+                    type="no_rows_csv",
+                    description="The CSV file is empty",
+                )
+            ]
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_list_model.model_dump(),
+        )
+
     await check_content_quota(
         asession=asession,
         error_list=error_list,
-        n_contents_to_add=len(df),
+        n_contents_to_add=n_rows,
         workspace_id=workspace_id,
     )
-    clean_dataframe(df=df)
-    check_empty_values(df=df, error_list=error_list)
-    check_length_constraints(df=df, error_list=error_list)
-    check_duplicates(df=df, error_list=error_list)
-    await check_db_duplicates(
-        asession=asession, df=df, error_list=error_list, workspace_id=workspace_id
-    )
 
     if error_list:
+        # Report each type of error once, in the order of the checks.
+        errors_by_type = {error.type: error for error in reversed(error_list)}
+        error_list = sorted(
+            errors_by_type.values(), key=lambda error: CSV_CHECK_ORDER.index(error.type)
+        )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=CustomErrorList(errors=error_list).model_dump(),
         )
 
+    return n_rows
+
 
-def check_duplicates(*, df: pd.DataFrame, error_list: list[CustomError]) -> None:
-    """Check for duplicates in the DataFrame.
+def check_duplicates(
+    *,
+    df: pd.DataFrame,
+    error_list: list[CustomError],
+    seen_texts: set[str],
+    seen_titles: set[str],
+) -> None:
+    """Check for duplicates in a chunk of the CSV, and against the previous chunks.
 
     Parameters
     ----------
@@ -1006,22 +1152,39 @@ def check_duplicates(*, df: pd.DataFrame, error_list: list[CustomError]) -> None
         The DataFrame to check.
     error_list
         The list of errors to append to.
+    seen_texts
+        The normalized hashes of the texts of the previous chunks. Updated in place.
+    seen_titles
+        The normalized hashes of the titles of the previous chunks. Updated in place.
     """
 
-    if df.duplicated(subset=["title"]).any():
-        error_list.append(
+    for col, seen_hashes, error in [
+        (
+            "title",
+            seen_titles,
             CustomError(
                 type="duplicate_titles",
                 description="Duplicate content titles found in the CSV file.",
-            )
-        )
-    if df.duplicated(subset=["text"]).any():
-        error_list.append(
+            ),
+        ),
+        (
+            "text",
+            seen_texts,
             CustomError(
                 type="duplicate_texts",
                 description="Duplicate content texts found in the CSV file.",
-            )
-        )
+            ),
+        ),
+    ]:
+        hashes = [hash_content_value(value) for value in df[col].dropna()]
+        unique_hashes = set(hashes)
+        if (
+            len(unique_hashes) < len(hashes)
+            or df[col].isnull().sum() > 1
+            or not seen_hashes.isdisjoint(unique_hashes)
+        ):
+            error_list.append(error)
+        seen_hashes.update(unique_hashes)
 
 
 def check_empty_values(*, df: pd.DataFrame, error_list: list[CustomError]) -> None:
@@ -1110,20 +1273,6 @@ def check_required_columns(*, df: pd.DataFrame, error_list: list[CustomError]) -
         )
 
 
-def clean_dataframe(*, df: pd.DataFrame) -> None:
-    """Clean the DataFrame by stripping whitespace and replacing empty strings.
-
-    Parameters
-    ----------
-    df
-        The DataFrame to clean.
-    """
-
-    df["title"] = df["title"].str.strip()
-    df["text"] = df["text"].str.strip()
-    df.replace("", None, inplace=True)
-
-
 async def _check_content_quota_availability(
     *, asession: AsyncSession, n_contents_to_add: int, workspace_id: int
 ) -> None:
@@ -1174,61 +1323,6 @@ async def _check_content_quota_availability(
             )
 
 
-def _extract_unique_tags(*, tags_col: pd.Series) -> list[str]:
-    """Get unique UPPERCASE tags from a DataFrame column (comma-separated within
-    column).
-
-    Parameters
-    ----------
-    tags_col
-        The column containing tags.
-
-    Returns
-    -------
-    list[str]
-        A list of unique tags.
-    """
-
-    # Prep the column.
-    tags_col = tags_col.dropna().astype(str)
-
-    # Split and explode to have one tag per row.
-    tags_flat = tags_col.str.split(",").explode()
-
-    # Strip and uppercase.
-    tags_flat = tags_flat.str.strip().str.upper()
-
-    # Get unique tags as a list.
-    tags_unique_list = list(tags_flat.unique())
-
-    return tags_unique_list
-
-
-def _get_tags_not_in_db(
-    *, incoming_tags: list[str], tags_in_db: list[TagDB]
-) -> list[str]:
-    """Compare tags fetched from the DB with incoming tags and return tags not in the
-    DB.
-
-    Parameters
-    ----------
-    incoming_tags
-        List of incoming tags.
-    tags_in_db
-        List of `TagDB` objects fetched from the database.
-
-    Returns
-    -------
-    list[str]
-        List of tags not in the database.
-    """
-
-    tags_in_db_list: list[str] = [tag_json.tag_name for tag_json in tags_in_db]
-    tags_not_in_db_list: list[str] = list(set(incoming_tags) - set(tags_in_db_list))
-
-    return tags_not_in_db_list
-
-
 def _convert_record_to_schema(*, record: ContentDB) -> ContentRetrieve:
     """Convert `models.ContentDB` models to `ContentRetrieve` schema.
 
@@ -1260,28 +1354,3 @@ def _convert_record_to_schema(*, record: ContentDB) -> ContentRetrieve:
     )
 
     return content_retrieve
-
-
-def _convert_tag_record_to_schema(*, record: TagDB) -> TagRetrieve:
-    """Convert `models.TagDB` models to `TagRetrieve` schema.
-
-    Parameters
-    ----------
-    record
-        `TagDB` object to convert.
-
-    Returns
-    -------
-    TagRetrieve
-        `TagRetrieve` object of the converted record.
-    """
-
-    tag_retrieve = TagRetrieve(
-        created_datetime_utc=record.created_datetime_utc,
-        tag_id=record.tag_id,
-        tag_name=record.tag_name,
-        updated_datetime_utc=record.updated_datetime_utc,
-        workspace_id=record.workspace_id,
-    )
-
-    return tag_retrieve
@@ -1,10 +1,13 @@
 """This module contains Pydantic models for content endpoints."""
 
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from ..tags.schemas import TagRetrieve
+
 
 class ContentCreate(BaseModel):
     """Pydantic model for content creation request."""
@@ -26,6 +29,14 @@ class ContentCreate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ContentBulkFailure(BaseModel):
+    """Pydantic model for a content item that failed to be saved in bulk."""
+
+    content_title: str
+    error: str
+    index: int
+
+
 class ContentDelete(BaseModel):
     """Pydantic model for content deletion."""
 
@@ -56,6 +67,34 @@ class ContentUpdate(ContentCreate):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CsvImportStatusEnum(str, Enum):
+    """Enum for CSV import job status."""
+
+    failed = "Failed"
+    in_progress = "In progress"
+    success = "Success"
+    not_started = "Import job created"
+
+
+class CsvImportStatus(BaseModel):
+    """Pydantic model for the status of a CSV import job."""
+
+    job_id: str
+    user_id: int
+    workspace_id: int
+    file_name: str
+    created_datetime_utc: datetime
+    finished_datetime_utc: Optional[datetime] = None
+    heartbeat_datetime_utc: Optional[datetime] = None
+    job_status: CsvImportStatusEnum = CsvImportStatusEnum.not_started
+    error_trace: Optional[str] = ""
+    rows_total: int
+    rows_processed: int = 0
+    contents_created: int = 0
+    failures: list[ContentBulkFailure] = Field(default_factory=list)
+    tags_created: list[TagRetrieve] = Field(default_factory=list)
+
+
 class CustomError(BaseModel):
     """Pydantic model for custom error."""
 
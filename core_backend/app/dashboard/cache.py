@@ -0,0 +1,121 @@
+"""This module contains the Redis cache of the dashboard responses.
+
+Dashboard responses are cached by workspace, endpoint, timeframe, frequency and time
+bucket. The predefined timeframes end now, so their responses are cached in the open
+bucket of the current `DASHBOARD_CACHE_OPEN_TTL` seconds and expire with it. Custom
+timeframes are their own bucket, which is closed once its last day has ended; the
+statistics of a closed bucket no longer change, so they are cached for
+`DASHBOARD_CACHE_CLOSED_TTL` seconds.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, TypeVar
+
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+
+from .config import DASHBOARD_CACHE_CLOSED_TTL, DASHBOARD_CACHE_OPEN_TTL
+from .schemas import TimeFrequency
+
+CACHE_KEY_PREFIX = "dashboard_cache:"
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+
+def get_dashboard_cache_key_and_ttl(
+    *,
+    end_date: datetime,
+    endpoint: str,
+    frequency: TimeFrequency,
+    start_date: datetime,
+    timeframe: str,
+    top_n: Optional[int] = None,
+    workspace_id: int,
+) -> tuple[str, int]:
+    """Get the cache key and TTL of a dashboard response.
+
+    Parameters
+    ----------
+    end_date
+        The end date of the statistics.
+    endpoint
+        The name of the dashboard endpoint.
+    frequency
+        The frequency of the statistics.
+    start_date
+        The start date of the statistics.
+    timeframe
+        The timeframe of the statistics.
+    top_n
+        The number of top content of the statistics, if any.
+    workspace_id
+        The ID of the workspace of the statistics.
+
+    Returns
+    -------
+    tuple[str, int]
+        The cache key and the TTL of the response, in seconds.
+    """
+
+    now = datetime.now(timezone.utc)
+    if timeframe == "custom":
+        bucket = f"{start_date:%Y%m%d}-{end_date:%Y%m%d}"
+        # The timeseries include the whole of the last day.
+        is_closed = end_date + timedelta(days=1) <= now
+        ttl = DASHBOARD_CACHE_CLOSED_TTL if is_closed else DASHBOARD_CACHE_OPEN_TTL
+    else:
+        bucket_start = int(now.timestamp()) // DASHBOARD_CACHE_OPEN_TTL
+        bucket = str(bucket_start * DASHBOARD_CACHE_OPEN_TTL)
+        ttl = DASHBOARD_CACHE_OPEN_TTL
+
+    key = (
+        f"{CACHE_KEY_PREFIX}{workspace_id}:{endpoint}:{timeframe}:{frequency.value}:"
+        f"{bucket}:{top_n}"
+    )
+    return key, ttl
+
+
+async def get_cached_dashboard_response(
+    *, key: str, redis: aioredis.Redis, response_model: type[ResponseModel]
+) -> Optional[ResponseModel]:
+    """Get a cached dashboard response.
+
+    Parameters
+    ----------
+    key
+        The cache key of the response.
+    redis
+        The Redis instance.
+    response_model
+        The model of the response.
+
+    Returns
+    -------
+    Optional[ResponseModel]
+        The cached response, or `None` if it is not cached.
+    """
+
+    cached_response = await redis.get(key)
+    if cached_response is None:
+        return None
+    return response_model.model_validate_json(cached_response)
+
+
+async def save_dashboard_response(
+    *, key: str, redis: aioredis.Redis, response: BaseModel, ttl: int
+) -> None:
+    """Cache a dashboard response.
+
+    Parameters
+    ----------
+    key
+        The cache key of the response.
+    redis
+        The Redis instance.
+    response
+        The response to cache.
+    ttl
+        The TTL of the response, in seconds.
+    """
+
+    await redis.set(key, response.model_dump_json(), ex=ttl)
@@ -2,6 +2,19 @@
 
 import os
 
+DASHBOARD_CACHE_CLOSED_TTL = int(
+    os.environ.get("DASHBOARD_CACHE_CLOSED_TTL", 60 * 60 * 24)
+)
+DASHBOARD_CACHE_OPEN_TTL = int(os.environ.get("DASHBOARD_CACHE_OPEN_TTL", 5 * 60))
+DASHBOARD_QUERY_CONCURRENCY = int(os.environ.get("DASHBOARD_QUERY_CONCURRENCY", 5))
+DASHBOARD_ROLLUP_BACKFILL_HOURS = int(
+    os.environ.get("DASHBOARD_ROLLUP_BACKFILL_HOURS", 24 * 7)
+)
+DASHBOARD_ROLLUP_DELAY = int(os.environ.get("DASHBOARD_ROLLUP_DELAY", 5 * 60))
+DASHBOARD_ROLLUP_INTERVAL = int(os.environ.get("DASHBOARD_ROLLUP_INTERVAL", 5 * 60))
+DASHBOARD_ROLLUPS_ENABLED = (
+    os.environ.get("DASHBOARD_ROLLUPS_ENABLED", "true").lower() == "true"
+)
 DISABLE_DASHBOARD_LLM = (
     os.environ.get("DISABLE_DASHBOARD_LLM", "false").lower() == "true"
 )
@@ -12,3 +25,24 @@ MAX_FEEDBACK_RECORDS_FOR_TOP_CONTENT = os.environ.get(
     "MAX_FEEDBACK_RECORDS_FOR_TOP_CONTENT", 7
 )
 TOPIC_MODELING_CONTEXT = os.environ.get("TOPIC_MODELING_CONTEXT", "maternal health")
+# Increase in the share of outlier queries among the new queries of a refresh, from
+# the share when the topic model was fitted, above which the model is fitted again
+TOPIC_MODELING_DRIFT_THRESHOLD = float(
+    os.environ.get("TOPIC_MODELING_DRIFT_THRESHOLD", 0.1)
+)
+# Number of queries without a persisted embedding embedded per embedding call
+TOPIC_MODELING_EMBEDDING_BATCH_SIZE = int(
+    os.environ.get("TOPIC_MODELING_EMBEDDING_BATCH_SIZE", 100)
+)
+# Topic models fitted at once per API worker, each in its own process
+TOPIC_MODELING_MAX_PROCESSES = int(os.environ.get("TOPIC_MODELING_MAX_PROCESSES", 1))
+# Directory of the persisted topic models of each workspace and timeframe
+TOPIC_MODELING_MODEL_DIR = os.environ.get(
+    "TOPIC_MODELING_MODEL_DIR", "temp/topic_models"
+)
+# Seconds after which a persisted topic model is fitted again on refresh
+TOPIC_MODELING_REFIT_INTERVAL = int(
+    os.environ.get("TOPIC_MODELING_REFIT_INTERVAL", 60 * 60 * 24 * 7)
+)
+# Seconds after which a topic modeling refresh is stopped
+TOPIC_MODELING_TIMEOUT = int(os.environ.get("TOPIC_MODELING_TIMEOUT", 60 * 60))
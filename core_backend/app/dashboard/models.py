@@ -1,8 +1,19 @@
 """This module contains functionalities for managing the dashboard statistics."""
 
 # pylint: disable=E1102
-from datetime import date, datetime, timezone
-from typing import Any, Sequence, cast, get_args
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TypeVar,
+    cast,
+    get_args,
+)
 
 from sqlalchemy import Row, case, desc, func, literal_column, or_, select, text, true
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,6 +21,7 @@ from sqlalchemy.sql import and_
 from sqlalchemy.sql.expression import Subquery
 
 from ..contents.models import ContentDB
+from ..database import get_sqlalchemy_async_engine
 from ..llm_call.dashboard import generate_ai_summary
 from ..question_answer.models import (
     ContentFeedbackDB,
@@ -19,7 +31,18 @@ from ..question_answer.models import (
 )
 from ..urgency_detection.models import UrgencyResponseDB
 from ..utils import setup_logger
-from .config import DISABLE_DASHBOARD_LLM
+from .config import (
+    DASHBOARD_QUERY_CONCURRENCY,
+    DASHBOARD_ROLLUPS_ENABLED,
+    DISABLE_DASHBOARD_LLM,
+)
+from .rollups import (
+    CONTENT_COUNT_COLUMNS,
+    HOURLY_COUNT_COLUMNS,
+    get_content_hourly_counts,
+    get_hourly_counts,
+    get_rollup_watermark,
+)
 from .schemas import (
     BokehContentItem,
     ContentFeedbackStats,
@@ -43,6 +66,20 @@ logger = setup_logger()
 
 N_SAMPLES_TOPIC_MODELING = 4000
 
+T = TypeVar("T")
+
+
+class TopContentTimeSeriesRow(NamedTuple):
+    """A row of the top content timeseries, as built from the dashboard rollups."""
+
+    content_id: int
+    content_title: str
+    n_negative_feedback: int
+    n_positive_feedback: int
+    query_count: int
+    time_period: datetime
+    total_query_count: int
+
 
 def convert_rows_to_details_drawer(
     *,
@@ -113,7 +150,7 @@ def convert_rows_to_details_drawer(
 def convert_rows_to_top_content_time_series(
     *,
     format_str: str,
-    rows: Sequence[Row[Any]],
+    rows: Sequence[Row[Any]] | Sequence[TopContentTimeSeriesRow],
 ) -> list[TopContentTimeSeries]:
     """Convert rows to list of `TopContentTimeSeries` objects.
 
@@ -398,6 +435,34 @@ async def get_content_details(
     )
 
 
+async def get_content_embeddings(
+    *, asession: AsyncSession, content_ids: list[int]
+) -> dict[int, list[float]]:
+    """Retrieve the stored embeddings of content cards.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    content_ids
+        The IDs of the content cards.
+
+    Returns
+    -------
+    dict[int, list[float]]
+        The embedding of each content card, by content ID.
+    """
+
+    if not content_ids:
+        return {}
+
+    statement = select(ContentDB.content_id, ContentDB.content_embedding).where(
+        ContentDB.content_id.in_(content_ids)
+    )
+    rows = (await asession.execute(statement)).all()
+    return {content_id: content_embedding for content_id, content_embedding in rows}
+
+
 async def get_content_feedback_stats(
     *, asession: AsyncSession, end_date: date, start_date: date, workspace_id: int
 ) -> ContentFeedbackStats:
@@ -538,6 +603,16 @@ async def get_heatmap(
         The heatmap of queries per two hour blocks.
     """
 
+    watermark = await _get_rollup_watermark(asession=asession)
+    if watermark is not None:
+        return await _get_heatmap_from_rollups(
+            asession=asession,
+            end_date=end_date,
+            start_date=start_date,
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+
     statement = (
         select(
             func.to_char(QueryDB.query_datetime_utc, "Dy").label("day_of_week"),
@@ -572,10 +647,12 @@ async def get_overview_timeseries(
     asession: AsyncSession,
     end_date: date,
     frequency: TimeFrequency,
+    query_semaphore: Optional[asyncio.Semaphore] = None,
     start_date: date,
     workspace_id: int,
 ) -> OverviewTimeSeries:
-    """Retrieve count of queries over time for the workspace.
+    """Retrieve count of queries over time for the workspace. The timeseries are
+    queried concurrently, each on its own session.
 
     Parameters
     ----------
@@ -585,6 +662,9 @@ async def get_overview_timeseries(
         The ending date for the queries count timeseries.
     frequency
         The frequency at which to retrieve the queries count timeseries.
+    query_semaphore
+        The semaphore limiting the number of dashboard queries that run concurrently
+        on their own sessions. Defaults to a new semaphore for this call.
     start_date
         The starting date for the queries count timeseries.
     workspace_id
@@ -596,19 +676,28 @@ async def get_overview_timeseries(
         The queries count timeseries.
     """
 
-    query_ts = await get_timeseries_query(
-        asession=asession,
-        end_date=end_date,
-        frequency=frequency,
-        start_date=start_date,
-        workspace_id=workspace_id,
-    )
-    urgency_ts = await get_timeseries_urgency(
-        asession=asession,
-        end_date=end_date,
-        frequency=frequency,
-        start_date=start_date,
-        workspace_id=workspace_id,
+    if query_semaphore is None:
+        query_semaphore = asyncio.Semaphore(DASHBOARD_QUERY_CONCURRENCY)
+
+    query_ts, urgency_ts = await asyncio.gather(
+        run_in_new_session(
+            get_timeseries_query,
+            asession=asession,
+            end_date=end_date,
+            frequency=frequency,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
+        run_in_new_session(
+            get_timeseries_urgency,
+            asession=asession,
+            end_date=end_date,
+            frequency=frequency,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
     )
 
     return OverviewTimeSeries(
@@ -756,9 +845,17 @@ async def get_raw_contents(
 async def get_raw_queries(
     *, asession: AsyncSession, end_date: date, start_date: date, workspace_id: int
 ) -> list[UserQuery]:
-    """Retrieve `N_SAMPLES_TOPIC_MODELING` randomly sampled raw queries (query_text)
+    """Retrieve at most `N_SAMPLES_TOPIC_MODELING` distinct raw queries (query_text)
     and their datetime stamps within the specified date range.
 
+    Queries with the same normalized text, i.e., lowercased with collapsed whitespace,
+    are aggregated in the database into their earliest query with the number of
+    queries as its count. If there are at most `N_SAMPLES_TOPIC_MODELING` distinct
+    texts, they are all returned. Otherwise, they are sampled in proportion to their
+    count, stratified by the day of their earliest query so that each day keeps its
+    share of the distinct texts, and the quota that a day cannot fill is filled from
+    the whole period. The sampled rows are streamed from the database.
+
     Parameters
     ----------
     asession
@@ -776,32 +873,69 @@ async def get_raw_queries(
         A list of `UserQuery` objects.
     """
 
-    statement = (
-        select(QueryDB.query_text, QueryDB.query_datetime_utc, QueryDB.query_id)
+    normalized_text = func.lower(
+        func.regexp_replace(func.trim(QueryDB.query_text), r"\s+", " ", "g")
+    )
+    grouped = (
+        select(
+            func.count().label("query_count"),
+            func.min(QueryDB.query_datetime_utc).label("query_datetime_utc"),
+            func.min(QueryDB.query_id).label("query_id"),
+        )
         .where(
             (QueryDB.workspace_id == workspace_id)
             & (QueryDB.query_datetime_utc >= start_date)
             & (QueryDB.query_datetime_utc < end_date)
             & (QueryDB.query_datetime_utc < datetime.now(tz=timezone.utc))
         )
-        .order_by(func.random())
-        .limit(N_SAMPLES_TOPIC_MODELING)
+        .group_by(normalized_text)
+        .subquery()
     )
 
-    result = await asession.execute(statement)
-    rows = result.fetchall()
-    return (
-        [
-            UserQuery(
-                query_id=row.query_id,
-                query_text=row.query_text,
-                query_datetime_utc=row.query_datetime_utc,
-            )
-            for row in rows
-        ]
-        if rows
-        else []
+    # Weighted sampling without replacement: each text draws the key
+    # `-ln(U) / count` once, and the smallest keys of each day are kept. Each day
+    # keeps a number of texts proportional to its number of distinct texts, so that a
+    # text repeated over several days does not inflate the quota of its first day. The
+    # quota left unused is filled with the smallest keys of the whole period.
+    keyed = select(
+        grouped,
+        (-func.ln(1 - func.random()) / grouped.c.query_count).label("sample_key"),
+    ).subquery()
+    day = func.date_trunc("day", keyed.c.query_datetime_utc)
+    ranked = select(
+        keyed,
+        func.row_number()
+        .over(order_by=keyed.c.sample_key, partition_by=day)
+        .label("sample_rank"),
+        func.count().over(partition_by=day).label("day_texts"),
+        func.count().over().label("total_texts"),
+    ).subquery()
+    in_day_quota = ranked.c.sample_rank <= func.ceil(
+        N_SAMPLES_TOPIC_MODELING * ranked.c.day_texts / ranked.c.total_texts
     )
+    statement = (
+        select(
+            QueryDB.query_text,
+            ranked.c.query_count,
+            ranked.c.query_datetime_utc,
+            ranked.c.query_id,
+        )
+        .join(QueryDB, QueryDB.query_id == ranked.c.query_id)
+        .order_by(in_day_quota.desc(), ranked.c.sample_key)
+        .limit(N_SAMPLES_TOPIC_MODELING)
+        .execution_options(yield_per=500)
+    )
+
+    result = await asession.stream(statement)
+    return [
+        UserQuery(
+            query_count=row.query_count,
+            query_datetime_utc=row.query_datetime_utc,
+            query_id=row.query_id,
+            query_text=row.query_text,
+        )
+        async for row in result
+    ]
 
 
 async def get_response_feedback_stats(
@@ -885,9 +1019,15 @@ async def get_response_feedback_stats(
 
 
 async def get_stats_cards(
-    *, asession: AsyncSession, end_date: date, start_date: date, workspace_id: int
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    query_semaphore: Optional[asyncio.Semaphore] = None,
+    start_date: date,
+    workspace_id: int,
 ) -> StatsCards:
-    """Retrieve statistics for question answering and upvotes.
+    """Retrieve statistics for question answering and upvotes. The statistics are
+    queried concurrently, each on its own session.
 
     Parameters
     ----------
@@ -895,6 +1035,9 @@ async def get_stats_cards(
         The SQLAlchemy async session to use for all database connections.
     end_date
         The ending date for the statistics.
+    query_semaphore
+        The semaphore limiting the number of dashboard queries that run concurrently
+        on their own sessions. Defaults to a new semaphore for this call.
     start_date
         The starting date for the statistics.
     workspace_id
@@ -906,29 +1049,57 @@ async def get_stats_cards(
         The statistics for question answering and upvotes.
     """
 
-    query_stats = await get_query_count_stats(
-        asession=asession,
-        end_date=end_date,
-        start_date=start_date,
-        workspace_id=workspace_id,
-    )
-    response_feedback_stats = await get_response_feedback_stats(
-        asession=asession,
-        end_date=end_date,
-        start_date=start_date,
-        workspace_id=workspace_id,
-    )
-    content_feedback_stats = await get_content_feedback_stats(
-        asession=asession,
-        end_date=end_date,
-        start_date=start_date,
-        workspace_id=workspace_id,
-    )
-    urgency_stats = await get_urgency_stats(
-        asession=asession,
-        end_date=end_date,
-        start_date=start_date,
-        workspace_id=workspace_id,
+    watermark = await _get_rollup_watermark(asession=asession)
+    if watermark is not None:
+        return await _get_stats_cards_from_rollups(
+            asession=asession,
+            end_date=end_date,
+            start_date=start_date,
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+
+    if query_semaphore is None:
+        query_semaphore = asyncio.Semaphore(DASHBOARD_QUERY_CONCURRENCY)
+
+    (
+        query_stats,
+        response_feedback_stats,
+        content_feedback_stats,
+        urgency_stats,
+    ) = await asyncio.gather(
+        run_in_new_session(
+            get_query_count_stats,
+            asession=asession,
+            end_date=end_date,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
+        run_in_new_session(
+            get_response_feedback_stats,
+            asession=asession,
+            end_date=end_date,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
+        run_in_new_session(
+            get_content_feedback_stats,
+            asession=asession,
+            end_date=end_date,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
+        run_in_new_session(
+            get_urgency_stats,
+            asession=asession,
+            end_date=end_date,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
     )
 
     return StatsCards(
@@ -1039,6 +1210,17 @@ async def get_timeseries_query(
         }
     """
 
+    watermark = await _get_rollup_watermark(asession=asession)
+    if watermark is not None:
+        return await _get_timeseries_query_from_rollups(
+            asession=asession,
+            end_date=end_date,
+            frequency=frequency,
+            start_date=start_date,
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+
     interval_str, ts_labels = get_time_labels_query(
         end_date=end_date, frequency=frequency, start_date=start_date
     )
@@ -1155,6 +1337,18 @@ async def get_timeseries_top_content(
         The top content timeseries.
     """
 
+    watermark = await _get_rollup_watermark(asession=asession)
+    if watermark is not None:
+        return await _get_timeseries_top_content_from_rollups(
+            asession=asession,
+            end_date=end_date,
+            frequency=frequency,
+            start_date=start_date,
+            top_n=top_n,
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+
     interval_str, ts_labels = get_time_labels_query(
         end_date=end_date, frequency=frequency, start_date=start_date
     )
@@ -1333,6 +1527,17 @@ async def get_timeseries_urgency(
         Dictionary containing the count of urgent queries over time.
     """
 
+    watermark = await _get_rollup_watermark(asession=asession)
+    if watermark is not None:
+        return await _get_timeseries_urgency_from_rollups(
+            asession=asession,
+            end_date=end_date,
+            frequency=frequency,
+            start_date=start_date,
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+
     interval_str, ts_labels = get_time_labels_query(
         end_date=end_date, frequency=frequency, start_date=start_date
     )
@@ -1509,7 +1714,45 @@ def initialize_heatmap() -> dict[TimeHours, dict[Day, int]]:
     return {h: {d: 0 for d in get_args(Day)} for h in get_args(TimeHours)}
 
 
-def set_curr_content_values(*, r: Row[Any]) -> dict[str, Any]:
+async def run_in_new_session(
+    func: Callable[..., Awaitable[T]],
+    *,
+    asession: AsyncSession,
+    query_semaphore: asyncio.Semaphore,
+    **kwargs: Any,
+) -> T:
+    """Run a dashboard query on its own session, so that it can run concurrently
+    with other queries. The session uses the same engine as `asession`.
+
+    NB: The query must not start concurrent queries itself, since it holds a slot of
+    the query semaphore while it runs.
+
+    Parameters
+    ----------
+    func
+        The dashboard query function, which takes the session as `asession`.
+    asession
+        The SQLAlchemy async session whose engine to use.
+    query_semaphore
+        The semaphore limiting the number of dashboard queries that run concurrently
+        on their own sessions, so that the connection pool is not exhausted.
+    kwargs
+        The other keyword arguments of the query function.
+
+    Returns
+    -------
+    T
+        The result of the query function.
+    """
+
+    async with query_semaphore:
+        async with AsyncSession(
+            asession.bind or get_sqlalchemy_async_engine(), expire_on_commit=False
+        ) as query_session:
+            return await func(asession=query_session, **kwargs)
+
+
+def set_curr_content_values(*, r: Row[Any] | TopContentTimeSeriesRow) -> dict[str, Any]:
     """Set current content values.
 
     Parameters
@@ -1530,3 +1773,568 @@ def set_curr_content_values(*, r: Row[Any]) -> dict[str, Any]:
         "title": r.content_title,
         "total_query_count": r.total_query_count,
     }
+
+
+async def _get_binned_hourly_counts(
+    *,
+    asession: AsyncSession,
+    interval_str: str,
+    labels: list[datetime],
+    watermark: datetime,
+    workspace_id: int,
+) -> dict[datetime, dict[str, int]]:
+    """Sum the hourly counts of a workspace into the bins of a timeseries.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    interval_str
+        The interval of the time labels.
+    labels
+        The time labels of the timeseries, in order.
+    watermark
+        The watermark of the dashboard rollups.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    dict[datetime, dict[str, int]]
+        The hourly counts summed per time label.
+    """
+
+    binned_counts = {label: dict.fromkeys(HOURLY_COUNT_COLUMNS, 0) for label in labels}
+    if not labels:
+        return binned_counts
+
+    start, end = _get_time_label_range(interval_str=interval_str, labels=labels)
+    rows = await get_hourly_counts(
+        asession=asession,
+        end=end,
+        start=start,
+        watermark=watermark,
+        workspace_id=workspace_id,
+    )
+    for row in rows:
+        label = _get_time_label(
+            hour_start=row["hour_start_utc"], interval_str=interval_str
+        )
+        if label in binned_counts:
+            for column in HOURLY_COUNT_COLUMNS:
+                binned_counts[label][column] += row[column]
+    return binned_counts
+
+
+async def _get_heatmap_from_rollups(
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    start_date: date,
+    watermark: datetime,
+    workspace_id: int,
+) -> Heatmap:
+    """Retrieve queries per two hour blocks each weekday between start and end date,
+    from the dashboard rollups.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end_date
+        The ending date for the heatmap.
+    start_date
+        The starting date for the heatmap.
+    watermark
+        The watermark of the dashboard rollups.
+    workspace_id
+        The ID of the workspace to retrieve the heatmap for.
+
+    Returns
+    -------
+    Heatmap
+        The heatmap of queries per two hour blocks.
+    """
+
+    rows = await get_hourly_counts(
+        asession=asession,
+        end=end_date,
+        start=start_date,
+        watermark=watermark,
+        workspace_id=workspace_id,
+    )
+
+    days = get_args(Day)
+    heatmap = initialize_heatmap()
+    for row in rows:
+        hour_start = row["hour_start_utc"].astimezone(timezone.utc)
+        hour_grp = hour_start.hour - hour_start.hour % 2
+        hour_grp_str = cast(TimeHours, f"{hour_grp:02}:00")
+        heatmap[hour_grp_str][days[hour_start.weekday()]] += row["n_queries"]
+
+    return Heatmap.model_validate(heatmap)
+
+
+async def _get_rollup_watermark(*, asession: AsyncSession) -> Optional[datetime]:
+    """Get the watermark of the dashboard rollups, if they are enabled.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+
+    Returns
+    -------
+    Optional[datetime]
+        The watermark of the dashboard rollups, or `None` if the statistics must be
+        computed from the raw tables.
+    """
+
+    if not DASHBOARD_ROLLUPS_ENABLED:
+        return None
+    return await get_rollup_watermark(asession=asession)
+
+
+async def _get_stats_cards_from_rollups(
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    start_date: date,
+    watermark: datetime,
+    workspace_id: int,
+) -> StatsCards:
+    """Retrieve statistics for question answering and upvotes from the dashboard
+    rollups. The previous period is the same window in time before the current
+    period.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end_date
+        The ending date for the statistics.
+    start_date
+        The starting date for the statistics.
+    watermark
+        The watermark of the dashboard rollups.
+    workspace_id
+        The ID of the workspace to retrieve the statistics for.
+
+    Returns
+    -------
+    StatsCards
+        The statistics for question answering and upvotes.
+    """
+
+    curr_counts = _sum_hourly_counts(
+        rows=await get_hourly_counts(
+            asession=asession,
+            end=end_date,
+            start=start_date,
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+    )
+    prev_counts = _sum_hourly_counts(
+        rows=await get_hourly_counts(
+            asession=asession,
+            end=start_date,
+            start=start_date - (end_date - start_date),
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+    )
+
+    content_feedback_stats = get_feedback_stats(
+        feedback_curr_period_dict={
+            "negative": curr_counts["n_content_feedback_negative"],
+            "positive": curr_counts["n_content_feedback_positive"],
+        },
+        feedback_prev_period_dict={
+            "negative": prev_counts["n_content_feedback_negative"],
+            "positive": prev_counts["n_content_feedback_positive"],
+        },
+    )
+    response_feedback_stats = get_feedback_stats(
+        feedback_curr_period_dict={
+            "negative": curr_counts["n_response_feedback_negative"],
+            "positive": curr_counts["n_response_feedback_positive"],
+        },
+        feedback_prev_period_dict={
+            "negative": prev_counts["n_response_feedback_negative"],
+            "positive": prev_counts["n_response_feedback_positive"],
+        },
+    )
+
+    return StatsCards(
+        content_feedback_stats=ContentFeedbackStats.model_validate(
+            content_feedback_stats
+        ),
+        query_stats=QueryStats(
+            n_questions=curr_counts["n_queries"],
+            percentage_increase=get_percentage_increase(
+                n_curr=curr_counts["n_queries"], n_prev=prev_counts["n_queries"]
+            ),
+        ),
+        response_feedback_stats=ResponseFeedbackStats.model_validate(
+            response_feedback_stats
+        ),
+        urgency_stats=UrgencyStats(
+            n_urgent=curr_counts["n_urgent"],
+            percentage_increase=get_percentage_increase(
+                n_curr=curr_counts["n_urgent"], n_prev=prev_counts["n_urgent"]
+            ),
+        ),
+    )
+
+
+def _get_time_label(*, hour_start: datetime, interval_str: str) -> datetime:
+    """Get the time label of the interval that an hour belongs to, as a naive UTC
+    datetime like the labels of `get_time_labels_query`.
+
+    Parameters
+    ----------
+    hour_start
+        The start of the hour.
+    interval_str
+        The interval of the time labels.
+
+    Returns
+    -------
+    datetime
+        The time label.
+    """
+
+    label = hour_start.astimezone(timezone.utc).replace(tzinfo=None)
+    match interval_str:
+        case "day":
+            return label.replace(hour=0)
+        case "week":
+            return label.replace(hour=0) - timedelta(days=label.weekday())
+        case "month":
+            return label.replace(day=1, hour=0)
+    return label
+
+
+def _get_time_label_range(
+    *, interval_str: str, labels: list[datetime]
+) -> tuple[datetime, datetime]:
+    """Get the time range covered by the time labels of a timeseries.
+
+    Parameters
+    ----------
+    interval_str
+        The interval of the time labels.
+    labels
+        The time labels, in order.
+
+    Returns
+    -------
+    tuple[datetime, datetime]
+        The start of the first interval and the end of the last interval, in UTC.
+    """
+
+    last_label = labels[-1]
+    match interval_str:
+        case "hour":
+            end = last_label + timedelta(hours=1)
+        case "day":
+            end = last_label + timedelta(days=1)
+        case "week":
+            end = last_label + timedelta(weeks=1)
+        case _:
+            end = last_label.replace(
+                year=last_label.year + last_label.month // 12,
+                month=last_label.month % 12 + 1,
+            )
+    return labels[0].replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)
+
+
+async def _get_time_labels(
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    frequency: TimeFrequency,
+    start_date: date,
+) -> tuple[str, list[datetime]]:
+    """Get the time labels of a timeseries.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end_date
+        The ending date for the time labels.
+    frequency
+        The frequency of the time labels.
+    start_date
+        The starting date for the time labels.
+
+    Returns
+    -------
+    tuple[str, list[datetime]]
+        The interval string and the time labels, in order.
+    """
+
+    interval_str, ts_labels = get_time_labels_query(
+        end_date=end_date, frequency=frequency, start_date=start_date
+    )
+    result = await asession.execute(
+        select(ts_labels.c.time_period).order_by(ts_labels.c.time_period)
+    )
+    return interval_str, list(result.scalars().all())
+
+
+async def _get_timeseries_query_from_rollups(
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    frequency: TimeFrequency,
+    start_date: date,
+    watermark: datetime,
+    workspace_id: int,
+) -> dict[str, dict[str, int]]:
+    """Retrieve the timeseries corresponding to escalated and not escalated queries
+    over the specified time period, from the dashboard rollups.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end_date
+        The ending date for the queries count timeseries query.
+    frequency
+        The frequency at which to retrieve the queries count timeseries.
+    start_date
+        The starting date for the queries count timeseries query.
+    watermark
+        The watermark of the dashboard rollups.
+    workspace_id
+        The ID of the workspace to retrieve the queries count timeseries query for.
+
+    Returns
+    -------
+    dict[str, dict[str, int]]
+        Dictionary whose keys are "escalated" and "not_escalated" and whose values are
+        dictionaries containing the count of queries over time for each category.
+    """
+
+    interval_str, labels = await _get_time_labels(
+        asession=asession,
+        end_date=end_date,
+        frequency=frequency,
+        start_date=start_date,
+    )
+    binned_counts = await _get_binned_hourly_counts(
+        asession=asession,
+        interval_str=interval_str,
+        labels=labels,
+        watermark=watermark,
+        workspace_id=workspace_id,
+    )
+
+    escalated = {}
+    not_escalated = {}
+    format_str = "%Y-%m-%dT%H:%M:%S.000000Z"  # ISO 8601 format (required by frontend)
+    for label, counts in binned_counts.items():
+        escalated[label.strftime(format_str)] = counts["n_queries_escalated"]
+        not_escalated[label.strftime(format_str)] = counts["n_queries_not_escalated"]
+
+    return {"escalated": escalated, "not_escalated": not_escalated}
+
+
+async def _get_timeseries_top_content_from_rollups(
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    frequency: TimeFrequency,
+    start_date: date,
+    top_n: int | None,
+    watermark: datetime,
+    workspace_id: int,
+) -> list[TopContentTimeSeries]:
+    """Retrieve most frequently shared content and feedback between the start and end
+    date, from the dashboard rollups.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end_date
+        The ending date for the top content timeseries.
+    frequency
+        The frequency at which to retrieve the top content timeseries.
+    start_date
+        The starting date for the top content timeseries.
+    top_n
+        The number of top content to retrieve.
+    watermark
+        The watermark of the dashboard rollups.
+    workspace_id
+        The ID of the workspace to retrieve the top content timeseries for.
+
+    Returns
+    -------
+    list[TopContentTimeSeries]
+        The top content timeseries.
+    """
+
+    content_counts: dict[int, dict[str, int]] = {}
+    rows = await get_content_hourly_counts(
+        asession=asession,
+        end=end_date,
+        start=start_date,
+        watermark=watermark,
+        workspace_id=workspace_id,
+    )
+    for row in rows:
+        counts = content_counts.setdefault(
+            row["content_id"], dict.fromkeys(CONTENT_COUNT_COLUMNS, 0)
+        )
+        for column in CONTENT_COUNT_COLUMNS:
+            counts[column] += row[column]
+
+    top_content_ids = sorted(
+        (
+            content_id
+            for content_id, counts in content_counts.items()
+            if counts["n_query_responses"] > 0
+        ),
+        key=lambda content_id: (
+            -content_counts[content_id]["n_query_responses"],
+            content_id,
+        ),
+    )
+    if top_n:
+        top_content_ids = top_content_ids[:top_n]
+    if not top_content_ids:
+        return []
+
+    result = await asession.execute(
+        select(ContentDB.content_id, ContentDB.content_title).where(
+            ContentDB.content_id.in_(top_content_ids)
+        )
+    )
+    content_titles = {row.content_id: row.content_title for row in result}
+
+    interval_str, labels = await _get_time_labels(
+        asession=asession,
+        end_date=end_date,
+        frequency=frequency,
+        start_date=start_date,
+    )
+    query_counts = {
+        (content_id, label): 0 for content_id in top_content_ids for label in labels
+    }
+    if labels:
+        start, end = _get_time_label_range(interval_str=interval_str, labels=labels)
+        rows = await get_content_hourly_counts(
+            asession=asession,
+            end=end,
+            start=start,
+            watermark=watermark,
+            workspace_id=workspace_id,
+        )
+        for row in rows:
+            key = (
+                row["content_id"],
+                _get_time_label(
+                    hour_start=row["hour_start_utc"], interval_str=interval_str
+                ),
+            )
+            if key in query_counts:
+                query_counts[key] += row["n_query_responses"]
+
+    top_content_rows = [
+        TopContentTimeSeriesRow(
+            content_id=content_id,
+            content_title=content_titles[content_id],
+            n_negative_feedback=content_counts[content_id]["n_feedback_negative"],
+            n_positive_feedback=content_counts[content_id]["n_feedback_positive"],
+            query_count=query_counts[(content_id, label)],
+            time_period=label,
+            total_query_count=content_counts[content_id]["n_query_responses"],
+        )
+        for content_id in top_content_ids
+        for label in labels
+    ]
+    format_str = "%Y-%m-%dT%H:%M:%S.000000Z"  # ISO 8601 format (required by frontend)
+
+    return convert_rows_to_top_content_time_series(
+        format_str=format_str, rows=top_content_rows
+    )
+
+
+async def _get_timeseries_urgency_from_rollups(
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    frequency: TimeFrequency,
+    start_date: date,
+    watermark: datetime,
+    workspace_id: int,
+) -> dict[str, int]:
+    """Retrieve the timeseries corresponding to the count of urgent queries over time
+    for the specified workspace, from the dashboard rollups.
+
+    NB: Like the raw timeseries, only the time periods with at least one urgency
+    response are included.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end_date
+        The ending date for the count of urgent queries.
+    frequency
+        The frequency at which to retrieve the count of urgent queries.
+    start_date
+        The starting date for the count of urgent queries.
+    watermark
+        The watermark of the dashboard rollups.
+    workspace_id
+        The ID of the workspace to retrieve the timeseries for.
+
+    Returns
+    -------
+    dict[str, int]
+        Dictionary containing the count of urgent queries over time.
+    """
+
+    interval_str, labels = await _get_time_labels(
+        asession=asession,
+        end_date=end_date,
+        frequency=frequency,
+        start_date=start_date,
+    )
+    binned_counts = await _get_binned_hourly_counts(
+        asession=asession,
+        interval_str=interval_str,
+        labels=labels,
+        watermark=watermark,
+        workspace_id=workspace_id,
+    )
+
+    format_str = "%Y-%m-%dT%H:%M:%S.000000Z"  # ISO 8601 format (required by frontend)
+    return {
+        label.strftime(format_str): counts["n_urgent"]
+        for label, counts in binned_counts.items()
+        if counts["n_urgency_responses"] > 0
+    }
+
+
+def _sum_hourly_counts(*, rows: list[dict[str, Any]]) -> dict[str, int]:
+    """Sum the hourly counts of a period.
+
+    Parameters
+    ----------
+    rows
+        The hourly counts.
+
+    Returns
+    -------
+    dict[str, int]
+        The counts of the period.
+    """
+
+    return {column: sum(row[column] for row in rows) for column in HOURLY_COUNT_COLUMNS}
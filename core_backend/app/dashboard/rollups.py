@@ -0,0 +1,1006 @@
+"""This module contains the hourly rollups of the dashboard statistics.
+
+The dashboard rollup worker aggregates the queries, feedback, urgency responses and
+content hits of each complete hour into per-workspace rollup tables, and records the
+end of the aggregated hours as a watermark. The dashboard reads the rollups for the
+complete hours before the watermark, and aggregates the raw tables with the same
+statements for the rest of the requested period, i.e. the hours after the watermark
+and any partial hour at either end of the period.
+"""
+
+# pylint: disable=E1102
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional, Type
+
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Integer,
+    PrimaryKeyConstraint,
+    Select,
+    String,
+    case,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, Mapped, mapped_column
+
+from ..contents.models import ContentDB
+from ..database import with_new_session
+from ..models import Base
+from ..question_answer.models import (
+    ContentFeedbackDB,
+    QueryDB,
+    QueryResponseContentDB,
+    ResponseFeedbackDB,
+)
+from ..urgency_detection.models import UrgencyQueryDB, UrgencyResponseDB
+from ..utils import setup_logger
+from .config import (
+    DASHBOARD_ROLLUP_BACKFILL_HOURS,
+    DASHBOARD_ROLLUP_DELAY,
+    DASHBOARD_ROLLUP_INTERVAL,
+)
+
+CONTENT_COUNT_COLUMNS = (
+    "n_feedback_negative",
+    "n_feedback_positive",
+    "n_query_responses",
+)
+HOURLY_COUNT_COLUMNS = (
+    "n_content_feedback_negative",
+    "n_content_feedback_positive",
+    "n_queries",
+    "n_queries_escalated",
+    "n_queries_not_escalated",
+    "n_response_feedback_negative",
+    "n_response_feedback_positive",
+    "n_urgency_responses",
+    "n_urgent",
+)
+HOURLY_ROLLUP_NAME = "hourly"
+ROLLUP_LOCK_ID = 7_412_093_551
+
+logger = setup_logger()
+
+
+class DashboardContentHourlyRollupDB(Base):
+    """ORM for the hourly counts of the queries and feedback of each content."""
+
+    __tablename__ = "dashboard_content_hourly_rollup"
+    __table_args__ = (
+        PrimaryKeyConstraint("workspace_id", "hour_start_utc", "content_id"),
+    )
+
+    content_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("content.content_id", ondelete="CASCADE"), nullable=False
+    )
+    hour_start_utc: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    n_feedback_negative: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_feedback_positive: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_query_responses: Mapped[int] = mapped_column(Integer, nullable=False)
+    workspace_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("workspace.workspace_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+
+class DashboardHourlyRollupDB(Base):
+    """ORM for the hourly counts of the queries, feedback and urgency responses of
+    each workspace.
+    """
+
+    __tablename__ = "dashboard_hourly_rollup"
+    __table_args__ = (PrimaryKeyConstraint("workspace_id", "hour_start_utc"),)
+
+    hour_start_utc: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    n_content_feedback_negative: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_content_feedback_positive: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_queries: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_queries_escalated: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_queries_not_escalated: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_response_feedback_negative: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_response_feedback_positive: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_urgency_responses: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_urgent: Mapped[int] = mapped_column(Integer, nullable=False)
+    workspace_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("workspace.workspace_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+
+class DashboardRollupWatermarkDB(Base):
+    """ORM for the watermark of the dashboard rollups, i.e. the end of the hours that
+    have been aggregated into the rollup tables.
+    """
+
+    __tablename__ = "dashboard_rollup_watermark"
+
+    rollup_name: Mapped[str] = mapped_column(String, primary_key=True, nullable=False)
+    updated_datetime_utc: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    watermark_datetime_utc: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+def floor_hour(value: date) -> datetime:
+    """Truncate a date or datetime to the start of its hour, in UTC.
+
+    Parameters
+    ----------
+    value
+        The date or datetime to truncate. Dates are taken as midnight UTC.
+
+    Returns
+    -------
+    datetime
+        The start of the hour.
+    """
+
+    if not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value: date) -> datetime:
+    """Round a date or datetime up to the start of the next hour, in UTC, unless it is
+    already at the start of an hour.
+
+    Parameters
+    ----------
+    value
+        The date or datetime to round up. Dates are taken as midnight UTC.
+
+    Returns
+    -------
+    datetime
+        The start of the hour.
+    """
+
+    hour_start = floor_hour(value)
+    if hour_start == to_utc_datetime(value):
+        return hour_start
+    return hour_start + timedelta(hours=1)
+
+
+def to_utc_datetime(value: date) -> datetime:
+    """Convert a date or datetime to a timezone-aware datetime in UTC.
+
+    Parameters
+    ----------
+    value
+        The date or datetime to convert. Dates are taken as midnight UTC.
+
+    Returns
+    -------
+    datetime
+        The datetime in UTC.
+    """
+
+    if not isinstance(value, datetime):
+        return floor_hour(value)
+    return value.astimezone(timezone.utc)
+
+
+def split_time_range(
+    *, end: date, start: date, watermark: Optional[datetime]
+) -> tuple[list[tuple[datetime, datetime]], Optional[tuple[datetime, datetime]]]:
+    """Split the period `[start, end)` into the complete hours that can be read from
+    the rollups and the ranges that must be aggregated from the raw tables.
+
+    Parameters
+    ----------
+    end
+        The end of the period.
+    start
+        The start of the period.
+    watermark
+        The watermark of the rollups, or `None` if the rollups are not available.
+
+    Returns
+    -------
+    tuple[list[tuple[datetime, datetime]], Optional[tuple[datetime, datetime]]]
+        The ranges to aggregate from the raw tables and the range of hours to read
+        from the rollups, if any.
+    """
+
+    lower, upper = to_utc_datetime(start), to_utc_datetime(end)
+    if watermark is None:
+        return [(lower, upper)], None
+
+    rollup_start = ceil_hour(lower)
+    rollup_end = min(floor_hour(upper), watermark)
+    if rollup_start >= rollup_end:
+        return [(lower, upper)], None
+
+    raw_ranges = []
+    if lower < rollup_start:
+        raw_ranges.append((lower, rollup_start))
+    if rollup_end < upper:
+        raw_ranges.append((rollup_end, upper))
+    return raw_ranges, (rollup_start, rollup_end)
+
+
+def _filter_events(
+    statement: Select,
+    *,
+    datetime_column: InstrumentedAttribute,
+    hours: Optional[list[datetime]],
+    lower: datetime,
+    upper: datetime,
+    workspace_column: InstrumentedAttribute,
+    workspace_id: Optional[int],
+) -> Select:
+    """Restrict an aggregation statement to the events of a time range and, optionally,
+    of a list of hours and of a workspace.
+
+    Parameters
+    ----------
+    statement
+        The aggregation statement.
+    datetime_column
+        The column with the datetime of the events.
+    hours
+        The start of the hours to restrict the events to, if any.
+    lower
+        The start of the time range, included.
+    upper
+        The end of the time range, excluded.
+    workspace_column
+        The column with the workspace ID of the events.
+    workspace_id
+        The ID of the workspace to restrict the events to, if any.
+
+    Returns
+    -------
+    Select
+        The restricted statement.
+    """
+
+    statement = statement.where(datetime_column >= lower, datetime_column < upper)
+    if hours is not None:
+        statement = statement.where(func.date_trunc("hour", datetime_column).in_(hours))
+    if workspace_id is not None:
+        statement = statement.where(workspace_column == workspace_id)
+    return statement
+
+
+def _get_content_count_statements(
+    *,
+    hours: Optional[list[datetime]],
+    lower: datetime,
+    upper: datetime,
+    workspace_id: Optional[int],
+) -> list[Select]:
+    """Get the statements that aggregate the hourly counts of each content.
+
+    Parameters
+    ----------
+    hours
+        The start of the hours to aggregate, if not all the hours of the time range.
+    lower
+        The start of the time range, included.
+    upper
+        The end of the time range, excluded.
+    workspace_id
+        The ID of the workspace to aggregate, if not all workspaces.
+
+    Returns
+    -------
+    list[Select]
+        The aggregation statements.
+    """
+
+    hour_start = func.date_trunc("hour", QueryResponseContentDB.created_datetime_utc)
+    query_responses = (
+        select(
+            ContentDB.workspace_id,
+            hour_start.label("hour_start_utc"),
+            QueryResponseContentDB.content_id,
+            func.count(QueryResponseContentDB.query_id).label("n_query_responses"),
+        )
+        .select_from(QueryResponseContentDB)
+        .join(ContentDB, QueryResponseContentDB.content_id == ContentDB.content_id)
+        .group_by(ContentDB.workspace_id, hour_start, QueryResponseContentDB.content_id)
+    )
+
+    hour_start = func.date_trunc("hour", ContentFeedbackDB.feedback_datetime_utc)
+    feedback = select(
+        ContentFeedbackDB.workspace_id,
+        hour_start.label("hour_start_utc"),
+        ContentFeedbackDB.content_id,
+        func.count(case((ContentFeedbackDB.feedback_sentiment == "negative", 1))).label(
+            "n_feedback_negative"
+        ),
+        func.count(case((ContentFeedbackDB.feedback_sentiment == "positive", 1))).label(
+            "n_feedback_positive"
+        ),
+    ).group_by(ContentFeedbackDB.workspace_id, hour_start, ContentFeedbackDB.content_id)
+
+    return [
+        _filter_events(
+            query_responses,
+            datetime_column=QueryResponseContentDB.created_datetime_utc,
+            hours=hours,
+            lower=lower,
+            upper=upper,
+            workspace_column=ContentDB.workspace_id,
+            workspace_id=workspace_id,
+        ),
+        _filter_events(
+            feedback,
+            datetime_column=ContentFeedbackDB.feedback_datetime_utc,
+            hours=hours,
+            lower=lower,
+            upper=upper,
+            workspace_column=ContentFeedbackDB.workspace_id,
+            workspace_id=workspace_id,
+        ),
+    ]
+
+
+def _get_hourly_count_statements(
+    *,
+    hours: Optional[list[datetime]],
+    lower: datetime,
+    upper: datetime,
+    workspace_id: Optional[int],
+) -> list[Select]:
+    """Get the statements that aggregate the hourly counts of each workspace.
+
+    NB: Escalated and not escalated queries are counted per response feedback, like
+    the queries timeseries, so a query with several feedback is counted once per
+    feedback. They are bucketed by the hour of the query, while the feedback counts
+    are bucketed by the hour of the feedback.
+
+    Parameters
+    ----------
+    hours
+        The start of the hours to aggregate, if not all the hours of the time range.
+    lower
+        The start of the time range, included.
+    upper
+        The end of the time range, excluded.
+    workspace_id
+        The ID of the workspace to aggregate, if not all workspaces.
+
+    Returns
+    -------
+    list[Select]
+        The aggregation statements.
+    """
+
+    hour_start = func.date_trunc("hour", QueryDB.query_datetime_utc)
+    queries = (
+        select(
+            QueryDB.workspace_id,
+            hour_start.label("hour_start_utc"),
+            func.count(func.distinct(QueryDB.query_id)).label("n_queries"),
+            func.count(
+                case((ResponseFeedbackDB.feedback_sentiment == "negative", 1))
+            ).label("n_queries_escalated"),
+            func.count(
+                case(
+                    (
+                        or_(
+                            ResponseFeedbackDB.feedback_sentiment.is_(None),
+                            ResponseFeedbackDB.feedback_sentiment != "negative",
+                        ),
+                        1,
+                    )
+                )
+            ).label("n_queries_not_escalated"),
+        )
+        .select_from(QueryDB)
+        .outerjoin(ResponseFeedbackDB, ResponseFeedbackDB.query_id == QueryDB.query_id)
+        .group_by(QueryDB.workspace_id, hour_start)
+    )
+
+    hour_start = func.date_trunc("hour", ResponseFeedbackDB.feedback_datetime_utc)
+    response_feedback = (
+        select(
+            QueryDB.workspace_id,
+            hour_start.label("hour_start_utc"),
+            func.count(
+                case((ResponseFeedbackDB.feedback_sentiment == "negative", 1))
+            ).label("n_response_feedback_negative"),
+            func.count(
+                case((ResponseFeedbackDB.feedback_sentiment == "positive", 1))
+            ).label("n_response_feedback_positive"),
+        )
+        .select_from(ResponseFeedbackDB)
+        .join(QueryDB, ResponseFeedbackDB.query_id == QueryDB.query_id)
+        .group_by(QueryDB.workspace_id, hour_start)
+    )
+
+    hour_start = func.date_trunc("hour", ContentFeedbackDB.feedback_datetime_utc)
+    content_feedback = (
+        select(
+            ContentDB.workspace_id,
+            hour_start.label("hour_start_utc"),
+            func.count(
+                case((ContentFeedbackDB.feedback_sentiment == "negative", 1))
+            ).label("n_content_feedback_negative"),
+            func.count(
+                case((ContentFeedbackDB.feedback_sentiment == "positive", 1))
+            ).label("n_content_feedback_positive"),
+        )
+        .select_from(ContentFeedbackDB)
+        .join(ContentDB, ContentFeedbackDB.content_id == ContentDB.content_id)
+        .group_by(ContentDB.workspace_id, hour_start)
+    )
+
+    hour_start = func.date_trunc("hour", UrgencyResponseDB.response_datetime_utc)
+    urgency_responses = (
+        select(
+            UrgencyQueryDB.workspace_id,
+            hour_start.label("hour_start_utc"),
+            func.count(UrgencyResponseDB.urgency_response_id).label(
+                "n_urgency_responses"
+            ),
+            func.count(case((UrgencyResponseDB.is_urgent == true(), 1))).label(
+                "n_urgent"
+            ),
+        )
+        .select_from(UrgencyResponseDB)
+        .join(
+            UrgencyQueryDB,
+            UrgencyResponseDB.query_id == UrgencyQueryDB.urgency_query_id,
+        )
+        .group_by(UrgencyQueryDB.workspace_id, hour_start)
+    )
+
+    return [
+        _filter_events(
+            queries,
+            datetime_column=QueryDB.query_datetime_utc,
+            workspace_column=QueryDB.workspace_id,
+            hours=hours,
+            lower=lower,
+            upper=upper,
+            workspace_id=workspace_id,
+        ),
+        _filter_events(
+            response_feedback,
+            datetime_column=ResponseFeedbackDB.feedback_datetime_utc,
+            workspace_column=QueryDB.workspace_id,
+            hours=hours,
+            lower=lower,
+            upper=upper,
+            workspace_id=workspace_id,
+        ),
+        _filter_events(
+            content_feedback,
+            datetime_column=ContentFeedbackDB.feedback_datetime_utc,
+            workspace_column=ContentDB.workspace_id,
+            hours=hours,
+            lower=lower,
+            upper=upper,
+            workspace_id=workspace_id,
+        ),
+        _filter_events(
+            urgency_responses,
+            datetime_column=UrgencyResponseDB.response_datetime_utc,
+            workspace_column=UrgencyQueryDB.workspace_id,
+            hours=hours,
+            lower=lower,
+            upper=upper,
+            workspace_id=workspace_id,
+        ),
+    ]
+
+
+async def _aggregate_counts(
+    *,
+    asession: AsyncSession,
+    count_columns: tuple[str, ...],
+    key_columns: tuple[str, ...],
+    statements: list[Select],
+) -> list[dict[str, Any]]:
+    """Run aggregation statements and merge their counts into one row per key.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    count_columns
+        The count columns of the merged rows.
+    key_columns
+        The columns identifying a row.
+    statements
+        The aggregation statements, each selecting the key columns and some of the
+        count columns.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The merged rows, with a zero count for the columns not selected by any
+        statement.
+    """
+
+    rows: dict[tuple, dict[str, Any]] = {}
+    for statement in statements:
+        result = await asession.execute(statement)
+        for row in result.mappings():
+            key = tuple(row[column] for column in key_columns)
+            counts = rows.setdefault(
+                key,
+                {**dict(zip(key_columns, key)), **dict.fromkeys(count_columns, 0)},
+            )
+            for column, value in row.items():
+                if column not in key_columns:
+                    counts[column] += value
+    return list(rows.values())
+
+
+async def aggregate_content_hourly_counts(
+    *,
+    asession: AsyncSession,
+    hours: Optional[list[datetime]] = None,
+    lower: datetime,
+    upper: datetime,
+    workspace_id: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """Aggregate the hourly counts of each content from the raw tables.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    hours
+        The start of the hours to aggregate, if not all the hours of the time range.
+    lower
+        The start of the time range, included.
+    upper
+        The end of the time range, excluded.
+    workspace_id
+        The ID of the workspace to aggregate, if not all workspaces.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The rows of the content rollup for the time range.
+    """
+
+    return await _aggregate_counts(
+        asession=asession,
+        count_columns=CONTENT_COUNT_COLUMNS,
+        key_columns=("workspace_id", "hour_start_utc", "content_id"),
+        statements=_get_content_count_statements(
+            hours=hours, lower=lower, upper=upper, workspace_id=workspace_id
+        ),
+    )
+
+
+async def aggregate_hourly_counts(
+    *,
+    asession: AsyncSession,
+    hours: Optional[list[datetime]] = None,
+    lower: datetime,
+    upper: datetime,
+    workspace_id: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """Aggregate the hourly counts of each workspace from the raw tables.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    hours
+        The start of the hours to aggregate, if not all the hours of the time range.
+    lower
+        The start of the time range, included.
+    upper
+        The end of the time range, excluded.
+    workspace_id
+        The ID of the workspace to aggregate, if not all workspaces.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The rows of the hourly rollup for the time range.
+    """
+
+    return await _aggregate_counts(
+        asession=asession,
+        count_columns=HOURLY_COUNT_COLUMNS,
+        key_columns=("workspace_id", "hour_start_utc"),
+        statements=_get_hourly_count_statements(
+            hours=hours, lower=lower, upper=upper, workspace_id=workspace_id
+        ),
+    )
+
+
+async def _get_counts(
+    *,
+    asession: AsyncSession,
+    end: date,
+    rollup_model: Type[DashboardContentHourlyRollupDB] | Type[DashboardHourlyRollupDB],
+    start: date,
+    watermark: Optional[datetime],
+    workspace_id: int,
+) -> list[dict[str, Any]]:
+    """Get the hourly counts of a workspace over a period, from the rollups where
+    possible and from the raw tables otherwise.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end
+        The end of the period, excluded.
+    rollup_model
+        The rollup table to read.
+    start
+        The start of the period, included.
+    watermark
+        The watermark of the rollups, or `None` if the rollups are not available.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The hourly counts. Partial hours at either end of the period only count the
+        events within the period.
+    """
+
+    aggregate = (
+        aggregate_content_hourly_counts
+        if rollup_model is DashboardContentHourlyRollupDB
+        else aggregate_hourly_counts
+    )
+    raw_ranges, rollup_range = split_time_range(
+        end=end, start=start, watermark=watermark
+    )
+
+    rows = []
+    if rollup_range is not None:
+        statement = select(*rollup_model.__table__.columns).where(
+            rollup_model.workspace_id == workspace_id,
+            rollup_model.hour_start_utc >= rollup_range[0],
+            rollup_model.hour_start_utc < rollup_range[1],
+        )
+        result = await asession.execute(statement)
+        rows.extend(dict(row) for row in result.mappings())
+    for lower, upper in raw_ranges:
+        rows.extend(
+            await aggregate(
+                asession=asession, lower=lower, upper=upper, workspace_id=workspace_id
+            )
+        )
+    return rows
+
+
+async def get_content_hourly_counts(
+    *,
+    asession: AsyncSession,
+    end: date,
+    start: date,
+    watermark: Optional[datetime],
+    workspace_id: int,
+) -> list[dict[str, Any]]:
+    """Get the hourly counts of each content of a workspace over a period.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end
+        The end of the period, excluded.
+    start
+        The start of the period, included.
+    watermark
+        The watermark of the rollups, or `None` if the rollups are not available.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The hourly counts of each content.
+    """
+
+    return await _get_counts(
+        asession=asession,
+        end=end,
+        rollup_model=DashboardContentHourlyRollupDB,
+        start=start,
+        watermark=watermark,
+        workspace_id=workspace_id,
+    )
+
+
+async def get_hourly_counts(
+    *,
+    asession: AsyncSession,
+    end: date,
+    start: date,
+    watermark: Optional[datetime],
+    workspace_id: int,
+) -> list[dict[str, Any]]:
+    """Get the hourly counts of a workspace over a period.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end
+        The end of the period, excluded.
+    start
+        The start of the period, included.
+    watermark
+        The watermark of the rollups, or `None` if the rollups are not available.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The hourly counts.
+    """
+
+    return await _get_counts(
+        asession=asession,
+        end=end,
+        rollup_model=DashboardHourlyRollupDB,
+        start=start,
+        watermark=watermark,
+        workspace_id=workspace_id,
+    )
+
+
+async def get_rollup_watermark(*, asession: AsyncSession) -> Optional[datetime]:
+    """Get the watermark of the dashboard rollups.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+
+    Returns
+    -------
+    Optional[datetime]
+        The end of the hours aggregated into the rollups, or `None` if the rollups
+        have never been updated.
+    """
+
+    statement = select(DashboardRollupWatermarkDB.watermark_datetime_utc).where(
+        DashboardRollupWatermarkDB.rollup_name == HOURLY_ROLLUP_NAME
+    )
+    result = await asession.execute(statement)
+    return result.scalar_one_or_none()
+
+
+async def _get_first_event_hour(*, asession: AsyncSession) -> Optional[datetime]:
+    """Get the start of the hour of the earliest event to aggregate.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+
+    Returns
+    -------
+    Optional[datetime]
+        The start of the hour, or `None` if there are no events.
+    """
+
+    first_datetimes = []
+    for datetime_column in (
+        ContentFeedbackDB.feedback_datetime_utc,
+        QueryDB.query_datetime_utc,
+        QueryResponseContentDB.created_datetime_utc,
+        ResponseFeedbackDB.feedback_datetime_utc,
+        UrgencyResponseDB.response_datetime_utc,
+    ):
+        result = await asession.execute(select(func.min(datetime_column)))
+        first_datetime = result.scalar_one_or_none()
+        if first_datetime is not None:
+            first_datetimes.append(first_datetime)
+    return floor_hour(min(first_datetimes)) if first_datetimes else None
+
+
+async def _get_late_feedback_hours(
+    *, asession: AsyncSession, lower: datetime, upper: datetime
+) -> list[datetime]:
+    """Get the hours before `lower` of the queries that received response feedback
+    between `lower` and `upper`. Their escalation counts are already in the rollups
+    and must be aggregated again.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    lower
+        The start of the time range of the feedback, included.
+    upper
+        The end of the time range of the feedback, excluded.
+
+    Returns
+    -------
+    list[datetime]
+        The start of the hours to aggregate again.
+    """
+
+    hour_start = func.date_trunc("hour", QueryDB.query_datetime_utc)
+    statement = (
+        select(hour_start)
+        .distinct()
+        .select_from(ResponseFeedbackDB)
+        .join(QueryDB, ResponseFeedbackDB.query_id == QueryDB.query_id)
+        .where(
+            ResponseFeedbackDB.feedback_datetime_utc >= lower,
+            ResponseFeedbackDB.feedback_datetime_utc < upper,
+            QueryDB.query_datetime_utc < lower,
+        )
+    )
+    result = await asession.execute(statement)
+    return list(result.scalars().all())
+
+
+async def _rebuild_rollups(
+    *,
+    asession: AsyncSession,
+    hours: Optional[list[datetime]] = None,
+    lower: datetime,
+    upper: datetime,
+) -> None:
+    """Replace the rollup rows of a time range with counts aggregated from the raw
+    tables.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    hours
+        The start of the hours to rebuild, if not all the hours of the time range.
+    lower
+        The start of the time range, included. Must be the start of an hour.
+    upper
+        The end of the time range, excluded. Must be the start of an hour.
+    """
+
+    for rollup_model in (DashboardContentHourlyRollupDB, DashboardHourlyRollupDB):
+        statement = delete(rollup_model).where(
+            rollup_model.hour_start_utc >= lower, rollup_model.hour_start_utc < upper
+        )
+        if hours is not None:
+            statement = statement.where(rollup_model.hour_start_utc.in_(hours))
+        await asession.execute(statement)
+
+    hourly_rows = await aggregate_hourly_counts(
+        asession=asession, hours=hours, lower=lower, upper=upper
+    )
+    if hourly_rows:
+        await asession.execute(insert(DashboardHourlyRollupDB), hourly_rows)
+    content_rows = await aggregate_content_hourly_counts(
+        asession=asession, hours=hours, lower=lower, upper=upper
+    )
+    if content_rows:
+        await asession.execute(insert(DashboardContentHourlyRollupDB), content_rows)
+
+
+async def _save_rollup_watermark(
+    *, asession: AsyncSession, watermark: datetime
+) -> None:
+    """Save the watermark of the dashboard rollups.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    watermark
+        The end of the hours aggregated into the rollups.
+    """
+
+    statement = pg_insert(DashboardRollupWatermarkDB).values(
+        rollup_name=HOURLY_ROLLUP_NAME,
+        updated_datetime_utc=datetime.now(timezone.utc),
+        watermark_datetime_utc=watermark,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[DashboardRollupWatermarkDB.rollup_name],
+        set_={
+            "updated_datetime_utc": statement.excluded.updated_datetime_utc,
+            "watermark_datetime_utc": statement.excluded.watermark_datetime_utc,
+        },
+    )
+    await asession.execute(statement)
+
+
+@with_new_session
+async def update_dashboard_rollups(
+    *, asession: AsyncSession | None = None
+) -> Optional[datetime]:
+    """Aggregate the complete hours since the watermark into the rollup tables.
+
+    Only hours that ended at least `DASHBOARD_ROLLUP_DELAY` seconds ago are
+    aggregated, so that events committed late are not missed. On the first run, the
+    rollups are backfilled from the earliest event. The hours are aggregated in
+    chunks of `DASHBOARD_ROLLUP_BACKFILL_HOURS`, each committed with the new
+    watermark, so an interrupted run resumes from the last chunk. The hours of
+    queries that received response feedback since the watermark are aggregated
+    again, since their escalation counts have changed.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections. The default
+        for this should be `None` since it is provided by the `with_new_session`
+        decorator.
+
+    Returns
+    -------
+    Optional[datetime]
+        The watermark of the rollups, or `None` if another worker holds the lock.
+    """
+
+    assert asession is not None
+    upper = floor_hour(
+        datetime.now(timezone.utc) - timedelta(seconds=DASHBOARD_ROLLUP_DELAY)
+    )
+    watermark = None
+    while True:
+        # The lock is released at the end of each transaction, and prevents concurrent
+        # workers from aggregating the same hours.
+        result = await asession.execute(
+            select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_ID))
+        )
+        if not result.scalar_one():
+            await asession.rollback()
+            return watermark
+
+        watermark = await get_rollup_watermark(asession=asession)
+        lower = watermark or await _get_first_event_hour(asession=asession) or upper
+        if lower >= upper:
+            if watermark is None:
+                await _save_rollup_watermark(asession=asession, watermark=upper)
+                watermark = upper
+            await asession.commit()
+            return watermark
+
+        chunk_upper = min(
+            lower + timedelta(hours=DASHBOARD_ROLLUP_BACKFILL_HOURS), upper
+        )
+        if watermark is not None:
+            late_hours = await _get_late_feedback_hours(
+                asession=asession, lower=lower, upper=chunk_upper
+            )
+            if late_hours:
+                await _rebuild_rollups(
+                    asession=asession,
+                    hours=late_hours,
+                    lower=min(late_hours),
+                    upper=max(late_hours) + timedelta(hours=1),
+                )
+        await _rebuild_rollups(asession=asession, lower=lower, upper=chunk_upper)
+        await _save_rollup_watermark(asession=asession, watermark=chunk_upper)
+        await asession.commit()
+        logger.info(f"Aggregated dashboard rollups from {lower} to {chunk_upper}.")
+
+
+async def run_dashboard_rollup_aggregator() -> None:
+    """Periodically update the dashboard rollups until cancelled."""
+
+    while True:
+        try:
+            await update_dashboard_rollups()
+        except Exception as e:
+            logger.error(f"Error updating the dashboard rollups: {str(e)}")
+        await asyncio.sleep(DASHBOARD_ROLLUP_INTERVAL)
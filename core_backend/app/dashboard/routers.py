@@ -1,5 +1,6 @@
 """This module contains FastAPI routers for dashboard endpoints."""
 
+import asyncio
 import json
 import os
 import random
@@ -20,14 +21,21 @@ from fastapi import (
 from langfuse.decorators import langfuse_context, observe  # type: ignore
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth.dependencies import get_current_workspace_name
+from ..auth.dependencies import get_current_user, get_current_workspace_name
 from ..database import get_async_session, get_sqlalchemy_async_engine
-from ..users.models import WorkspaceDB
+from ..users.models import UserDB, WorkspaceDB, user_has_required_role_in_workspace
+from ..users.schemas import UserRoles
 from ..utils import setup_logger
 from ..workspaces.utils import get_workspace_by_workspace_name
+from .cache import (
+    get_cached_dashboard_response,
+    get_dashboard_cache_key_and_ttl,
+    save_dashboard_response,
+)
 from .config import (
     MAX_FEEDBACK_RECORDS_FOR_AI_SUMMARY,
     MAX_FEEDBACK_RECORDS_FOR_TOP_CONTENT,
+    TOPIC_MODELING_TIMEOUT,
 )
 from .models import (
     get_ai_answer_summary,
@@ -39,6 +47,7 @@ from .models import (
     get_stats_cards,
     get_timeseries_top_content,
     get_top_content,
+    run_in_new_session,
 )
 from .plotting import produce_bokeh_plot
 from .schemas import (
@@ -50,6 +59,7 @@ from .schemas import (
     TopicsData,
 )
 from .topic_modeling import topic_model_queries
+from .topic_modeling_jobs import TopicModelingJob, cancel_topic_modeling
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
@@ -187,11 +197,14 @@ async def retrieve_content_ai_summary(
 @router.get("/performance/{timeframe}", response_model=DashboardPerformance)
 async def retrieve_performance_frequency(
     timeframe: DashboardTimeFilter,
+    calling_user_db: Annotated[UserDB, Depends(get_current_user)],
     workspace_name: Annotated[str, Depends(get_current_workspace_name)],
+    request: Request,
     asession: AsyncSession = Depends(get_async_session),
     top_n: int | None = None,
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    bypass_cache: bool = False,
 ) -> DashboardPerformance:
     """Retrieve timeseries data on content usage and performance of each content.
 
@@ -199,8 +212,12 @@ async def retrieve_performance_frequency(
     ----------
     timeframe
         The time frequency to retrieve performance for.
+    calling_user_db
+        The user object associated with the user retrieving performance.
     workspace_name
         The name of the workspace to retrieve performance for.
+    request
+        The request object.
     asession
         The SQLAlchemy async session to use for all database connections.
     top_n
@@ -209,6 +226,9 @@ async def retrieve_performance_frequency(
         The start date for the time period.
     end_date
         The end date for the time period.
+    bypass_cache
+        Specifies whether to recompute the statistics instead of returning a cached
+        response. Only admins can bypass the cache.
 
     Returns
     -------
@@ -219,6 +239,12 @@ async def retrieve_performance_frequency(
     workspace_db = await get_workspace_by_workspace_name(
         asession=asession, workspace_name=workspace_name
     )
+    await check_cache_bypass(
+        asession=asession,
+        bypass_cache=bypass_cache,
+        calling_user_db=calling_user_db,
+        workspace_db=workspace_db,
+    )
 
     freq, start_dt, end_dt = get_freq_start_end_date(
         end_date_str=end_date,
@@ -226,6 +252,24 @@ async def retrieve_performance_frequency(
         start_date_str=start_date,
         timeframe=timeframe,
     )
+
+    redis = request.app.state.redis
+    cache_key, cache_ttl = get_dashboard_cache_key_and_ttl(
+        end_date=end_dt,
+        endpoint="performance",
+        frequency=freq,
+        start_date=start_dt,
+        timeframe=timeframe,
+        top_n=top_n,
+        workspace_id=workspace_db.workspace_id,
+    )
+    if not bypass_cache:
+        cached_performance_stats = await get_cached_dashboard_response(
+            key=cache_key, redis=redis, response_model=DashboardPerformance
+        )
+        if cached_performance_stats is not None:
+            return cached_performance_stats
+
     performance_stats = await retrieve_performance(
         asession=asession,
         end_date=end_dt,
@@ -234,6 +278,9 @@ async def retrieve_performance_frequency(
         top_n=top_n,
         workspace_id=workspace_db.workspace_id,
     )
+    await save_dashboard_response(
+        key=cache_key, redis=redis, response=performance_stats, ttl=cache_ttl
+    )
 
     return performance_stats
 
@@ -241,11 +288,14 @@ async def retrieve_performance_frequency(
 @router.get("/overview/{timeframe}", response_model=DashboardOverview)
 async def retrieve_overview_frequency(
     timeframe: DashboardTimeFilter,
+    calling_user_db: Annotated[UserDB, Depends(get_current_user)],
     workspace_name: Annotated[str, Depends(get_current_workspace_name)],
+    request: Request,
     asession: AsyncSession = Depends(get_async_session),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     frequency: Optional[TimeFrequency] = None,
+    bypass_cache: bool = False,
 ) -> DashboardOverview:
     """Retrieve all question answer statistics for the last day.
 
@@ -253,8 +303,12 @@ async def retrieve_overview_frequency(
     ----------
     timeframe
         The time frequency to retrieve overview for.
+    calling_user_db
+        The user object associated with the user retrieving the overview.
     workspace_name
         The name of the workspace to retrieve overview frequency for.
+    request
+        The request object.
     asession
         The SQLAlchemy async session to use for all database connections.
     start_date
@@ -263,6 +317,9 @@ async def retrieve_overview_frequency(
         The end date for the time period.
     frequency
         The frequency at which to retrieve the statistics.
+    bypass_cache
+        Specifies whether to recompute the statistics instead of returning a cached
+        response. Only admins can bypass the cache.
 
     Returns
     -------
@@ -273,6 +330,12 @@ async def retrieve_overview_frequency(
     workspace_db = await get_workspace_by_workspace_name(
         asession=asession, workspace_name=workspace_name
     )
+    await check_cache_bypass(
+        asession=asession,
+        bypass_cache=bypass_cache,
+        calling_user_db=calling_user_db,
+        workspace_db=workspace_db,
+    )
 
     # Use renamed `start_dt`/`end_dt` to avoid typing errors etc.
     freq, start_dt, end_dt = get_freq_start_end_date(
@@ -281,13 +344,34 @@ async def retrieve_overview_frequency(
         start_date_str=start_date,
         timeframe=timeframe,
     )
+
+    redis = request.app.state.redis
+    cache_key, cache_ttl = get_dashboard_cache_key_and_ttl(
+        end_date=end_dt,
+        endpoint="overview",
+        frequency=freq,
+        start_date=start_dt,
+        timeframe=timeframe,
+        workspace_id=workspace_db.workspace_id,
+    )
+    if not bypass_cache:
+        cached_stats = await get_cached_dashboard_response(
+            key=cache_key, redis=redis, response_model=DashboardOverview
+        )
+        if cached_stats is not None:
+            return cached_stats
+
     stats = await retrieve_overview(
         asession=asession,
         end_date=end_dt,
         frequency=freq,
+        query_semaphore=request.app.state.dashboard_query_semaphore,
         start_date=start_dt,
         workspace_id=workspace_db.workspace_id,
     )
+    await save_dashboard_response(
+        key=cache_key, redis=redis, response=stats, ttl=cache_ttl
+    )
 
     return stats
 
@@ -301,9 +385,13 @@ async def refresh_insights_frequency(
     asession: AsyncSession = Depends(get_async_session),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    refit: bool = Query(False),
 ) -> dict[str, str]:
     """Refresh topic modelling insights for the time period specified.
 
+    The persisted topic model of the workspace and timeframe is reused unless it is
+    due for a refit, or `refit` is set.
+
     Parameters
     ----------
     timeframe
@@ -320,6 +408,9 @@ async def refresh_insights_frequency(
         The start date for the time period.
     end_date
         The end date for the time period.
+    refit
+        Specifies whether to fit the topic model again rather than reuse the
+        persisted model.
 
     Returns
     -------
@@ -340,18 +431,78 @@ async def refresh_insights_frequency(
         timeframe=timeframe,
     )
 
+    # Only one refresh runs at a time per workspace, so that repeated refreshes do
+    # not stack.
+    job = TopicModelingJob(
+        redis=request.app.state.redis,
+        timeframe=timeframe,
+        workspace_name=workspace_db.workspace_name,
+    )
+    if not await job.acquire():
+        return {"detail": "A refresh task is already running for this workspace."}
+
     background_tasks.add_task(
         refresh_insights,
         end_date=end_dt,
-        request=request,
+        job=job,
+        process_semaphore=request.app.state.topic_modeling_process_semaphore,
+        refit=refit,
         start_date=start_dt,
-        timeframe=timeframe,
         workspace_db=workspace_db,
     )
 
     return {"detail": "Refresh task started in background."}
 
 
+@router.post("/insights/{timeframe}/cancel", response_model=dict)
+async def cancel_insights_refresh(
+    timeframe: DashboardTimeFilter,
+    request: Request,
+    workspace_name: Annotated[str, Depends(get_current_workspace_name)],
+    asession: AsyncSession = Depends(get_async_session),
+) -> dict[str, str]:
+    """Cancel the running refresh of topic modelling insights for the time period
+    specified. The refresh stops at its next step.
+
+    Parameters
+    ----------
+    timeframe
+        The time frequency of the refresh to cancel.
+    request
+        The request object.
+    workspace_name
+        The name of the workspace of the refresh.
+    asession
+        The SQLAlchemy async session to use for all database connections.
+
+    Returns
+    -------
+    dict
+        A dictionary with a message indicating that the refresh task is cancelled.
+
+    Raises
+    ------
+    HTTPException
+        If no refresh is running for the time period.
+    """
+
+    workspace_db = await get_workspace_by_workspace_name(
+        asession=asession, workspace_name=workspace_name
+    )
+
+    if not await cancel_topic_modeling(
+        redis=request.app.state.redis,
+        timeframe=timeframe,
+        workspace_name=workspace_db.workspace_name,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No refresh task is running for this timeframe.",
+        )
+
+    return {"detail": "Refresh task cancelled."}
+
+
 @router.get("/insights/{timeframe}", response_model=TopicsData)
 async def retrieve_insights_frequency(
     timeframe: DashboardTimeFilter,
@@ -435,8 +586,48 @@ async def create_plot(
             status_code=status.HTTP_404_NOT_FOUND, detail="Embeddings data not found."
         )
 
+    # Building the plot is CPU-bound, so it runs outside of the event loop.
     df = pd.read_json(embeddings_json.decode("utf-8"), orient="split")
-    return produce_bokeh_plot(embeddings_df=df)
+    return await asyncio.to_thread(produce_bokeh_plot, embeddings_df=df)
+
+
+async def check_cache_bypass(
+    *,
+    asession: AsyncSession,
+    bypass_cache: bool,
+    calling_user_db: UserDB,
+    workspace_db: WorkspaceDB,
+) -> None:
+    """Check that the calling user can bypass the cache of the dashboard responses.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    bypass_cache
+        Specifies whether the cache is bypassed.
+    calling_user_db
+        The user object associated with the user retrieving the statistics.
+    workspace_db
+        The workspace object of the statistics.
+
+    Raises
+    ------
+    HTTPException
+        If the cache is bypassed by a user who is not an admin of the workspace.
+    """
+
+    if bypass_cache and not await user_has_required_role_in_workspace(
+        allowed_user_roles=[UserRoles.ADMIN],
+        asession=asession,
+        user_db=calling_user_db,
+        workspace_db=workspace_db,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User does not have the required role to bypass the dashboard "
+            "cache.",
+        )
 
 
 def get_freq_start_end_date(
@@ -527,92 +718,102 @@ def get_freq_start_end_date(
 async def refresh_insights(
     *,
     end_date: date,
-    request: Request,
+    job: TopicModelingJob,
+    process_semaphore: asyncio.Semaphore,
+    refit: bool = False,
     start_date: date,
-    timeframe: DashboardTimeFilter,
     workspace_db: WorkspaceDB,
 ) -> None:
     """Retrieve topic modelling insights for the time period specified and write to
     Redis. This function returns `None` since it is called by a background task and
     only ever writes to Redis.
 
+    The progress of the job is written to Redis at each step. The job stops if it is
+    cancelled or runs for longer than `TOPIC_MODELING_TIMEOUT` seconds, and releases
+    the lock of the workspace when it finishes.
+
     Parameters
     ----------
-    asession
-        The SQLAlchemy async session to use for all database connections.
     end_date
         The end date for the time period.
-    request
-        The request object.
+    job
+        The topic modeling job, which holds the lock of the workspace.
+    process_semaphore
+        The semaphore limiting the number of topic modeling processes of the API
+        worker.
+    refit
+        Specifies whether to fit the topic model again rather than reuse the
+        persisted model.
     start_date
         The start date for the time period.
-    timeframe
-        The timeframe for the time period.
     workspace_db
         The workspace database object.
     """
+
+    redis = job.redis
     async with AsyncSession(
         get_sqlalchemy_async_engine(), expire_on_commit=False
     ) as asession:
-        redis = request.app.state.redis
-        await redis.set(
-            f"{workspace_db.workspace_name}_insights_{timeframe}_results",
-            TopicsData(
-                data=[],
-                refreshTimeStamp=datetime.now(timezone.utc).isoformat(),
-                status="in_progress",
-            ).model_dump_json(),
-        )
-
-        step = None
         try:
-            step = "Retrieve queries"
-            time_period_queries = await get_raw_queries(
-                asession=asession,
-                end_date=end_date,
-                start_date=start_date,
-                workspace_id=workspace_db.workspace_id,
-            )
-
-            step = "Retrieve contents"
-            content_data = await get_raw_contents(
-                asession=asession, workspace_id=workspace_db.workspace_id
-            )
-
-            topic_output, embeddings_df = await topic_model_queries(
-                content_data=content_data,
-                query_data=time_period_queries,
-                workspace_id=workspace_db.workspace_id,
-            )
-
-            langfuse_context.update_current_trace(
-                name="topic_modeling",
-                session_id=create_session_id("topic_modeling", start_date, end_date),
-                metadata={"workspace_id": workspace_db.workspace_id},
-            )
-
-            step = "Write to Redis"
-            embeddings_json = embeddings_df.to_json(orient="split")
-            embeddings_key = f"{workspace_db.workspace_name}_embeddings_{timeframe}"
-            await redis.set(embeddings_key, embeddings_json)
-            await redis.set(
-                f"{workspace_db.workspace_name}_insights_{timeframe}_results",
-                topic_output.model_dump_json(),
-            )
-            return
+            async with asyncio.timeout(TOPIC_MODELING_TIMEOUT):
+                await job.set_step("Retrieve queries")
+                time_period_queries = await get_raw_queries(
+                    asession=asession,
+                    end_date=end_date,
+                    start_date=start_date,
+                    workspace_id=workspace_db.workspace_id,
+                )
+
+                await job.set_step("Retrieve contents")
+                content_data = await get_raw_contents(
+                    asession=asession, workspace_id=workspace_db.workspace_id
+                )
+
+                topic_output, embeddings_df = await topic_model_queries(
+                    asession=asession,
+                    content_data=content_data,
+                    job=job,
+                    process_semaphore=process_semaphore,
+                    query_data=time_period_queries,
+                    refit=refit,
+                    workspace_id=workspace_db.workspace_id,
+                )
+
+                langfuse_context.update_current_trace(
+                    name="topic_modeling",
+                    session_id=create_session_id(
+                        "topic_modeling", start_date, end_date
+                    ),
+                    metadata={"workspace_id": workspace_db.workspace_id},
+                )
+
+                await job.set_step("Write to Redis")
+                embeddings_json = embeddings_df.to_json(orient="split")
+                embeddings_key = (
+                    f"{workspace_db.workspace_name}_embeddings_{job.timeframe}"
+                )
+                await redis.set(embeddings_key, embeddings_json)
+                await redis.set(job.results_key, topic_output.model_dump_json())
         except Exception as e:  # pylint: disable=W0718
-            error_msg = str(e)
+            if isinstance(e, TimeoutError):
+                error_msg = (
+                    f"Topic modeling timed out after {TOPIC_MODELING_TIMEOUT} seconds."
+                )
+            else:
+                error_msg = str(e)
             logger.error(error_msg)
             await redis.set(
-                f"{workspace_db.workspace_name}_insights_{timeframe}_results",
+                job.results_key,
                 TopicsData(
                     data=[],
                     error_message=error_msg,
-                    failure_step=step,
+                    failure_step=job.step,
                     refreshTimeStamp=datetime.now(timezone.utc).isoformat(),
                     status="error",
                 ).model_dump_json(),
             )
+        finally:
+            await job.release()
 
 
 async def retrieve_overview(
@@ -620,6 +821,7 @@ async def retrieve_overview(
     asession: AsyncSession,
     end_date: date,
     frequency: TimeFrequency,
+    query_semaphore: asyncio.Semaphore,
     start_date: date,
     top_n: int = 4,
     workspace_id: int,
@@ -634,6 +836,9 @@ async def retrieve_overview(
         The ending date for the statistics.
     frequency
         The frequency at which to retrieve the statistics.
+    query_semaphore
+        The semaphore limiting the number of dashboard queries that run concurrently
+        on their own sessions.
     start_date
         The starting date for the statistics.
     top_n
@@ -647,34 +852,44 @@ async def retrieve_overview(
         The dashboard overview statistics.
     """
 
-    stats = await get_stats_cards(
-        asession=asession,
-        end_date=end_date,
-        start_date=start_date,
-        workspace_id=workspace_id,
-    )
-
-    heatmap = await get_heatmap(
-        asession=asession,
-        end_date=end_date,
-        start_date=start_date,
-        workspace_id=workspace_id,
-    )
-
-    time_series = await get_overview_timeseries(
-        asession=asession,
-        end_date=end_date,
-        frequency=frequency,
-        start_date=start_date,
-        workspace_id=workspace_id,
-    )
-
-    top_content = await get_top_content(
-        asession=asession, top_n=top_n, workspace_id=workspace_id
+    # The statistics are independent, so they are queried concurrently. Only
+    # `get_stats_cards` uses `asession`; the other queries run on their own sessions.
+    stats, heatmap, time_series, top_content = await asyncio.gather(
+        get_stats_cards(
+            asession=asession,
+            end_date=end_date,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
+        run_in_new_session(
+            get_heatmap,
+            asession=asession,
+            end_date=end_date,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
+        get_overview_timeseries(
+            asession=asession,
+            end_date=end_date,
+            frequency=frequency,
+            query_semaphore=query_semaphore,
+            start_date=start_date,
+            workspace_id=workspace_id,
+        ),
+        run_in_new_session(
+            get_top_content,
+            asession=asession,
+            query_semaphore=query_semaphore,
+            top_n=top_n,
+            workspace_id=workspace_id,
+        ),
     )
 
     return DashboardOverview(
         heatmap=heatmap,
+        refreshTimeStamp=datetime.now(timezone.utc).isoformat(),
         stats_cards=stats,
         time_series=time_series,
         top_content=top_content,
@@ -721,7 +936,10 @@ async def retrieve_performance(
         top_n=top_n,
         workspace_id=workspace_id,
     )
-    return DashboardPerformance(content_time_series=content_time_series)
+    return DashboardPerformance(
+        content_time_series=content_time_series,
+        refreshTimeStamp=datetime.now(timezone.utc).isoformat(),
+    )
 
 
 def create_session_id(
@@ -141,6 +141,7 @@ class TopicsData(BaseModel):
     data: list[Topic]
     error_message: str | None = None
     failure_step: str | None = None
+    progress_step: str | None = None
     refreshTimeStamp: str
     status: Literal["not_started", "in_progress", "completed", "error"]
 
@@ -161,8 +162,10 @@ class UserFeedback(BaseModel):
 
 
 class UserQuery(BaseModel):
-    """Pydantic model for insights for user queries."""
+    """Pydantic model for insights for user queries. `query_count` is the number of
+    queries with the same normalized text."""
 
+    query_count: int = 1
     query_datetime_utc: datetime
     query_id: int
     query_text: str
@@ -202,6 +205,7 @@ class DashboardOverview(BaseModel):
     """Pydantic model for dashboard overview."""
 
     heatmap: Heatmap
+    refreshTimeStamp: str
     stats_cards: StatsCards
     time_series: OverviewTimeSeries
     top_content: list[TopContent]
@@ -221,3 +225,4 @@ class DashboardPerformance(BaseModel):
     """Pydantic model for dashboard performance."""
 
     content_time_series: list[TopContentTimeSeries]
+    refreshTimeStamp: str
@@ -0,0 +1,265 @@
+"""This module contains the local storage of the fitted topic models.
+
+The topic model of each workspace and timeframe is persisted with its state: the
+topic and 2D coordinates of each document it assigned at the last refresh, and the
+labels of its topics. A refresh then only assigns the new documents, and keeps the
+labels of the topics, unless the model is fitted again.
+
+Each fit of a model is saved in its own file, named after the ID of the fit, and the
+state records the ID of the fit it belongs to. Replacing the state file is the single
+atomic step of a save, so the state and the model it points to always match, even if
+a save is interrupted.
+"""
+
+import glob
+import json
+import os
+from typing import Optional, TypedDict
+
+from bertopic import BERTopic
+
+from .config import TOPIC_MODELING_MODEL_DIR
+
+MODEL_FILE_PREFIX = "model_"
+STATE_FILE_NAME = "state.json"
+# Minimum Jaccard similarity between the queries of a new topic and those of a
+# topic of the previous model for the new topic to keep its label.
+LABEL_REUSE_THRESHOLD = 0.5
+
+
+class TopicModelState(TypedDict):
+    """The state of a persisted topic model.
+
+    `assignments` maps the ID of each document of the last refresh, e.g. `query_1`,
+    to its topic ID and 2D coordinates.
+    """
+
+    assignments: dict[str, tuple[int, float, float]]
+    embedding_model: str
+    fit_id: str
+    fitted_datetime_utc: str
+    outlier_share: float
+    topic_keywords: dict[int, list[str]]
+    topic_labels: dict[int, dict[str, str]]
+
+
+def _get_model_path(*, fit_id: str, model_dir: str) -> str:
+    """Get the path of the file of a fit of a topic model.
+
+    Parameters
+    ----------
+    fit_id
+        The ID of the fit.
+    model_dir
+        The directory of the topic model.
+
+    Returns
+    -------
+    str
+        The path of the model file.
+    """
+
+    return os.path.join(model_dir, f"{MODEL_FILE_PREFIX}{fit_id}.pkl")
+
+
+def get_topic_model_dir(*, timeframe: str, workspace_id: int) -> str:
+    """Get the directory of the persisted topic model of a workspace and timeframe.
+
+    Parameters
+    ----------
+    timeframe
+        The timeframe of the topic model.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    str
+        The directory of the topic model.
+    """
+
+    return os.path.join(TOPIC_MODELING_MODEL_DIR, str(workspace_id), timeframe)
+
+
+def load_topic_model(*, fit_id: str, model_dir: str) -> Optional[BERTopic]:
+    """Load a fit of a persisted topic model.
+
+    Parameters
+    ----------
+    fit_id
+        The ID of the fit, from the state of the topic model.
+    model_dir
+        The directory of the topic model.
+
+    Returns
+    -------
+    Optional[BERTopic]
+        The topic model, or `None` if the fit is not persisted.
+    """
+
+    model_path = _get_model_path(fit_id=fit_id, model_dir=model_dir)
+    if not os.path.exists(model_path):
+        return None
+    return BERTopic.load(model_path)
+
+
+def load_topic_model_state(*, model_dir: str) -> Optional[TopicModelState]:
+    """Load the state of a persisted topic model.
+
+    Parameters
+    ----------
+    model_dir
+        The directory of the topic model.
+
+    Returns
+    -------
+    Optional[TopicModelState]
+        The state of the topic model, or `None` if no state is persisted.
+    """
+
+    state_path = os.path.join(model_dir, STATE_FILE_NAME)
+    if not os.path.exists(state_path):
+        return None
+
+    with open(state_path, encoding="utf-8") as f:
+        state_json = json.load(f)
+
+    # JSON object keys are strings, and arrays are lists. A state saved before fits
+    # had IDs does not point to any model file.
+    return TopicModelState(
+        assignments={
+            doc_id: (int(topic_id), float(x), float(y))
+            for doc_id, (topic_id, x, y) in state_json["assignments"].items()
+        },
+        embedding_model=state_json["embedding_model"],
+        fit_id=state_json.get("fit_id", ""),
+        fitted_datetime_utc=state_json["fitted_datetime_utc"],
+        outlier_share=state_json["outlier_share"],
+        topic_keywords={
+            int(topic_id): keywords
+            for topic_id, keywords in state_json["topic_keywords"].items()
+        },
+        topic_labels={
+            int(topic_id): label
+            for topic_id, label in state_json["topic_labels"].items()
+        },
+    )
+
+
+def match_topic_labels(
+    *,
+    new_assignments: dict[str, int],
+    old_assignments: dict[str, int],
+    old_labels: dict[int, dict[str, str]],
+) -> dict[int, dict[str, str]]:
+    """Match the topics of a new model to those of the previous model, by the queries
+    they share, and keep the labels of the matched topics.
+
+    Parameters
+    ----------
+    new_assignments
+        The topic ID of each document in the new model.
+    old_assignments
+        The topic ID of each document in the previous model.
+    old_labels
+        The labels of the topics of the previous model.
+
+    Returns
+    -------
+    dict[int, dict[str, str]]
+        The labels of the topics of the new model matched to a labelled topic of the
+        previous model. Each previous topic is matched at most once.
+    """
+
+    common_doc_ids = [
+        doc_id
+        for doc_id in new_assignments
+        if doc_id in old_assignments and doc_id.startswith("query_")
+    ]
+    new_topics: dict[int, set[str]] = {}
+    old_topics: dict[int, set[str]] = {}
+    for doc_id in common_doc_ids:
+        new_topics.setdefault(new_assignments[doc_id], set()).add(doc_id)
+        old_topics.setdefault(old_assignments[doc_id], set()).add(doc_id)
+
+    similarities = sorted(
+        (
+            (len(new_docs & old_docs) / len(new_docs | old_docs), new_id, old_id)
+            for new_id, new_docs in new_topics.items()
+            for old_id, old_docs in old_topics.items()
+            if new_id != -1 and old_id in old_labels
+        ),
+        reverse=True,
+    )
+
+    topic_labels: dict[int, dict[str, str]] = {}
+    matched_old_ids: set[int] = set()
+    for similarity, new_id, old_id in similarities:
+        if similarity < LABEL_REUSE_THRESHOLD:
+            break
+        if new_id in topic_labels or old_id in matched_old_ids:
+            continue
+        topic_labels[new_id] = old_labels[old_id]
+        matched_old_ids.add(old_id)
+    return topic_labels
+
+
+def save_topic_model(
+    *, model_dir: str, state: TopicModelState, topic_model: Optional[BERTopic] = None
+) -> None:
+    """Persist the state of a topic model, and the model itself if it was fitted
+    again.
+
+    A refitted model is written to the file of its fit before the state that points
+    to it replaces the previous state, and the files of the previous fits are only
+    deleted afterwards. The files are replaced atomically, so a concurrent reader
+    never sees a partial file.
+
+    Parameters
+    ----------
+    model_dir
+        The directory of the topic model.
+    state
+        The state of the topic model.
+    topic_model
+        The topic model, if it was fitted again. It is saved as the fit
+        `state["fit_id"]`.
+    """
+
+    os.makedirs(model_dir, exist_ok=True)
+
+    model_path = _get_model_path(fit_id=state["fit_id"], model_dir=model_dir)
+    if topic_model is not None:
+        topic_model.save(f"{model_path}.tmp", serialization="pickle")
+        os.replace(f"{model_path}.tmp", model_path)
+
+    state_path = os.path.join(model_dir, STATE_FILE_NAME)
+    with open(f"{state_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(f"{state_path}.tmp", state_path)
+
+    if topic_model is not None:
+        for path in glob.glob(os.path.join(model_dir, f"{MODEL_FILE_PREFIX}*.pkl")):
+            if path != model_path:
+                os.remove(path)
+
+
+def save_topic_labels(
+    *, model_dir: str, topic_labels: dict[int, dict[str, str]]
+) -> None:
+    """Save the labels of the topics of a persisted topic model.
+
+    Parameters
+    ----------
+    model_dir
+        The directory of the topic model.
+    topic_labels
+        The labels of the topics.
+    """
+
+    state = load_topic_model_state(model_dir=model_dir)
+    if state is None:
+        return
+
+    state["topic_labels"] = topic_labels
+    save_topic_model(model_dir=model_dir, state=state)
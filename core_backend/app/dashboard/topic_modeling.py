@@ -2,20 +2,39 @@
 
 import asyncio
 import os
-from datetime import datetime, timezone
-from typing import Any, Coroutine, cast
+from datetime import datetime, timedelta, timezone
+from typing import Any, Coroutine, NamedTuple, Optional, cast
+from uuid import uuid4
 
 import numpy as np
 import pandas as pd
 from bertopic import BERTopic
 from hdbscan import HDBSCAN
-from sentence_transformers import SentenceTransformer
+from sqlalchemy.ext.asyncio import AsyncSession
 from umap import UMAP
 
+from ..config import LITELLM_MODEL_EMBEDDING
 from ..llm_call.dashboard import generate_topic_label
-from ..utils import setup_logger
-from .config import TOPIC_MODELING_CONTEXT
+from ..question_answer.models import get_query_embeddings, save_query_embeddings_to_db
+from ..utils import embedding_batch, setup_logger
+from .config import (
+    TOPIC_MODELING_CONTEXT,
+    TOPIC_MODELING_DRIFT_THRESHOLD,
+    TOPIC_MODELING_EMBEDDING_BATCH_SIZE,
+    TOPIC_MODELING_REFIT_INTERVAL,
+)
+from .models import get_content_embeddings
 from .schemas import BokehContentItem, Topic, TopicsData, UserQuery
+from .topic_model_store import (
+    TopicModelState,
+    get_topic_model_dir,
+    load_topic_model,
+    load_topic_model_state,
+    match_topic_labels,
+    save_topic_labels,
+    save_topic_model,
+)
+from .topic_modeling_jobs import TopicModelingJob, run_in_process
 
 logger = setup_logger()
 
@@ -25,18 +44,29 @@ DISABLE_DASHBOARD_LLM = (
 )
 
 
-def add_reduced_embeddings(*, results_df: pd.DataFrame, topic_model: BERTopic) -> None:
+class TopicModelOutput(NamedTuple):
+    """The output of `fit_topics`, returned by the topic modeling process."""
+
+    reduced_embeddings: np.ndarray
+    refitted: bool
+    topic_ids: list[int]
+    topic_keywords: dict[int, list[str]]
+    topic_labels: dict[int, dict[str, str]]
+
+
+def add_reduced_embeddings(
+    *, reduced_embeddings: np.ndarray, results_df: pd.DataFrame
+) -> None:
     """Add reduced embeddings (2D) to the results DataFrame.
 
     Parameters
     ----------
+    reduced_embeddings
+        The 2D embeddings of the texts, reduced by the UMAP model of the topic model.
     results_df
         A DataFrame containing the topic modeling results.
-    topic_model
-        A fitted BERTopic model.
     """
 
-    reduced_embeddings = topic_model.umap_model.embedding_
     results_df["x"] = reduced_embeddings[:, 0]
     results_df["y"] = reduced_embeddings[:, 1]
 
@@ -77,30 +107,361 @@ def fit_topic_model(*, embeddings: np.ndarray, texts: list[str]) -> BERTopic:
     return topic_model
 
 
-def generate_embeddings(*, texts: list[str]) -> np.ndarray:
-    """Generate embeddings for the provided texts using SentenceTransformer.
+def get_outlier_share(
+    *, doc_ids: list[str], topic_ids: list[int], weights: list[int]
+) -> float:
+    """Get the share of the queries that are outliers, i.e., not in any topic.
+
+    Parameters
+    ----------
+    doc_ids
+        The ID of each document, e.g. `query_1`.
+    topic_ids
+        The topic ID of each document.
+    weights
+        The number of queries of each document.
+
+    Returns
+    -------
+    float
+        The share of the queries that are outliers, or 0 if there are no queries.
+    """
+
+    n_queries = n_outliers = 0
+    for doc_id, topic_id, weight in zip(doc_ids, topic_ids, weights):
+        if doc_id.startswith("query_"):
+            n_queries += weight
+            n_outliers += weight if topic_id == -1 else 0
+    if not n_queries:
+        return 0.0
+    return n_outliers / n_queries
+
+
+def get_refit_reason(
+    *, embedding_model: str, refit: bool, state: Optional[TopicModelState]
+) -> Optional[str]:
+    """Get the reason to fit the topic model again rather than assign the new
+    documents with the persisted model, if any.
+
+    Parameters
+    ----------
+    embedding_model
+        The embedding model of the embeddings.
+    refit
+        Specifies whether a refit was requested.
+    state
+        The state of the persisted topic model, if any.
+
+    Returns
+    -------
+    Optional[str]
+        The reason for the refit, or `None` if the persisted model can be reused.
+    """
+
+    if refit:
+        return "refit requested"
+    if state is None:
+        return "no persisted model"
+    if state["embedding_model"] != embedding_model:
+        return "embedding model changed"
+    fitted_datetime_utc = datetime.fromisoformat(state["fitted_datetime_utc"])
+    if datetime.now(timezone.utc) - fitted_datetime_utc > timedelta(
+        seconds=TOPIC_MODELING_REFIT_INTERVAL
+    ):
+        return "persisted model is stale"
+    return None
+
+
+def assign_topics(
+    *,
+    doc_ids: list[str],
+    embeddings: np.ndarray,
+    state: TopicModelState,
+    texts: list[str],
+    topic_model: BERTopic,
+    weights: list[int],
+) -> Optional[TopicModelOutput]:
+    """Assign the documents to the topics of the persisted topic model. Documents
+    assigned at the last refresh keep their topic and coordinates, and only the new
+    documents are transformed.
 
     Parameters
     ----------
+    doc_ids
+        The ID of each document, e.g. `query_1`.
+    embeddings
+        An array of embeddings for the provided texts.
+    state
+        The state of the persisted topic model.
     texts
-        A list of strings to generate embeddings for.
+        A list of strings to assign to the topics.
+    topic_model
+        The persisted topic model.
+    weights
+        The number of queries of each text.
 
     Returns
     -------
-    np.ndarray
+    Optional[TopicModelOutput]
+        The reduced embeddings and topic of each text, or `None` if the outlier share
+        of the new queries drifted by more than `TOPIC_MODELING_DRIFT_THRESHOLD` and
+        the model must be fitted again.
+    """
+
+    reduced_embeddings = np.zeros((len(doc_ids), 2), dtype=np.float32)
+    topic_ids = [-1] * len(doc_ids)
+    new_indices = []
+    for i, doc_id in enumerate(doc_ids):
+        if doc_id in state["assignments"]:
+            topic_ids[i], x, y = state["assignments"][doc_id]
+            reduced_embeddings[i] = (x, y)
+        else:
+            new_indices.append(i)
+    logger.info(f"Assigning {len(new_indices)} new documents to persisted topics")
+
+    if new_indices:
+        new_embeddings = embeddings[new_indices]
+        new_topics, _ = topic_model.transform(
+            [texts[i] for i in new_indices], new_embeddings
+        )
+        reduced_embeddings[new_indices] = topic_model.umap_model.transform(
+            new_embeddings
+        )
+        for i, topic_id in zip(new_indices, new_topics):
+            topic_ids[i] = int(topic_id)
+
+        new_outlier_share = get_outlier_share(
+            doc_ids=[doc_ids[i] for i in new_indices],
+            topic_ids=[topic_ids[i] for i in new_indices],
+            weights=[weights[i] for i in new_indices],
+        )
+        if new_outlier_share - state["outlier_share"] > TOPIC_MODELING_DRIFT_THRESHOLD:
+            logger.info(
+                f"Outlier share of new queries {new_outlier_share:.2f} drifted from "
+                f"{state['outlier_share']:.2f}"
+            )
+            return None
+
+    return TopicModelOutput(
+        reduced_embeddings=reduced_embeddings,
+        refitted=False,
+        topic_ids=topic_ids,
+        topic_keywords=state["topic_keywords"],
+        topic_labels=state["topic_labels"],
+    )
+
+
+def fit_topics(
+    *,
+    doc_ids: list[str],
+    embedding_model: str,
+    embeddings: np.ndarray,
+    model_dir: str,
+    refit: bool,
+    texts: list[str],
+    weights: list[int],
+) -> TopicModelOutput:
+    """Assign the texts to the topics of the persisted topic model of the workspace
+    and timeframe, or fit a new BERTopic model and persist it.
+
+    The model is fitted again if a refit is requested, if no model is persisted, if
+    the embedding model changed, if the model is older than
+    `TOPIC_MODELING_REFIT_INTERVAL` seconds, or if the new queries drift from its
+    topics. A refitted model keeps the labels of the topics that match a topic of the
+    previous model.
+
+    This is CPU-bound and runs in a child process, see `run_in_process`, so only the
+    outputs needed by the rest of the pipeline are returned rather than the model.
+
+    Parameters
+    ----------
+    doc_ids
+        The ID of each document, e.g. `query_1`.
+    embedding_model
+        The embedding model of the embeddings.
+    embeddings
         An array of embeddings for the provided texts.
+    model_dir
+        The directory of the persisted topic model.
+    refit
+        Specifies whether to fit the topic model again.
+    texts
+        A list of strings to fit the topic model on.
+    weights
+        The number of queries of each text. UMAP and HDBSCAN do not take sample
+        weights, so each distinct text is a single point of the fit, and the weights
+        only count towards the outlier share.
+
+    Returns
+    -------
+    TopicModelOutput
+        The reduced embeddings and topic of each text, the keywords of each topic,
+        and the labels kept for the topics.
     """
 
-    sentence_model = SentenceTransformer("all-MiniLM-L6-v2")
-    embeddings_any = sentence_model.encode(
-        texts, convert_to_numpy=True, convert_to_tensor=False, show_progress_bar=False
+    state = load_topic_model_state(model_dir=model_dir)
+    refit_reason = get_refit_reason(
+        embedding_model=embedding_model, refit=refit, state=state
+    )
+    topic_model = None
+    if refit_reason is None and state is not None:
+        topic_model = load_topic_model(fit_id=state["fit_id"], model_dir=model_dir)
+        if topic_model is None:
+            refit_reason = "persisted model is missing"
+
+    if state is not None and topic_model is not None:
+        output = assign_topics(
+            doc_ids=doc_ids,
+            embeddings=embeddings,
+            state=state,
+            texts=texts,
+            topic_model=topic_model,
+            weights=weights,
+        )
+        if output is not None:
+            save_topic_model(
+                model_dir=model_dir,
+                state={
+                    **state,
+                    "assignments": {
+                        doc_id: (topic_id, float(x), float(y))
+                        for doc_id, topic_id, (x, y) in zip(
+                            doc_ids, output.topic_ids, output.reduced_embeddings
+                        )
+                    },
+                },
+            )
+            return output
+        refit_reason = "new queries drifted"
+
+    logger.info(f"Fitting topic model: {refit_reason}")
+    topic_model = fit_topic_model(embeddings=embeddings, texts=texts)
+    topics, _ = topic_model.transform(texts, embeddings)
+    topic_ids = [int(topic_id) for topic_id in topics]
+    reduced_embeddings = topic_model.umap_model.embedding_
+    topic_labels = (
+        match_topic_labels(
+            new_assignments=dict(zip(doc_ids, topic_ids)),
+            old_assignments={
+                doc_id: topic_id
+                for doc_id, (topic_id, _, _) in state["assignments"].items()
+            },
+            old_labels=state["topic_labels"],
+        )
+        if state is not None
+        else {}
+    )
+    output = TopicModelOutput(
+        reduced_embeddings=reduced_embeddings,
+        refitted=True,
+        topic_ids=topic_ids,
+        topic_keywords={
+            topic_id: [word for word, _ in topic_model.get_topic(topic_id) or []]
+            for topic_id in set(topic_ids)
+            if topic_id != -1
+        },
+        topic_labels=topic_labels,
+    )
+    save_topic_model(
+        model_dir=model_dir,
+        state=TopicModelState(
+            assignments={
+                doc_id: (topic_id, float(x), float(y))
+                for doc_id, topic_id, (x, y) in zip(
+                    doc_ids, topic_ids, reduced_embeddings
+                )
+            },
+            embedding_model=embedding_model,
+            fit_id=uuid4().hex,
+            fitted_datetime_utc=datetime.now(timezone.utc).isoformat(),
+            outlier_share=get_outlier_share(
+                doc_ids=doc_ids, topic_ids=topic_ids, weights=weights
+            ),
+            topic_keywords=output.topic_keywords,
+            topic_labels=topic_labels,
+        ),
+        topic_model=topic_model,
+    )
+    return output
+
+
+async def get_embeddings(
+    *,
+    asession: AsyncSession,
+    content_data: list[BokehContentItem],
+    query_data: list[UserQuery],
+    workspace_id: int,
+) -> np.ndarray:
+    """Get the embeddings of the queries and content cards, from the embedding model
+    of the search.
+
+    The queries reuse the embeddings persisted at search time, and the content cards
+    their stored embeddings. Queries without a persisted embedding of the current
+    embedding model, such as queries made before embeddings were persisted, are
+    embedded once and their embeddings persisted.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    content_data
+        A list of `BokehContentItem` objects containing content data.
+    query_data
+        A list of `UserQuery` objects containing the raw queries and their datetime
+        stamps.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    np.ndarray
+        An array of embeddings with the queries first, then the content cards, as in
+        the DataFrame of `prepare_dataframes`.
+    """
+
+    query_embeddings = await get_query_embeddings(
+        asession=asession, query_ids=[query.query_id for query in query_data]
+    )
+    missing_queries = [
+        query for query in query_data if query.query_id not in query_embeddings
+    ]
+    logger.info(
+        f"Embedding {len(missing_queries)} of {len(query_data)} queries without a "
+        "persisted embedding"
+    )
+    for i in range(0, len(missing_queries), TOPIC_MODELING_EMBEDDING_BATCH_SIZE):
+        batch = missing_queries[i : i + TOPIC_MODELING_EMBEDDING_BATCH_SIZE]
+        batch_embeddings = dict(
+            zip(
+                [query.query_id for query in batch],
+                await embedding_batch(
+                    texts_to_embed=[query.query_text for query in batch]
+                ),
+            )
+        )
+        await save_query_embeddings_to_db(
+            asession=asession,
+            query_embeddings=batch_embeddings,
+            workspace_id=workspace_id,
+        )
+        query_embeddings.update(batch_embeddings)
+
+    content_embeddings = await get_content_embeddings(
+        asession=asession, content_ids=[content.content_id for content in content_data]
+    )
+
+    return np.array(
+        [query_embeddings[query.query_id] for query in query_data]
+        + [content_embeddings[content.content_id] for content in content_data],
+        dtype=np.float32,
     )
-    embeddings = cast(np.ndarray, embeddings_any)  # Needed for mypy issues
-    return embeddings
 
 
 async def generate_topic_labels_async(
-    *, results_df: pd.DataFrame, topic_model: BERTopic, workspace_id: int
+    *,
+    results_df: pd.DataFrame,
+    topic_keywords: dict[int, list[str]],
+    workspace_id: int,
 ) -> dict[int, dict[str, str]]:
     """Generate topic labels asynchronously using an LLM or alternative method.
 
@@ -108,8 +469,8 @@ async def generate_topic_labels_async(
     ----------
     results_df
         A DataFrame containing the topic modeling results.
-    topic_model
-        A fitted BERTopic model.
+    topic_keywords
+        The keywords of each topic in the topic model.
     workspace_id
         The ID of the workspace.
 
@@ -132,8 +493,13 @@ async def generate_topic_labels_async(
         if topic_id == -1:  # Skip noise/unclassified topics
             continue
 
-        # Get top 5 query samples for the topic.
-        topic_queries = topic_df[topic_df["type"] == "query"]["text"].head(5).tolist()
+        # Get the top 5 most frequent query samples for the topic.
+        topic_queries = (
+            topic_df[topic_df["type"] == "query"]
+            .sort_values("count", ascending=False, kind="stable")["text"]
+            .head(5)
+            .tolist()
+        )
 
         # Create task for generating topic label.
         topic_id_int = int(topic_id)
@@ -142,7 +508,7 @@ async def generate_topic_labels_async(
                 context=TOPIC_MODELING_CONTEXT,
                 sample_texts=topic_queries,
                 topic_id=topic_id_int,
-                topic_model=topic_model,
+                topic_keywords=topic_keywords.get(topic_id_int, []),
                 workspace_id=workspace_id,
             )
         )
@@ -214,10 +580,11 @@ def prepare_dataframes(
     full_texts = query_df["query_text"].tolist() + content_df["content_text"].tolist()
     types = query_df["type"].tolist() + content_df["type"].tolist()
     datetimes = query_df["query_datetime_utc"].tolist() + [""] * len(content_df)
+    counts = query_df["query_count"].tolist() + [1] * len(content_df)
 
     # Create combined DataFrame.
     results_df = pd.DataFrame(
-        {"text": full_texts, "type": types, "datetime": datetimes}
+        {"text": full_texts, "type": types, "datetime": datetimes, "count": counts}
     )
 
     return results_df
@@ -260,7 +627,9 @@ def prepare_topics_data(
         )
 
         # Get topic samples.
-        topic_samples_slice = only_queries[["text", "datetime"]].head(20)
+        topic_samples_slice = only_queries.sort_values(
+            "count", ascending=False, kind="stable"
+        )[["text", "datetime"]].head(20)
         string_topic_samples = [
             {
                 "query_text": str(sample["text"]),
@@ -273,7 +642,7 @@ def prepare_topics_data(
         topic = Topic(
             topic_id=int(topic_id),
             topic_name=topic_dict["topic_title"],
-            topic_popularity=len(only_queries),
+            topic_popularity=int(only_queries["count"].sum()),
             topic_samples=string_topic_samples,
             topic_summary=topic_dict["topic_summary"],
         )
@@ -294,19 +663,38 @@ def prepare_topics_data(
 
 async def topic_model_queries(
     *,
+    asession: AsyncSession,
     content_data: list[BokehContentItem],
+    job: TopicModelingJob,
+    process_semaphore: asyncio.Semaphore,
     query_data: list[UserQuery],
+    refit: bool = False,
     workspace_id: int,
 ) -> tuple[TopicsData, pd.DataFrame]:
-    """Perform topic modeling on user queries and content data.
+    """Perform topic modeling on user queries and content data. The topic model is
+    fitted in a child process, so that it does not block the API worker.
+
+    The topic model of the workspace and timeframe is persisted, so a refresh only
+    assigns the new documents to its topics and generates labels for the topics
+    without one, unless the model is fitted again.
 
     Parameters
     ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
     content_data
         A list of `BokehContentItem` objects containing content data.
+    job
+        The topic modeling job, which records the progress of each step.
+    process_semaphore
+        The semaphore limiting the number of topic modeling processes of the API
+        worker.
     query_data
         A list of `UserQuery` objects containing the raw queries and their datetime
         stamps.
+    refit
+        Specifies whether to fit the topic model again rather than reuse the
+        persisted model.
     workspace_id
         The ID of the workspace.
 
@@ -363,25 +751,58 @@ async def topic_model_queries(
     # Prepare dataframes.
     results_df = prepare_dataframes(content_data=content_data, query_data=query_data)
 
-    # Generate embeddings.
-    embeddings = generate_embeddings(texts=results_df["text"].tolist())
-
-    # Fit the BERTopic model.
-    topic_model = fit_topic_model(
-        embeddings=embeddings, texts=results_df["text"].tolist()
+    # Get embeddings.
+    await job.set_step("Get embeddings")
+    embeddings = await get_embeddings(
+        asession=asession,
+        content_data=content_data,
+        query_data=query_data,
+        workspace_id=workspace_id,
     )
 
-    # Transform documents to get topics and probabilities.
-    topics, _ = topic_model.transform(results_df["text"], embeddings)
-    results_df["topic_id"] = topics
+    # Fit the BERTopic model, or reuse the persisted one, and get the topic of each
+    # document.
+    await job.set_step("Fit topic model")
+    model_dir = get_topic_model_dir(timeframe=job.timeframe, workspace_id=workspace_id)
+    topic_model_output = await run_in_process(
+        fit_topics,
+        doc_ids=[f"query_{query.query_id}" for query in query_data]
+        + [f"content_{content.content_id}" for content in content_data],
+        embedding_model=LITELLM_MODEL_EMBEDDING,
+        embeddings=embeddings,
+        job=job,
+        model_dir=model_dir,
+        process_semaphore=process_semaphore,
+        refit=refit,
+        texts=results_df["text"].tolist(),
+        weights=results_df["count"].tolist(),
+    )
+    results_df["topic_id"] = topic_model_output.topic_ids
 
     # Add reduced embeddings (for visualization).
-    add_reduced_embeddings(results_df=results_df, topic_model=topic_model)
+    add_reduced_embeddings(
+        reduced_embeddings=topic_model_output.reduced_embeddings, results_df=results_df
+    )
 
-    # Generate topic labels using LLM or alternative method.
-    topic_labels = await generate_topic_labels_async(
-        results_df=results_df, topic_model=topic_model, workspace_id=workspace_id
+    # Generate labels for the topics without a kept label using LLM or alternative
+    # method.
+    await job.set_step("Generate topic labels")
+    topic_labels = dict(topic_model_output.topic_labels)
+    unlabelled_df = results_df[~results_df["topic_id"].isin(list(topic_labels))].copy()
+    new_topic_labels = await generate_topic_labels_async(
+        results_df=unlabelled_df,
+        topic_keywords=topic_model_output.topic_keywords,
+        workspace_id=workspace_id,
+    )
+    logger.info(
+        f"Generated {len(new_topic_labels)} topic labels, kept {len(topic_labels)} "
+        f"(refitted: {topic_model_output.refitted})"
     )
+    if new_topic_labels:
+        topic_labels.update(new_topic_labels)
+        await asyncio.to_thread(
+            save_topic_labels, model_dir=model_dir, topic_labels=topic_labels
+        )
 
     # Add topic titles to the dataFrame.
     results_df["topic_title"] = results_df.apply(
@@ -0,0 +1,343 @@
+"""This module contains the jobs that refresh the topic modeling insights.
+
+A refresh runs as a background task of the API worker that received it, but the
+fitting of the topic model runs in a child process, so that it does not block the
+event loop of the worker. Only one refresh runs at a time per workspace: the job holds
+a lock in Redis while it runs. Its progress is written to the results key of its
+timeframe, and a cancelled job stops at its next step, terminating its child process.
+"""
+
+import asyncio
+import multiprocessing
+from datetime import datetime, timezone
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional, TypeVar
+from uuid import uuid4
+
+from redis import asyncio as aioredis
+
+from ..utils import setup_logger
+from .config import TOPIC_MODELING_TIMEOUT
+from .schemas import TopicsData
+
+# Seconds between checks of a child process and of the cancellation of its job.
+PROCESS_POLL_INTERVAL = 1.0
+
+# Push back the expiry of the lock, or delete it, only if the job still holds it.
+# KEYS[1]: lock; ARGV: token of the job, lock expiry.
+_EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+# KEYS[1]: lock; ARGV: token of the job.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+logger = setup_logger()
+T = TypeVar("T")
+
+
+class TopicModelingCancelledError(Exception):
+    """Exception raised when a topic modeling refresh is cancelled."""
+
+
+def _to_str(value: bytes | str) -> str:
+    """Decode a Redis value.
+
+    Parameters
+    ----------
+    value
+        The value, as bytes unless the client decodes responses.
+
+    Returns
+    -------
+    str
+        The decoded value.
+    """
+
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def get_insights_cancel_key(*, timeframe: str, workspace_name: str) -> str:
+    """Get the Redis key that requests the cancellation of a refresh.
+
+    Parameters
+    ----------
+    timeframe
+        The timeframe of the refresh.
+    workspace_name
+        The name of the workspace.
+
+    Returns
+    -------
+    str
+        The Redis key.
+    """
+
+    return f"{workspace_name}_insights_{timeframe}_cancel"
+
+
+def get_insights_lock_key(*, workspace_name: str) -> str:
+    """Get the Redis key of the lock held by the running refresh of a workspace.
+
+    Parameters
+    ----------
+    workspace_name
+        The name of the workspace.
+
+    Returns
+    -------
+    str
+        The Redis key.
+    """
+
+    return f"{workspace_name}_insights_lock"
+
+
+async def cancel_topic_modeling(
+    *, redis: aioredis.Redis, timeframe: str, workspace_name: str
+) -> bool:
+    """Request the cancellation of the running refresh of a timeframe.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+    timeframe
+        The timeframe of the refresh.
+    workspace_name
+        The name of the workspace.
+
+    Returns
+    -------
+    bool
+        Specifies whether a refresh of the timeframe is running.
+    """
+
+    lock = await redis.get(get_insights_lock_key(workspace_name=workspace_name))
+    if lock is None or _to_str(lock).split(":")[0] != timeframe:
+        return False
+
+    await redis.set(
+        get_insights_cancel_key(timeframe=timeframe, workspace_name=workspace_name),
+        "1",
+        ex=TOPIC_MODELING_TIMEOUT,
+    )
+    return True
+
+
+class TopicModelingJob:
+    """A topic modeling refresh of a workspace for a timeframe."""
+
+    def __init__(
+        self, *, redis: aioredis.Redis, timeframe: str, workspace_name: str
+    ) -> None:
+        """Initialize the job.
+
+        Parameters
+        ----------
+        redis
+            The Redis instance.
+        timeframe
+            The timeframe of the refresh.
+        workspace_name
+            The name of the workspace.
+        """
+
+        self.redis = redis
+        self.step: Optional[str] = None
+        self.timeframe = timeframe
+        self.token = f"{timeframe}:{uuid4().hex}"
+        self.workspace_name = workspace_name
+
+        self.cancel_key = get_insights_cancel_key(
+            timeframe=timeframe, workspace_name=workspace_name
+        )
+        self.lock_key = get_insights_lock_key(workspace_name=workspace_name)
+        self.results_key = f"{workspace_name}_insights_{timeframe}_results"
+
+    async def acquire(self) -> bool:
+        """Take the lock of the workspace, unless another refresh holds it. The lock
+        expires `TOPIC_MODELING_TIMEOUT` seconds after the job last showed progress, so
+        a lock held by a worker that died is eventually released.
+
+        Returns
+        -------
+        bool
+            Specifies whether the lock was acquired.
+        """
+
+        acquired = await self.redis.set(
+            self.lock_key, self.token, ex=TOPIC_MODELING_TIMEOUT, nx=True
+        )
+        if acquired:
+            await self.redis.delete(self.cancel_key)
+        return bool(acquired)
+
+    async def is_cancelled(self) -> bool:
+        """Check whether the cancellation of the job was requested.
+
+        Returns
+        -------
+        bool
+            Specifies whether the job is cancelled.
+        """
+
+        return bool(await self.redis.exists(self.cancel_key))
+
+    async def refresh_lock(self) -> None:
+        """Push back the expiry of the lock of the workspace, so that it does not
+        expire while the job is still running.
+
+        Raises
+        ------
+        RuntimeError
+            If the job no longer holds the lock, e.g., because it expired and another
+            refresh took it.
+        """
+
+        held = await self.redis.eval(
+            _EXTEND_LOCK_SCRIPT, 1, self.lock_key, self.token, TOPIC_MODELING_TIMEOUT
+        )
+        if not held:
+            raise RuntimeError("Topic modeling lost the lock of the workspace.")
+
+    async def release(self) -> None:
+        """Release the lock of the workspace, if the job still holds it."""
+
+        await self.redis.eval(_RELEASE_LOCK_SCRIPT, 1, self.lock_key, self.token)
+        await self.redis.delete(self.cancel_key)
+
+    async def set_step(self, step: str) -> None:
+        """Start a step of the job and write its progress.
+
+        Parameters
+        ----------
+        step
+            The step of the job.
+
+        Raises
+        ------
+        RuntimeError
+            If the job no longer holds the lock of the workspace.
+        TopicModelingCancelledError
+            If the job is cancelled.
+        """
+
+        if await self.is_cancelled():
+            raise TopicModelingCancelledError("Topic modeling was cancelled.")
+        await self.refresh_lock()
+
+        self.step = step
+        await self.redis.set(
+            self.results_key,
+            TopicsData(
+                data=[],
+                progress_step=step,
+                refreshTimeStamp=datetime.now(timezone.utc).isoformat(),
+                status="in_progress",
+            ).model_dump_json(),
+        )
+
+
+def _run_in_child_process(
+    conn: Connection, func: Callable[..., Any], kwargs: dict[str, Any]
+) -> None:
+    """Run a function and send its result, or its error, to the parent process.
+
+    Parameters
+    ----------
+    conn
+        The connection to the parent process.
+    func
+        The function to run.
+    kwargs
+        The keyword arguments of the function.
+    """
+
+    try:
+        conn.send((None, func(**kwargs)))
+    except Exception as e:  # pylint: disable=W0718
+        conn.send((f"{type(e).__name__}: {e}", None))
+    finally:
+        conn.close()
+
+
+async def run_in_process(
+    func: Callable[..., T],
+    *,
+    job: TopicModelingJob,
+    process_semaphore: asyncio.Semaphore,
+    **kwargs: Any,
+) -> T:
+    """Run a function of a topic modeling job in a child process.
+
+    At most `TOPIC_MODELING_MAX_PROCESSES` processes run at once per API worker, as
+    limited by the semaphore of the application. The lock of the job is refreshed
+    while the process runs. The process is terminated if the job is cancelled or loses
+    its lock, or if the calling task is cancelled, e.g. on timeout. The function and
+    its arguments must be picklable.
+
+    Parameters
+    ----------
+    func
+        The function to run. It must be defined at the top level of a module.
+    job
+        The topic modeling job.
+    process_semaphore
+        The semaphore limiting the number of topic modeling processes of the API
+        worker.
+    kwargs
+        The keyword arguments of the function.
+
+    Returns
+    -------
+    T
+        The result of the function.
+
+    Raises
+    ------
+    RuntimeError
+        If the function raises an error, the process exits without a result, or the
+        job loses its lock.
+    TopicModelingCancelledError
+        If the job is cancelled.
+    """
+
+    async with process_semaphore:
+        # Forking a process that runs an event loop and database connections is not
+        # safe, so the child process starts a fresh interpreter.
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe(duplex=False)
+        process = context.Process(
+            args=(child_conn, func, kwargs), target=_run_in_child_process
+        )
+        process.start()
+        child_conn.close()
+
+        try:
+            while not parent_conn.poll():
+                if not process.is_alive() and not parent_conn.poll():
+                    raise RuntimeError(
+                        f"Topic modeling process exited with code {process.exitcode}"
+                    )
+                if await job.is_cancelled():
+                    raise TopicModelingCancelledError("Topic modeling was cancelled.")
+                await job.refresh_lock()
+                await asyncio.sleep(PROCESS_POLL_INTERVAL)
+            error, result = await asyncio.to_thread(parent_conn.recv)
+        finally:
+            if process.is_alive():
+                process.terminate()
+            await asyncio.to_thread(process.join)
+            parent_conn.close()
+
+    if error is not None:
+        raise RuntimeError(error)
+    return result
@@ -0,0 +1,325 @@
+"""This module contains the content-hash cache of the docmuncher pipeline.
+
+The expensive stages of the pipeline are cached in Redis by the SHA-256 of their
+input, so that retried jobs and duplicate uploads (even under another file name) skip
+them:
+
+- the OCR markdown of each page, keyed by the OCR backend, the hash of the PDF file
+  and the page index;
+- each processed chunk, keyed by the LLM models used and the hash of the chunk;
+- the final chunks of a PDF file, keyed by the LLM models, the OCR and text layer
+  settings used and the hash of the PDF file.
+
+Changing a model or a setting that affects a stage therefore never serves results
+computed with the previous value.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+from langchain_core.documents import Document
+from redis import asyncio as aioredis
+
+from ..config import (
+    LITELLM_MODEL_DOCMUNCHER_PARAPHRASE_TABLE,
+    LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE,
+    LITELLM_MODEL_DOCMUNCHER_TITLE,
+)
+from .config import (
+    DOCMUNCHER_CACHE_TTL,
+    DOCMUNCHER_OCR_BACKEND,
+    DOCMUNCHER_TEXT_LAYER_ENABLED,
+    DOCMUNCHER_TEXT_LAYER_MIN_CHARS,
+)
+
+CACHE_KEY_PREFIX = "docmuncher_cache:"
+
+
+def hash_content(content: bytes) -> str:
+    """Get the SHA-256 of the content of a file.
+
+    Parameters
+    ----------
+    content
+        The content of the file.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 of the content.
+    """
+
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_chunk(chunk: Document) -> str:
+    """Get the SHA-256 of a chunk.
+
+    Parameters
+    ----------
+    chunk
+        The chunk to hash.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 of the chunk.
+    """
+
+    payload = json.dumps(
+        {"metadata": chunk.metadata, "page_content": chunk.page_content},
+        sort_keys=True,
+    )
+    return hash_content(payload.encode("utf-8"))
+
+
+def _hash_settings(settings: dict) -> str:
+    """Get a short hash of the settings a cached stage depends on.
+
+    Parameters
+    ----------
+    settings
+        The settings, by name.
+
+    Returns
+    -------
+    str
+        The first 16 hexadecimal characters of the SHA-256 of the settings.
+    """
+
+    payload = json.dumps(settings, sort_keys=True)
+    return hash_content(payload.encode("utf-8"))[:16]
+
+
+def _get_chunk_key(chunk_hash: str) -> str:
+    """Get the cache key of a processed chunk, which depends on the LLM models.
+
+    Parameters
+    ----------
+    chunk_hash
+        The hash of the chunk, from `hash_chunk`.
+
+    Returns
+    -------
+    str
+        The cache key.
+    """
+
+    settings = {
+        "LITELLM_MODEL_DOCMUNCHER_PARAPHRASE_TABLE": (
+            LITELLM_MODEL_DOCMUNCHER_PARAPHRASE_TABLE
+        ),
+        "LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE": LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE,
+        "LITELLM_MODEL_DOCMUNCHER_TITLE": LITELLM_MODEL_DOCMUNCHER_TITLE,
+    }
+    return f"{CACHE_KEY_PREFIX}chunk:{_hash_settings(settings)}:{chunk_hash}"
+
+
+def _get_chunks_key(doc_hash: str) -> str:
+    """Get the cache key of the final chunks of a PDF file, which depend on the LLM
+    models and on the OCR and text layer settings.
+
+    Parameters
+    ----------
+    doc_hash
+        The SHA-256 of the PDF file.
+
+    Returns
+    -------
+    str
+        The cache key.
+    """
+
+    settings = {
+        "DOCMUNCHER_OCR_BACKEND": DOCMUNCHER_OCR_BACKEND,
+        "DOCMUNCHER_TEXT_LAYER_ENABLED": DOCMUNCHER_TEXT_LAYER_ENABLED,
+        "DOCMUNCHER_TEXT_LAYER_MIN_CHARS": DOCMUNCHER_TEXT_LAYER_MIN_CHARS,
+        "LITELLM_MODEL_DOCMUNCHER_PARAPHRASE_TABLE": (
+            LITELLM_MODEL_DOCMUNCHER_PARAPHRASE_TABLE
+        ),
+        "LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE": LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE,
+        "LITELLM_MODEL_DOCMUNCHER_TITLE": LITELLM_MODEL_DOCMUNCHER_TITLE,
+    }
+    return f"{CACHE_KEY_PREFIX}chunks:{_hash_settings(settings)}:{doc_hash}"
+
+
+def _serialize_chunk(chunk: Optional[Document]) -> Optional[dict]:
+    """Serialize a chunk to a JSON-compatible dictionary.
+
+    Parameters
+    ----------
+    chunk
+        The chunk to serialize. `None` stands for a dropped chunk.
+
+    Returns
+    -------
+    Optional[dict]
+        The serialized chunk.
+    """
+
+    if chunk is None:
+        return None
+    return {"metadata": chunk.metadata, "page_content": chunk.page_content}
+
+
+def _deserialize_chunk(chunk: Optional[dict]) -> Optional[Document]:
+    """Deserialize a chunk serialized by `_serialize_chunk`.
+
+    Parameters
+    ----------
+    chunk
+        The serialized chunk.
+
+    Returns
+    -------
+    Optional[Document]
+        The chunk.
+    """
+
+    if chunk is None:
+        return None
+    return Document(metadata=chunk["metadata"], page_content=chunk["page_content"])
+
+
+async def get_cached_ocr_pages(*, doc_hash: str, redis: aioredis.Redis) -> dict:
+    """Get the cached OCR markdown of the pages of a PDF file.
+
+    Parameters
+    ----------
+    doc_hash
+        The SHA-256 of the PDF file.
+    redis
+        The Redis instance.
+
+    Returns
+    -------
+    dict
+        The OCR result of each cached page, keyed by the page index.
+    """
+
+    cached_pages = await redis.hgetall(
+        f"{CACHE_KEY_PREFIX}ocr:{DOCMUNCHER_OCR_BACKEND}:{doc_hash}"
+    )
+    return {int(index): json.loads(page) for index, page in cached_pages.items()}
+
+
+async def cache_ocr_pages(
+    *, doc_hash: str, pages: list[dict], redis: aioredis.Redis
+) -> None:
+    """Cache the OCR markdown of pages of a PDF file.
+
+    Parameters
+    ----------
+    doc_hash
+        The SHA-256 of the PDF file.
+    pages
+        The OCR result of each page, with the page `index` and its `markdown`.
+    redis
+        The Redis instance.
+    """
+
+    if not pages:
+        return
+
+    key = f"{CACHE_KEY_PREFIX}ocr:{DOCMUNCHER_OCR_BACKEND}:{doc_hash}"
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={page["index"]: json.dumps(page) for page in pages})
+        pipe.expire(key, DOCMUNCHER_CACHE_TTL)
+        await pipe.execute()
+
+
+async def get_cached_processed_chunk(
+    *, chunk_hash: str, redis: aioredis.Redis
+) -> tuple[bool, Optional[Document]]:
+    """Get the cached result of processing a chunk.
+
+    Parameters
+    ----------
+    chunk_hash
+        The hash of the chunk, from `hash_chunk`.
+    redis
+        The Redis instance.
+
+    Returns
+    -------
+    tuple[bool, Optional[Document]]
+        Whether the result is cached, and the processed chunk (`None` if the chunk
+        was dropped).
+    """
+
+    cached_chunk = await redis.get(_get_chunk_key(chunk_hash))
+    if cached_chunk is None:
+        return False, None
+    return True, _deserialize_chunk(json.loads(cached_chunk))
+
+
+async def cache_processed_chunk(
+    *, chunk: Optional[Document], chunk_hash: str, redis: aioredis.Redis
+) -> None:
+    """Cache the result of processing a chunk.
+
+    Parameters
+    ----------
+    chunk
+        The processed chunk, or `None` if the chunk was dropped.
+    chunk_hash
+        The hash of the chunk before processing, from `hash_chunk`.
+    redis
+        The Redis instance.
+    """
+
+    await redis.set(
+        _get_chunk_key(chunk_hash),
+        json.dumps(_serialize_chunk(chunk)),
+        ex=DOCMUNCHER_CACHE_TTL,
+    )
+
+
+async def get_cached_chunks(
+    *, doc_hash: str, redis: aioredis.Redis
+) -> Optional[list[Document]]:
+    """Get the cached final chunks of a PDF file.
+
+    Parameters
+    ----------
+    doc_hash
+        The SHA-256 of the PDF file.
+    redis
+        The Redis instance.
+
+    Returns
+    -------
+    Optional[list[Document]]
+        The final chunks, or `None` if they are not cached.
+    """
+
+    cached_chunks = await redis.get(_get_chunks_key(doc_hash))
+    if cached_chunks is None:
+        return None
+    return [
+        Document(metadata=chunk["metadata"], page_content=chunk["page_content"])
+        for chunk in json.loads(cached_chunks)
+    ]
+
+
+async def cache_chunks(
+    *, chunks: list[Document], doc_hash: str, redis: aioredis.Redis
+) -> None:
+    """Cache the final chunks of a PDF file.
+
+    Parameters
+    ----------
+    chunks
+        The final chunks, ready to be converted to cards.
+    doc_hash
+        The SHA-256 of the PDF file.
+    redis
+        The Redis instance.
+    """
+
+    await redis.set(
+        _get_chunks_key(doc_hash),
+        json.dumps([_serialize_chunk(chunk) for chunk in chunks]),
+        ex=DOCMUNCHER_CACHE_TTL,
+    )
@@ -0,0 +1,69 @@
+"""This module contains configuration settings for the docmuncher package."""
+
+import os
+
+# Maximum number of concurrent LLM calls per LiteLLM model while processing chunks.
+DOCMUNCHER_LLM_MAX_CONCURRENCY = int(
+    os.environ.get("DOCMUNCHER_LLM_MAX_CONCURRENCY", 8)
+)
+
+# OCR backend used to convert PDF pages to markdown: `mistral` or `stub`. The `stub`
+# backend extracts the PDF text layer locally and is meant for offline testing.
+DOCMUNCHER_OCR_BACKEND = os.environ.get("DOCMUNCHER_OCR_BACKEND", "mistral")
+# Large PDFs are split into page ranges of this size that are OCR'd concurrently.
+DOCMUNCHER_OCR_PAGES_PER_REQUEST = int(
+    os.environ.get("DOCMUNCHER_OCR_PAGES_PER_REQUEST", 8)
+)
+# Maximum number of concurrent OCR requests per worker.
+DOCMUNCHER_OCR_MAX_CONCURRENCY = int(
+    os.environ.get("DOCMUNCHER_OCR_MAX_CONCURRENCY", 4)
+)
+
+# Whether uploaded documents are queued on a Redis stream and processed by the
+# standalone docmuncher worker (`python docmuncher_worker.py`). If disabled, documents
+# are processed in a background task of the API process that received the upload.
+DOCMUNCHER_JOB_QUEUE_ENABLED = (
+    os.environ.get("DOCMUNCHER_JOB_QUEUE_ENABLED", "True") == "True"
+)
+# Seconds a job may go without a heartbeat before another worker reclaims it.
+DOCMUNCHER_JOB_VISIBILITY_TIMEOUT = int(
+    os.environ.get("DOCMUNCHER_JOB_VISIBILITY_TIMEOUT", 300)
+)
+# Maximum number of attempts at processing a job before it is marked as failed.
+DOCMUNCHER_JOB_MAX_ATTEMPTS = int(os.environ.get("DOCMUNCHER_JOB_MAX_ATTEMPTS", 3))
+# Seconds to wait before the first retry; doubled on every subsequent retry.
+DOCMUNCHER_JOB_RETRY_BACKOFF = int(os.environ.get("DOCMUNCHER_JOB_RETRY_BACKOFF", 30))
+# Maximum number of jobs processed concurrently for a single workspace, across all
+# workers.
+DOCMUNCHER_JOB_WORKSPACE_CONCURRENCY = int(
+    os.environ.get("DOCMUNCHER_JOB_WORKSPACE_CONCURRENCY", 2)
+)
+# Maximum number of jobs processed concurrently by a single worker process.
+DOCMUNCHER_WORKER_CONCURRENCY = int(os.environ.get("DOCMUNCHER_WORKER_CONCURRENCY", 2))
+# Seconds between removals of expired jobs from the job listing indexes.
+DOCMUNCHER_JOB_INDEX_PRUNE_INTERVAL = int(
+    os.environ.get("DOCMUNCHER_JOB_INDEX_PRUNE_INTERVAL", 600)
+)
+
+# Seconds for which OCR markdown and processed chunks are cached by the SHA-256 of the
+# PDF file, so that retried and duplicate uploads skip OCR and LLM processing.
+DOCMUNCHER_CACHE_TTL = int(os.environ.get("DOCMUNCHER_CACHE_TTL", 3600 * 24 * 7))
+
+# Whether pages with a usable text layer are converted to markdown locally instead of
+# being sent to the OCR backend.
+DOCMUNCHER_TEXT_LAYER_ENABLED = (
+    os.environ.get("DOCMUNCHER_TEXT_LAYER_ENABLED", "True") == "True"
+)
+# Minimum number of non-whitespace characters in the text layer of a page for it to
+# be extracted locally. Pages with less text are likely scanned or image-only.
+DOCMUNCHER_TEXT_LAYER_MIN_CHARS = int(
+    os.environ.get("DOCMUNCHER_TEXT_LAYER_MIN_CHARS", 50)
+)
+
+# Directory uploads are spooled to before processing. It must be shared by the backend
+# and the docmuncher workers.
+DOCMUNCHER_SPOOL_DIR = os.environ.get("DOCMUNCHER_SPOOL_DIR", "temp/docmuncher")
+# Size in bytes of the blocks uploads are copied to the spool directory in.
+DOCMUNCHER_SPOOL_BLOCK_SIZE = int(
+    os.environ.get("DOCMUNCHER_SPOOL_BLOCK_SIZE", 1024 * 1024)
+)
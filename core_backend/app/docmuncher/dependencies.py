@@ -1,14 +1,12 @@
+import asyncio
 import json
-import os
 from datetime import datetime, timezone
-from io import BytesIO
-from typing import Dict
+from typing import Awaitable, Callable, Dict, Optional
 
-from fastapi import HTTPException, Request, status
+from fastapi import HTTPException, status
 from langchain.text_splitter import MarkdownHeaderTextSplitter
 from langchain_core.documents import Document
-from mistralai import DocumentURLChunk, Mistral
-from PyPDF2 import PdfReader
+from redis import asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import (
@@ -17,7 +15,7 @@ from ..config import (
     PAGES_TO_CARDS_CONVERSION,
     REDIS_DOC_INGEST_EXPIRY_TIME,
 )
-from ..contents.models import save_content_to_db
+from ..contents.models import save_contents_to_db_bulk
 from ..contents.schemas import ContentCreate
 from ..llm_call.llm_prompts import (
     SYSTEM_DOCMUNCHER_TABLE,
@@ -25,28 +23,32 @@ from ..llm_call.llm_prompts import (
     USER_DOCMUNCHER_TABLE,
     USER_DOCMUNCHER_TITLE,
 )
-from ..llm_call.utils import _ask_llm_async
 from ..tags.models import is_tag_name_unique, save_tag_to_db
 from ..tags.schemas import TagCreate
 from ..utils import setup_logger
+from .cache import (
+    cache_chunks,
+    cache_processed_chunk,
+    get_cached_chunks,
+    get_cached_processed_chunk,
+    hash_chunk,
+    hash_content,
+)
+from .job_index import save_job_status
+from .ocr import convert_pages_to_markdown
 from .schemas import DocIngestionStatusPdf, DocStatusEnum
-from .utils import is_content_single_line, is_image_only_card, is_table_in_card
+from .spool import delete_spooled_file, read_spooled_file
+from .utils import (
+    ask_llm_with_concurrency_limit,
+    is_content_single_line,
+    is_image_only_card,
+    is_table_in_card,
+)
 
 logger = setup_logger()
-MISTRAL_CLIENT = None
 JOB_KEY_PREFIX = "docmuncher_job_"
 
 
-def get_mistral_client() -> Mistral:
-    """
-    Get a Mistral client instance.
-    """
-    global MISTRAL_CLIENT
-    if MISTRAL_CLIENT is None:
-        MISTRAL_CLIENT = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
-    return MISTRAL_CLIENT
-
-
 async def create_tag_per_file(
     filename: str, workspace_id: int, asession: AsyncSession
 ) -> list:
@@ -88,52 +90,6 @@ async def create_tag_per_file(
     return [tag_db]
 
 
-def convert_pages_to_markdown(file_name: str, content: bytes) -> dict:
-    """
-    Convert a PDF file to dictionary of markdown text.
-
-    Parameters
-    ----------
-    file_name
-        The PDF filename to convert.
-    content
-        The content of the PDF file.
-
-    Returns
-    -------
-    dict
-        The content of the PDF file in markdown formatted text.
-    HTTPException
-        If the conversion fails.
-    """
-    client = get_mistral_client()
-
-    try:
-        uploaded_file = client.files.upload(
-            file={
-                "file_name": file_name,
-                "content": content,
-            },
-            purpose="ocr",
-        )
-
-        signed_url = client.files.get_signed_url(file_id=uploaded_file.id)
-
-        pdf_response = client.ocr.process(
-            document=DocumentURLChunk(document_url=signed_url.url),
-            model="mistral-ocr-latest",
-            include_image_base64=False,
-        )
-
-        markdown_text = json.loads(pdf_response.model_dump_json())
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to convert PDF to markdown: {e}",
-        ) from e
-    return markdown_text
-
-
 def chunk_markdown_text_by_headers(markdown_text: dict) -> dict:
     """
     Chunk markdown text by headers.
@@ -249,14 +205,83 @@ async def merge_chunks_for_continuity(md_header_splits: dict) -> list:
     return merged_chunks
 
 
-async def deal_with_incorrectly_formatted_cards(merged_chunks: list) -> list:
+async def process_chunk(
+    *, chunk: Document, llm_semaphores: dict[str, asyncio.Semaphore]
+) -> Optional[Document]:
+    """
+    Drop a chunk if it is not a valid card, otherwise paraphrase any table in it and
+    generate its title.
+
+    Parameters
+    ----------
+    chunk
+        The markdown header split to process.
+    llm_semaphores
+        The semaphore of each LLM model, see `ask_llm_with_concurrency_limit`.
+
+    Returns
+    -------
+    Optional[Document]
+        The processed chunk, or None if the chunk should be dropped.
+    """
+    is_single_line = await is_content_single_line(
+        chunk=chunk, llm_semaphores=llm_semaphores
+    )
+    is_image_card = is_image_only_card(chunk)
+    if is_image_card or is_single_line:
+        return None
+
+    if is_table_in_card(chunk):
+        chunk.page_content = await ask_llm_with_concurrency_limit(
+            json_=False,
+            litellm_model=LITELLM_MODEL_DOCMUNCHER_PARAPHRASE_TABLE,
+            llm_semaphores=llm_semaphores,
+            metadata=chunk.metadata,
+            system_message=SYSTEM_DOCMUNCHER_TABLE,
+            user_message=USER_DOCMUNCHER_TABLE.format(
+                meta=json.dumps(chunk.metadata), content=chunk.page_content
+            ),
+        )
+    chunk.metadata["title"] = await ask_llm_with_concurrency_limit(
+        json_=False,
+        litellm_model=LITELLM_MODEL_DOCMUNCHER_TITLE,
+        llm_semaphores=llm_semaphores,
+        metadata=chunk.metadata,
+        system_message=SYSTEM_DOCMUNCHER_TITLE,
+        user_message=USER_DOCMUNCHER_TITLE.format(
+            meta=json.dumps(chunk.metadata), content=chunk.page_content
+        ),
+    )
+    chunk.metadata["title"] = chunk.metadata["title"].strip('"')
+    return chunk
+
+
+async def deal_with_incorrectly_formatted_cards(
+    merged_chunks: list,
+    llm_semaphores: Optional[dict[str, asyncio.Semaphore]] = None,
+    progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    redis: Optional[aioredis.Redis] = None,
+) -> list:
     """
     Deal with incorrectly formatted cards.
 
+    Chunks are processed concurrently, with LLM calls limited per model by
+    `ask_llm_with_concurrency_limit`. The order of the chunks is preserved.
+
     Parameters
     ----------
     merged_chunks
         The merged markdown header splits to process.
+    llm_semaphores
+        The semaphore of each LLM model, shared by the jobs of the worker or
+        application running them. If not given, only the LLM calls of this job are
+        limited.
+    progress_callback
+        Optional coroutine called with the number of chunks processed so far and the
+        total number of chunks, each time a chunk finishes.
+    redis
+        The Redis instance holding the chunk cache, if any. Chunks processed before
+        (e.g. by a failed attempt at the same job) are then not sent to the LLM again.
 
     Returns
     -------
@@ -265,35 +290,37 @@ async def deal_with_incorrectly_formatted_cards(merged_chunks: list) -> list:
     HTTPException
         If the processing fails.
     """
-    final_merged_chunks = []
-    for chunk in merged_chunks:
-        is_single_line = await is_content_single_line(chunk)
-        is_image_card = is_image_only_card(chunk)
-        if is_image_card or is_single_line:
-            continue
-
-        if is_table_in_card(chunk):
-            chunk.page_content = await _ask_llm_async(
-                json_=False,
-                litellm_model=LITELLM_MODEL_DOCMUNCHER_PARAPHRASE_TABLE,
-                metadata=chunk.metadata,
-                system_message=SYSTEM_DOCMUNCHER_TABLE,
-                user_message=USER_DOCMUNCHER_TABLE.format(
-                    meta=json.dumps(chunk.metadata), content=chunk.page_content
-                ),
+    llm_semaphores = {} if llm_semaphores is None else llm_semaphores
+    num_chunks = len(merged_chunks)
+    num_chunks_processed = 0
+
+    async def _process_chunk_and_report(chunk: Document) -> Optional[Document]:
+        nonlocal num_chunks_processed
+        if redis is None:
+            processed_chunk = await process_chunk(
+                chunk=chunk, llm_semaphores=llm_semaphores
             )
-        chunk.metadata["title"] = await _ask_llm_async(
-            json_=False,
-            litellm_model=LITELLM_MODEL_DOCMUNCHER_TITLE,
-            metadata=chunk.metadata,
-            system_message=SYSTEM_DOCMUNCHER_TITLE,
-            user_message=USER_DOCMUNCHER_TITLE.format(
-                meta=json.dumps(chunk.metadata), content=chunk.page_content
-            ),
-        )
-        chunk.metadata["title"] = chunk.metadata["title"].strip('"')
-        final_merged_chunks.append(chunk)
-    return final_merged_chunks
+        else:
+            chunk_hash = hash_chunk(chunk)
+            is_cached, processed_chunk = await get_cached_processed_chunk(
+                chunk_hash=chunk_hash, redis=redis
+            )
+            if not is_cached:
+                processed_chunk = await process_chunk(
+                    chunk=chunk, llm_semaphores=llm_semaphores
+                )
+                await cache_processed_chunk(
+                    chunk=processed_chunk, chunk_hash=chunk_hash, redis=redis
+                )
+        num_chunks_processed += 1
+        if progress_callback is not None:
+            await progress_callback(num_chunks_processed, num_chunks)
+        return processed_chunk
+
+    processed_chunks = await asyncio.gather(
+        *[_process_chunk_and_report(chunk) for chunk in merged_chunks]
+    )
+    return [chunk for chunk in processed_chunks if chunk is not None]
 
 
 async def convert_markdown_chunks_to_cards(
@@ -303,7 +330,8 @@ async def convert_markdown_chunks_to_cards(
     asession: AsyncSession,
 ) -> dict:
     """
-    Convert markdown chunks to cards.
+    Convert markdown chunks to cards and save them in bulk. Cards that fail to be
+    saved are logged and skipped, unless no card could be saved at all.
 
     Parameters
     ----------
@@ -319,76 +347,134 @@ async def convert_markdown_chunks_to_cards(
     Returns
     ------
     dict
-        The response from saving
+        The response from saving, with the number of cards saved and failed.
     HTTPException
         If the conversion fails.
     """
 
-    try:
-        for header_split in merged_chunks:
-            metadata = header_split.metadata
-            title = metadata.pop("title")
+    cards = []
+    for header_split in merged_chunks:
+        metadata = header_split.metadata
+        title = metadata.pop("title")
 
-            card = ContentCreate(
+        cards.append(
+            ContentCreate(
                 content_text=header_split.page_content,
                 content_title=title,
                 content_metadata=metadata,
                 content_tags=content_tags,
                 is_validated=False,
             )
-            await save_content_to_db(
-                asession=asession,
-                content=card,
-                exclude_archived=True,
-                workspace_id=workspace_id,
-                commit=False,
-            )
+        )
 
+    try:
+        contents_db, failures = await save_contents_to_db_bulk(
+            asession=asession,
+            commit=False,
+            contents=cards,
+            workspace_id=workspace_id,
+        )
     except Exception as e:
         # TODO: this is a dumb way to handle errors in card creation
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process PDF file: {e}",
         ) from e
-    return {"detail": "Cards saved successfully"}
+
+    for failure in failures:
+        logger.error(f"Failed to save card '{failure.content_title}': {failure.error}")
+    if failures and not contents_db:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process PDF file: {failures[0].error}",
+        )
+    return {
+        "detail": "Cards saved successfully",
+        "num_cards_failed": len(failures),
+        "num_cards_saved": len(contents_db),
+    }
+
+
+async def release_expected_contents(
+    redis: aioredis.Redis, workspace_id: int, num_pages: int
+) -> None:
+    """
+    Release the contents that a finished job was expected to create from the
+    workspace's temporary log of expected contents.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance holding the log of expected contents.
+    workspace_id
+        The workspace ID the job was saving cards in.
+    num_pages
+        The number of pages of the PDF file processed by the job.
+    """
+    temp_docmuncher_contents = await redis.get(f"{workspace_id}_docmuncher_contents")
+    await redis.set(
+        f"{workspace_id}_docmuncher_contents",
+        max(
+            0,
+            int(temp_docmuncher_contents or 0) - num_pages * PAGES_TO_CARDS_CONVERSION,
+        ),
+    )
 
 
 async def process_pdf_file(
-    request: Request,
+    redis: aioredis.Redis,
     task_id: str,
     file_name: str,
-    content: bytes,
+    file_path: str,
     workspace_id: int,
     asession: AsyncSession,
+    attempt: int = 1,
+    max_attempts: int = 1,
+    llm_semaphores: Optional[dict[str, asyncio.Semaphore]] = None,
+    ocr_semaphore: Optional[asyncio.Semaphore] = None,
 ) -> DocIngestionStatusPdf:
     """
     Process a PDF file.
 
+    If the processing fails and `attempt` is less than `max_attempts`, then the job is
+    left in the `not_started` state so that it can be retried, and the expected
+    contents of the workspace are not released. Otherwise, the spooled PDF file is
+    deleted.
+
     Parameters
     ----------
-    request
-        The request object from FastAPI.
-    filename
+    redis
+        The Redis instance holding the job status.
+    task_id
+        The ID of the document ingestion job.
+    file_name
         The PDF filename to process.
-    content
-        The content of the PDF file.
-    content_tags
-        The tag (associated with the filename) to save the cards with.
+    file_path
+        The path of the spooled PDF file.
     workspace_id
         The workspace ID to save the cards in.
     asession
         The database session object.
+    attempt
+        The number of this attempt at processing the job, starting from 1.
+    max_attempts
+        The maximum number of attempts at processing the job.
+    llm_semaphores
+        The semaphore of each LLM model, shared by the jobs of the worker or
+        application running them.
+    ocr_semaphore
+        The semaphore limiting the number of concurrent OCR requests, shared by the
+        jobs of the worker or application running them.
 
     Returns
     -------
-    dict
-        The response from processing the PDF file.
+    DocIngestionStatusPdf
+        The status of the job after processing the PDF file.
     HTTPException
-        If the processing fails.
+        If the job is not found.
     """
     # --- Update redis state operations ---
-    # Get redis client and the job status
-    redis = request.app.state.redis
+    # Get the job status
     job_status = await redis.get(task_id)
     if not job_status:
         raise HTTPException(
@@ -397,18 +483,22 @@ async def process_pdf_file(
         )
 
     job_status_dict = json.loads(job_status.decode("utf-8"))
-    job_status_pydantic = DocIngestionStatusPdf(
-        **job_status_dict,
-        error_trace="",
-        finished_datetime_utc=None,
-    )
+    job_status_dict.update(error_trace="", finished_datetime_utc=None)
+    job_status_pydantic = DocIngestionStatusPdf(**job_status_dict)
 
+    lock = f"lock:{file_name}"
+    acquired_lock = False
     try:
         # Acquire a lock for this file
-        lock = f"lock:{file_name}"
         acquired_lock = await redis.set(
-            lock, "1", nx=True, ex=REDIS_DOC_INGEST_EXPIRY_TIME
+            lock, task_id, nx=True, ex=REDIS_DOC_INGEST_EXPIRY_TIME
         )
+        if not acquired_lock:
+            # A retried job may still hold the lock from an interrupted attempt
+            lock_owner = await redis.get(lock)
+            acquired_lock = lock_owner is not None and (
+                lock_owner.decode("utf-8") == task_id
+            )
 
         if not acquired_lock:
             raise HTTPException(
@@ -417,15 +507,43 @@ async def process_pdf_file(
             )
 
         job_status_pydantic.task_status = DocStatusEnum.in_progress
-        await redis.set(task_id, job_status_pydantic.model_dump_json())
-
-        # Process PDF file
-        markdown_text = convert_pages_to_markdown(file_name=file_name, content=content)
-        md_header_splits = chunk_markdown_text_by_headers(markdown_text)
-        merged_chunks = await merge_chunks_for_continuity(md_header_splits)
-        final_merged_chunks = await deal_with_incorrectly_formatted_cards(
-            merged_chunks=merged_chunks
-        )
+        await save_job_status(job_status=job_status_pydantic, redis=redis)
+
+        # Process PDF file, unless the same file has been processed before
+        content = await read_spooled_file(path=file_path)
+        doc_hash = await asyncio.to_thread(hash_content, content)
+        final_merged_chunks = await get_cached_chunks(doc_hash=doc_hash, redis=redis)
+        if final_merged_chunks is None:
+            markdown_text = await convert_pages_to_markdown(
+                file_name=file_name,
+                content=content,
+                num_pages=job_status_pydantic.pages_total or None,
+                ocr_semaphore=ocr_semaphore,
+                redis=redis,
+            )
+            for stat, value in markdown_text["stats"].items():
+                setattr(job_status_pydantic, stat, value)
+            md_header_splits = chunk_markdown_text_by_headers(markdown_text)
+            merged_chunks = await merge_chunks_for_continuity(md_header_splits)
+
+            async def _update_chunk_progress(
+                num_processed: int, num_total: int
+            ) -> None:
+                job_status_pydantic.chunks_processed = num_processed
+                job_status_pydantic.chunks_total = num_total
+                await save_job_status(job_status=job_status_pydantic, redis=redis)
+
+            final_merged_chunks = await deal_with_incorrectly_formatted_cards(
+                merged_chunks=merged_chunks,
+                llm_semaphores=llm_semaphores,
+                progress_callback=_update_chunk_progress,
+                redis=redis,
+            )
+            await cache_chunks(
+                chunks=final_merged_chunks, doc_hash=doc_hash, redis=redis
+            )
+        else:
+            logger.info(f"Using cached chunks for {file_name}.")
 
         # Create the tags and save the merged cards to the database
         content_tags = await create_tag_per_file(
@@ -449,28 +567,32 @@ async def process_pdf_file(
         logger.error(f"Error processing file {file_name}: {str(e)}")
         await asession.rollback()
 
-        job_status_pydantic.task_status = DocStatusEnum.failed
-        job_status_pydantic.error_trace = str(e)
-        job_status_pydantic.finished_datetime_utc = datetime.now(timezone.utc)
+        # Release the lock, if this job holds it
+        if acquired_lock:
+            await redis.delete(lock)
 
-        # Release the lock
-        await redis.delete(lock)
+        is_locked = isinstance(e, HTTPException) and (
+            e.status_code == status.HTTP_423_LOCKED
+        )
+        if attempt < max_attempts and not is_locked:
+            job_status_pydantic.task_status = DocStatusEnum.not_started
+            job_status_pydantic.error_trace = (
+                f"Attempt {attempt} of {max_attempts} failed, retrying: {str(e)}"
+            )
+        else:
+            job_status_pydantic.task_status = DocStatusEnum.failed
+            job_status_pydantic.error_trace = str(e)
+            job_status_pydantic.finished_datetime_utc = datetime.now(timezone.utc)
 
     finally:
-        await redis.set(task_id, job_status_pydantic.model_dump_json())
-
-        temp_docmuncher_contents = await redis.get(
-            f"{workspace_id}_docmuncher_contents"
-        )
-        num_pages = len(PdfReader(BytesIO(content)).pages)
+        await save_job_status(job_status=job_status_pydantic, redis=redis)
 
-        # Update expected contents since task has finished
-        await redis.set(
-            f"{workspace_id}_docmuncher_contents",
-            max(
-                0, int(temp_docmuncher_contents) - num_pages * PAGES_TO_CARDS_CONVERSION
-            ),
-        )
+        # Update expected contents once the task has finished for good
+        if job_status_pydantic.task_status != DocStatusEnum.not_started:
+            await release_expected_contents(
+                redis, workspace_id, job_status_pydantic.pages_total
+            )
+            delete_spooled_file(file_path)
         await asession.close()
 
     return job_status_pydantic
@@ -0,0 +1,401 @@
+"""This module contains the Redis indexes of docmuncher job statuses.
+
+Job statuses are stored under their task ID and expire after
+`REDIS_DOC_INGEST_EXPIRY_TIME`. To list jobs without scanning the Redis keyspace,
+every job is also indexed in sorted sets scored by the job creation time:
+
+- all jobs in a workspace, and the jobs in each status;
+- the jobs of a user in a workspace, and the jobs of the user in each status;
+- the uploads in a workspace, and the jobs of each upload.
+
+The indexes are updated whenever a job status is saved. Entries of expired jobs are
+removed by `prune_expired_jobs`, which runs periodically in the background, and
+lazily whenever a listing comes across them.
+"""
+
+import asyncio
+import json
+import time
+from typing import Optional
+
+from redis import asyncio as aioredis
+
+from ..config import REDIS_DOC_INGEST_EXPIRY_TIME
+from ..utils import setup_logger
+from .config import DOCMUNCHER_JOB_INDEX_PRUNE_INTERVAL
+from .schemas import DocStatusEnum, DocUploadResponsePdf
+
+JOB_INDEX_KEY_PREFIX = "docmuncher:index:"
+JOB_EXPIRY_KEY = f"{JOB_INDEX_KEY_PREFIX}expiry"
+
+logger = setup_logger()
+
+
+def _to_str(value: bytes | str) -> str:
+    """Decode a Redis value, regardless of whether the client decodes responses.
+
+    Parameters
+    ----------
+    value
+        The value returned by Redis.
+
+    Returns
+    -------
+    str
+        The decoded value.
+    """
+
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _workspace_jobs_key(
+    *,
+    task_status: Optional[DocStatusEnum] = None,
+    user_id: Optional[int] = None,
+    workspace_id: int,
+) -> str:
+    """Get the key of the index of jobs in a workspace.
+
+    Parameters
+    ----------
+    task_status
+        If given, only jobs in this status are indexed.
+    user_id
+        If given, only jobs created by this user are indexed.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    str
+        The key of the index.
+    """
+
+    key = f"{JOB_INDEX_KEY_PREFIX}workspace:{workspace_id}"
+    if user_id is not None:
+        key += f":user:{user_id}"
+    if task_status is not None:
+        key += f":status:{DocStatusEnum(task_status).value}"
+    return key
+
+
+def _workspace_uploads_key(*, workspace_id: int) -> str:
+    """Get the key of the index of uploads in a workspace.
+
+    Parameters
+    ----------
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    str
+        The key of the index.
+    """
+
+    return f"{JOB_INDEX_KEY_PREFIX}workspace:{workspace_id}:uploads"
+
+
+def _upload_jobs_key(*, upload_id: str) -> str:
+    """Get the key of the index of jobs in an upload.
+
+    Parameters
+    ----------
+    upload_id
+        The ID of the upload.
+
+    Returns
+    -------
+    str
+        The key of the index.
+    """
+
+    return f"{JOB_INDEX_KEY_PREFIX}upload:{upload_id}"
+
+
+def _status_keys(*, user_id: int, workspace_id: int) -> list[str]:
+    """Get the keys of all per-status indexes a job of a user can be in.
+
+    Parameters
+    ----------
+    user_id
+        The ID of the user that created the job.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    list[str]
+        The keys of the indexes.
+    """
+
+    return [
+        _workspace_jobs_key(
+            task_status=task_status, user_id=uid, workspace_id=workspace_id
+        )
+        for task_status in DocStatusEnum
+        for uid in (None, user_id)
+    ]
+
+
+async def save_job_status(
+    *, expire: bool = False, job_status: DocUploadResponsePdf, redis: aioredis.Redis
+) -> None:
+    """Save the status of a job and update the job indexes.
+
+    Parameters
+    ----------
+    expire
+        Specifies whether to (re)start the expiry of the job. Otherwise, the expiry of
+        the existing job status is kept.
+    job_status
+        The status of the job.
+    redis
+        The Redis instance.
+    """
+
+    task_id = job_status.task_id
+    workspace_id = job_status.workspace_id
+    user_id = job_status.user_id
+    created_at = job_status.created_datetime_utc.timestamp()
+
+    async with redis.pipeline(transaction=True) as pipe:
+        if expire:
+            pipe.set(
+                task_id, job_status.model_dump_json(), ex=REDIS_DOC_INGEST_EXPIRY_TIME
+            )
+            pipe.zadd(
+                JOB_EXPIRY_KEY,
+                {
+                    json.dumps(
+                        {
+                            "task_id": task_id,
+                            "upload_id": job_status.upload_id,
+                            "user_id": user_id,
+                            "workspace_id": workspace_id,
+                        }
+                    ): time.time()
+                    + REDIS_DOC_INGEST_EXPIRY_TIME
+                },
+            )
+        else:
+            pipe.set(task_id, job_status.model_dump_json(), keepttl=True)
+
+        for key in _status_keys(user_id=user_id, workspace_id=workspace_id):
+            pipe.zrem(key, task_id)
+        for uid in (None, user_id):
+            pipe.zadd(
+                _workspace_jobs_key(user_id=uid, workspace_id=workspace_id),
+                {task_id: created_at},
+            )
+            pipe.zadd(
+                _workspace_jobs_key(
+                    task_status=job_status.task_status,
+                    user_id=uid,
+                    workspace_id=workspace_id,
+                ),
+                {task_id: created_at},
+            )
+        pipe.zadd(
+            _workspace_uploads_key(workspace_id=workspace_id),
+            {job_status.upload_id: created_at},
+            nx=True,
+        )
+        pipe.zadd(
+            _upload_jobs_key(upload_id=job_status.upload_id), {task_id: created_at}
+        )
+        await pipe.execute()
+
+
+async def _get_jobs(
+    *, index_key: str, redis: aioredis.Redis, task_ids: list
+) -> list[dict]:
+    """Get the status of jobs, and drop expired jobs from the index they came from.
+
+    Parameters
+    ----------
+    index_key
+        The key of the index the task IDs were read from.
+    redis
+        The Redis instance.
+    task_ids
+        The task IDs of the jobs.
+
+    Returns
+    -------
+    list[dict]
+        The status of each job that has not expired, in the order of `task_ids`.
+    """
+
+    if not task_ids:
+        return []
+
+    jobs = await redis.mget(task_ids)
+    expired_task_ids = [task_id for task_id, job in zip(task_ids, jobs) if job is None]
+    if expired_task_ids:
+        await redis.zrem(index_key, *expired_task_ids)
+    return [json.loads(job) for job in jobs if job is not None]
+
+
+async def list_jobs(
+    *,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    redis: aioredis.Redis,
+    task_statuses: Optional[list[DocStatusEnum]] = None,
+    user_id: Optional[int] = None,
+    workspace_id: int,
+) -> list[dict]:
+    """List the status of jobs in a workspace, newest first.
+
+    Parameters
+    ----------
+    limit
+        The maximum number of jobs to return. If `None`, all jobs are returned.
+    offset
+        The number of jobs to skip.
+    redis
+        The Redis instance.
+    task_statuses
+        If given, only jobs in one of these statuses are returned.
+    user_id
+        If given, only jobs created by this user are returned.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    list[dict]
+        The status of each job.
+    """
+
+    stop = -1 if limit is None else offset + limit - 1
+
+    if not task_statuses:
+        index_key = _workspace_jobs_key(user_id=user_id, workspace_id=workspace_id)
+        task_ids = await redis.zrevrange(index_key, offset, stop)
+        return await _get_jobs(index_key=index_key, redis=redis, task_ids=task_ids)
+
+    # Merge the newest jobs of each status, then page through the merged list
+    jobs: list[tuple[float, dict]] = []
+    for task_status in set(task_statuses):
+        index_key = _workspace_jobs_key(
+            task_status=task_status, user_id=user_id, workspace_id=workspace_id
+        )
+        task_ids_with_scores = await redis.zrevrange(
+            index_key, 0, stop, withscores=True
+        )
+        status_jobs = await _get_jobs(
+            index_key=index_key,
+            redis=redis,
+            task_ids=[task_id for task_id, _ in task_ids_with_scores],
+        )
+        # Expired jobs are dropped by `_get_jobs`, so scores are matched by task ID
+        scores = {_to_str(task_id): score for task_id, score in task_ids_with_scores}
+        jobs.extend((scores[job["task_id"]], job) for job in status_jobs)
+
+    jobs.sort(key=lambda x: x[0], reverse=True)
+    jobs = jobs[offset:] if limit is None else jobs[offset : offset + limit]
+    return [job for _, job in jobs]
+
+
+async def list_uploads(
+    *,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    redis: aioredis.Redis,
+    workspace_id: int,
+) -> dict[str, list[dict]]:
+    """List the jobs of each upload in a workspace, newest upload first.
+
+    Parameters
+    ----------
+    limit
+        The maximum number of uploads to return. If `None`, all uploads are returned.
+    offset
+        The number of uploads to skip.
+    redis
+        The Redis instance.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    dict[str, list[dict]]
+        The status of the jobs of each upload, oldest job first, keyed by upload ID.
+    """
+
+    stop = -1 if limit is None else offset + limit - 1
+    upload_ids = await redis.zrevrange(
+        _workspace_uploads_key(workspace_id=workspace_id), offset, stop
+    )
+
+    uploads: dict[str, list[dict]] = {}
+    for upload_id in upload_ids:
+        upload_id = (
+            upload_id.decode("utf-8") if isinstance(upload_id, bytes) else upload_id
+        )
+        index_key = _upload_jobs_key(upload_id=upload_id)
+        task_ids = await redis.zrange(index_key, 0, -1)
+        jobs = await _get_jobs(index_key=index_key, redis=redis, task_ids=task_ids)
+        if jobs:
+            uploads[upload_id] = jobs
+    return uploads
+
+
+async def prune_expired_jobs(*, redis: aioredis.Redis) -> int:
+    """Remove expired jobs from the job indexes.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+
+    Returns
+    -------
+    int
+        The number of expired jobs removed.
+    """
+
+    expired = await redis.zrangebyscore(JOB_EXPIRY_KEY, "-inf", time.time())
+    for member in expired:
+        job = json.loads(member)
+        task_id = job["task_id"]
+        workspace_id = job["workspace_id"]
+        upload_jobs_key = _upload_jobs_key(upload_id=job["upload_id"])
+
+        async with redis.pipeline(transaction=True) as pipe:
+            for key in _status_keys(user_id=job["user_id"], workspace_id=workspace_id):
+                pipe.zrem(key, task_id)
+            for uid in (None, job["user_id"]):
+                pipe.zrem(
+                    _workspace_jobs_key(user_id=uid, workspace_id=workspace_id), task_id
+                )
+            pipe.zrem(upload_jobs_key, task_id)
+            pipe.zrem(JOB_EXPIRY_KEY, member)
+            await pipe.execute()
+
+        if not await redis.zcard(upload_jobs_key):
+            await redis.zrem(
+                _workspace_uploads_key(workspace_id=workspace_id), job["upload_id"]
+            )
+    return len(expired)
+
+
+async def run_job_index_pruner(*, redis: aioredis.Redis) -> None:
+    """Periodically remove expired jobs from the job indexes until cancelled.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+    """
+
+    while True:
+        try:
+            n_pruned = await prune_expired_jobs(redis=redis)
+            if n_pruned:
+                logger.info(f"Pruned {n_pruned} expired docmuncher jobs.")
+        except Exception as e:
+            logger.error(f"Error pruning docmuncher job indexes: {str(e)}")
+        await asyncio.sleep(DOCMUNCHER_JOB_INDEX_PRUNE_INTERVAL)
@@ -0,0 +1,669 @@
+"""This module contains the durable job queue for docmuncher document ingestion.
+
+Upload requests enqueue one job per PDF file on a Redis stream. Jobs are consumed by
+one or more standalone worker processes (see `docmuncher_worker.py`) through a
+consumer group, so that a job survives restarts of the API process that received the
+upload:
+
+1. A worker that dies mid-job leaves the job in the consumer group's pending entries
+   list. Workers keep a heartbeat on the jobs they are processing, and a job whose
+   heartbeat is older than the visibility timeout is reclaimed by another worker.
+2. Failed jobs are retried with exponential backoff up to a maximum number of
+   attempts, after which they are marked as failed.
+3. The number of jobs processed concurrently for a single workspace is capped across
+   all workers. Jobs for a workspace that is at capacity are deferred.
+
+Retried and deferred jobs are parked in a sorted set scored by the time at which they
+become ready and are moved back onto the stream once that time has passed.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
+
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from ..config import REDIS_DOC_INGEST_EXPIRY_TIME
+from ..database import get_async_session
+from ..utils import setup_logger
+from .config import (
+    DOCMUNCHER_JOB_MAX_ATTEMPTS,
+    DOCMUNCHER_JOB_RETRY_BACKOFF,
+    DOCMUNCHER_JOB_VISIBILITY_TIMEOUT,
+    DOCMUNCHER_JOB_WORKSPACE_CONCURRENCY,
+    DOCMUNCHER_OCR_MAX_CONCURRENCY,
+    DOCMUNCHER_WORKER_CONCURRENCY,
+)
+from .dependencies import process_pdf_file, release_expected_contents
+from .job_index import save_job_status
+from .schemas import DocIngestionStatusPdf, DocStatusEnum
+from .spool import delete_spooled_file
+
+JOB_STREAM_KEY = "docmuncher:jobs"
+JOB_CONSUMER_GROUP = "docmuncher-workers"
+JOB_DELAYED_KEY = "docmuncher:delayed"
+JOB_RUNNING_KEY_PREFIX = "docmuncher:running:"
+
+# Seconds to wait before retrying a job deferred because its workspace is at capacity.
+WORKSPACE_DEFER_DELAY = 5
+# Milliseconds to block on the stream while waiting for new jobs.
+STREAM_BLOCK_MS = 1000
+
+# Atomically drop expired slots and admit the task if the workspace is below its cap.
+# KEYS[1]: running set; ARGV: now, slot expiry, task ID, cap, key expiry.
+_ACQUIRE_WORKSPACE_SLOT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZSCORE', KEYS[1], ARGV[3])
+    or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[4]) then
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+# Atomically move the parked jobs that are ready back onto the stream, so that a job
+# is never removed from the sorted set without being added to the stream.
+# KEYS[1]: delayed jobs; KEYS[2]: job stream; ARGV: now, maximum number of jobs.
+_PROMOTE_DELAYED_JOBS_SCRIPT = """
+local jobs = redis.call(
+    'ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2])
+)
+for _, job in ipairs(jobs) do
+    local fields = {}
+    for field, value in pairs(cjson.decode(job)) do
+        table.insert(fields, field)
+        table.insert(fields, tostring(value))
+    end
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('XADD', KEYS[2], '*', unpack(fields))
+end
+return #jobs
+"""
+# Maximum number of parked jobs moved back onto the stream by a single script call.
+PROMOTE_BATCH_SIZE = 100
+
+logger = setup_logger()
+
+
+def _to_str(value: bytes | str) -> str:
+    """Decode a Redis value, regardless of whether the client decodes responses.
+
+    Parameters
+    ----------
+    value
+        The value returned by Redis.
+
+    Returns
+    -------
+    str
+        The decoded value.
+    """
+
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def get_retry_delay(*, attempt: int) -> int:
+    """Get the number of seconds to wait before retrying a failed job.
+
+    Parameters
+    ----------
+    attempt
+        The attempt that failed, starting from 1.
+
+    Returns
+    -------
+    int
+        The number of seconds to wait before the next attempt.
+    """
+
+    return DOCMUNCHER_JOB_RETRY_BACKOFF * 2 ** (attempt - 1)
+
+
+async def ensure_job_queue(*, redis: aioredis.Redis) -> None:
+    """Create the job stream and its consumer group if they do not exist yet.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+    """
+
+    try:
+        await redis.xgroup_create(
+            JOB_STREAM_KEY, JOB_CONSUMER_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def enqueue_docmuncher_job(
+    *,
+    file_name: str,
+    file_path: str,
+    redis: aioredis.Redis,
+    task_id: str,
+    workspace_id: int,
+) -> None:
+    """Enqueue a spooled PDF file for processing by the docmuncher workers.
+
+    Parameters
+    ----------
+    file_name
+        The name of the PDF file.
+    file_path
+        The path of the spooled PDF file, in the spool directory shared with the
+        workers.
+    redis
+        The Redis instance.
+    task_id
+        The ID of the document ingestion job.
+    workspace_id
+        The ID of the workspace to save the cards in.
+    """
+
+    await ensure_job_queue(redis=redis)
+    await redis.xadd(
+        JOB_STREAM_KEY,
+        {
+            "task_id": task_id,
+            "file_name": file_name,
+            "file_path": file_path,
+            "workspace_id": workspace_id,
+            "attempt": 1,
+        },
+    )
+
+
+async def schedule_docmuncher_job(
+    *, delay: float, job: dict[str, Any], redis: aioredis.Redis
+) -> None:
+    """Park a job until `delay` seconds have passed.
+
+    Parameters
+    ----------
+    delay
+        The number of seconds after which the job is moved back onto the stream.
+    job
+        The job fields.
+    redis
+        The Redis instance.
+    """
+
+    await redis.zadd(JOB_DELAYED_KEY, {json.dumps(job): time.time() + delay})
+
+
+async def promote_delayed_jobs(*, redis: aioredis.Redis) -> int:
+    """Move parked jobs that are ready back onto the stream.
+
+    Jobs are removed from the sorted set and added to the stream in a single Lua
+    script, so a job is never lost between the two, and concurrent workers never
+    enqueue the same job twice.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+
+    Returns
+    -------
+    int
+        The number of jobs moved onto the stream.
+    """
+
+    n_promoted = 0
+    while True:
+        n_jobs = await redis.eval(
+            _PROMOTE_DELAYED_JOBS_SCRIPT,
+            2,
+            JOB_DELAYED_KEY,
+            JOB_STREAM_KEY,
+            time.time(),
+            PROMOTE_BATCH_SIZE,
+        )
+        n_promoted += n_jobs
+        if n_jobs < PROMOTE_BATCH_SIZE:
+            return n_promoted
+
+
+async def acquire_workspace_slot(
+    *, redis: aioredis.Redis, task_id: str, workspace_id: int
+) -> bool:
+    """Try to take one of the workspace's concurrent processing slots.
+
+    Slots expire after the visibility timeout unless refreshed, so a slot held by a
+    worker that died is eventually released.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+    task_id
+        The ID of the document ingestion job.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    bool
+        Specifies whether the slot was acquired.
+    """
+
+    now = time.time()
+    acquired = await redis.eval(
+        _ACQUIRE_WORKSPACE_SLOT_SCRIPT,
+        1,
+        f"{JOB_RUNNING_KEY_PREFIX}{workspace_id}",
+        now,
+        now + DOCMUNCHER_JOB_VISIBILITY_TIMEOUT,
+        task_id,
+        DOCMUNCHER_JOB_WORKSPACE_CONCURRENCY,
+        REDIS_DOC_INGEST_EXPIRY_TIME,
+    )
+    return bool(acquired)
+
+
+async def release_workspace_slot(
+    *, redis: aioredis.Redis, task_id: str, workspace_id: int
+) -> None:
+    """Release a workspace processing slot.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+    task_id
+        The ID of the document ingestion job.
+    workspace_id
+        The ID of the workspace.
+    """
+
+    await redis.zrem(f"{JOB_RUNNING_KEY_PREFIX}{workspace_id}", task_id)
+
+
+async def mark_job_failed(
+    *,
+    error_trace: str,
+    file_path: str,
+    redis: aioredis.Redis,
+    task_id: str,
+    workspace_id: int,
+) -> None:
+    """Mark a job as failed without processing it again.
+
+    Parameters
+    ----------
+    error_trace
+        The reason for the failure.
+    file_path
+        The path of the spooled PDF file of the job.
+    redis
+        The Redis instance.
+    task_id
+        The ID of the document ingestion job.
+    workspace_id
+        The ID of the workspace the job was saving cards in.
+    """
+
+    job_status = await redis.get(task_id)
+    if job_status:
+        job_status_dict = json.loads(_to_str(job_status))
+        job_status_dict.update(
+            task_status=DocStatusEnum.failed,
+            error_trace=error_trace,
+            finished_datetime_utc=datetime.now(timezone.utc),
+        )
+        job_status_pydantic = DocIngestionStatusPdf(**job_status_dict)
+        await save_job_status(job_status=job_status_pydantic, redis=redis)
+        await release_expected_contents(
+            redis, workspace_id, job_status_pydantic.pages_total
+        )
+
+    delete_spooled_file(file_path)
+
+
+class DocmuncherJobWorker:
+    """Consume docmuncher jobs from the Redis stream."""
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = DOCMUNCHER_WORKER_CONCURRENCY,
+        redis: aioredis.Redis,
+    ) -> None:
+        """Initialize the worker.
+
+        Parameters
+        ----------
+        concurrency
+            The maximum number of jobs processed concurrently by this worker.
+        redis
+            The Redis instance.
+        """
+
+        self.redis = redis
+        # One semaphore per LiteLLM model, shared by the jobs of this worker.
+        self.llm_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.ocr_semaphore = asyncio.Semaphore(DOCMUNCHER_OCR_MAX_CONCURRENCY)
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self._slots = asyncio.Semaphore(concurrency)
+        self._stopping = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+
+    def stop(self) -> None:
+        """Stop consuming new jobs. Jobs in progress are allowed to finish."""
+
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Consume jobs until the worker is stopped."""
+
+        await ensure_job_queue(redis=self.redis)
+        logger.info(f"Docmuncher worker {self.consumer_name} started.")
+
+        while not self._stopping.is_set():
+            try:
+                await promote_delayed_jobs(redis=self.redis)
+                await self._reclaim_stale_jobs()
+                await self._read_new_jobs()
+            except Exception as e:
+                logger.error(f"Error while consuming docmuncher jobs: {str(e)}")
+                await asyncio.sleep(1)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"Docmuncher worker {self.consumer_name} stopped.")
+
+    async def _read_new_jobs(self) -> None:
+        """Read new jobs from the stream, up to the number of free slots. If no slot
+        frees up within the block time, return so that delayed and stale jobs are
+        still handled and the worker can stop."""
+
+        try:
+            await asyncio.wait_for(
+                self._slots.acquire(), timeout=STREAM_BLOCK_MS / 1000
+            )
+        except TimeoutError:
+            return
+        n_free = 1
+        while not self._slots.locked():
+            await self._slots.acquire()
+            n_free += 1
+
+        response = await self.redis.xreadgroup(
+            JOB_CONSUMER_GROUP,
+            self.consumer_name,
+            {JOB_STREAM_KEY: ">"},
+            count=n_free,
+            block=STREAM_BLOCK_MS,
+        )
+        messages = response[0][1] if response else []
+        for message_id, fields in messages:
+            self._start_job(message_id=message_id, fields=fields, delivery_count=1)
+        for _ in range(n_free - len(messages)):
+            self._slots.release()
+
+    async def _reclaim_stale_jobs(self) -> None:
+        """Claim jobs whose worker has not sent a heartbeat within the timeout."""
+
+        min_idle_time = DOCMUNCHER_JOB_VISIBILITY_TIMEOUT * 1000
+        pending = await self.redis.xpending_range(
+            JOB_STREAM_KEY, JOB_CONSUMER_GROUP, min="-", max="+", count=100
+        )
+        for entry in pending:
+            if entry["time_since_delivered"] < min_idle_time:
+                continue
+            if self._slots.locked():
+                return
+            await self._slots.acquire()
+            claimed = await self.redis.xclaim(
+                JOB_STREAM_KEY,
+                JOB_CONSUMER_GROUP,
+                self.consumer_name,
+                min_idle_time=min_idle_time,
+                message_ids=[entry["message_id"]],
+            )
+            if not claimed or claimed[0][1] is None:
+                # The message was deleted from the stream after it was delivered
+                await self.redis.xack(
+                    JOB_STREAM_KEY, JOB_CONSUMER_GROUP, entry["message_id"]
+                )
+                self._slots.release()
+                continue
+            message_id, fields = claimed[0]
+            logger.warning(
+                f"Reclaimed docmuncher job {_to_str(message_id)} from "
+                f"{_to_str(entry['consumer'])}."
+            )
+            self._start_job(
+                message_id=message_id,
+                fields=fields,
+                delivery_count=entry["times_delivered"] + 1,
+            )
+
+    def _start_job(
+        self, *, delivery_count: int, fields: dict, message_id: bytes | str
+    ) -> None:
+        """Process a job in the background. The caller must hold a slot.
+
+        Parameters
+        ----------
+        delivery_count
+            The number of times the message has been delivered to a worker.
+        fields
+            The job fields.
+        message_id
+            The ID of the stream message.
+        """
+
+        task = asyncio.create_task(
+            self._handle_job(
+                delivery_count=delivery_count, fields=fields, message_id=message_id
+            )
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _: self._slots.release())
+
+    async def _handle_job(
+        self, *, delivery_count: int, fields: dict, message_id: bytes | str
+    ) -> None:
+        """Process a single job and acknowledge it once it is finished, failed for
+        good, or parked for later.
+
+        A job that raises an unexpected error is not acknowledged: it stays in the
+        pending entries list and is reclaimed as its next attempt once the visibility
+        timeout has passed, until it is marked as failed after the maximum number of
+        attempts.
+
+        Parameters
+        ----------
+        delivery_count
+            The number of times the message has been delivered to a worker. Every
+            delivery beyond the first means that a worker died while processing it.
+        fields
+            The job fields.
+        message_id
+            The ID of the stream message.
+        """
+
+        job = {_to_str(k): _to_str(v) for k, v in fields.items()}
+        task_id = job["task_id"]
+        workspace_id = int(job["workspace_id"])
+        attempt = int(job["attempt"]) + delivery_count - 1
+
+        acknowledge = False
+        try:
+            if attempt > DOCMUNCHER_JOB_MAX_ATTEMPTS:
+                await mark_job_failed(
+                    error_trace=f"Job abandoned after {attempt - 1} attempts.",
+                    file_path=job["file_path"],
+                    redis=self.redis,
+                    task_id=task_id,
+                    workspace_id=workspace_id,
+                )
+                acknowledge = True
+                return
+
+            if not await acquire_workspace_slot(
+                redis=self.redis, task_id=task_id, workspace_id=workspace_id
+            ):
+                await schedule_docmuncher_job(
+                    delay=WORKSPACE_DEFER_DELAY, job=job, redis=self.redis
+                )
+                acknowledge = True
+                return
+
+            try:
+                await self._process_job(
+                    attempt=attempt,
+                    job=job,
+                    message_id=message_id,
+                    workspace_id=workspace_id,
+                )
+            finally:
+                await release_workspace_slot(
+                    redis=self.redis, task_id=task_id, workspace_id=workspace_id
+                )
+            acknowledge = True
+        except Exception as e:
+            logger.error(
+                f"Error handling docmuncher job {task_id}, it will be retried once "
+                f"the visibility timeout has passed: {str(e)}"
+            )
+        finally:
+            if acknowledge:
+                await self.redis.xack(JOB_STREAM_KEY, JOB_CONSUMER_GROUP, message_id)
+                await self.redis.xdel(JOB_STREAM_KEY, message_id)
+
+    async def _process_job(
+        self,
+        *,
+        attempt: int,
+        job: dict[str, str],
+        message_id: bytes | str,
+        workspace_id: int,
+    ) -> None:
+        """Run the docmuncher pipeline on a job while keeping its heartbeat.
+
+        Parameters
+        ----------
+        attempt
+            The number of this attempt at processing the job, starting from 1.
+        job
+            The job fields.
+        message_id
+            The ID of the stream message.
+        workspace_id
+            The ID of the workspace to save the cards in.
+        """
+
+        task_id = job["task_id"]
+        if not os.path.exists(job["file_path"]):
+            await mark_job_failed(
+                error_trace="The uploaded file is no longer available.",
+                file_path=job["file_path"],
+                redis=self.redis,
+                task_id=task_id,
+                workspace_id=workspace_id,
+            )
+            return
+
+        heartbeat = asyncio.create_task(
+            self._heartbeat(
+                message_id=message_id, task_id=task_id, workspace_id=workspace_id
+            )
+        )
+        try:
+            async for asession in get_async_session():
+                job_status = await process_pdf_file(
+                    redis=self.redis,
+                    task_id=task_id,
+                    file_name=job["file_name"],
+                    file_path=job["file_path"],
+                    workspace_id=workspace_id,
+                    asession=asession,
+                    attempt=attempt,
+                    max_attempts=DOCMUNCHER_JOB_MAX_ATTEMPTS,
+                    llm_semaphores=self.llm_semaphores,
+                    ocr_semaphore=self.ocr_semaphore,
+                )
+        finally:
+            heartbeat.cancel()
+
+        if job_status.task_status == DocStatusEnum.not_started:
+            delay = get_retry_delay(attempt=attempt)
+            logger.info(f"Retrying docmuncher job {task_id} in {delay} seconds.")
+            await schedule_docmuncher_job(
+                delay=delay,
+                job={**job, "attempt": attempt + 1},
+                redis=self.redis,
+            )
+
+    async def _heartbeat(
+        self, *, message_id: bytes | str, task_id: str, workspace_id: int
+    ) -> None:
+        """Periodically signal that a job is still being processed.
+
+        Re-claiming the message resets its idle time, so that other workers do not
+        reclaim it, and the workspace slot is extended for the same period.
+
+        Parameters
+        ----------
+        message_id
+            The ID of the stream message.
+        task_id
+            The ID of the document ingestion job.
+        workspace_id
+            The ID of the workspace.
+        """
+
+        interval = max(1, DOCMUNCHER_JOB_VISIBILITY_TIMEOUT // 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.redis.xclaim(
+                    JOB_STREAM_KEY,
+                    JOB_CONSUMER_GROUP,
+                    self.consumer_name,
+                    min_idle_time=0,
+                    message_ids=[message_id],
+                    justid=True,
+                )
+                await self.redis.zadd(
+                    f"{JOB_RUNNING_KEY_PREFIX}{workspace_id}",
+                    {task_id: time.time() + DOCMUNCHER_JOB_VISIBILITY_TIMEOUT},
+                    xx=True,
+                )
+            except Exception as e:
+                logger.error(f"Heartbeat failed for docmuncher job {task_id}: {e}")
+
+
+async def run_docmuncher_worker(*, redis_host: str) -> None:
+    """Run a docmuncher worker until it receives SIGINT or SIGTERM.
+
+    Parameters
+    ----------
+    redis_host
+        The URL of the Redis instance holding the job queue.
+    """
+
+    redis = await aioredis.from_url(redis_host)
+    worker = DocmuncherJobWorker(redis=redis)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await redis.aclose()
@@ -0,0 +1,312 @@
+"""This module contains the OCR backends used by docmuncher to convert PDF pages to
+markdown text.
+"""
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from mistralai import DocumentURLChunk, Mistral
+from PyPDF2 import PdfReader
+from redis import asyncio as aioredis
+
+from ..utils import setup_logger
+from .cache import cache_ocr_pages, get_cached_ocr_pages, hash_content
+from .config import (
+    DOCMUNCHER_OCR_BACKEND,
+    DOCMUNCHER_OCR_MAX_CONCURRENCY,
+    DOCMUNCHER_OCR_PAGES_PER_REQUEST,
+    DOCMUNCHER_TEXT_LAYER_ENABLED,
+)
+from .text_layer import extract_text_layer_pages
+
+logger = setup_logger()
+MISTRAL_CLIENT = None
+
+
+def get_mistral_client() -> Mistral:
+    """
+    Get a Mistral client instance.
+    """
+    global MISTRAL_CLIENT
+    if MISTRAL_CLIENT is None:
+        MISTRAL_CLIENT = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+    return MISTRAL_CLIENT
+
+
+class OCRBackend(ABC):
+    """Base class for OCR backends.
+
+    A backend first prepares a document once, then converts page ranges of the
+    prepared document to markdown. Page ranges may be processed concurrently.
+    """
+
+    @abstractmethod
+    async def prepare(self, file_name: str, content: bytes) -> Any:
+        """
+        Prepare a PDF file for OCR.
+
+        Parameters
+        ----------
+        file_name
+            The PDF filename.
+        content
+            The content of the PDF file.
+
+        Returns
+        -------
+        Any
+            The prepared document, passed to `ocr_pages`.
+        """
+
+    @abstractmethod
+    async def ocr_pages(self, document: Any, pages: list[int]) -> list[dict]:
+        """
+        Convert pages of a prepared document to markdown.
+
+        Parameters
+        ----------
+        document
+            The document returned by `prepare`.
+        pages
+            The 0-based indices of the pages to convert.
+
+        Returns
+        -------
+        list[dict]
+            One dictionary per page with the page `index` and its `markdown`.
+        """
+
+
+class MistralOCRBackend(OCRBackend):
+    """OCR backend using the Mistral OCR API through the async client."""
+
+    async def prepare(self, file_name: str, content: bytes) -> str:
+        """
+        Upload the PDF file to Mistral and return its signed URL.
+        """
+        client = get_mistral_client()
+        uploaded_file = await client.files.upload_async(
+            file={
+                "file_name": file_name,
+                "content": content,
+            },
+            purpose="ocr",
+        )
+        signed_url = await client.files.get_signed_url_async(file_id=uploaded_file.id)
+        return signed_url.url
+
+    async def ocr_pages(self, document: str, pages: list[int]) -> list[dict]:
+        """
+        Run Mistral OCR on pages of the uploaded PDF file.
+        """
+        client = get_mistral_client()
+        pdf_response = await client.ocr.process_async(
+            document=DocumentURLChunk(document_url=document),
+            model="mistral-ocr-latest",
+            include_image_base64=False,
+            pages=pages,
+        )
+        return [page.model_dump() for page in pdf_response.pages]
+
+
+class StubOCRBackend(OCRBackend):
+    """OCR backend that extracts the PDF text layer locally.
+
+    This backend does not call any remote service and is meant for offline testing
+    of the ingestion pipeline. Scanned pages without a text layer produce empty
+    markdown.
+    """
+
+    async def prepare(self, file_name: str, content: bytes) -> bytes:
+        """
+        Return the content of the PDF file. PyPDF2 readers are not thread-safe, so
+        each page range parses the file with its own reader.
+        """
+        return content
+
+    async def ocr_pages(self, document: bytes, pages: list[int]) -> list[dict]:
+        """
+        Extract the text layer of pages of the PDF file.
+        """
+
+        def _extract_text() -> list[dict]:
+            reader = PdfReader(BytesIO(document))
+            return [
+                {"index": i, "markdown": reader.pages[i].extract_text() or ""}
+                for i in pages
+            ]
+
+        return await asyncio.to_thread(_extract_text)
+
+
+OCR_BACKENDS: dict[str, OCRBackend] = {
+    "mistral": MistralOCRBackend(),
+    "stub": StubOCRBackend(),
+}
+
+
+def count_pdf_pages(content: bytes) -> int:
+    """
+    Count the number of pages in a PDF file.
+
+    Parameters
+    ----------
+    content
+        The content of the PDF file.
+
+    Returns
+    -------
+    int
+        The number of pages.
+    """
+    return len(PdfReader(BytesIO(content)).pages)
+
+
+def split_into_page_ranges(num_pages: int, pages_per_range: int) -> list[list[int]]:
+    """
+    Split the pages of a document into consecutive page ranges.
+
+    Parameters
+    ----------
+    num_pages
+        The number of pages in the document.
+    pages_per_range
+        The maximum number of pages in each range.
+
+    Returns
+    -------
+    list[list[int]]
+        The 0-based page indices of each range, in page order.
+    """
+    pages_per_range = max(1, pages_per_range)
+    return [
+        list(range(start, min(start + pages_per_range, num_pages)))
+        for start in range(0, num_pages, pages_per_range)
+    ]
+
+
+async def convert_pages_to_markdown(
+    file_name: str,
+    content: bytes,
+    num_pages: Optional[int] = None,
+    ocr_semaphore: Optional[asyncio.Semaphore] = None,
+    redis: Optional[aioredis.Redis] = None,
+) -> dict:
+    """
+    Convert a PDF file to dictionary of markdown text.
+
+    If `DOCMUNCHER_TEXT_LAYER_ENABLED`, pages with a usable text layer are extracted
+    locally. The remaining pages are split into ranges of
+    `DOCMUNCHER_OCR_PAGES_PER_REQUEST` that are OCR'd concurrently by the
+    `DOCMUNCHER_OCR_BACKEND` backend. All pages are merged back in page order. No
+    blocking call is made on the event loop.
+
+    If `redis` is given, the markdown of each page is cached by the SHA-256 of the
+    PDF file as soon as its page range is OCR'd, and only pages that are not cached
+    are sent to the backend.
+
+    Parameters
+    ----------
+    file_name
+        The PDF filename to convert.
+    content
+        The content of the PDF file.
+    num_pages
+        The number of pages in the PDF file, if already known.
+    ocr_semaphore
+        The semaphore limiting the number of concurrent OCR requests, shared by the
+        jobs of the worker or application running them. If not given, only the OCR
+        requests of this file are limited to `DOCMUNCHER_OCR_MAX_CONCURRENCY`.
+    redis
+        The Redis instance holding the OCR cache, if any.
+
+    Returns
+    -------
+    dict
+        The content of the PDF file in markdown formatted text, with one entry per
+        page under `pages`, and the number of pages that took each path under
+        `stats`.
+    HTTPException
+        If the conversion fails.
+    """
+    backend = OCR_BACKENDS.get(DOCMUNCHER_OCR_BACKEND)
+    if backend is None:
+        raise ValueError(f"Invalid OCR backend: {DOCMUNCHER_OCR_BACKEND}")
+
+    if ocr_semaphore is None:
+        ocr_semaphore = asyncio.Semaphore(DOCMUNCHER_OCR_MAX_CONCURRENCY)
+
+    try:
+        text_layer_pages: dict[int, dict] = {}
+        if DOCMUNCHER_TEXT_LAYER_ENABLED:
+            num_pages, text_layer_pages = await asyncio.to_thread(
+                extract_text_layer_pages, content
+            )
+        elif num_pages is None:
+            num_pages = await asyncio.to_thread(count_pdf_pages, content)
+
+        cached_pages: dict[int, dict] = {}
+        doc_hash = await asyncio.to_thread(hash_content, content)
+        if redis is not None and len(text_layer_pages) < num_pages:
+            cached_pages = {
+                index: page
+                for index, page in (
+                    await get_cached_ocr_pages(doc_hash=doc_hash, redis=redis)
+                ).items()
+                if index not in text_layer_pages
+            }
+        missing_pages = [
+            i
+            for i in range(num_pages)
+            if i not in text_layer_pages and i not in cached_pages
+        ]
+
+        ocr_results: list[list[dict]] = []
+        if missing_pages:
+            document = await backend.prepare(file_name, content)
+
+            async def _ocr_page_range(pages: list[int]) -> list[dict]:
+                async with ocr_semaphore:
+                    ocr_pages = await backend.ocr_pages(document, pages)
+                if redis is not None:
+                    await cache_ocr_pages(
+                        doc_hash=doc_hash, pages=ocr_pages, redis=redis
+                    )
+                return ocr_pages
+
+            page_ranges = [
+                [missing_pages[i] for i in page_range]
+                for page_range in split_into_page_ranges(
+                    len(missing_pages), DOCMUNCHER_OCR_PAGES_PER_REQUEST
+                )
+            ]
+            ocr_results = await asyncio.gather(
+                *[_ocr_page_range(pages) for pages in page_ranges]
+            )
+
+        markdown_pages = sorted(
+            [
+                *text_layer_pages.values(),
+                *cached_pages.values(),
+                *(page for pages in ocr_results for page in pages),
+            ],
+            key=lambda page: page["index"],
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to convert PDF to markdown: {e}",
+        ) from e
+
+    stats = {
+        "pages_total": num_pages,
+        "pages_text_layer": len(text_layer_pages),
+        "pages_ocr": len(missing_pages),
+        "pages_ocr_cached": len(cached_pages),
+    }
+    logger.info(f"Converted {file_name} to markdown: {stats}")
+    return {"pages": markdown_pages, "stats": stats}
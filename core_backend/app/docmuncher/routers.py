@@ -1,9 +1,9 @@
-import json
+import asyncio
 import re
 import zipfile
 from datetime import datetime, timezone
-from io import BytesIO
-from typing import Annotated
+from pathlib import Path
+from typing import Annotated, Optional
 from uuid import uuid4
 
 import numpy as np
@@ -13,35 +13,46 @@ from fastapi import (
     Depends,
     File,
     HTTPException,
+    Query,
     Request,
     UploadFile,
     status,
 )
-from PyPDF2 import PdfReader
+from redis import asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth.dependencies import get_current_user, get_current_workspace_name
 from ..config import (
     CHECK_CONTENT_LIMIT,
     PAGES_TO_CARDS_CONVERSION,
-    REDIS_DOC_INGEST_EXPIRY_TIME,
 )
 from ..contents.routers import (
     ExceedsContentQuotaError,
     _check_content_quota_availability,
 )
 from ..database import get_async_session
-from ..users.models import UserDB, user_has_required_role_in_workspace
+from ..users.models import UserDB, WorkspaceDB, user_has_required_role_in_workspace
 from ..users.schemas import UserRoles
 from ..utils import setup_logger
 from ..workspaces.utils import get_workspace_by_workspace_name
+from .config import DOCMUNCHER_JOB_QUEUE_ENABLED
 from .dependencies import JOB_KEY_PREFIX, process_pdf_file
+from .job_index import list_jobs, list_uploads, save_job_status
+from .job_queue import enqueue_docmuncher_job
 from .schemas import (
+    DocIngestionStatusPdf,
     DocIngestionStatusZip,
     DocStatusEnum,
     DocUploadResponsePdf,
     DocUploadResponseZip,
 )
+from .spool import (
+    count_spooled_pdf_pages,
+    delete_spooled_file,
+    delete_spooled_files,
+    extract_pdf_members,
+    spool_upload,
+)
 
 TAG_METADATA = {
     "name": "Document upload",
@@ -66,10 +77,12 @@ async def upload_document(
 
     The process is as follows:
 
-    1. Parameters for the endpoint are checked first.
+    1. Parameters for the endpoint are checked first, and the upload is spooled to
+        disk.
     2. Check if content / page limits are reached
-    3. Create a copy of the file and asession
-    4. Start a document ingestion job and return a job ID.
+    3. Enqueue a document ingestion job per PDF file for the docmuncher workers (or
+        start it as a background task if the job queue is disabled).
+    4. Return the job IDs.
 
     Parameters
     ----------
@@ -119,37 +132,107 @@ async def upload_document(
             detail="Filename is required",
         )
 
-    pdf_files = []
-    num_pages = 0
+    # Spool the upload to disk, and extract the PDF files of a zip file one at a time
+    pdf_files: list[tuple[str, Path]] = []
     parent_file_name = None
     if file.filename.endswith(".zip"):
         parent_file_name = file.filename
-        zip_file_content = await file.read()
-        with zipfile.ZipFile(BytesIO(zip_file_content)) as zip_file:
-            pdf_files = [
-                (f, zip_file.read(f)) for f in zip_file.namelist() if f.endswith(".pdf")
-            ]
-            if not pdf_files:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="The zip file does not contain any PDF files.",
-                )
-            num_pages = sum(
-                len(PdfReader(BytesIO(content)).pages) for _, content in pdf_files
-            )
+        zip_path = await spool_upload(extension=".zip", stream=file.file)
         await file.close()
+        try:
+            pdf_files = await extract_pdf_members(zip_path=zip_path)
+        except zipfile.BadZipFile as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The zip file could not be read.",
+            ) from e
+        finally:
+            delete_spooled_file(zip_path)
+        if not pdf_files:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The zip file does not contain any PDF files.",
+            )
     elif file.filename.endswith(".pdf"):
-        file_content = await file.read()
-        pdf_files = [(file.filename, file_content)]
-        num_pages = len(PdfReader(BytesIO(file_content)).pages)
+        pdf_path = await spool_upload(extension=".pdf", stream=file.file)
         await file.close()
-
+        pdf_files = [(file.filename, pdf_path)]
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are supported for document ingestion.",
         )
 
+    try:
+        return await _create_ingestion_jobs(
+            background_tasks=background_tasks,
+            calling_user_db=calling_user_db,
+            llm_semaphores=request.app.state.docmuncher_llm_semaphores,
+            ocr_semaphore=request.app.state.docmuncher_ocr_semaphore,
+            parent_file_name=parent_file_name,
+            pdf_files=pdf_files,
+            redis=redis,
+            workspace_db=workspace_db,
+            asession=asession,
+        )
+    except Exception:
+        delete_spooled_files([pdf_path for _, pdf_path in pdf_files])
+        raise
+
+
+async def _create_ingestion_jobs(
+    *,
+    background_tasks: BackgroundTasks,
+    calling_user_db: UserDB,
+    llm_semaphores: dict[str, asyncio.Semaphore],
+    ocr_semaphore: asyncio.Semaphore,
+    parent_file_name: Optional[str],
+    pdf_files: list[tuple[str, Path]],
+    redis: aioredis.Redis,
+    workspace_db: WorkspaceDB,
+    asession: AsyncSession,
+) -> DocUploadResponsePdf | DocUploadResponseZip:
+    """Check the content quota and start an ingestion job for each spooled PDF file.
+
+    Parameters
+    ----------
+    background_tasks
+        The background tasks of the request, used if the job queue is disabled.
+    calling_user_db
+        The user object associated with the user that is creating the content.
+    llm_semaphores
+        The semaphore of each LLM model, shared by the jobs run by the application
+        if the job queue is disabled.
+    ocr_semaphore
+        The semaphore limiting the concurrent OCR requests of the jobs run by the
+        application if the job queue is disabled.
+    parent_file_name
+        The name of the uploaded zip file, if any.
+    pdf_files
+        The name and spooled path of each PDF file.
+    redis
+        The Redis instance.
+    workspace_db
+        The workspace to create the content in.
+    asession
+        The SQLAlchemy async session to use for all database connections.
+
+    Returns
+    -------
+    DocUploadResponsePdf | DocUploadResponseZip
+        The response model for document upload.
+
+    Raises
+    ------
+    HTTPException
+        If the upload would exceed the content quota of the workspace.
+    """
+    # Count the pages of each PDF file once, and store them with the job
+    pages_per_file = [
+        await count_spooled_pdf_pages(path=pdf_path) for _, pdf_path in pdf_files
+    ]
+    num_pages = sum(pages_per_file)
+
     # 3.
     # Get temporary log of expected contents to be created by running jobs
     temp_docmuncher_contents = await redis.get(
@@ -204,8 +287,7 @@ async def upload_document(
     tasks: list[DocUploadResponsePdf] = []
     zip_created_datetime_utc = datetime.now(timezone.utc)
 
-    for filename, content in pdf_files:
-        bg_asession = AsyncSession(asession.bind)
+    for (filename, pdf_path), file_num_pages in zip(pdf_files, pages_per_file):
         # 3.
         # Log task in redis
         task_id = f"{JOB_KEY_PREFIX}{str(uuid4())}"
@@ -218,26 +300,36 @@ async def upload_document(
             task_id=task_id,
             doc_name=filename,
             task_status=DocStatusEnum.not_started,
+            pages_total=file_num_pages,
         )
         tasks.append(task_status)
 
-        await redis.set(
-            task_id, task_status.model_dump_json(), ex=REDIS_DOC_INGEST_EXPIRY_TIME
-        )
+        await save_job_status(expire=True, job_status=task_status, redis=redis)
         # Update expected contents from running jobs
         await redis.set(
             f"{workspace_db.workspace_id}_docmuncher_contents", num_expected_contents
         )
 
-        background_tasks.add_task(
-            process_pdf_file,
-            request=request,
-            task_id=task_id,
-            file_name=filename,
-            content=content,
-            workspace_id=workspace_db.workspace_id,
-            asession=bg_asession,
-        )
+        if DOCMUNCHER_JOB_QUEUE_ENABLED:
+            await enqueue_docmuncher_job(
+                file_name=filename,
+                file_path=str(pdf_path),
+                redis=redis,
+                task_id=task_id,
+                workspace_id=workspace_db.workspace_id,
+            )
+        else:
+            background_tasks.add_task(
+                process_pdf_file,
+                redis=redis,
+                task_id=task_id,
+                file_name=filename,
+                file_path=str(pdf_path),
+                workspace_id=workspace_db.workspace_id,
+                asession=AsyncSession(asession.bind),
+                llm_semaphores=llm_semaphores,
+                ocr_semaphore=ocr_semaphore,
+            )
 
     # 4.
     if len(pdf_files) == 1:
@@ -305,31 +397,150 @@ async def get_jobs_running_for_user(
 
     # Query status response
     redis = request.app.state.redis
-    job_keys = await redis.keys(f"{JOB_KEY_PREFIX}*")
-    if not job_keys:
+    if not await list_jobs(
+        limit=1, redis=redis, workspace_id=workspace_db.workspace_id
+    ):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="No jobs found",
+            detail=f"No jobs found in workspace {workspace_name}",
         )
 
-    all_jobs = await redis.mget(job_keys)
-    all_jobs_list = [json.loads(job.decode("utf-8")) for job in all_jobs]
+    running_jobs = await list_jobs(
+        limit=1,
+        redis=redis,
+        task_statuses=[DocStatusEnum.in_progress],
+        workspace_id=workspace_db.workspace_id,
+    )
 
-    user_workspace_jobs = [
-        job for job in all_jobs_list if job["workspace_id"] == workspace_db.workspace_id
-    ]
+    return len(running_jobs) > 0
+
+
+@router.get("/status/progress", response_model=list[DocIngestionStatusPdf])
+async def get_job_progress_for_user(
+    request: Request,
+    calling_user_db: Annotated[UserDB, Depends(get_current_user)],
+    workspace_name: Annotated[str, Depends(get_current_workspace_name)],
+    asession: AsyncSession = Depends(get_async_session),
+) -> list[DocIngestionStatusPdf]:
+    """Get the progress of all running jobs in the workspace.
+
+    Parameters:
+    -----------
+    request
+        The request object from FastAPI.
+    calling_user_db
+        The user object associated with the user that is checking the status.
+    workspace_name
+        The name of the workspace to check the status in.
+    asession
+        The database session object.
+
+    Returns:
+    --------
+    list[DocIngestionStatusPdf]
+        The status of each running job, including the number of chunks processed
+        out of the total.
+
+    Raises
+    ------
+    HTTPException
+        If the user does not have the required role to create content in the workspace.
+    """
+    # Check params
+    workspace_db = await get_workspace_by_workspace_name(
+        asession=asession, workspace_name=workspace_name
+    )
 
-    if len(user_workspace_jobs) == 0:
+    if not await user_has_required_role_in_workspace(
+        allowed_user_roles=[UserRoles.ADMIN],
+        asession=asession,
+        user_db=calling_user_db,
+        workspace_db=workspace_db,
+    ):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No jobs found in workspace {workspace_name}",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User does not have the required role to request ingestion status.",
+        )
+
+    # Query status response
+    running_jobs = await list_jobs(
+        redis=request.app.state.redis,
+        task_statuses=[DocStatusEnum.in_progress],
+        workspace_id=workspace_db.workspace_id,
+    )
+
+    return [DocIngestionStatusPdf.model_validate(job) for job in running_jobs]
+
+
+@router.get("/status/jobs", response_model=list[DocIngestionStatusPdf])
+async def get_jobs_for_user(
+    request: Request,
+    calling_user_db: Annotated[UserDB, Depends(get_current_user)],
+    workspace_name: Annotated[str, Depends(get_current_workspace_name)],
+    task_status: Annotated[Optional[list[DocStatusEnum]], Query()] = None,
+    only_mine: bool = False,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    asession: AsyncSession = Depends(get_async_session),
+) -> list[DocIngestionStatusPdf]:
+    """Get the status of the jobs in the workspace, newest first.
+
+    Parameters:
+    -----------
+    request
+        The request object from FastAPI.
+    calling_user_db
+        The user object associated with the user that is checking the status.
+    workspace_name
+        The name of the workspace to check the status in.
+    task_status
+        If given, only jobs in one of these statuses are returned.
+    only_mine
+        Specifies whether to only return jobs created by the calling user.
+    offset
+        The number of jobs to skip.
+    limit
+        The maximum number of jobs to return. If not given, all jobs are returned.
+    asession
+        The database session object.
+
+    Returns:
+    --------
+    list[DocIngestionStatusPdf]
+        The status of each job.
+
+    Raises
+    ------
+    HTTPException
+        If the user does not have the required role to create content in the workspace.
+    """
+    # Check params
+    workspace_db = await get_workspace_by_workspace_name(
+        asession=asession, workspace_name=workspace_name
+    )
+
+    if not await user_has_required_role_in_workspace(
+        allowed_user_roles=[UserRoles.ADMIN],
+        asession=asession,
+        user_db=calling_user_db,
+        workspace_db=workspace_db,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User does not have the required role to request ingestion status.",
         )
 
-    num_processes_running = sum(
-        job["task_status"] == DocStatusEnum.in_progress for job in user_workspace_jobs
+    # Query status response
+    jobs = await list_jobs(
+        limit=limit,
+        offset=offset,
+        redis=request.app.state.redis,
+        task_statuses=task_status,
+        user_id=calling_user_db.user_id if only_mine else None,
+        workspace_id=workspace_db.workspace_id,
     )
 
-    return True if num_processes_running > 0 else False
+    return [DocIngestionStatusPdf.model_validate(job) for job in jobs]
 
 
 @router.get("/status/data", response_model=list[DocIngestionStatusZip])
@@ -337,9 +548,11 @@ async def get_all_jobs(
     request: Request,
     calling_user_db: Annotated[UserDB, Depends(get_current_user)],
     workspace_name: Annotated[str, Depends(get_current_workspace_name)],
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
     asession: AsyncSession = Depends(get_async_session),
 ) -> list[DocIngestionStatusZip]:
-    """Get the status of all jobs.
+    """Get the status of all jobs, grouped by upload with the newest upload first.
 
     Parameters:
     -----------
@@ -349,6 +562,11 @@ async def get_all_jobs(
         The user object associated with the user that is checking the status.
     workspace_name
         The name of the workspace to check the status in.
+    offset
+        The number of uploads to skip.
+    limit
+        The maximum number of uploads to return. If not given, all uploads are
+        returned.
     asession
         The database session object.
 
@@ -381,39 +599,22 @@ async def get_all_jobs(
         )
 
     # Query status response
-    redis = request.app.state.redis
-    job_keys = await redis.keys(f"{JOB_KEY_PREFIX}*")
-    if not job_keys:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No jobs found",
-        )
-
-    all_jobs = await redis.mget(job_keys)
-    all_jobs_list = [json.loads(job.decode("utf-8")) for job in all_jobs]
-
-    # Filter jobs for the workspace and user
-    user_workspace_jobs = [
-        job for job in all_jobs_list if job["workspace_id"] == workspace_db.workspace_id
-    ]
+    uploads = await list_uploads(
+        limit=limit,
+        offset=offset,
+        redis=request.app.state.redis,
+        workspace_id=workspace_db.workspace_id,
+    )
 
-    if len(user_workspace_jobs) == 0:
+    if len(uploads) == 0 and offset == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No jobs found in workspace {workspace_name}",
         )
 
-    # Group jobs by upload id
-    upload_ids = np.unique(
-        [str(job["upload_id"]) for job in user_workspace_jobs]
-    ).tolist()
-
     task_table: list[DocIngestionStatusZip] = []
-    for upload_id in upload_ids:
-        group = [job for job in user_workspace_jobs if job["upload_id"] == upload_id]
-        tasks = sorted(group, key=lambda x: x["created_datetime_utc"])
-
-        if len(group) == 1:
+    for upload_id, tasks in uploads.items():
+        if len(tasks) == 1:
             task = tasks[0]
 
             zip_task = dict(
@@ -445,7 +646,7 @@ async def get_all_jobs(
                 workspace_id=int(tasks[0]["workspace_id"]),
                 parent_file_name=tasks[0]["parent_file_name"],
                 created_datetime_utc=tasks[0]["created_datetime_utc"],
-                docs_total=len(group),
+                docs_total=len(tasks),
             )
 
             # Get the zip status and docs indexed numbers
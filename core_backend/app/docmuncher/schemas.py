@@ -30,6 +30,7 @@ class DocUploadResponsePdf(DocUploadResponseBase):
     task_id: str
     doc_name: str
     task_status: DocStatusEnum = DocStatusEnum.not_started
+    pages_total: int = 0
 
 
 class DocUploadResponseZip(DocUploadResponseBase):
@@ -50,7 +51,11 @@ class DocIngestionStatusBase(BaseModel):
 class DocIngestionStatusPdf(DocUploadResponsePdf, DocIngestionStatusBase):
     """Pydantic model for document ingestion status."""
 
-    pass
+    chunks_processed: int = 0
+    chunks_total: int = 0
+    pages_text_layer: int = 0
+    pages_ocr: int = 0
+    pages_ocr_cached: int = 0
 
 
 class DocIngestionStatusZip(DocUploadResponseBase, DocIngestionStatusBase):
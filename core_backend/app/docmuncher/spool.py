@@ -0,0 +1,154 @@
+"""This module contains the spooling of docmuncher uploads to disk.
+
+Uploaded files are copied to `DOCMUNCHER_SPOOL_DIR` in fixed-size blocks, and the PDF
+members of a zip file are extracted one at a time, so that an upload is never held in
+memory as a whole. Jobs refer to their spooled PDF file, which is deleted once the job
+has finished. The spool directory must be shared by the backend and the docmuncher
+workers.
+"""
+
+import asyncio
+import zipfile
+from pathlib import Path
+from typing import BinaryIO
+
+from PyPDF2 import PdfReader
+
+from ..utils import delete_spooled_file, spool_stream
+from .config import DOCMUNCHER_SPOOL_BLOCK_SIZE, DOCMUNCHER_SPOOL_DIR
+
+
+def _spool_stream(*, extension: str, stream: BinaryIO) -> Path:
+    """Copy a stream to a new file in the spool directory, one block at a time.
+
+    Parameters
+    ----------
+    extension
+        The file extension, including the leading dot.
+    stream
+        The stream to copy.
+
+    Returns
+    -------
+    Path
+        The path of the spooled file.
+    """
+
+    return spool_stream(
+        block_size=DOCMUNCHER_SPOOL_BLOCK_SIZE,
+        directory=DOCMUNCHER_SPOOL_DIR,
+        extension=extension,
+        stream=stream,
+    )
+
+
+async def spool_upload(*, extension: str, stream: BinaryIO) -> Path:
+    """Spool an uploaded file to disk without blocking the event loop.
+
+    Parameters
+    ----------
+    extension
+        The file extension, including the leading dot.
+    stream
+        The file-like object of the upload.
+
+    Returns
+    -------
+    Path
+        The path of the spooled file.
+    """
+
+    return await asyncio.to_thread(_spool_stream, extension=extension, stream=stream)
+
+
+def _extract_pdf_members(zip_path: Path) -> list[tuple[str, Path]]:
+    """Extract the PDF members of a spooled zip file, one member at a time.
+
+    Parameters
+    ----------
+    zip_path
+        The path of the spooled zip file.
+
+    Returns
+    -------
+    list[tuple[str, Path]]
+        The name and spooled path of each PDF member.
+    """
+
+    pdf_files: list[tuple[str, Path]] = []
+    try:
+        with zipfile.ZipFile(zip_path) as zip_file:
+            for member in zip_file.infolist():
+                if member.is_dir() or not member.filename.endswith(".pdf"):
+                    continue
+                with zip_file.open(member) as member_stream:
+                    pdf_path = _spool_stream(extension=".pdf", stream=member_stream)
+                pdf_files.append((member.filename, pdf_path))
+    except Exception:
+        delete_spooled_files([path for _, path in pdf_files])
+        raise
+    return pdf_files
+
+
+async def extract_pdf_members(*, zip_path: Path) -> list[tuple[str, Path]]:
+    """Extract the PDF members of a spooled zip file without blocking the event loop.
+
+    Parameters
+    ----------
+    zip_path
+        The path of the spooled zip file.
+
+    Returns
+    -------
+    list[tuple[str, Path]]
+        The name and spooled path of each PDF member.
+    """
+
+    return await asyncio.to_thread(_extract_pdf_members, zip_path)
+
+
+async def count_spooled_pdf_pages(*, path: Path) -> int:
+    """Count the number of pages of a spooled PDF file.
+
+    Parameters
+    ----------
+    path
+        The path of the spooled PDF file.
+
+    Returns
+    -------
+    int
+        The number of pages.
+    """
+
+    return await asyncio.to_thread(lambda: len(PdfReader(path).pages))
+
+
+async def read_spooled_file(*, path: Path | str) -> bytes:
+    """Read a spooled file without blocking the event loop.
+
+    Parameters
+    ----------
+    path
+        The path of the spooled file.
+
+    Returns
+    -------
+    bytes
+        The content of the file.
+    """
+
+    return await asyncio.to_thread(Path(path).read_bytes)
+
+
+def delete_spooled_files(paths: list[Path]) -> None:
+    """Delete spooled files, if they exist.
+
+    Parameters
+    ----------
+    paths
+        The paths of the spooled files.
+    """
+
+    for path in paths:
+        delete_spooled_file(path)
@@ -0,0 +1,174 @@
+"""This module contains the local text-layer extraction used by docmuncher.
+
+Born-digital PDFs carry a text layer that can be converted to markdown locally,
+without a remote OCR request. Each page is classified by the quality of its text
+layer: pages with enough readable text are extracted here, with headers detected from
+font sizes so that `chunk_markdown_text_by_headers` can split them, while scanned or
+image-only pages are left for the OCR backend.
+"""
+
+from collections import Counter
+from io import BytesIO
+from typing import Any, Optional
+
+from PyPDF2 import PageObject, PdfReader
+
+from .config import DOCMUNCHER_TEXT_LAYER_MIN_CHARS
+
+# Minimum share of readable characters in the text layer. Fonts without a usable
+# encoding produce replacement or control characters instead of text.
+MIN_READABLE_CHAR_RATIO = 0.9
+# Minimum ratio of the font size of a line to the body font size of the page for the
+# line to be a header, for each header level.
+HEADER_FONT_SIZE_RATIOS = [("#", 1.6), ("##", 1.3), ("###", 1.15)]
+# Longer lines are never headers.
+MAX_HEADER_LENGTH = 100
+
+
+def _effective_font_size(
+    cm: list[float], tm: list[float], font_size: Optional[float]
+) -> float:
+    """Get the rendered font size of a text run.
+
+    Parameters
+    ----------
+    cm
+        The current transformation matrix.
+    tm
+        The text matrix.
+    font_size
+        The font size set by the `Tf` operator.
+
+    Returns
+    -------
+    float
+        The font size scaled by the vertical scale of the text and transformation
+        matrices.
+    """
+
+    scale = abs(tm[3] * cm[3]) or 1.0
+    return (font_size or 0.0) * scale
+
+
+def _extract_lines(page: PageObject) -> list[tuple[str, float]]:
+    """Extract the lines of text of a page, with the largest font size in each line.
+
+    Parameters
+    ----------
+    page
+        The PDF page.
+
+    Returns
+    -------
+    list[tuple[str, float]]
+        The text and font size of each line.
+    """
+
+    lines: list[tuple[str, float]] = []
+    current_text = ""
+    current_size = 0.0
+
+    def _visit_text(
+        text: str, cm: list[float], tm: list[float], _: Any, font_size: float
+    ) -> None:
+        nonlocal current_text, current_size
+        for i, fragment in enumerate(text.split("\n")):
+            if i > 0:
+                lines.append((current_text, current_size))
+                current_text, current_size = "", 0.0
+            current_text += fragment
+            if fragment.strip():
+                current_size = max(
+                    current_size, _effective_font_size(cm, tm, font_size)
+                )
+
+    page.extract_text(visitor_text=_visit_text)
+    lines.append((current_text, current_size))
+    return [(text.strip(), size) for text, size in lines if text.strip()]
+
+
+def is_text_layer_usable(text: str) -> bool:
+    """Determine if the text layer of a page can be used instead of OCR.
+
+    Parameters
+    ----------
+    text
+        The text extracted from the page.
+
+    Returns
+    -------
+    bool
+        True if the page has enough readable text, False if it is likely scanned or
+        image-only.
+    """
+
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < DOCMUNCHER_TEXT_LAYER_MIN_CHARS:
+        return False
+    n_readable = sum(c.isprintable() and c != "\ufffd" for c in chars)
+    return n_readable / len(chars) >= MIN_READABLE_CHAR_RATIO
+
+
+def convert_lines_to_markdown(lines: list[tuple[str, float]]) -> str:
+    """Convert lines of text to markdown, marking lines in larger fonts as headers.
+
+    Parameters
+    ----------
+    lines
+        The text and font size of each line.
+
+    Returns
+    -------
+    str
+        The markdown text.
+    """
+
+    # The body font size is the size used for most characters on the page
+    size_counts: Counter = Counter()
+    for text, size in lines:
+        size_counts[round(size, 1)] += len(text)
+    body_size = size_counts.most_common(1)[0][0] if size_counts else 0.0
+
+    markdown_lines = []
+    for text, size in lines:
+        prefix = ""
+        if body_size > 0 and len(text) <= MAX_HEADER_LENGTH:
+            for header, ratio in HEADER_FONT_SIZE_RATIOS:
+                if size >= body_size * ratio:
+                    prefix = f"{header} "
+                    break
+        markdown_lines.append(f"{prefix}{text}")
+    return "\n".join(markdown_lines)
+
+
+def extract_text_layer_pages(content: bytes) -> tuple[int, dict[int, dict]]:
+    """Extract the markdown of every page of a PDF file with a usable text layer.
+
+    This function is CPU-bound and should be run in a thread.
+
+    Parameters
+    ----------
+    content
+        The content of the PDF file.
+
+    Returns
+    -------
+    tuple[int, dict[int, dict]]
+        The number of pages in the PDF file, and the page `index` and `markdown` of
+        each page with a usable text layer, keyed by the page index.
+    """
+
+    reader = PdfReader(BytesIO(content))
+    text_layer_pages: dict[int, dict] = {}
+    for i, page in enumerate(reader.pages):
+        try:
+            lines = _extract_lines(page)
+        except Exception:
+            # Leave pages whose text layer cannot be parsed to the OCR backend
+            continue
+        if is_text_layer_usable("".join(text for text, _ in lines)):
+            text_layer_pages[i] = {
+                "index": i,
+                "markdown": convert_lines_to_markdown(lines),
+            }
+    return len(reader.pages), text_layer_pages
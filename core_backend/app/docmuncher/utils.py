@@ -1,10 +1,46 @@
+import asyncio
 import re
+from typing import Any
 
 from langchain_core.documents import Document
 
 from ..config import LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE
 from ..llm_call.llm_prompts import SYSTEM_SINGLE_LINE_CARD, USER_SINGLE_LINE_CARD
 from ..llm_call.utils import _ask_llm_async
+from .config import DOCMUNCHER_LLM_MAX_CONCURRENCY
+
+
+async def ask_llm_with_concurrency_limit(
+    *,
+    litellm_model: str,
+    llm_semaphores: dict[str, asyncio.Semaphore],
+    **kwargs: Any,
+) -> str:
+    """
+    Call `_ask_llm_async` while holding the semaphore for `litellm_model`, so that
+    at most `DOCMUNCHER_LLM_MAX_CONCURRENCY` calls to the same model are in flight.
+
+    Parameters
+    ----------
+    litellm_model
+        The name of the LLM model for the `litellm` proxy server.
+    llm_semaphores
+        The semaphore of each LLM model, owned by the worker or application running
+        the jobs. The semaphore of a model is created on its first call.
+    kwargs
+        Additional keyword arguments for `_ask_llm_async`.
+
+    Returns
+    -------
+    str
+        The response from the LLM model.
+    """
+    semaphore = llm_semaphores.get(litellm_model)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(DOCMUNCHER_LLM_MAX_CONCURRENCY)
+        llm_semaphores[litellm_model] = semaphore
+    async with semaphore:
+        return await _ask_llm_async(litellm_model=litellm_model, **kwargs)
 
 
 def is_image_only_card(chunk: Document) -> bool:
@@ -63,7 +99,9 @@ def is_table_in_card(chunk: Document) -> bool:
     return False
 
 
-async def is_content_single_line(chunk: Document) -> bool:
+async def is_content_single_line(
+    *, chunk: Document, llm_semaphores: dict[str, asyncio.Semaphore]
+) -> bool:
     """
     Determine if a card contains only a single line of content.
 
@@ -71,6 +109,8 @@ async def is_content_single_line(chunk: Document) -> bool:
     ----------
     chunk
         The document chunk to analyze.
+    llm_semaphores
+        The semaphore of each LLM model, see `ask_llm_with_concurrency_limit`.
 
     Returns
     -------
@@ -80,9 +120,10 @@ async def is_content_single_line(chunk: Document) -> bool:
     content = chunk.page_content.strip()
     if len(content.split("\n")) > 1:
         return False
-    is_single_line = await _ask_llm_async(
+    is_single_line = await ask_llm_with_concurrency_limit(
         json_=False,
         litellm_model=LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE,
+        llm_semaphores=llm_semaphores,
         metadata=chunk.metadata,
         system_message=SYSTEM_SINGLE_LINE_CARD,
         user_message=USER_SINGLE_LINE_CARD.format(content=content),
@@ -1,7 +1,5 @@
 """This module contains LLM functions for the dashboard."""
 
-from bertopic import BERTopic
-
 from ..config import LITELLM_MODEL_DASHBOARD_SUMMARY, LITELLM_MODEL_TOPIC_MODEL
 from ..dashboard.config import DISABLE_DASHBOARD_LLM
 from ..utils import setup_logger
@@ -51,7 +49,7 @@ async def generate_topic_label(
     context: str,
     sample_texts: list[str],
     topic_id: int,
-    topic_model: BERTopic,
+    topic_keywords: list[str],
     workspace_id: int,
 ) -> dict[str, str]:
     """Generate topic labels for example queries.
@@ -64,8 +62,8 @@ async def generate_topic_label(
         The sample texts to use for generating the topic label.
     topic_id
         The topic ID.
-    topic_model
-        The topic model object.
+    topic_keywords
+        The keywords of the topic in the topic model, most representative first.
     workspace_id
         The workspace ID.
 
@@ -82,19 +80,15 @@ async def generate_topic_label(
         logger.info("LLM functionality is disabled. Generating labels using KeyBERT.")
 
         # Use KeyBERT-inspired method to generate topic labels.
-        # Assume topic_model is provided.
-        topic_info = topic_model.get_topic(topic_id)
-        if not topic_info:
+        if not topic_keywords:
             logger.warning(f"No topic info found for topic_id {topic_id}.")
             return {"topic_title": "Unknown", "topic_summary": "Not available."}
 
-        # Extract top keywords.
-        top_keywords = [word for word, _ in topic_info]
-        topic_title = ", ".join(top_keywords[:3])  # Use top 3 keywords as title
+        topic_title = ", ".join(topic_keywords[:3])  # Use top 3 keywords as title
 
         # Use all keywords as summary.
         # Line formatting looks odd since 'pre-wrap' is enabled on the frontend.
-        topic_summary = f"""{" ".join(top_keywords)}
+        topic_summary = f"""{" ".join(topic_keywords)}
 
 Hint: To enable full AI summaries please set the DASHBOARD_LLM environment variable to "True" in your configuration."""  # noqa: E501
         logger.info(
@@ -8,7 +8,7 @@ from pydantic import ValidationError
 
 from ..config import LITELLM_MODEL_URGENCY_DETECT
 from ..utils import setup_logger
-from .llm_prompts import UrgencyDetectionEntailment
+from .llm_prompts import UrgencyDetectionEntailment, UrgencyDetectionEntailmentBatch
 from .utils import _ask_llm_async
 
 logger = setup_logger()
@@ -52,3 +52,49 @@ async def detect_urgency(
         parsed_json = ud_entailment.default_json
 
     return UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult(**parsed_json)
+
+
+async def detect_urgency_batch(
+    *, messages: list[str], metadata: Optional[dict] = None, urgency_rules: list[str]
+) -> list[UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult]:
+    """Detects the urgency of several messages in a single LLM call.
+
+    Parameters
+    ----------
+    messages
+        The messages to detect the urgency of.
+    metadata
+        Additional metadata to pass to the LLM model.
+    urgency_rules
+        A list of urgency rules.
+
+    Returns
+    -------
+    list[UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult]
+        The urgency detection result for each message, in the same order as
+        `messages`.
+    """
+
+    ud_entailment = UrgencyDetectionEntailmentBatch(urgency_rules=urgency_rules)
+    prompt = ud_entailment.get_prompt()
+
+    json_str = await _ask_llm_async(
+        json_=True,
+        litellm_model=LITELLM_MODEL_URGENCY_DETECT,
+        metadata=metadata,
+        system_message=prompt,
+        user_message=ud_entailment.get_user_message(messages=messages),
+    )
+
+    try:
+        parsed_jsons = ud_entailment.parse_json_batch(
+            json_str=json_str, n_messages=len(messages)
+        )
+    except (AttributeError, ValueError) as e:
+        logger.warning(f"JSON Decode failed. json_str: {json_str}. Exception: {e}")
+        parsed_jsons = [ud_entailment.default_json for _ in messages]
+
+    return [
+        UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult(**parsed_json)
+        for parsed_json in parsed_jsons
+    ]
@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
+import json
 import re
 import textwrap
 from enum import Enum
 from typing import ClassVar, Literal
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from .utils import format_prompt, remove_json_markdown
 
@@ -688,6 +689,104 @@ class UrgencyDetectionEntailment:
         return prompt
 
 
+class UrgencyDetectionEntailmentBatch(UrgencyDetectionEntailment):
+    """Urgency detection using entailment for several messages in one LLM call."""
+
+    _prompt_base: str = textwrap.dedent(
+        """
+        You are a highly sensitive urgency detector. You will be given a JSON list
+        of user messages, each with a `message_id`. For EACH message, score if ANY
+        part of the message corresponds to any part of the urgency rules provided
+        below. Ignore any part of a message that does not correspond to the rules.
+        For each message, respond with (a) the rule that is most consistent with the
+        message, (b) the probability between 0 and 1 with increments of 0.1 that ANY
+        part of the message matches the rule, and (c) the reason for the
+        probability.
+
+
+        Respond in json string with one result per message:
+
+        {
+           results: [
+               {
+                   message_id: int
+                   best_matching_rule: str
+                   probability: float
+                   reason: str
+               }
+           ]
+        }
+        """
+    ).strip()
+
+    def parse_json_batch(self, *, json_str: str, n_messages: int) -> list[dict]:
+        """Validate the output of the batch urgency detection entailment task.
+
+        Results that are missing or invalid are replaced with `default_json`.
+
+        Parameters
+        ----------
+        json_str
+            The JSON string to validate.
+        n_messages
+            The number of messages that were sent to the LLM.
+
+        Returns
+        -------
+        list[dict]
+            The validated JSON response for each message, in message order.
+
+        Raises
+        ------
+        ValueError
+            If the response does not contain a list of results.
+        """
+
+        json_str = remove_json_markdown(text=json_str)
+        results = json.loads(json_str).get("results")
+        if not isinstance(results, list):
+            raise ValueError("Response does not contain a list of results.")
+
+        parsed_results = [dict(self.default_json) for _ in range(n_messages)]
+        for result in results:
+            if not isinstance(result, dict):
+                continue
+            message_id = result.pop("message_id", None)
+            if not isinstance(message_id, int) or not 0 <= message_id < n_messages:
+                continue
+            try:
+                parsed_results[message_id] = self.parse_json(
+                    json_str=json.dumps(result)
+                )
+            except (ValidationError, ValueError):
+                continue
+
+        return parsed_results
+
+    @staticmethod
+    def get_user_message(*, messages: list[str]) -> str:
+        """Return the user message containing the messages to classify.
+
+        Parameters
+        ----------
+        messages
+            The messages to classify.
+
+        Returns
+        -------
+        str
+            The JSON list of messages with their IDs.
+        """
+
+        return json.dumps(
+            [
+                {"message_id": i, "message_text": message}
+                for i, message in enumerate(messages)
+            ],
+            ensure_ascii=False,
+        )
+
+
 def get_feedback_summary_prompt(*, content: str, content_title: str) -> str:
     """Return the prompt for the feedback summarization task.
 
@@ -5,10 +5,13 @@
 3. Errors sent to the user in the `QueryResponseErrorDB` database.
 4. Response feedback provided by users in the `ResponseFeedbackDB` database.
 5. Content feedback provided by users in the `ContentFeedbackDB` database.
+6. Embeddings computed for queries at search time in the `QueryEmbeddingDB` database.
 """
 
 from datetime import datetime, timezone
+from typing import Optional
 
+from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
     JSON,
     Boolean,
@@ -19,9 +22,11 @@ from sqlalchemy import (
     String,
     select,
 )
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from ..config import LITELLM_MODEL_EMBEDDING
 from ..contents.models import ContentDB
 from ..models import Base, JSONDict
 from ..utils import generate_secret_key
@@ -88,6 +93,45 @@ class QueryDB(Base):
         )
 
 
+class QueryEmbeddingDB(Base):
+    """ORM for storing the embedding of a query computed at search time, so that
+    analytics such as topic modeling reuse it instead of embedding the query again.
+
+    The vector has no fixed size, and each embedding records its model, so that
+    embeddings of a previous embedding model can be told apart and replaced.
+    """
+
+    __tablename__ = "query_embedding"
+
+    created_datetime_utc: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    embedding_model: Mapped[str] = mapped_column(String, nullable=False)
+    query_embedding: Mapped[Vector] = mapped_column(Vector(), nullable=False)
+    query_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("query.query_id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    workspace_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("workspace.workspace_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        """Construct the string representation of the `QueryEmbeddingDB` object.
+
+        Returns
+        -------
+        str
+            A string representation of the `QueryEmbeddingDB` object.
+        """
+
+        return f"<Embedding of query #{self.query_id} by {self.embedding_model}>"
+
+
 class QueryResponseDB(Base):
     """ORM for managing query responses sent to the user.
 
@@ -302,6 +346,41 @@ async def check_secret_key_match(
     return (query_record is not None) and (query_record[0] == secret_key)
 
 
+async def get_query_embeddings(
+    *,
+    asession: AsyncSession,
+    embedding_model: Optional[str] = None,
+    query_ids: list[int],
+) -> dict[int, list[float]]:
+    """Get the embeddings of queries persisted at search time.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    embedding_model
+        The embedding model of the embeddings. Defaults to `LITELLM_MODEL_EMBEDDING`.
+    query_ids
+        The IDs of the queries.
+
+    Returns
+    -------
+    dict[int, list[float]]
+        The embedding of each query that has one from the embedding model.
+    """
+
+    if not query_ids:
+        return {}
+
+    stmt = select(QueryEmbeddingDB.query_id, QueryEmbeddingDB.query_embedding).where(
+        QueryEmbeddingDB.query_id.in_(query_ids),
+        QueryEmbeddingDB.embedding_model
+        == (embedding_model or LITELLM_MODEL_EMBEDDING),
+    )
+    rows = (await asession.execute(stmt)).all()
+    return {query_id: query_embedding for query_id, query_embedding in rows}
+
+
 async def save_content_feedback_to_db(
     *, asession: AsyncSession, feedback: ContentFeedback
 ) -> ContentFeedbackDB:
@@ -382,6 +461,55 @@ async def save_content_for_query_to_db(
     await asession.commit()
 
 
+async def save_query_embeddings_to_db(
+    *,
+    asession: AsyncSession,
+    embedding_model: Optional[str] = None,
+    query_embeddings: dict[int, list[float]],
+    workspace_id: int,
+) -> None:
+    """Save the embeddings of queries to the database, replacing any previous
+    embedding of the same queries.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    embedding_model
+        The embedding model of the embeddings. Defaults to `LITELLM_MODEL_EMBEDDING`.
+    query_embeddings
+        The embedding of each query, by query ID.
+    workspace_id
+        The ID of the workspace of the queries.
+    """
+
+    if not query_embeddings:
+        return
+
+    stmt = pg_insert(QueryEmbeddingDB).values(
+        [
+            {
+                "created_datetime_utc": datetime.now(timezone.utc),
+                "embedding_model": embedding_model or LITELLM_MODEL_EMBEDDING,
+                "query_embedding": query_embedding,
+                "query_id": query_id,
+                "workspace_id": workspace_id,
+            }
+            for query_id, query_embedding in query_embeddings.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[QueryEmbeddingDB.query_id],
+        set_={
+            "created_datetime_utc": stmt.excluded.created_datetime_utc,
+            "embedding_model": stmt.excluded.embedding_model,
+            "query_embedding": stmt.excluded.query_embedding,
+        },
+    )
+    await asession.execute(stmt)
+    await asession.commit()
+
+
 async def save_query_response_to_db(
     *,
     asession: AsyncSession,
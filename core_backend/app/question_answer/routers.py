@@ -2,6 +2,7 @@
 endpoints.
 """
 
+import asyncio
 import json
 import os
 from io import BytesIO
@@ -24,7 +25,7 @@ from ..config import (
     USE_CROSS_ENCODER,
 )
 from ..contents.models import (
-    get_similar_content_async,
+    get_search_results,
     increment_query_count,
     update_votes_in_db,
 )
@@ -52,6 +53,7 @@ from ..turnio.requests import send_turn_text_message
 from ..turnio.schemas import TurnTextMessage
 from ..users.models import WorkspaceDB
 from ..utils import (
+    embedding,
     generate_random_filename,
     get_random_int32,
     setup_logger,
@@ -63,6 +65,7 @@ from .models import (
     check_secret_key_match,
     save_content_feedback_to_db,
     save_content_for_query_to_db,
+    save_query_embeddings_to_db,
     save_query_response_to_db,
     save_response_feedback_to_db,
     save_user_query_to_db,
@@ -80,6 +83,9 @@ from .speech_components.external_voice_components import transcribe_audio
 from .speech_components.utils import download_file_from_url, post_to_speech_stt
 
 logger = setup_logger()
+# Keep references to the background tasks that persist query embeddings, so that they
+# are not garbage collected before they complete.
+QUERY_EMBEDDING_TASKS: set[asyncio.Task] = set()
 
 
 TAG_METADATA = {
@@ -807,12 +813,28 @@ async def get_search_response(
 
     logger.info(f"Searching for similar content to: {query_refined.query_text}")
 
-    search_results = await get_similar_content_async(
+    # Use latest transformed version of the text.
+    question_embedding = await embedding(text_to_embed=query_refined.query_text)
+
+    # The embedding is persisted for analytics in the background, so that it does not
+    # delay the response.
+    if response.query_id is not None:
+        task = asyncio.create_task(
+            _save_query_embedding(
+                query_embedding=question_embedding,
+                query_id=response.query_id,
+                workspace_id=workspace_id,
+            )
+        )
+        QUERY_EMBEDDING_TASKS.add(task)
+        task.add_done_callback(QUERY_EMBEDDING_TASKS.discard)
+
+    search_results = await get_search_results(
         asession=asession,
         exclude_archived=exclude_archived,
         exclude_unvalidated=exclude_unvalidated,
         n_similar=n_to_crossencoder if USE_CROSS_ENCODER == "True" else n_similar,
-        question=query_refined.query_text,  # Use latest transformed version of the text
+        question_embedding=question_embedding,
         workspace_id=workspace_id,
     )
 
@@ -829,6 +851,42 @@ async def get_search_response(
     return response
 
 
+@with_new_session
+async def _save_query_embedding(
+    *,
+    asession: AsyncSession | None = None,
+    query_embedding: list[float],
+    query_id: int,
+    workspace_id: int,
+) -> None:
+    """Save the embedding of a query computed at search time. Failures are logged
+    rather than raised, since the embedding is only used for analytics.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections. The default
+        for this should be `None` since it is provided by the `with_new_session`
+        decorator.
+    query_embedding
+        The embedding of the query.
+    query_id
+        The ID of the query.
+    workspace_id
+        The ID of the workspace of the query.
+    """
+
+    assert asession is not None
+    try:
+        await save_query_embeddings_to_db(
+            asession=asession,
+            query_embeddings={query_id: query_embedding},
+            workspace_id=workspace_id,
+        )
+    except Exception as e:  # pylint: disable=W0718
+        logger.error(f"Failed to save the embedding of query #{query_id}: {e}")
+
+
 def rerank_search_results(
     *,
     n_similar: int,
@@ -0,0 +1,763 @@
+"""This module contains the background re-embedding job for embedding model migrations.
+
+Changing `LITELLM_MODEL_EMBEDDING` or `PGVECTOR_VECTOR_SIZE` leaves every stored
+content and urgency rule vector stale. The job re-embeds each table with the new model
+into a shadow vector column, while search keeps using the current column:
+
+1. The shadow columns are added to the table, along with a trigger that resets the
+   shadow vector of a row whenever its embedded text changes.
+2. Rows without a shadow vector are embedded in ID order, in rate-limited batches. The
+   cursor and progress are checkpointed in Redis after each batch, so that an
+   interrupted job resumes where it stopped.
+3. The indexes of the shadow columns are built concurrently, without blocking writes.
+4. Once every row has a shadow vector, the shadow columns and indexes replace the
+   current ones in a single transaction.
+
+Queries are embedded with the configured model, so the backend must be redeployed with
+the new `LITELLM_MODEL_EMBEDDING` and `PGVECTOR_VECTOR_SIZE` right after the switch.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import Optional, TypedDict
+
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from .config import PGVECTOR_DISTANCE, PGVECTOR_EF_CONSTRUCTION, PGVECTOR_M
+from .contents.models import get_embedding_fingerprint
+from .database import get_sqlalchemy_async_engine
+from .urgency_rules.models import invalidate_urgency_rule_cache
+from .utils import (
+    EmbeddingCallException,
+    embedding_batch,
+    get_embedding_model_name,
+    setup_logger,
+)
+
+REEMBEDDING_KEY_PREFIX = "reembedding:"
+SHADOW_SUFFIX = "_shadow"
+# Maximum time to wait for the table lock of the switch, so that the switch never
+# queues every other query of the table behind a long-running transaction.
+SWITCH_LOCK_TIMEOUT = "10s"
+
+logger = setup_logger()
+
+
+class ReembeddingIncompleteError(Exception):
+    """Exception raised when switching to a shadow column that is not fully filled."""
+
+
+class EmbeddingTarget(TypedDict):
+    """A table whose vectors are re-embedded.
+
+    The embedded text of a row is the concatenation of its `text_columns`, separated
+    by newlines.
+    """
+
+    fingerprint_column: Optional[str]
+    fingerprint_index: Optional[str]
+    id_column: str
+    table: str
+    text_columns: list[str]
+    vector_column: str
+    vector_index: Optional[str]
+
+
+class ReembeddingStatus(TypedDict):
+    """The checkpoint of the re-embedding job of a table.
+
+    `last_id` is the ID of the last embedded row of the current pass, or `None` at the
+    start of a pass.
+    """
+
+    last_id: Optional[int]
+    model: str
+    rows_embedded: int
+    rows_failed: int
+    status: str
+    updated_datetime_utc: str
+    vector_size: int
+
+
+EMBEDDING_TARGETS: dict[str, EmbeddingTarget] = {
+    "content": EmbeddingTarget(
+        fingerprint_column="content_embedding_fingerprint",
+        fingerprint_index="ix_content_embedding_fingerprint",
+        id_column="content_id",
+        table="content",
+        text_columns=["content_title", "content_text"],
+        vector_column="content_embedding",
+        vector_index="ix_content_embedding",
+    ),
+    "urgency_rule": EmbeddingTarget(
+        fingerprint_column=None,
+        fingerprint_index=None,
+        id_column="urgency_rule_id",
+        table="urgency_rule",
+        text_columns=["urgency_rule_text"],
+        vector_column="urgency_rule_vector",
+        vector_index=None,
+    ),
+}
+
+
+class RequestRateLimiter:
+    """Space out requests to stay under a maximum number of requests per minute."""
+
+    def __init__(self, *, max_requests_per_minute: int) -> None:
+        """Initialize the rate limiter.
+
+        Parameters
+        ----------
+        max_requests_per_minute
+            The maximum number of requests per minute. Requests are not limited if
+            this is not positive.
+        """
+
+        self.interval = (
+            60.0 / max_requests_per_minute if max_requests_per_minute > 0 else 0.0
+        )
+        self.next_request_time = 0.0
+
+    async def wait(self) -> None:
+        """Wait until the next request is allowed."""
+
+        now = time.monotonic()
+        if self.next_request_time > now:
+            await asyncio.sleep(self.next_request_time - now)
+        self.next_request_time = max(now, self.next_request_time) + self.interval
+
+
+def get_shadow_name(name: str) -> str:
+    """Get the name of the shadow of a column or index.
+
+    Parameters
+    ----------
+    name
+        The name of the column or index.
+
+    Returns
+    -------
+    str
+        The name of its shadow.
+    """
+
+    return f"{name}{SHADOW_SUFFIX}"
+
+
+def _get_trigger_name(*, target: EmbeddingTarget) -> str:
+    """Get the name of the trigger, and trigger function, that resets shadow vectors.
+
+    Parameters
+    ----------
+    target
+        The re-embedded table.
+
+    Returns
+    -------
+    str
+        The name of the trigger.
+    """
+
+    return f"reembedding_reset_{target['table']}"
+
+
+def _get_shadow_table(*, target: EmbeddingTarget, vector_size: int) -> sa.TableClause:
+    """Get a lightweight table construct with the columns used by the job.
+
+    Parameters
+    ----------
+    target
+        The re-embedded table.
+    vector_size
+        The size of the shadow vectors.
+
+    Returns
+    -------
+    sa.TableClause
+        The table construct.
+    """
+
+    columns = [
+        sa.column(target["id_column"], sa.Integer),
+        sa.column(get_shadow_name(target["vector_column"]), Vector(vector_size)),
+        *[sa.column(column, sa.Text) for column in target["text_columns"]],
+    ]
+    if target["fingerprint_column"] is not None:
+        columns.append(
+            sa.column(get_shadow_name(target["fingerprint_column"]), sa.String)
+        )
+    return sa.table(target["table"], *columns)
+
+
+async def get_reembedding_status(
+    *, redis: aioredis.Redis, table: str
+) -> Optional[ReembeddingStatus]:
+    """Get the checkpoint of the re-embedding job of a table from Redis.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+    table
+        The name of the table.
+
+    Returns
+    -------
+    Optional[ReembeddingStatus]
+        The checkpoint, or `None` if the table has never been re-embedded.
+    """
+
+    status = await redis.get(f"{REEMBEDDING_KEY_PREFIX}{table}")
+    return None if status is None else json.loads(status)
+
+
+async def save_reembedding_status(
+    *, redis: aioredis.Redis, status: ReembeddingStatus, table: str
+) -> None:
+    """Save the checkpoint of the re-embedding job of a table in Redis.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance.
+    status
+        The checkpoint.
+    table
+        The name of the table.
+    """
+
+    status["updated_datetime_utc"] = datetime.now(timezone.utc).isoformat()
+    await redis.set(f"{REEMBEDDING_KEY_PREFIX}{table}", json.dumps(status))
+
+
+async def prepare_shadow_columns(
+    *, asession: AsyncSession, target: EmbeddingTarget, vector_size: int
+) -> None:
+    """Add the shadow columns of a table and the trigger that resets them.
+
+    This is idempotent, so that a resumed job keeps the shadow vectors already
+    written.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    target
+        The re-embedded table.
+    vector_size
+        The size of the shadow vectors.
+    """
+
+    table = target["table"]
+    trigger_name = _get_trigger_name(target=target)
+    shadow_columns = {
+        get_shadow_name(target["vector_column"]): f"vector({vector_size})"
+    }
+    if target["fingerprint_column"] is not None:
+        shadow_columns[get_shadow_name(target["fingerprint_column"])] = "varchar(64)"
+
+    for column, column_type in shadow_columns.items():
+        await asession.execute(
+            sa.text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}"
+            )
+        )
+
+    resets = " ".join(f"NEW.{column} := NULL;" for column in shadow_columns)
+    await asession.execute(
+        sa.text(
+            f"CREATE OR REPLACE FUNCTION {trigger_name}() RETURNS trigger AS $$ "
+            f"BEGIN {resets} RETURN NEW; END; $$ LANGUAGE plpgsql"
+        )
+    )
+    changed = " OR ".join(
+        f"OLD.{column} IS DISTINCT FROM NEW.{column}"
+        for column in target["text_columns"]
+    )
+    await asession.execute(sa.text(f"DROP TRIGGER IF EXISTS {trigger_name} ON {table}"))
+    await asession.execute(
+        sa.text(
+            f"CREATE TRIGGER {trigger_name} BEFORE UPDATE OF "
+            f"{', '.join(target['text_columns'])} ON {table} FOR EACH ROW "
+            f"WHEN ({changed}) EXECUTE FUNCTION {trigger_name}()"
+        )
+    )
+    await asession.commit()
+
+
+async def drop_shadow_columns(
+    *, asession: AsyncSession, target: EmbeddingTarget
+) -> None:
+    """Drop the shadow columns, indexes and trigger of an abandoned job.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    target
+        The re-embedded table.
+    """
+
+    table = target["table"]
+    trigger_name = _get_trigger_name(target=target)
+    await asession.execute(sa.text(f"DROP TRIGGER IF EXISTS {trigger_name} ON {table}"))
+    await asession.execute(sa.text(f"DROP FUNCTION IF EXISTS {trigger_name}()"))
+    for column in (target["vector_column"], target["fingerprint_column"]):
+        if column is not None:
+            await asession.execute(
+                sa.text(
+                    f"ALTER TABLE {table} DROP COLUMN IF EXISTS "
+                    f"{get_shadow_name(column)}"
+                )
+            )
+    await asession.commit()
+
+
+async def _embed_texts(
+    *, model: str, rate_limiter: RequestRateLimiter, texts: list[str]
+) -> list[Optional[list[float]]]:
+    """Embed a batch of texts, falling back to one call per text if the batch fails.
+
+    Parameters
+    ----------
+    model
+        The embedding model.
+    rate_limiter
+        The rate limiter of the embedding calls.
+    texts
+        The texts to embed.
+
+    Returns
+    -------
+    list[Optional[list[float]]]
+        The embedding of each text, or `None` if the text could not be embedded.
+    """
+
+    metadata = {"generation_name": "reembedding"}
+    await rate_limiter.wait()
+    try:
+        return list(
+            await embedding_batch(metadata=metadata, model=model, texts_to_embed=texts)
+        )
+    except EmbeddingCallException as e:
+        logger.warning(f"Batch embedding call failed, embedding each text: {str(e)}")
+
+    embeddings: list[Optional[list[float]]] = []
+    for text in texts:
+        await rate_limiter.wait()
+        try:
+            embeddings.extend(
+                await embedding_batch(
+                    metadata=metadata, model=model, texts_to_embed=[text]
+                )
+            )
+        except EmbeddingCallException as e:
+            logger.error(f"Failed to embed text: {str(e)}")
+            embeddings.append(None)
+    return embeddings
+
+
+async def fill_shadow_column(
+    *,
+    asession: AsyncSession,
+    batch_size: int,
+    rate_limiter: RequestRateLimiter,
+    redis: aioredis.Redis,
+    status: ReembeddingStatus,
+    target: EmbeddingTarget,
+) -> ReembeddingStatus:
+    """Embed every row of a table without a shadow vector, one batch at a time.
+
+    Rows are embedded in ID order from the checkpointed cursor to the end of the
+    table, then once more from the start of the table to pick up the rows inserted or
+    edited behind the cursor and the rows that failed. A shadow vector is only
+    written if the embedded text of the row has not changed in the meantime.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    batch_size
+        The number of rows to embed per embedding call.
+    rate_limiter
+        The rate limiter of the embedding calls.
+    redis
+        The Redis instance holding the checkpoint.
+    status
+        The checkpoint of the job.
+    target
+        The re-embedded table.
+
+    Returns
+    -------
+    ReembeddingStatus
+        The updated checkpoint.
+
+    Raises
+    ------
+    ValueError
+        If the embedding model does not return vectors of the expected size.
+    """
+
+    vector_size = status["vector_size"]
+    model_name = await get_embedding_model_name(model=status["model"])
+    table = _get_shadow_table(target=target, vector_size=vector_size)
+    id_column = table.c[target["id_column"]]
+    vector_column = table.c[get_shadow_name(target["vector_column"])]
+    text_to_embed = sa.func.concat_ws(
+        "\n", *[table.c[column] for column in target["text_columns"]]
+    )
+    values = {vector_column.name: sa.bindparam("b_vector")}
+    if target["fingerprint_column"] is not None:
+        values[get_shadow_name(target["fingerprint_column"])] = sa.bindparam(
+            "b_fingerprint"
+        )
+    update_stmt = (
+        table.update()
+        .where(id_column == sa.bindparam("b_id"))
+        .where(text_to_embed == sa.bindparam("b_text_to_embed"))
+        .values(values)
+    )
+
+    n_passes = 0
+    while n_passes < 2:
+        stmt = (
+            sa.select(id_column, text_to_embed.label("text_to_embed"))
+            .where(vector_column.is_(None))
+            .order_by(id_column)
+            .limit(batch_size)
+        )
+        if status["last_id"] is not None:
+            stmt = stmt.where(id_column > status["last_id"])
+        rows = (await asession.execute(stmt)).all()
+        if not rows:
+            n_passes += 1
+            status["last_id"] = None
+            continue
+
+        embeddings = await _embed_texts(
+            model=status["model"],
+            rate_limiter=rate_limiter,
+            texts=[row.text_to_embed for row in rows],
+        )
+        params = []
+        for row, row_embedding in zip(rows, embeddings):
+            if row_embedding is None:
+                status["rows_failed"] += 1
+                continue
+            if len(row_embedding) != vector_size:
+                raise ValueError(
+                    f"Model {status['model']} returned vectors of size "
+                    f"{len(row_embedding)} instead of {vector_size}"
+                )
+            params.append(
+                {
+                    "b_fingerprint": get_embedding_fingerprint(
+                        model=model_name,
+                        text_to_embed=row.text_to_embed,
+                        vector_size=vector_size,
+                    ),
+                    "b_id": getattr(row, target["id_column"]),
+                    "b_text_to_embed": row.text_to_embed,
+                    "b_vector": row_embedding,
+                }
+            )
+        if params:
+            await asession.execute(update_stmt, params)
+        await asession.commit()
+
+        status["last_id"] = getattr(rows[-1], target["id_column"])
+        status["rows_embedded"] += len(params)
+        await save_reembedding_status(redis=redis, status=status, table=target["table"])
+        logger.info(
+            f"Re-embedded {status['rows_embedded']} rows of {target['table']} "
+            f"(cursor at ID {status['last_id']})"
+        )
+
+    return status
+
+
+async def count_missing_shadow_vectors(
+    *, asession: AsyncSession, target: EmbeddingTarget
+) -> int:
+    """Count the rows of a table without a shadow vector.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    target
+        The re-embedded table.
+
+    Returns
+    -------
+    int
+        The number of rows without a shadow vector.
+    """
+
+    result = await asession.execute(
+        sa.text(
+            f"SELECT count(*) FROM {target['table']} "
+            f"WHERE {get_shadow_name(target['vector_column'])} IS NULL"
+        )
+    )
+    return result.scalar_one()
+
+
+async def build_shadow_indexes(*, engine: AsyncEngine, target: EmbeddingTarget) -> None:
+    """Build the indexes of the shadow columns of a table concurrently.
+
+    `CREATE INDEX CONCURRENTLY` does not block writes, but cannot run in a
+    transaction, and leaves an invalid index behind if it fails. An invalid index
+    left by a previous run is dropped and built again.
+
+    Parameters
+    ----------
+    engine
+        The SQLAlchemy async engine.
+    target
+        The re-embedded table.
+    """
+
+    index_definitions = []
+    if target["vector_index"] is not None:
+        index_definitions.append(
+            (
+                get_shadow_name(target["vector_index"]),
+                f"USING hnsw ({get_shadow_name(target['vector_column'])} "
+                f"{PGVECTOR_DISTANCE}) WITH (m = {PGVECTOR_M}, "
+                f"ef_construction = {PGVECTOR_EF_CONSTRUCTION})",
+            )
+        )
+    if target["fingerprint_index"] is not None:
+        index_definitions.append(
+            (
+                get_shadow_name(target["fingerprint_index"]),
+                f"({get_shadow_name(str(target['fingerprint_column']))})",
+            )
+        )
+
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        for index_name, definition in index_definitions:
+            is_valid = (
+                await connection.execute(
+                    sa.text(
+                        "SELECT i.indisvalid FROM pg_index i "
+                        "JOIN pg_class c ON c.oid = i.indexrelid "
+                        "WHERE c.relname = :index_name"
+                    ),
+                    {"index_name": index_name},
+                )
+            ).scalar_one_or_none()
+            if is_valid:
+                continue
+            if is_valid is not None:
+                logger.info(f"Dropping invalid index {index_name}")
+                await connection.execute(
+                    sa.text(f"DROP INDEX CONCURRENTLY {index_name}")
+                )
+            logger.info(f"Building index {index_name}")
+            await connection.execute(
+                sa.text(
+                    f"CREATE INDEX CONCURRENTLY {index_name} "
+                    f"ON {target['table']} {definition}"
+                )
+            )
+
+
+async def switch_to_shadow_columns(
+    *, asession: AsyncSession, target: EmbeddingTarget
+) -> None:
+    """Replace the vector columns and indexes of a table with their shadows.
+
+    The switch runs in a single transaction, under an exclusive lock of the table,
+    so that search moves from the old vectors to the new ones at once.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    target
+        The re-embedded table.
+
+    Raises
+    ------
+    ReembeddingIncompleteError
+        If any row of the table does not have a shadow vector.
+    """
+
+    table = target["table"]
+    trigger_name = _get_trigger_name(target=target)
+    await asession.execute(sa.text(f"SET LOCAL lock_timeout = '{SWITCH_LOCK_TIMEOUT}'"))
+    await asession.execute(sa.text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+    n_missing = await count_missing_shadow_vectors(asession=asession, target=target)
+    if n_missing > 0:
+        await asession.rollback()
+        raise ReembeddingIncompleteError(
+            f"{n_missing} rows of {table} do not have a shadow vector yet"
+        )
+
+    await asession.execute(sa.text(f"DROP TRIGGER {trigger_name} ON {table}"))
+    await asession.execute(sa.text(f"DROP FUNCTION {trigger_name}()"))
+    # Dropping the old columns drops their indexes too.
+    for column, index in (
+        (target["vector_column"], target["vector_index"]),
+        (target["fingerprint_column"], target["fingerprint_index"]),
+    ):
+        if column is None:
+            continue
+        await asession.execute(sa.text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+        await asession.execute(
+            sa.text(
+                f"ALTER TABLE {table} RENAME COLUMN {get_shadow_name(column)} "
+                f"TO {column}"
+            )
+        )
+        if index is not None:
+            await asession.execute(
+                sa.text(f"ALTER INDEX {get_shadow_name(index)} RENAME TO {index}")
+            )
+    await asession.execute(
+        sa.text(
+            f"ALTER TABLE {table} ALTER COLUMN {target['vector_column']} SET NOT NULL"
+        )
+    )
+    await asession.commit()
+
+
+async def _invalidate_urgency_rule_caches(
+    *, asession: AsyncSession, redis: aioredis.Redis
+) -> None:
+    """Make every worker reload the urgency rule vectors of every workspace.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance holding the urgency rule version counters.
+    """
+
+    workspace_ids = (
+        await asession.execute(
+            sa.text("SELECT DISTINCT workspace_id FROM urgency_rule")
+        )
+    ).scalars()
+    for workspace_id in workspace_ids:
+        await invalidate_urgency_rule_cache(redis=redis, workspace_id=workspace_id)
+
+
+async def run_reembedding(
+    *,
+    batch_size: int,
+    fill: bool = True,
+    max_requests_per_minute: int,
+    model: str,
+    redis: aioredis.Redis,
+    switch: bool = True,
+    tables: list[str],
+    vector_size: int,
+) -> None:
+    """Re-embed the vectors of tables with an embedding model.
+
+    Parameters
+    ----------
+    batch_size
+        The number of rows to embed per embedding call.
+    fill
+        Specifies whether to embed the rows without a shadow vector. If `False`, the
+        job only switches to shadow columns filled by a previous run.
+    max_requests_per_minute
+        The maximum number of embedding calls per minute.
+    model
+        The new embedding model.
+    redis
+        The Redis instance holding the checkpoints.
+    switch
+        Specifies whether to switch to the shadow columns once they are filled.
+    tables
+        The names of the tables to re-embed, from `EMBEDDING_TARGETS`.
+    vector_size
+        The size of the vectors of the new embedding model.
+
+    Raises
+    ------
+    ReembeddingIncompleteError
+        If a table cannot be switched because some of its rows were not embedded.
+    """
+
+    engine = get_sqlalchemy_async_engine()
+    rate_limiter = RequestRateLimiter(max_requests_per_minute=max_requests_per_minute)
+
+    for table in tables:
+        target = EMBEDDING_TARGETS[table]
+        async with AsyncSession(engine, expire_on_commit=False) as asession:
+            status = await get_reembedding_status(redis=redis, table=table)
+            is_same_job = (
+                status is not None
+                and status["model"] == model
+                and status["vector_size"] == vector_size
+            )
+            if is_same_job and status is not None and status["status"] == "switched":
+                logger.info(f"{table} is already embedded with {model}")
+                continue
+            if not fill and not is_same_job:
+                raise ReembeddingIncompleteError(
+                    f"{table} has no shadow columns embedded with {model}"
+                )
+
+            if fill:
+                if status is None or not is_same_job:
+                    if status is not None:
+                        logger.info(
+                            f"Discarding the shadow columns of {table} embedded with "
+                            f"{status['model']}"
+                        )
+                        await drop_shadow_columns(asession=asession, target=target)
+                    status = ReembeddingStatus(
+                        last_id=None,
+                        model=model,
+                        rows_embedded=0,
+                        rows_failed=0,
+                        status="in_progress",
+                        updated_datetime_utc="",
+                        vector_size=vector_size,
+                    )
+                    await save_reembedding_status(
+                        redis=redis, status=status, table=table
+                    )
+                await prepare_shadow_columns(
+                    asession=asession, target=target, vector_size=vector_size
+                )
+                status["rows_failed"] = 0
+                status = await fill_shadow_column(
+                    asession=asession,
+                    batch_size=batch_size,
+                    rate_limiter=rate_limiter,
+                    redis=redis,
+                    status=status,
+                    target=target,
+                )
+
+            await build_shadow_indexes(engine=engine, target=target)
+            if not switch:
+                n_missing = await count_missing_shadow_vectors(
+                    asession=asession, target=target
+                )
+                logger.info(f"{table} has {n_missing} rows without a shadow vector")
+                continue
+
+            await switch_to_shadow_columns(asession=asession, target=target)
+            assert status is not None
+            status["status"] = "switched"
+            await save_reembedding_status(redis=redis, status=status, table=table)
+            if table == "urgency_rule":
+                await _invalidate_urgency_rule_caches(asession=asession, redis=redis)
+            logger.info(f"Switched {table} to vectors embedded with {model}")
@@ -2,9 +2,30 @@
 
 import os
 
-# cosine_distance_classifier, llm_entailment_classifier
+# cosine_distance_classifier, llm_entailment_classifier, cascade_classifier
 URGENCY_CLASSIFIER = os.environ.get("URGENCY_CLASSIFIER", "cosine_distance_classifier")
 URGENCY_DETECTION_MAX_DISTANCE = os.environ.get("URGENCY_DETECTION_MAX_DISTANCE", 0.5)
 URGENCY_DETECTION_MIN_PROBABILITY = os.environ.get(
     "URGENCY_DETECTION_MIN_PROBABILITY", 0.5
 )
+
+# cascade_classifier: messages closer than URGENCY_CASCADE_URGENT_MAX_DISTANCE to any
+# rule are urgent and messages farther than URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE
+# from every rule are not urgent, without calling the LLM. Anything in between is
+# sent to the LLM with the URGENCY_CASCADE_TOP_K closest rules. Calibrate the
+# thresholds with `validation/urgency_detection/validate_ud.py`.
+URGENCY_CASCADE_URGENT_MAX_DISTANCE = os.environ.get(
+    "URGENCY_CASCADE_URGENT_MAX_DISTANCE", 0.2
+)
+URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE = os.environ.get(
+    "URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE", 0.7
+)
+URGENCY_CASCADE_TOP_K = os.environ.get("URGENCY_CASCADE_TOP_K", 5)
+
+# Batch urgency detection
+URGENCY_DETECTION_BATCH_MAX_SIZE = int(
+    os.environ.get("URGENCY_DETECTION_BATCH_MAX_SIZE", 100)
+)
+URGENCY_DETECTION_BATCH_LLM_CHUNK_SIZE = os.environ.get(
+    "URGENCY_DETECTION_BATCH_LLM_CHUNK_SIZE", 10
+)
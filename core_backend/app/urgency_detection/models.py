@@ -4,7 +4,7 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import JSON, Boolean, DateTime, Integer, String, select
+from sqlalchemy import JSON, Boolean, DateTime, Integer, String, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.schema import ForeignKey
@@ -201,3 +201,77 @@ async def save_urgency_response_to_db(
     await asession.commit()
     await asession.refresh(urgency_query_responses_db)
     return urgency_query_responses_db
+
+
+async def save_urgency_queries_and_responses_to_db(
+    *,
+    asession: AsyncSession,
+    feedback_secret_keys: list[str],
+    message_datetime_utc: datetime,
+    responses: list[UrgencyResponse],
+    urgency_queries: list[UrgencyQuery],
+    workspace_id: int,
+) -> list[int]:
+    """Bulk insert urgency queries and their responses in a single transaction.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    feedback_secret_keys
+        The secret key for the feedback of each urgency query.
+    message_datetime_utc
+        The datetime at which the urgency queries were received.
+    responses
+        The urgency response for each urgency query.
+    urgency_queries
+        The urgency queries to save to the database.
+    workspace_id
+        The ID of the workspace to save the urgency queries to.
+
+    Returns
+    -------
+    list[int]
+        The IDs of the saved urgency queries, in the same order as `urgency_queries`.
+    """
+
+    if len(urgency_queries) == 0:
+        return []
+
+    query_stmt = insert(UrgencyQueryDB).returning(
+        UrgencyQueryDB.urgency_query_id, sort_by_parameter_order=True
+    )
+    query_rows = await asession.execute(
+        query_stmt,
+        [
+            {
+                "feedback_secret_key": feedback_secret_key,
+                "message_datetime_utc": message_datetime_utc,
+                "message_text": urgency_query.message_text,
+                "workspace_id": workspace_id,
+            }
+            for feedback_secret_key, urgency_query in zip(
+                feedback_secret_keys, urgency_queries
+            )
+        ],
+    )
+    urgency_query_ids = list(query_rows.scalars().all())
+
+    response_datetime_utc = datetime.now(timezone.utc)
+    await asession.execute(
+        insert(UrgencyResponseDB),
+        [
+            {
+                "details": response.model_dump()["details"],
+                "is_urgent": response.is_urgent,
+                "matched_rules": response.matched_rules,
+                "query_id": urgency_query_id,
+                "response_datetime_utc": response_datetime_utc,
+                "workspace_id": workspace_id,
+            }
+            for urgency_query_id, response in zip(urgency_query_ids, responses)
+        ],
+    )
+    await asession.commit()
+
+    return urgency_query_ids
@@ -1,27 +1,47 @@
 """This module contains FastAPI routers for urgency detection endpoints."""
 
+import asyncio
+from datetime import datetime, timezone
 from typing import Callable
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from langfuse.decorators import langfuse_context, observe  # type: ignore
+from redis import asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth.dependencies import authenticate_key, rate_limiter
+from ..auth.dependencies import authenticate_key, consume_api_quota, rate_limiter
+from ..config import CHECK_API_LIMIT
 from ..database import get_async_session
-from ..llm_call.entailment import detect_urgency
+from ..llm_call.entailment import detect_urgency, detect_urgency_batch
+from ..llm_call.llm_prompts import UrgencyDetectionEntailment
 from ..urgency_rules.models import (
     get_cosine_distances_from_rules,
+    get_cosine_distances_from_rules_batch,
     get_urgency_rules_from_db,
 )
+from ..urgency_rules.schemas import UrgencyRuleCosineDistance
 from ..users.models import WorkspaceDB
 from ..utils import generate_secret_key, setup_logger
 from .config import (
+    URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE,
+    URGENCY_CASCADE_TOP_K,
+    URGENCY_CASCADE_URGENT_MAX_DISTANCE,
     URGENCY_CLASSIFIER,
+    URGENCY_DETECTION_BATCH_LLM_CHUNK_SIZE,
     URGENCY_DETECTION_MAX_DISTANCE,
     URGENCY_DETECTION_MIN_PROBABILITY,
 )
-from .models import save_urgency_query_to_db, save_urgency_response_to_db
-from .schemas import UrgencyQuery, UrgencyResponse
+from .models import (
+    save_urgency_queries_and_responses_to_db,
+    save_urgency_query_to_db,
+    save_urgency_response_to_db,
+)
+from .schemas import (
+    UrgencyQuery,
+    UrgencyQueryBatch,
+    UrgencyResponse,
+    UrgencyResponseBatch,
+)
 
 TAG_METADATA = {
     "name": "Urgency detection",
@@ -36,6 +56,7 @@ router = APIRouter(
 )
 
 ALL_URGENCY_CLASSIFIERS = {}
+ALL_URGENCY_BATCH_CLASSIFIERS = {}
 
 
 def urgency_classifier(classifier_func: Callable) -> Callable:
@@ -56,10 +77,33 @@ def urgency_classifier(classifier_func: Callable) -> Callable:
     return classifier_func
 
 
+def urgency_batch_classifier(classifier_func: Callable) -> Callable:
+    """Decorator to register batch classifier functions.
+
+    The batch classifier is registered under the name of its function without the
+    `_batch` suffix, so that it matches the corresponding `URGENCY_CLASSIFIER`.
+
+    Parameters
+    ----------
+    classifier_func
+        The batch classifier function to register.
+
+    Returns
+    -------
+    Callable
+        The batch classifier function.
+    """
+
+    classifier_name = classifier_func.__name__.removesuffix("_batch")
+    ALL_URGENCY_BATCH_CLASSIFIERS[classifier_name] = classifier_func
+    return classifier_func
+
+
 @router.post("/urgency-detect", response_model=UrgencyResponse)
 @observe()
 async def classify_text(
     urgency_query: UrgencyQuery,
+    request: Request,
     asession: AsyncSession = Depends(get_async_session),
     workspace_db: WorkspaceDB = Depends(authenticate_key),
 ) -> UrgencyResponse:
@@ -69,6 +113,8 @@ async def classify_text(
     ----------
     urgency_query
         The urgency query to classify.
+    request
+        The FastAPI request object.
     asession
         The SQLAlchemy async session to use for all database connections.
     workspace_db
@@ -99,6 +145,7 @@ async def classify_text(
 
     urgency_response = await classifier(
         asession=asession,
+        redis=request.app.state.redis,
         urgency_query=urgency_query,
         workspace_id=workspace_db.workspace_id,
     )
@@ -118,9 +165,89 @@ async def classify_text(
     return urgency_response
 
 
+@router.post("/urgency-detect/batch", response_model=UrgencyResponseBatch)
+@observe()
+async def classify_text_batch(
+    urgency_query_batch: UrgencyQueryBatch,
+    request: Request,
+    asession: AsyncSession = Depends(get_async_session),
+    workspace_db: WorkspaceDB = Depends(authenticate_key),
+) -> UrgencyResponseBatch:
+    """Classify the urgency of a batch of text messages.
+
+    All messages are embedded in a single embedding call and scored together. Each
+    message counts as one call against the daily API quota.
+
+    Parameters
+    ----------
+    urgency_query_batch
+        The batch of urgency queries to classify.
+    request
+        The FastAPI request object.
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    workspace_db
+        The authenticated workspace object.
+
+    Returns
+    -------
+    UrgencyResponseBatch
+        The urgency response for each query, in the same order as the queries.
+
+    Raises
+    ------
+    ValueError
+        If the urgency classifier is invalid.
+    """
+
+    urgency_queries = urgency_query_batch.urgency_queries
+    redis = request.app.state.redis
+
+    # NB: The router-level rate limiter has already charged one call.
+    if CHECK_API_LIMIT is not False and len(urgency_queries) > 1:
+        await consume_api_quota(
+            n_calls=len(urgency_queries) - 1, redis=redis, workspace_db=workspace_db
+        )
+
+    classifier = ALL_URGENCY_BATCH_CLASSIFIERS.get(URGENCY_CLASSIFIER)
+    if not classifier:
+        raise ValueError(f"Invalid urgency classifier: {URGENCY_CLASSIFIER}")
+
+    message_datetime_utc = datetime.now(timezone.utc)
+    urgency_responses = await classifier(
+        asession=asession,
+        redis=redis,
+        urgency_queries=urgency_queries,
+        workspace_id=workspace_db.workspace_id,
+    )
+
+    urgency_query_ids = await save_urgency_queries_and_responses_to_db(
+        asession=asession,
+        feedback_secret_keys=[generate_secret_key() for _ in urgency_queries],
+        message_datetime_utc=message_datetime_utc,
+        responses=urgency_responses,
+        urgency_queries=urgency_queries,
+        workspace_id=workspace_db.workspace_id,
+    )
+
+    langfuse_context.update_current_trace(
+        name="urgency_detection_batch",
+        metadata={
+            "urgency_query_ids": urgency_query_ids,
+            "workspace_id": workspace_db.workspace_id,
+        },
+    )
+
+    return UrgencyResponseBatch(urgency_responses=urgency_responses)
+
+
 @urgency_classifier
 async def cosine_distance_classifier(
-    *, asession: AsyncSession, urgency_query: UrgencyQuery, workspace_id: int
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_query: UrgencyQuery,
+    workspace_id: int,
 ) -> UrgencyResponse:
     """Classify the urgency of a text message using cosine distance.
 
@@ -128,6 +255,8 @@ async def cosine_distance_classifier(
     ----------
     asession
         The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance.
     urgency_query
         The urgency query to classify.
     workspace_id
@@ -142,6 +271,7 @@ async def cosine_distance_classifier(
     cosine_distances = await get_cosine_distances_from_rules(
         asession=asession,
         message_text=urgency_query.message_text,
+        redis=redis,
         workspace_id=workspace_id,
     )
     matched_rules = []
@@ -158,7 +288,11 @@ async def cosine_distance_classifier(
 
 @urgency_classifier
 async def llm_entailment_classifier(
-    *, asession: AsyncSession, urgency_query: UrgencyQuery, workspace_id: int
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_query: UrgencyQuery,
+    workspace_id: int,
 ) -> UrgencyResponse:
     """Classify the urgency of a text message using LLM entailment.
 
@@ -168,6 +302,8 @@ async def llm_entailment_classifier(
     ----------
     asession
         The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance.
     urgency_query
         The urgency query to classify.
     workspace_id
@@ -200,3 +336,360 @@ async def llm_entailment_classifier(
         )
 
     return UrgencyResponse(details=result, is_urgent=False, matched_rules=[])
+
+
+@urgency_classifier
+async def cascade_classifier(
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_query: UrgencyQuery,
+    workspace_id: int,
+) -> UrgencyResponse:
+    """Classify the urgency of a text message using cosine distance as a pre-filter
+    for LLM entailment.
+
+    The process is as follows:
+
+    1. Rank the urgency rules by cosine distance from the message.
+    2. If the closest rule is within `URGENCY_CASCADE_URGENT_MAX_DISTANCE`, then the
+        message is urgent and the LLM is skipped.
+    3. If the closest rule is beyond `URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE`, then
+        the message is not urgent and the LLM is skipped.
+    4. Otherwise, only the `URGENCY_CASCADE_TOP_K` closest rules are sent to the LLM
+        for entailment.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance.
+    urgency_query
+        The urgency query to classify.
+    workspace_id
+        The ID of the workspace to classify the urgency of the text message.
+
+    Returns
+    -------
+    UrgencyResponse
+        The urgency response object.
+    """
+
+    # 1.
+    cosine_distances = await get_cosine_distances_from_rules(
+        asession=asession,
+        message_text=urgency_query.message_text,
+        redis=redis,
+        workspace_id=workspace_id,
+    )
+    if len(cosine_distances) == 0:
+        return UrgencyResponse(details={}, is_urgent=False, matched_rules=[])
+
+    ranked_rules = [cosine_distances[i] for i in sorted(cosine_distances)]
+    min_distance = float(ranked_rules[0].distance)
+
+    # 2.
+    if min_distance < float(URGENCY_CASCADE_URGENT_MAX_DISTANCE):
+        matched_rules = [
+            str(rule.urgency_rule)
+            for rule in ranked_rules
+            if float(rule.distance) < float(URGENCY_CASCADE_URGENT_MAX_DISTANCE)
+        ]
+        return UrgencyResponse(
+            details=cosine_distances, is_urgent=True, matched_rules=matched_rules
+        )
+
+    # 3.
+    if min_distance > float(URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE):
+        return UrgencyResponse(
+            details=cosine_distances, is_urgent=False, matched_rules=[]
+        )
+
+    # 4.
+    metadata = {"trace_workspace_id": "workspace_id-" + str(workspace_id)}
+    shortlisted_rules = [
+        rule.urgency_rule for rule in ranked_rules[: int(URGENCY_CASCADE_TOP_K)]
+    ]
+    result = await detect_urgency(
+        message=urgency_query.message_text,
+        metadata=metadata,
+        urgency_rules=shortlisted_rules,
+    )
+
+    if result.probability > float(URGENCY_DETECTION_MIN_PROBABILITY):
+        return UrgencyResponse(
+            details=result, is_urgent=True, matched_rules=[result.best_matching_rule]
+        )
+
+    return UrgencyResponse(details=result, is_urgent=False, matched_rules=[])
+
+
+@urgency_batch_classifier
+async def cosine_distance_classifier_batch(
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_queries: list[UrgencyQuery],
+    workspace_id: int,
+) -> list[UrgencyResponse]:
+    """Classify the urgency of several text messages using cosine distance.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance.
+    urgency_queries
+        The urgency queries to classify.
+    workspace_id
+        The ID of the workspace to classify the urgency of the text messages.
+
+    Returns
+    -------
+    list[UrgencyResponse]
+        The urgency response for each query, in the same order as the queries.
+    """
+
+    cosine_distances_batch = await get_cosine_distances_from_rules_batch(
+        asession=asession,
+        message_texts=[urgency_query.message_text for urgency_query in urgency_queries],
+        redis=redis,
+        workspace_id=workspace_id,
+    )
+
+    urgency_responses = []
+    for cosine_distances in cosine_distances_batch:
+        matched_rules = _get_rules_within_distance(
+            cosine_distances=cosine_distances,
+            max_distance=float(URGENCY_DETECTION_MAX_DISTANCE),
+        )
+        urgency_responses.append(
+            UrgencyResponse(
+                details=cosine_distances,
+                is_urgent=len(matched_rules) > 0,
+                matched_rules=matched_rules,
+            )
+        )
+
+    return urgency_responses
+
+
+@urgency_batch_classifier
+async def llm_entailment_classifier_batch(
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_queries: list[UrgencyQuery],
+    workspace_id: int,
+) -> list[UrgencyResponse]:
+    """Classify the urgency of several text messages using LLM entailment, with one
+    LLM call per chunk of `URGENCY_DETECTION_BATCH_LLM_CHUNK_SIZE` messages.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance.
+    urgency_queries
+        The urgency queries to classify.
+    workspace_id
+        The ID of the workspace to classify the urgency of the text messages.
+
+    Returns
+    -------
+    list[UrgencyResponse]
+        The urgency response for each query, in the same order as the queries.
+    """
+
+    rules = await get_urgency_rules_from_db(
+        asession=asession, workspace_id=workspace_id
+    )
+    urgency_rules = [rule.urgency_rule_text for rule in rules]
+
+    if len(urgency_rules) == 0:
+        return [
+            UrgencyResponse(details={}, is_urgent=False, matched_rules=[])
+            for _ in urgency_queries
+        ]
+
+    metadata = {"trace_workspace_id": "workspace_id-" + str(workspace_id)}
+    chunk_size = int(URGENCY_DETECTION_BATCH_LLM_CHUNK_SIZE)
+    chunks = [
+        urgency_queries[i : i + chunk_size]
+        for i in range(0, len(urgency_queries), chunk_size)
+    ]
+    chunk_results = await asyncio.gather(
+        *[
+            detect_urgency_batch(
+                messages=[urgency_query.message_text for urgency_query in chunk],
+                metadata=metadata,
+                urgency_rules=urgency_rules,
+            )
+            for chunk in chunks
+        ]
+    )
+
+    return [
+        _convert_entailment_result_to_response(result=result)
+        for results in chunk_results
+        for result in results
+    ]
+
+
+@urgency_batch_classifier
+async def cascade_classifier_batch(
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_queries: list[UrgencyQuery],
+    workspace_id: int,
+) -> list[UrgencyResponse]:
+    """Classify the urgency of several text messages using cosine distance as a
+    pre-filter for LLM entailment.
+
+    Messages that the cosine distance thresholds cannot decide are sent to the LLM in
+    chunks of `URGENCY_DETECTION_BATCH_LLM_CHUNK_SIZE`, together with the union of
+    the `URGENCY_CASCADE_TOP_K` closest rules of each message in the chunk.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance.
+    urgency_queries
+        The urgency queries to classify.
+    workspace_id
+        The ID of the workspace to classify the urgency of the text messages.
+
+    Returns
+    -------
+    list[UrgencyResponse]
+        The urgency response for each query, in the same order as the queries.
+    """
+
+    cosine_distances_batch = await get_cosine_distances_from_rules_batch(
+        asession=asession,
+        message_texts=[urgency_query.message_text for urgency_query in urgency_queries],
+        redis=redis,
+        workspace_id=workspace_id,
+    )
+
+    urgency_responses: list[UrgencyResponse | None] = []
+    undecided_idxs = []
+    for idx, cosine_distances in enumerate(cosine_distances_batch):
+        if len(cosine_distances) == 0:
+            urgency_responses.append(
+                UrgencyResponse(details={}, is_urgent=False, matched_rules=[])
+            )
+            continue
+
+        min_distance = float(cosine_distances[0].distance)
+        if min_distance < float(URGENCY_CASCADE_URGENT_MAX_DISTANCE):
+            urgency_responses.append(
+                UrgencyResponse(
+                    details=cosine_distances,
+                    is_urgent=True,
+                    matched_rules=_get_rules_within_distance(
+                        cosine_distances=cosine_distances,
+                        max_distance=float(URGENCY_CASCADE_URGENT_MAX_DISTANCE),
+                    ),
+                )
+            )
+        elif min_distance > float(URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE):
+            urgency_responses.append(
+                UrgencyResponse(
+                    details=cosine_distances, is_urgent=False, matched_rules=[]
+                )
+            )
+        else:
+            urgency_responses.append(None)
+            undecided_idxs.append(idx)
+
+    if len(undecided_idxs) > 0:
+        metadata = {"trace_workspace_id": "workspace_id-" + str(workspace_id)}
+        chunk_size = int(URGENCY_DETECTION_BATCH_LLM_CHUNK_SIZE)
+        top_k = int(URGENCY_CASCADE_TOP_K)
+        chunks = [
+            undecided_idxs[i : i + chunk_size]
+            for i in range(0, len(undecided_idxs), chunk_size)
+        ]
+        chunk_tasks = []
+        for chunk in chunks:
+            shortlisted_rules: dict[str, None] = {}
+            for idx in chunk:
+                for rank in range(min(top_k, len(cosine_distances_batch[idx]))):
+                    rule = cosine_distances_batch[idx][rank].urgency_rule
+                    shortlisted_rules[rule] = None
+            chunk_tasks.append(
+                detect_urgency_batch(
+                    messages=[urgency_queries[idx].message_text for idx in chunk],
+                    metadata=metadata,
+                    urgency_rules=list(shortlisted_rules),
+                )
+            )
+        chunk_results = await asyncio.gather(*chunk_tasks)
+
+        for chunk, results in zip(chunks, chunk_results):
+            for idx, result in zip(chunk, results):
+                urgency_responses[idx] = _convert_entailment_result_to_response(
+                    result=result
+                )
+
+    return [
+        urgency_response
+        for urgency_response in urgency_responses
+        if urgency_response is not None
+    ]
+
+
+def _convert_entailment_result_to_response(
+    *, result: UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult
+) -> UrgencyResponse:
+    """Convert an LLM entailment result to an urgency response.
+
+    Parameters
+    ----------
+    result
+        The LLM entailment result.
+
+    Returns
+    -------
+    UrgencyResponse
+        The urgency response object.
+    """
+
+    if result.probability > float(URGENCY_DETECTION_MIN_PROBABILITY):
+        return UrgencyResponse(
+            details=result, is_urgent=True, matched_rules=[result.best_matching_rule]
+        )
+
+    return UrgencyResponse(details=result, is_urgent=False, matched_rules=[])
+
+
+def _get_rules_within_distance(
+    *, cosine_distances: dict[int, UrgencyRuleCosineDistance], max_distance: float
+) -> list[str]:
+    """Get the urgency rules that are closer than `max_distance` to a message.
+
+    Parameters
+    ----------
+    cosine_distances
+        The dictionary of urgency rules and their cosine distances from the message.
+    max_distance
+        The maximum cosine distance for a rule to be matched.
+
+    Returns
+    -------
+    list[str]
+        The matched urgency rules.
+    """
+
+    return [
+        str(rule.urgency_rule)
+        for rule in cosine_distances.values()
+        if float(rule.distance) < max_distance
+    ]
@@ -4,6 +4,7 @@ from pydantic import BaseModel, ConfigDict, Field
 
 from ..llm_call.entailment import UrgencyDetectionEntailment
 from ..urgency_rules.schemas import UrgencyRuleCosineDistance
+from .config import URGENCY_DETECTION_BATCH_MAX_SIZE
 
 
 class UrgencyQuery(BaseModel):
@@ -19,6 +20,24 @@ class UrgencyQuery(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UrgencyQueryBatch(BaseModel):
+    """Pydantic model for batch urgency detection queries."""
+
+    urgency_queries: list[UrgencyQuery] = Field(
+        ...,
+        max_length=URGENCY_DETECTION_BATCH_MAX_SIZE,
+        min_length=1,
+        examples=[
+            [
+                {"message_text": "I have a headache and blurry vision."},
+                {"message_text": "When should I start taking folic acid?"},
+            ]
+        ],
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UrgencyResponse(BaseModel):
     """Pydantic model for urgency detection responses."""
 
@@ -70,3 +89,15 @@ class UrgencyResponse(BaseModel):
             ]
         },
     )
+
+
+class UrgencyResponseBatch(BaseModel):
+    """Pydantic model for batch urgency detection responses."""
+
+    urgency_responses: list[UrgencyResponse] = Field(
+        ...,
+        description="The urgency response for each query, in the same order as the "
+        "queries in the request.",
+    )
+
+    model_config = ConfigDict(from_attributes=True)
@@ -3,9 +3,11 @@
 """
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, TypedDict
 
+import numpy as np
 from pgvector.sqlalchemy import Vector
+from redis import asyncio as aioredis
 from sqlalchemy import (
     JSON,
     DateTime,
@@ -20,9 +22,26 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 from ..config import PGVECTOR_VECTOR_SIZE
 from ..models import Base, JSONDict
-from ..utils import embedding
+from ..utils import embedding, embedding_batch
 from .schemas import UrgencyRuleCosineDistance, UrgencyRuleCreate
 
+# Redis key holding the version counter of the urgency rules for a workspace. Every
+# write to the `urgency_rule` table bumps the counter so that all workers drop their
+# cached rule matrix for that workspace.
+URGENCY_RULES_VERSION_KEY_PREFIX = "urgency_rules_version:"
+
+
+class UrgencyRuleMatrix(TypedDict):
+    """In-memory representation of the urgency rules for a workspace."""
+
+    rule_matrix: np.ndarray
+    rule_texts: list[str]
+    version: int
+
+
+# Per-worker cache of urgency rule matrices, keyed by workspace ID.
+_URGENCY_RULE_MATRIX_CACHE: dict[int, UrgencyRuleMatrix] = {}
+
 
 class UrgencyRuleDB(Base):
     """ORM for managing urgency detection rules.
@@ -66,7 +85,11 @@ class UrgencyRuleDB(Base):
 
 
 async def save_urgency_rule_to_db(
-    *, asession: AsyncSession, urgency_rule: UrgencyRuleCreate, workspace_id: int
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_rule: UrgencyRuleCreate,
+    workspace_id: int,
 ) -> UrgencyRuleDB:
     """Save urgency rule to the database.
 
@@ -74,6 +97,8 @@ async def save_urgency_rule_to_db(
     ----------
     asession
         The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance used to signal the change to all workers.
     urgency_rule
         The urgency rule to save to the database.
     workspace_id
@@ -103,6 +128,7 @@ async def save_urgency_rule_to_db(
     asession.add(urgency_rule_db)
     await asession.commit()
     await asession.refresh(urgency_rule_db)
+    await invalidate_urgency_rule_cache(redis=redis, workspace_id=workspace_id)
 
     return urgency_rule_db
 
@@ -110,6 +136,7 @@ async def save_urgency_rule_to_db(
 async def update_urgency_rule_in_db(
     *,
     asession: AsyncSession,
+    redis: aioredis.Redis,
     urgency_rule: UrgencyRuleCreate,
     urgency_rule_id: int,
     workspace_id: int,
@@ -120,6 +147,8 @@ async def update_urgency_rule_in_db(
     ----------
     asession
         The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance used to signal the change to all workers.
     urgency_rule
         The urgency rule to update.
     urgency_rule_id
@@ -151,12 +180,17 @@ async def update_urgency_rule_in_db(
     urgency_rule_db = await asession.merge(urgency_rule_db)
     await asession.commit()
     await asession.refresh(urgency_rule_db)
+    await invalidate_urgency_rule_cache(redis=redis, workspace_id=workspace_id)
 
     return urgency_rule_db
 
 
 async def delete_urgency_rule_from_db(
-    *, asession: AsyncSession, urgency_rule_id: int, workspace_id: int
+    *,
+    asession: AsyncSession,
+    redis: aioredis.Redis,
+    urgency_rule_id: int,
+    workspace_id: int,
 ) -> None:
     """Delete urgency rule from the database.
 
@@ -164,6 +198,8 @@ async def delete_urgency_rule_from_db(
     ----------
     asession
         The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance used to signal the change to all workers.
     urgency_rule_id
         The ID of the urgency rule to delete.
     workspace_id
@@ -177,6 +213,7 @@ async def delete_urgency_rule_from_db(
     )
     await asession.execute(stmt)
     await asession.commit()
+    await invalidate_urgency_rule_cache(redis=redis, workspace_id=workspace_id)
 
 
 async def get_urgency_rule_by_id_from_db(
@@ -250,16 +287,25 @@ async def get_urgency_rules_from_db(
 
 
 async def get_cosine_distances_from_rules(
-    *, asession: AsyncSession, message_text: str, workspace_id: int
+    *,
+    asession: AsyncSession,
+    message_text: str,
+    redis: aioredis.Redis,
+    workspace_id: int,
 ) -> dict[int, UrgencyRuleCosineDistance]:
     """Get cosine distances from urgency rules.
 
+    The distances are computed in memory against the cached urgency rule matrix for
+    the workspace, so the database is only hit when the rules have changed.
+
     Parameters
     ----------
     asession
         The SQLAlchemy async session to use for all database connections.
     message_text
         The message text to compare against the urgency rules.
+    redis
+        The Redis instance holding the urgency rule version counters.
     workspace_id
         The ID of the workspace containing the urgency rules.
 
@@ -274,23 +320,192 @@ async def get_cosine_distances_from_rules(
         "generation_name": "get_cosine_distances_from_rules",
     }
     message_vector = await embedding(metadata=metadata, text_to_embed=message_text)
-    query = (
-        select(
-            UrgencyRuleDB,
-            UrgencyRuleDB.urgency_rule_vector.cosine_distance(message_vector).label(
-                "distance"
-            ),
-        )
-        .where(UrgencyRuleDB.workspace_id == workspace_id)
-        .order_by("distance")
+    urgency_rule_matrix = await get_urgency_rule_matrix(
+        asession=asession, redis=redis, workspace_id=workspace_id
+    )
+    distances = compute_cosine_distances(
+        message_vector=message_vector,
+        rule_matrix=urgency_rule_matrix["rule_matrix"],
     )
-
-    search_result = (await asession.execute(query)).all()
 
     results_dict = {}
-    for i, r in enumerate(search_result):
+    for i, rule_idx in enumerate(np.argsort(distances, kind="stable")):
         results_dict[i] = UrgencyRuleCosineDistance(
-            distance=r[1], urgency_rule=r[0].urgency_rule_text
+            distance=float(distances[rule_idx]),
+            urgency_rule=urgency_rule_matrix["rule_texts"][rule_idx],
         )
 
     return results_dict
+
+
+async def get_cosine_distances_from_rules_batch(
+    *,
+    asession: AsyncSession,
+    message_texts: list[str],
+    redis: aioredis.Redis,
+    workspace_id: int,
+) -> list[dict[int, UrgencyRuleCosineDistance]]:
+    """Get cosine distances from urgency rules for several messages.
+
+    All messages are embedded in a single embedding call and scored against the
+    cached urgency rule matrix for the workspace in a single matrix operation.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    message_texts
+        The message texts to compare against the urgency rules.
+    redis
+        The Redis instance holding the urgency rule version counters.
+    workspace_id
+        The ID of the workspace containing the urgency rules.
+
+    Returns
+    -------
+    list[dict[int, UrgencyRuleCosineDistance]]
+        The dictionary of urgency rules and their cosine distances for each message,
+        in the same order as `message_texts`.
+    """
+
+    metadata = {
+        "trace_workspace_id": "workspace_id-" + str(workspace_id),
+        "generation_name": "get_cosine_distances_from_rules_batch",
+    }
+    message_vectors = await embedding_batch(
+        metadata=metadata, texts_to_embed=message_texts
+    )
+    urgency_rule_matrix = await get_urgency_rule_matrix(
+        asession=asession, redis=redis, workspace_id=workspace_id
+    )
+    rule_texts = urgency_rule_matrix["rule_texts"]
+    if len(rule_texts) == 0:
+        return [{} for _ in message_texts]
+
+    distance_matrix = compute_cosine_distances(
+        message_vector=np.asarray(message_vectors, dtype=np.float32),
+        rule_matrix=urgency_rule_matrix["rule_matrix"],
+    )
+
+    results = []
+    for distances in distance_matrix:
+        results.append(
+            {
+                i: UrgencyRuleCosineDistance(
+                    distance=float(distances[rule_idx]),
+                    urgency_rule=rule_texts[rule_idx],
+                )
+                for i, rule_idx in enumerate(np.argsort(distances, kind="stable"))
+            }
+        )
+
+    return results
+
+
+def clear_urgency_rule_matrix_cache() -> None:
+    """Clear the urgency rule matrices cached in the current worker."""
+
+    _URGENCY_RULE_MATRIX_CACHE.clear()
+
+
+def compute_cosine_distances(
+    *, message_vector: list[float] | np.ndarray, rule_matrix: np.ndarray
+) -> np.ndarray:
+    """Compute the cosine distances between message vectors and a matrix of
+    L2-normalized urgency rule vectors.
+
+    Parameters
+    ----------
+    message_vector
+        The embedding of the message, or a matrix with one message embedding per row.
+    rule_matrix
+        The matrix of L2-normalized urgency rule vectors, one row per rule.
+
+    Returns
+    -------
+    np.ndarray
+        The cosine distance of the message from each urgency rule. If
+        `message_vector` is a matrix, then one row of distances per message.
+    """
+
+    message_array = np.asarray(message_vector, dtype=np.float32)
+    if rule_matrix.shape[0] == 0:
+        return np.empty(message_array.shape[:-1] + (0,), dtype=np.float32)
+
+    message_norms = np.linalg.norm(message_array, axis=-1, keepdims=True)
+    message_norms[message_norms == 0] = 1.0
+    message_array = message_array / message_norms
+
+    return 1.0 - message_array @ rule_matrix.T
+
+
+async def get_urgency_rule_matrix(
+    *, asession: AsyncSession, redis: aioredis.Redis, workspace_id: int
+) -> UrgencyRuleMatrix:
+    """Get the urgency rule matrix for a workspace.
+
+    The matrix is cached per worker and reloaded from the database only when the
+    workspace's urgency rule version in Redis differs from the cached version.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    redis
+        The Redis instance holding the urgency rule version counters.
+    workspace_id
+        The ID of the workspace to get the urgency rule matrix for.
+
+    Returns
+    -------
+    UrgencyRuleMatrix
+        The urgency rule matrix for the workspace.
+    """
+
+    version_value = await redis.get(f"{URGENCY_RULES_VERSION_KEY_PREFIX}{workspace_id}")
+    version = int(version_value) if version_value is not None else 0
+
+    cached_matrix = _URGENCY_RULE_MATRIX_CACHE.get(workspace_id)
+    if cached_matrix is not None and cached_matrix["version"] == version:
+        return cached_matrix
+
+    stmt = (
+        select(UrgencyRuleDB.urgency_rule_text, UrgencyRuleDB.urgency_rule_vector)
+        .where(UrgencyRuleDB.workspace_id == workspace_id)
+        .order_by(UrgencyRuleDB.urgency_rule_id)
+    )
+    rows = (await asession.execute(stmt)).all()
+
+    rule_matrix = np.array(
+        [row.urgency_rule_vector for row in rows], dtype=np.float32
+    ).reshape(len(rows), int(PGVECTOR_VECTOR_SIZE))
+    row_norms = np.linalg.norm(rule_matrix, axis=1, keepdims=True)
+    row_norms[row_norms == 0] = 1.0
+
+    urgency_rule_matrix = UrgencyRuleMatrix(
+        rule_matrix=rule_matrix / row_norms,
+        rule_texts=[row.urgency_rule_text for row in rows],
+        version=version,
+    )
+    _URGENCY_RULE_MATRIX_CACHE[workspace_id] = urgency_rule_matrix
+
+    return urgency_rule_matrix
+
+
+async def invalidate_urgency_rule_cache(
+    *, redis: aioredis.Redis, workspace_id: int
+) -> None:
+    """Signal all workers that the urgency rules for a workspace have changed.
+
+    NB: This must be called after the change has been committed so that workers
+    reloading the rules see the new state.
+
+    Parameters
+    ----------
+    redis
+        The Redis instance holding the urgency rule version counters.
+    workspace_id
+        The ID of the workspace whose urgency rules have changed.
+    """
+
+    await redis.incr(f"{URGENCY_RULES_VERSION_KEY_PREFIX}{workspace_id}")
@@ -2,7 +2,7 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.exceptions import HTTPException
 from langfuse.decorators import langfuse_context, observe  # type: ignore
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -36,6 +36,7 @@ logger = setup_logger(name=__name__)
 @observe()
 async def create_urgency_rule(
     urgency_rule: UrgencyRuleCreate,
+    request: Request,
     calling_user_db: Annotated[UserDB, Depends(get_current_user)],
     workspace_name: Annotated[str, Depends(get_current_workspace_name)],
     asession: AsyncSession = Depends(get_async_session),
@@ -46,6 +47,8 @@ async def create_urgency_rule(
     ----------
     urgency_rule
         The urgency rule to create.
+    request
+        The FastAPI request object.
     calling_user_db
         The user object associated with the user that is creating the urgency rule.
     workspace_name
@@ -84,6 +87,7 @@ async def create_urgency_rule(
 
         urgency_rule_db = await save_urgency_rule_to_db(
             asession=asession,
+            redis=request.app.state.redis,
             urgency_rule=urgency_rule,
             workspace_id=workspace_db.workspace_id,
         )
@@ -151,6 +155,7 @@ async def get_urgency_rule(
 @router.delete("/{urgency_rule_id}")
 async def delete_urgency_rule(
     urgency_rule_id: int,
+    request: Request,
     calling_user_db: Annotated[UserDB, Depends(get_current_user)],
     workspace_name: Annotated[str, Depends(get_current_workspace_name)],
     asession: AsyncSession = Depends(get_async_session),
@@ -161,6 +166,8 @@ async def delete_urgency_rule(
     ----------
     urgency_rule_id
         The ID of the urgency rule to delete.
+    request
+        The FastAPI request object.
     calling_user_db
         The user object associated with the user that is deleting the urgency rule.
     workspace_name
@@ -204,7 +211,10 @@ async def delete_urgency_rule(
         )
 
     await delete_urgency_rule_from_db(
-        asession=asession, urgency_rule_id=urgency_rule_id, workspace_id=workspace_id
+        asession=asession,
+        redis=request.app.state.redis,
+        urgency_rule_id=urgency_rule_id,
+        workspace_id=workspace_id,
     )
 
 
@@ -213,6 +223,7 @@ async def delete_urgency_rule(
 async def update_urgency_rule(
     urgency_rule_id: int,
     urgency_rule: UrgencyRuleCreate,
+    request: Request,
     calling_user_db: Annotated[UserDB, Depends(get_current_user)],
     workspace_name: Annotated[str, Depends(get_current_workspace_name)],
     asession: AsyncSession = Depends(get_async_session),
@@ -225,6 +236,8 @@ async def update_urgency_rule(
         The ID of the urgency rule to update.
     urgency_rule
         The updated urgency rule object.
+    request
+        The FastAPI request object.
     calling_user_db
         The user object associated with the user that is updating the urgency rule.
     workspace_name
@@ -274,6 +287,7 @@ async def update_urgency_rule(
     try:
         urgency_rule_db = await update_urgency_rule_in_db(
             asession=asession,
+            redis=request.app.state.redis,
             urgency_rule=urgency_rule,
             urgency_rule_id=urgency_rule_id,
             workspace_id=workspace_id,
@@ -7,11 +7,13 @@ import mimetypes
 import os
 import random
 import secrets
+import shutil
 import string
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 from logging import Logger
-from typing import Optional
+from pathlib import Path
+from typing import BinaryIO, Optional
 from uuid import uuid4
 
 import aiohttp
@@ -48,6 +50,9 @@ if LANGFUSE == "True":
 
 _HTTP_CLIENT: aiohttp.ClientSession | None = None
 
+# The provider models that the embedding models of the LiteLLM proxy resolve to.
+_EMBEDDING_MODEL_NAMES: dict[str, str] = {}
+
 
 class HttpClient:
     """HTTP client for calling other endpoints."""
@@ -119,6 +124,23 @@ class EmbeddingCallException(Exception):
     pass
 
 
+def delete_spooled_file(path: Path | str) -> None:
+    """Delete a spooled file, if it exists.
+
+    Parameters
+    ----------
+    path
+        The path of the spooled file.
+    """
+
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        setup_logger().warning(f"Failed to delete spooled file {path}: {str(e)}")
+
+
 async def embedding(
     *, metadata: Optional[dict] = None, text_to_embed: str
 ) -> list[float]:
@@ -162,6 +184,65 @@ async def embedding(
     return embedding_value
 
 
+async def embedding_batch(
+    *,
+    metadata: Optional[dict] = None,
+    model: Optional[str] = None,
+    texts_to_embed: list[str],
+) -> list[list[float]]:
+    """Get embeddings for a list of texts in a single embedding call.
+
+    Parameters
+    ----------
+    metadata
+        Metadata for `LiteLLM` embedding API.
+    model
+        The embedding model. Defaults to `LITELLM_MODEL_EMBEDDING`.
+    texts_to_embed
+        The texts to embed.
+
+    Returns
+    -------
+    list[list[float]]
+        The embeddings for the given texts, in the same order as `texts_to_embed`.
+    """
+
+    if len(texts_to_embed) == 0:
+        return []
+
+    if metadata is None:
+        metadata = {}
+
+    metadata["trace_id"] = langfuse_context.get_current_trace_id()
+
+    try:
+        content_embeddings = await aembedding(
+            api_base=LITELLM_ENDPOINT,
+            api_key=LITELLM_API_KEY,
+            input=texts_to_embed,
+            metadata=metadata,
+            model=model or LITELLM_MODEL_EMBEDDING,
+        )
+    except Exception as err:
+        raise EmbeddingCallException(f"Error during embedding call: {err}") from err
+
+    # Validate the response structure
+    try:
+        embedding_data = sorted(content_embeddings.data, key=lambda item: item["index"])
+        embedding_values = [item["embedding"] for item in embedding_data]
+    except (AttributeError, KeyError, TypeError) as err:
+        raise EmbeddingCallException(
+            "Embedding response structure is not as expected"
+        ) from err
+
+    if len(embedding_values) != len(texts_to_embed):
+        raise EmbeddingCallException(
+            f"Expected {len(texts_to_embed)} embeddings but received "
+            f"{len(embedding_values)}"
+        )
+    return embedding_values
+
+
 def encode_api_limit(*, api_limit: int | None) -> int | str:
     """Encode the API limit for Redis.
 
@@ -242,6 +323,46 @@ def generate_secret_key() -> str:
     return uuid4().hex
 
 
+async def get_embedding_model_name(*, model: Optional[str] = None) -> str:
+    """Get the name of the provider model that an embedding model resolves to.
+
+    The embedding models are aliases defined in the LiteLLM proxy config, which can be
+    pointed at another provider model without changing the alias. The name is resolved
+    once per process with an embedding call on a short text, since the embedding
+    response carries the name of the provider model.
+
+    Parameters
+    ----------
+    model
+        The embedding model. Defaults to `LITELLM_MODEL_EMBEDDING`.
+
+    Returns
+    -------
+    str
+        The name of the provider model, or the embedding model itself if the
+        response does not carry one.
+
+    Raises
+    ------
+    EmbeddingCallException
+        If the embedding call fails.
+    """
+
+    model = model or LITELLM_MODEL_EMBEDDING
+    if model not in _EMBEDDING_MODEL_NAMES:
+        try:
+            response = await aembedding(
+                api_base=LITELLM_ENDPOINT,
+                api_key=LITELLM_API_KEY,
+                input="model",
+                model=model,
+            )
+        except Exception as err:
+            raise EmbeddingCallException(f"Error during embedding call: {err}") from err
+        _EMBEDDING_MODEL_NAMES[model] = getattr(response, "model", None) or model
+    return _EMBEDDING_MODEL_NAMES[model]
+
+
 def get_file_extension_from_mime_type(*, mime_type: Optional[str]) -> str:
     """Get file extension from MIME type.
 
@@ -459,6 +580,46 @@ def setup_logger(*, log_level: Optional[int] = None, name: str = __name__) -> Lo
     return logger
 
 
+def spool_stream(
+    *,
+    block_size: int = 1024 * 1024,
+    directory: Path | str,
+    extension: str,
+    stream: BinaryIO,
+) -> Path:
+    """Copy a stream to a new, uniquely named file in a spool directory, one block at
+    a time, so that the stream is never held in memory as a whole. The partial file
+    is deleted if the copy fails.
+
+    Parameters
+    ----------
+    block_size
+        The size in bytes of the blocks the stream is copied in.
+    directory
+        The spool directory. It is created if it does not exist.
+    extension
+        The file extension, including the leading dot.
+    stream
+        The stream to copy.
+
+    Returns
+    -------
+    Path
+        The path of the spooled file.
+    """
+
+    spool_dir = Path(directory)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f"{uuid4().hex}{extension}"
+    try:
+        with open(path, "wb") as f:
+            shutil.copyfileobj(stream, f, block_size)
+    except Exception:
+        delete_spooled_file(path)
+        raise
+    return path
+
+
 def verify_password_salted_hash(*, key: str, stored_hash: str) -> bool:
     """Verify if the API key matches the hash.
 
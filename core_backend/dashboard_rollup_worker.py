@@ -0,0 +1,13 @@
+"""This module contains the entry point for the dashboard rollup worker.
+
+The worker keeps the hourly rollup tables of the dashboard up to date. Run a single
+worker with `python dashboard_rollup_worker.py`; concurrent workers skip the update
+while another one holds the lock.
+"""
+
+import asyncio
+
+from app.dashboard.rollups import run_dashboard_rollup_aggregator
+
+if __name__ == "__main__":
+    asyncio.run(run_dashboard_rollup_aggregator())
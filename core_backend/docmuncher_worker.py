@@ -0,0 +1,13 @@
+"""This module contains the entry point for the docmuncher worker.
+
+The worker consumes document ingestion jobs enqueued by the `/docmuncher/upload`
+endpoint. Run as many workers as needed with `python docmuncher_worker.py`.
+"""
+
+import asyncio
+
+from app.config import REDIS_HOST
+from app.docmuncher.job_queue import run_docmuncher_worker
+
+if __name__ == "__main__":
+    asyncio.run(run_docmuncher_worker(redis_host=REDIS_HOST))
@@ -0,0 +1,47 @@
+"""Add a table of the query embeddings computed at search time.
+
+Revision ID: 3b3d0d54874c
+Revises: e4fb0ff084dc
+Create Date: 2026-10-18 19:02:11.418305
+
+"""
+
+from typing import Sequence, Union
+
+import pgvector
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b3d0d54874c"
+down_revision: Union[str, None] = "e4fb0ff084dc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "query_embedding",
+        sa.Column("created_datetime_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("embedding_model", sa.String(), nullable=False),
+        sa.Column("query_embedding", pgvector.sqlalchemy.Vector(), nullable=False),
+        sa.Column("query_id", sa.Integer(), nullable=False),
+        sa.Column("workspace_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["query_id"],
+            ["query.query_id"],
+            name=op.f("fk_query_embedding_query_id_query"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["workspace_id"],
+            ["workspace.workspace_id"],
+            name=op.f("fk_query_embedding_workspace_id_workspace"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("query_id", name=op.f("pk_query_embedding")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("query_embedding")
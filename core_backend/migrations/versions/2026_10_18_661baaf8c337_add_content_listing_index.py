@@ -0,0 +1,29 @@
+"""Add index for keyset pagination of content listing.
+
+Revision ID: 661baaf8c337
+Revises: 70f53dd208e9
+Create Date: 2026-10-18 16:02:19.553140
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "661baaf8c337"
+down_revision: Union[str, None] = "70f53dd208e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_content_workspace_id_display_number",
+        "content",
+        ["workspace_id", "display_number", "content_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_workspace_id_display_number", table_name="content")
@@ -0,0 +1,37 @@
+"""Add embedding fingerprint column to content.
+
+Revision ID: 70f53dd208e9
+Revises: bd05c7a28831
+Create Date: 2026-10-18 14:37:05.402981
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "70f53dd208e9"
+down_revision: Union[str, None] = "bd05c7a28831"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are left without a fingerprint, since the model that embedded
+    # them is unknown. They get one the next time they are embedded.
+    op.add_column(
+        "content",
+        sa.Column("content_embedding_fingerprint", sa.String(length=64), nullable=True),
+    )
+    op.create_index(
+        "ix_content_embedding_fingerprint",
+        "content",
+        ["content_embedding_fingerprint"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_embedding_fingerprint", table_name="content")
+    op.drop_column("content", "content_embedding_fingerprint")
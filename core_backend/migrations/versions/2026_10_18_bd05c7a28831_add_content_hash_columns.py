@@ -0,0 +1,99 @@
+"""Add normalized hash columns of content title and text.
+
+Revision ID: bd05c7a28831
+Revises: 3c54b4f5decf
+Create Date: 2026-10-18 10:12:41.118307
+
+"""
+
+import hashlib
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "bd05c7a28831"
+down_revision: Union[str, None] = "3c54b4f5decf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _hash_content_value(value: str) -> str:
+    """Same normalization as `app.contents.models.hash_content_value`."""
+    normalized_value = " ".join(value.split())
+    return hashlib.sha256(normalized_value.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content", sa.Column("content_text_hash", sa.String(length=64), nullable=True)
+    )
+    op.add_column(
+        "content", sa.Column("content_title_hash", sa.String(length=64), nullable=True)
+    )
+
+    # Backfill the hashes of existing rows, one batch at a time
+    content = sa.table(
+        "content",
+        sa.column("content_id", sa.Integer),
+        sa.column("content_text", sa.Text),
+        sa.column("content_text_hash", sa.String),
+        sa.column("content_title", sa.Text),
+        sa.column("content_title_hash", sa.String),
+    )
+    update_stmt = (
+        content.update()
+        .where(content.c.content_id == sa.bindparam("b_content_id"))
+        .values(
+            content_text_hash=sa.bindparam("b_content_text_hash"),
+            content_title_hash=sa.bindparam("b_content_title_hash"),
+        )
+    )
+    connection = op.get_bind()
+    last_content_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(
+                content.c.content_id, content.c.content_text, content.c.content_title
+            )
+            .where(content.c.content_id > last_content_id)
+            .order_by(content.c.content_id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            update_stmt,
+            [
+                {
+                    "b_content_id": row.content_id,
+                    "b_content_text_hash": _hash_content_value(row.content_text),
+                    "b_content_title_hash": _hash_content_value(row.content_title),
+                }
+                for row in rows
+            ],
+        )
+        last_content_id = rows[-1].content_id
+
+    op.alter_column("content", "content_text_hash", nullable=False)
+    op.alter_column("content", "content_title_hash", nullable=False)
+    op.create_index(
+        "ix_content_workspace_id_text_hash",
+        "content",
+        ["workspace_id", "content_text_hash"],
+    )
+    op.create_index(
+        "ix_content_workspace_id_title_hash",
+        "content",
+        ["workspace_id", "content_title_hash"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_workspace_id_title_hash", table_name="content")
+    op.drop_index("ix_content_workspace_id_text_hash", table_name="content")
+    op.drop_column("content", "content_title_hash")
+    op.drop_column("content", "content_text_hash")
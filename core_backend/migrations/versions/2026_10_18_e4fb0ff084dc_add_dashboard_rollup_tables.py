@@ -0,0 +1,86 @@
+"""Add hourly rollup tables of the dashboard statistics.
+
+Revision ID: e4fb0ff084dc
+Revises: 661baaf8c337
+Create Date: 2026-10-18 17:26:43.802114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4fb0ff084dc"
+down_revision: Union[str, None] = "661baaf8c337"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dashboard_content_hourly_rollup",
+        sa.Column("content_id", sa.Integer(), nullable=False),
+        sa.Column("hour_start_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("n_feedback_negative", sa.Integer(), nullable=False),
+        sa.Column("n_feedback_positive", sa.Integer(), nullable=False),
+        sa.Column("n_query_responses", sa.Integer(), nullable=False),
+        sa.Column("workspace_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["content_id"],
+            ["content.content_id"],
+            name=op.f("fk_dashboard_content_hourly_rollup_content_id_content"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["workspace_id"],
+            ["workspace.workspace_id"],
+            name=op.f("fk_dashboard_content_hourly_rollup_workspace_id_workspace"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "workspace_id",
+            "hour_start_utc",
+            "content_id",
+            name=op.f("pk_dashboard_content_hourly_rollup"),
+        ),
+    )
+    op.create_table(
+        "dashboard_hourly_rollup",
+        sa.Column("hour_start_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("n_content_feedback_negative", sa.Integer(), nullable=False),
+        sa.Column("n_content_feedback_positive", sa.Integer(), nullable=False),
+        sa.Column("n_queries", sa.Integer(), nullable=False),
+        sa.Column("n_queries_escalated", sa.Integer(), nullable=False),
+        sa.Column("n_queries_not_escalated", sa.Integer(), nullable=False),
+        sa.Column("n_response_feedback_negative", sa.Integer(), nullable=False),
+        sa.Column("n_response_feedback_positive", sa.Integer(), nullable=False),
+        sa.Column("n_urgency_responses", sa.Integer(), nullable=False),
+        sa.Column("n_urgent", sa.Integer(), nullable=False),
+        sa.Column("workspace_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["workspace_id"],
+            ["workspace.workspace_id"],
+            name=op.f("fk_dashboard_hourly_rollup_workspace_id_workspace"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "workspace_id", "hour_start_utc", name=op.f("pk_dashboard_hourly_rollup")
+        ),
+    )
+    op.create_table(
+        "dashboard_rollup_watermark",
+        sa.Column("rollup_name", sa.String(), nullable=False),
+        sa.Column("updated_datetime_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("watermark_datetime_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "rollup_name", name=op.f("pk_dashboard_rollup_watermark")
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_rollup_watermark")
+    op.drop_table("dashboard_hourly_rollup")
+    op.drop_table("dashboard_content_hourly_rollup")
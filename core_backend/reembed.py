@@ -0,0 +1,77 @@
+"""This module contains the entry point for the re-embedding job.
+
+Run `python reembed.py --model <model> --vector-size <size>` after changing the
+embedding model, to re-embed every content and urgency rule into shadow vector columns
+and switch to them once they are filled. The job checkpoints its progress and can be
+stopped and run again at any time. Use `--no-switch` to fill the shadow columns ahead
+of the deployment of the new model, then `--switch-only` during the deployment.
+"""
+
+import argparse
+import asyncio
+
+from redis import asyncio as aioredis
+
+from app.config import (
+    LITELLM_MODEL_EMBEDDING,
+    PGVECTOR_VECTOR_SIZE,
+    REDIS_HOST,
+    REEMBED_BATCH_SIZE,
+    REEMBED_MAX_REQUESTS_PER_MINUTE,
+)
+from app.reembedding import EMBEDDING_TARGETS, run_reembedding
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the re-embedding job.
+
+    Parameters
+    ----------
+    args
+        The command line arguments.
+    """
+
+    redis = await aioredis.from_url(REDIS_HOST)
+    try:
+        await run_reembedding(
+            batch_size=args.batch_size,
+            fill=not args.switch_only,
+            max_requests_per_minute=args.max_requests_per_minute,
+            model=args.model,
+            redis=redis,
+            switch=not args.no_switch,
+            tables=args.tables,
+            vector_size=args.vector_size,
+        )
+    finally:
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-embed stored vectors with a new embedding model."
+    )
+    parser.add_argument("--model", default=LITELLM_MODEL_EMBEDDING)
+    parser.add_argument("--vector-size", default=int(PGVECTOR_VECTOR_SIZE), type=int)
+    parser.add_argument("--batch-size", default=REEMBED_BATCH_SIZE, type=int)
+    parser.add_argument(
+        "--max-requests-per-minute", default=REEMBED_MAX_REQUESTS_PER_MINUTE, type=int
+    )
+    parser.add_argument(
+        "--tables",
+        choices=list(EMBEDDING_TARGETS),
+        default=list(EMBEDDING_TARGETS),
+        nargs="+",
+    )
+    switch_group = parser.add_mutually_exclusive_group()
+    switch_group.add_argument(
+        "--no-switch",
+        action="store_true",
+        help="Fill the shadow columns without switching to them.",
+    )
+    switch_group.add_argument(
+        "--switch-only",
+        action="store_true",
+        help="Switch to shadow columns filled by a previous run.",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -35,6 +35,7 @@ from core_backend.app.llm_call.llm_prompts import (
     RAG,
     AlignmentScore,
     IdentifiedLanguage,
+    UrgencyDetectionEntailment,
 )
 from core_backend.app.question_answer.models import (
     ContentFeedbackDB,
@@ -42,7 +43,10 @@ from core_backend.app.question_answer.models import (
 )
 from core_backend.app.question_answer.schemas import QueryRefined, QueryResponse
 from core_backend.app.urgency_detection.models import UrgencyQueryDB, UrgencyResponseDB
-from core_backend.app.urgency_rules.models import UrgencyRuleDB
+from core_backend.app.urgency_rules.models import (
+    UrgencyRuleDB,
+    clear_urgency_rule_matrix_cache,
+)
 from core_backend.app.users.models import (
     UserDB,
     UserWorkspaceDB,
@@ -1034,9 +1038,32 @@ def patch_llm_call(monkeysession: pytest.MonkeyPatch) -> None:
     monkeysession.setattr(
         "core_backend.app.contents.models.embedding", async_fake_embedding
     )
+    monkeysession.setattr(
+        "core_backend.app.contents.models.embedding_batch",
+        async_fake_embedding_batch,
+    )
+    monkeysession.setattr(
+        "core_backend.app.contents.models.get_embedding_model_name",
+        async_fake_get_embedding_model_name,
+    )
+    monkeysession.setattr(
+        "core_backend.app.dashboard.topic_modeling.embedding_batch",
+        async_fake_embedding_batch,
+    )
+    monkeysession.setattr(
+        "core_backend.app.question_answer.routers.embedding", async_fake_embedding
+    )
+    monkeysession.setattr(
+        "core_backend.app.reembedding.get_embedding_model_name",
+        async_fake_get_embedding_model_name,
+    )
     monkeysession.setattr(
         "core_backend.app.urgency_rules.models.embedding", async_fake_embedding
     )
+    monkeysession.setattr(
+        "core_backend.app.urgency_rules.models.embedding_batch",
+        async_fake_embedding_batch,
+    )
     monkeysession.setattr(process_input, "_classify_safety", mock_return_args)
     monkeysession.setattr(process_input, "_identify_language", mock_identify_language)
     monkeysession.setattr(process_input, "_paraphrase_question", mock_return_args)
@@ -1045,6 +1072,10 @@ def patch_llm_call(monkeysession: pytest.MonkeyPatch) -> None:
     monkeysession.setattr(
         "core_backend.app.urgency_detection.routers.detect_urgency", mock_detect_urgency
     )
+    monkeysession.setattr(
+        "core_backend.app.urgency_detection.routers.detect_urgency_batch",
+        mock_detect_urgency_batch,
+    )
     monkeysession.setattr(
         "core_backend.app.llm_call.process_output.get_llm_rag_answer",
         patched_llm_rag_answer,
@@ -1316,12 +1347,14 @@ async def urgency_rules_workspace_1(
         rules.append(rule_db)
     db_session.add_all(rules)
     db_session.commit()
+    clear_urgency_rule_matrix_cache()
 
     yield len(rules)
 
     # Delete the urgency rules.
     for rule in rules:
         db_session.delete(rule)
+    clear_urgency_rule_matrix_cache()
 
     # Delete urgency queries.
     stmt = delete(UrgencyQueryDB).where(UrgencyQueryDB.workspace_id == workspace_1_id)
@@ -1377,12 +1410,14 @@ async def urgency_rules_workspace_data_api_1(
         rules.append(rule_db)
     db_session.add_all(rules)
     db_session.commit()
+    clear_urgency_rule_matrix_cache()
 
     yield len(rules)
 
     # Delete the urgency rules.
     for rule in rules:
         db_session.delete(rule)
+    clear_urgency_rule_matrix_cache()
     db_session.commit()
 
 
@@ -1427,12 +1462,14 @@ async def urgency_rules_workspace_data_api_2(
         rules.append(rule_db)
     db_session.add_all(rules)
     db_session.commit()
+    clear_urgency_rule_matrix_cache()
 
     yield len(rules)
 
     # Delete the urgency rules.
     for rule in rules:
         db_session.delete(rule)
+    clear_urgency_rule_matrix_cache()
     db_session.commit()
 
 
@@ -1605,6 +1642,27 @@ async def async_fake_embedding(*arg: str, **kwargs: str) -> list[float]:
     return embedding_list
 
 
+async def async_fake_embedding_batch(
+    *, texts_to_embed: list[str], **kwargs: Any
+) -> list[list[float]]:
+    """Replicate `embedding_batch` function by generating random lists of floats.
+
+    Parameters
+    ----------
+    texts_to_embed
+        The texts to embed.
+    kwargs
+        Additional keyword arguments. Not used.
+
+    Returns
+    -------
+    list[list[float]]
+        One list of random floats per text.
+    """
+
+    return [await async_fake_embedding() for _ in texts_to_embed]
+
+
 async def async_fake_generate_public_url(*args: Any, **kwargs: Any) -> str:
     """A dummy function to replace the real `generate_public_url` function.
 
@@ -1624,6 +1682,23 @@ async def async_fake_generate_public_url(*args: Any, **kwargs: Any) -> str:
     return "http://example.com/signed-url"
 
 
+async def async_fake_get_embedding_model_name(*, model: Optional[str] = None) -> str:
+    """Replicate `get_embedding_model_name` function without an embedding call.
+
+    Parameters
+    ----------
+    model
+        The embedding model. Defaults to `LITELLM_MODEL_EMBEDDING`.
+
+    Returns
+    -------
+    str
+        The embedding model itself.
+    """
+
+    return model or LITELLM_MODEL_EMBEDDING
+
+
 async def async_fake_upload_file_to_gcs(*args: Any, **kwargs: Any) -> None:
     """A dummy function to replace the real `upload_file_to_gcs` function.
 
@@ -1663,6 +1738,36 @@ async def mock_detect_urgency(
     }
 
 
+async def mock_detect_urgency_batch(
+    urgency_rules: list[str], messages: list[str], metadata: Optional[dict]
+) -> list[UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult]:
+    """Mock function arguments for the `detect_urgency_batch` function.
+
+    Parameters
+    ----------
+    urgency_rules
+        A list of urgency rules.
+    messages
+        The messages to check against the urgency rules.
+    metadata
+        Additional metadata.
+
+    Returns
+    -------
+    list[UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult]
+        The urgency detection result for each message.
+    """
+
+    return [
+        UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult(
+            best_matching_rule=urgency_rules[0],
+            probability=0.7,
+            reason="this is a mocked response",
+        )
+        for _ in messages
+    ]
+
+
 async def mock_get_align_score(*args: Any, **kwargs: Any) -> AlignmentScore:
     """Mock return argument for the `_get_llm_align_score function`.
 
@@ -343,8 +343,15 @@ class TestArchiveContent:
             headers={"Authorization": f"Bearer {access_token_admin_4}"},
             files={"file": ("test.csv", data, "text/csv")},
         )
-        assert response.status_code == status.HTTP_200_OK
-        content_id = [x["content_id"] for x in response.json()["contents"]][0]
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        response = client.get(
+            "/content/", headers={"Authorization": f"Bearer {access_token_admin_4}"}
+        )
+        content_id = [
+            x["content_id"]
+            for x in response.json()
+            if x["content_title"] == "csv title 1"
+        ][0]
 
         data = _dict_to_csv_bytes(
             data={
@@ -380,7 +387,7 @@ class TestArchiveContent:
             headers={"Authorization": f"Bearer {access_token_admin_4}"},
             files={"file": ("test.csv", data, "text/csv")},
         )
-        assert response.status_code == status.HTTP_200_OK
+        assert response.status_code == status.HTTP_202_ACCEPTED
 
         # 2.
         response = client.get(
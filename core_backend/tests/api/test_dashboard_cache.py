@@ -0,0 +1,132 @@
+"""This module contains tests for the cache of the dashboard responses."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from redis import asyncio as aioredis
+
+from core_backend.app.dashboard.cache import get_dashboard_cache_key_and_ttl
+from core_backend.app.dashboard.config import (
+    DASHBOARD_CACHE_CLOSED_TTL,
+    DASHBOARD_CACHE_OPEN_TTL,
+)
+from core_backend.app.dashboard.schemas import TimeFrequency
+
+
+def test_closed_and_open_buckets_have_different_ttls() -> None:
+    """Test that custom timeframes that have ended are cached for longer than the
+    timeframes that include the current day.
+    """
+
+    today = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    kwargs = dict(
+        endpoint="overview",
+        frequency=TimeFrequency.Day,
+        timeframe="custom",
+        workspace_id=1,
+    )
+
+    closed_key, closed_ttl = get_dashboard_cache_key_and_ttl(
+        end_date=today - timedelta(days=1),
+        start_date=today - timedelta(days=8),
+        **kwargs,
+    )
+    open_key, open_ttl = get_dashboard_cache_key_and_ttl(
+        end_date=today, start_date=today - timedelta(days=7), **kwargs
+    )
+
+    assert closed_key != open_key
+    assert closed_ttl == DASHBOARD_CACHE_CLOSED_TTL
+    assert open_ttl == DASHBOARD_CACHE_OPEN_TTL
+
+
+def test_rolling_timeframes_are_cached_in_aligned_buckets() -> None:
+    """Test that requests of a predefined timeframe made in the same bucket share a
+    cache key, even though their start and end dates differ.
+    """
+
+    now = datetime.now(timezone.utc)
+    keys = {
+        get_dashboard_cache_key_and_ttl(
+            end_date=now + timedelta(microseconds=i),
+            endpoint="performance",
+            frequency=TimeFrequency.Hour,
+            start_date=now - timedelta(days=1, microseconds=-i),
+            timeframe="day",
+            top_n=5,
+            workspace_id=1,
+        )
+        for i in range(3)
+    }
+
+    # The three calls may straddle the end of a bucket.
+    assert len(keys) in (1, 2)
+    assert all(ttl == DASHBOARD_CACHE_OPEN_TTL for _, ttl in keys)
+
+
+class TestDashboardCacheBypass:
+    """Tests for the cache bypass of the dashboard endpoints."""
+
+    @pytest.mark.parametrize("endpoint", ["overview", "performance"])
+    async def test_admin_can_bypass_cache(
+        self,
+        access_token_admin_1: str,
+        client: TestClient,
+        endpoint: str,
+        redis_client: aioredis.Redis,
+    ) -> None:
+        """Test that cached responses are returned until an admin bypasses the cache.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            Access token for admin user 1.
+        client
+            The test client.
+        endpoint
+            The dashboard endpoint.
+        redis_client
+            The Redis client, which empties the cache before the test.
+        """
+
+        headers = {"Authorization": f"Bearer {access_token_admin_1}"}
+        first_response = client.get(f"/dashboard/{endpoint}/week", headers=headers)
+        cached_response = client.get(f"/dashboard/{endpoint}/week", headers=headers)
+        bypass_response = client.get(
+            f"/dashboard/{endpoint}/week",
+            headers=headers,
+            params={"bypass_cache": True},
+        )
+
+        assert first_response.status_code == status.HTTP_200_OK
+        assert cached_response.json() == first_response.json()
+        assert bypass_response.status_code == status.HTTP_200_OK
+        assert (
+            bypass_response.json()["refreshTimeStamp"]
+            > first_response.json()["refreshTimeStamp"]
+        )
+
+    async def test_read_only_user_cannot_bypass_cache(
+        self, access_token_read_only_1: str, client: TestClient
+    ) -> None:
+        """Test that read-only users cannot bypass the cache.
+
+        Parameters
+        ----------
+        access_token_read_only_1
+            Access token for read-only user 1.
+        client
+            The test client.
+        """
+
+        response = client.get(
+            "/dashboard/overview/week",
+            headers={"Authorization": f"Bearer {access_token_read_only_1}"},
+            params={"bypass_cache": True},
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
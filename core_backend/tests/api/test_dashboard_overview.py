@@ -1,5 +1,6 @@
 """This module contains tests for the dashboard overview endpoints."""
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import AsyncGenerator
 
@@ -21,6 +22,7 @@ from core_backend.app.dashboard.models import (
     get_timeseries_urgency,
     get_top_content,
     get_urgency_stats,
+    run_in_new_session,
 )
 from core_backend.app.dashboard.schemas import OverviewTimeSeries, TimeFrequency
 from core_backend.app.question_answer.models import (
@@ -1172,3 +1174,42 @@ class TestTopContent:
         )
 
         assert len(top_content) == 0
+
+
+async def test_run_in_new_session_bounds_concurrency(asession: AsyncSession) -> None:
+    """Test that dashboard queries run concurrently on their own sessions, up to the
+    limit of the query semaphore.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    """
+
+    query_semaphore = asyncio.Semaphore(2)
+    n_running = 0
+    max_running = 0
+    query_sessions = []
+
+    async def query(*, asession: AsyncSession, i: int) -> int:
+        nonlocal max_running, n_running
+        n_running += 1
+        max_running = max(max_running, n_running)
+        query_sessions.append(asession)
+        await asyncio.sleep(0.01)
+        n_running -= 1
+        return i
+
+    results = await asyncio.gather(
+        *(
+            run_in_new_session(
+                query, asession=asession, i=i, query_semaphore=query_semaphore
+            )
+            for i in range(5)
+        )
+    )
+
+    assert results == list(range(5))
+    assert max_running == 2
+    assert len({id(query_session) for query_session in query_sessions}) == 5
+    assert all(query_session is not asession for query_session in query_sessions)
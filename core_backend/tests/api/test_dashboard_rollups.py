@@ -0,0 +1,248 @@
+"""This module contains tests for the hourly rollups of the dashboard statistics."""
+
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core_backend.app.dashboard import models
+from core_backend.app.dashboard.models import (
+    get_heatmap,
+    get_stats_cards,
+    get_timeseries_query,
+    get_timeseries_top_content,
+    get_timeseries_urgency,
+)
+from core_backend.app.dashboard.rollups import (
+    DashboardContentHourlyRollupDB,
+    DashboardHourlyRollupDB,
+    DashboardRollupWatermarkDB,
+    get_rollup_watermark,
+    split_time_range,
+    update_dashboard_rollups,
+)
+from core_backend.app.dashboard.schemas import TimeFrequency
+from core_backend.app.question_answer.models import (
+    ContentFeedbackDB,
+    QueryDB,
+    QueryResponseContentDB,
+    ResponseFeedbackDB,
+)
+from core_backend.app.urgency_detection.models import UrgencyQueryDB, UrgencyResponseDB
+
+
+def test_split_time_range() -> None:
+    """Test that a period is split into complete hours read from the rollups and
+    partial hours or hours after the watermark aggregated from the raw tables.
+    """
+
+    start = datetime(2025, 1, 1, 10, 30, tzinfo=timezone.utc)
+    end = datetime(2025, 1, 2, 8, 15, tzinfo=timezone.utc)
+    watermark = datetime(2025, 1, 2, 6, tzinfo=timezone.utc)
+
+    raw_ranges, rollup_range = split_time_range(
+        end=end, start=start, watermark=watermark
+    )
+
+    assert rollup_range == (datetime(2025, 1, 1, 11, tzinfo=timezone.utc), watermark)
+    assert raw_ranges == [
+        (start, datetime(2025, 1, 1, 11, tzinfo=timezone.utc)),
+        (watermark, end),
+    ]
+    assert split_time_range(end=end, start=start, watermark=None) == (
+        [(start, end)],
+        None,
+    )
+    assert split_time_range(
+        end=end, start=start, watermark=datetime(2025, 1, 1, 11, tzinfo=timezone.utc)
+    ) == ([(start, end)], None)
+
+
+class TestDashboardRollups:
+    """Tests for the dashboard statistics read from the rollups."""
+
+    @pytest.fixture(scope="function")
+    async def dashboard_events(
+        self,
+        asession: AsyncSession,
+        faq_contents_in_workspace_3: list[int],
+        workspace_3_id: int,
+    ) -> AsyncGenerator[datetime, None]:
+        """Create queries, feedback, content hits and urgency responses over the last
+        three days in workspace 3, including in the current hour.
+
+        Parameters
+        ----------
+        asession
+            The SQLAlchemy async session to use for all database connections.
+        faq_contents_in_workspace_3
+            The IDs of the contents in workspace 3.
+        workspace_3_id
+            The ID of workspace 3.
+
+        Yields
+        ------
+        AsyncGenerator[datetime, None]
+            The current datetime.
+        """
+
+        now = datetime.now(timezone.utc)
+        sentiments = ["negative", "positive", None]
+        query_ids = []
+        urgency_query_ids = []
+        for i, hours_ago in enumerate([0, 0, 2, 2, 5, 26, 26, 49, 70]):
+            event_datetime = now - timedelta(hours=hours_ago, minutes=1 + i)
+            query_db = QueryDB(
+                feedback_secret_key="abc123",
+                query_datetime_utc=event_datetime,
+                query_generate_llm_response=False,
+                query_metadata={},
+                query_text=f"Rollup test query {i}",
+                workspace_id=workspace_3_id,
+            )
+            asession.add(query_db)
+            await asession.flush()
+            query_ids.append(query_db.query_id)
+
+            content_id = faq_contents_in_workspace_3[
+                i % len(faq_contents_in_workspace_3)
+            ]
+            asession.add(
+                QueryResponseContentDB(
+                    content_id=content_id,
+                    created_datetime_utc=event_datetime,
+                    query_id=query_db.query_id,
+                    workspace_id=workspace_3_id,
+                )
+            )
+            sentiment = sentiments[i % len(sentiments)]
+            if sentiment is not None:
+                asession.add(
+                    ResponseFeedbackDB(
+                        feedback_datetime_utc=event_datetime,
+                        feedback_sentiment=sentiment,
+                        query_id=query_db.query_id,
+                        workspace_id=workspace_3_id,
+                    )
+                )
+                asession.add(
+                    ContentFeedbackDB(
+                        content_id=content_id,
+                        feedback_datetime_utc=event_datetime,
+                        feedback_sentiment=sentiment,
+                        query_id=query_db.query_id,
+                        workspace_id=workspace_3_id,
+                    )
+                )
+
+            urgency_query_db = UrgencyQueryDB(
+                feedback_secret_key="abc123",
+                message_datetime_utc=event_datetime,
+                message_text=f"Rollup test urgency query {i}",
+                workspace_id=workspace_3_id,
+            )
+            asession.add(urgency_query_db)
+            await asession.flush()
+            urgency_query_ids.append(urgency_query_db.urgency_query_id)
+            asession.add(
+                UrgencyResponseDB(
+                    details={},
+                    is_urgent=i % 2 == 0,
+                    matched_rules=[],
+                    query_id=urgency_query_db.urgency_query_id,
+                    response_datetime_utc=event_datetime,
+                    workspace_id=workspace_3_id,
+                )
+            )
+        await asession.commit()
+
+        yield now
+
+        for model in (
+            DashboardContentHourlyRollupDB,
+            DashboardHourlyRollupDB,
+            DashboardRollupWatermarkDB,
+        ):
+            await asession.execute(delete(model))
+        await asession.execute(
+            delete(UrgencyResponseDB).where(
+                UrgencyResponseDB.query_id.in_(urgency_query_ids)
+            )
+        )
+        await asession.execute(
+            delete(UrgencyQueryDB).where(
+                UrgencyQueryDB.urgency_query_id.in_(urgency_query_ids)
+            )
+        )
+        for model in (ContentFeedbackDB, QueryResponseContentDB, ResponseFeedbackDB):
+            await asession.execute(delete(model).where(model.query_id.in_(query_ids)))
+        await asession.execute(delete(QueryDB).where(QueryDB.query_id.in_(query_ids)))
+        await asession.commit()
+
+    async def test_rollups_match_raw_tables(
+        self,
+        asession: AsyncSession,
+        dashboard_events: datetime,
+        monkeypatch: pytest.MonkeyPatch,
+        workspace_3_id: int,
+    ) -> None:
+        """Test that the dashboard statistics read from the rollups are the same as
+        the statistics computed from the raw tables.
+
+        Parameters
+        ----------
+        asession
+            The SQLAlchemy async session to use for all database connections.
+        dashboard_events
+            The current datetime.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        workspace_3_id
+            The ID of workspace 3.
+        """
+
+        now = dashboard_events
+        periods = [
+            (now - timedelta(days=1, seconds=30), now + timedelta(seconds=30)),
+            (now - timedelta(days=3, seconds=30), now + timedelta(seconds=30)),
+        ]
+
+        async def get_statistics() -> list:
+            statistics: list = []
+            for start_date, end_date in periods:
+                kwargs = dict(
+                    asession=asession,
+                    end_date=end_date,
+                    start_date=start_date,
+                    workspace_id=workspace_3_id,
+                )
+                statistics.append(await get_stats_cards(**kwargs))
+                statistics.append(await get_heatmap(**kwargs))
+                for frequency in (TimeFrequency.Hour, TimeFrequency.Day):
+                    statistics.append(
+                        await get_timeseries_query(frequency=frequency, **kwargs)
+                    )
+                    statistics.append(
+                        await get_timeseries_urgency(frequency=frequency, **kwargs)
+                    )
+                    statistics.append(
+                        await get_timeseries_top_content(
+                            frequency=frequency, top_n=None, **kwargs
+                        )
+                    )
+            return statistics
+
+        monkeypatch.setattr(models, "DASHBOARD_ROLLUPS_ENABLED", False)
+        raw_statistics = await get_statistics()
+
+        watermark = await update_dashboard_rollups()
+        assert watermark is not None
+        assert watermark == await get_rollup_watermark(asession=asession)
+        assert watermark <= now
+
+        monkeypatch.setattr(models, "DASHBOARD_ROLLUPS_ENABLED", True)
+        rollup_statistics = await get_statistics()
+
+        assert rollup_statistics == raw_statistics
@@ -0,0 +1,604 @@
+"""This module contains tests for the topic modeling of the dashboard."""
+
+import asyncio
+import os
+import pickle
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from redis import asyncio as aioredis
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core_backend.app.config import PGVECTOR_VECTOR_SIZE
+from core_backend.app.dashboard import models, topic_model_store, topic_modeling
+from core_backend.app.dashboard.models import get_raw_contents, get_raw_queries
+from core_backend.app.dashboard.schemas import UserQuery
+from core_backend.app.dashboard.topic_model_store import (
+    STATE_FILE_NAME,
+    TopicModelState,
+    load_topic_model,
+    load_topic_model_state,
+    match_topic_labels,
+    save_topic_labels,
+    save_topic_model,
+)
+from core_backend.app.dashboard.topic_modeling import fit_topics, get_embeddings
+from core_backend.app.dashboard.topic_modeling_jobs import (
+    TopicModelingCancelledError,
+    TopicModelingJob,
+    cancel_topic_modeling,
+    run_in_process,
+)
+from core_backend.app.question_answer.models import (
+    QueryDB,
+    get_query_embeddings,
+    save_query_embeddings_to_db,
+)
+
+
+async def test_get_embeddings_reuses_persisted_query_embeddings(
+    asession: AsyncSession,
+    faq_contents_in_workspace_3: list[int],
+    monkeypatch: pytest.MonkeyPatch,
+    workspace_3_id: int,
+) -> None:
+    """Test that only queries without a persisted embedding are embedded, and that
+    their embeddings are persisted.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    faq_contents_in_workspace_3
+        The IDs of the contents in workspace 3.
+    monkeypatch
+        Pytest monkeypatch fixture.
+    workspace_3_id
+        The ID of workspace 3.
+    """
+
+    embedded_texts: list[str] = []
+
+    async def embedding_batch(
+        *, texts_to_embed: list[str], **kwargs: Any
+    ) -> list[list[float]]:
+        embedded_texts.extend(texts_to_embed)
+        return [[1.0] * int(PGVECTOR_VECTOR_SIZE) for _ in texts_to_embed]
+
+    monkeypatch.setattr(topic_modeling, "embedding_batch", embedding_batch)
+
+    query_data = []
+    for i in range(3):
+        query_db = QueryDB(
+            feedback_secret_key="abc123",
+            query_datetime_utc=datetime.now(timezone.utc),
+            query_generate_llm_response=False,
+            query_metadata={},
+            query_text=f"Topic modeling test query {i}",
+            workspace_id=workspace_3_id,
+        )
+        asession.add(query_db)
+        await asession.flush()
+        query_data.append(
+            UserQuery(
+                query_datetime_utc=query_db.query_datetime_utc,
+                query_id=query_db.query_id,
+                query_text=query_db.query_text,
+            )
+        )
+    await asession.commit()
+    query_ids = [query.query_id for query in query_data]
+    search_embedding = [0.5] * int(PGVECTOR_VECTOR_SIZE)
+    await save_query_embeddings_to_db(
+        asession=asession,
+        query_embeddings={query_ids[0]: search_embedding},
+        workspace_id=workspace_3_id,
+    )
+    content_data = await get_raw_contents(
+        asession=asession, workspace_id=workspace_3_id
+    )
+
+    try:
+        for _ in range(2):
+            embeddings = await get_embeddings(
+                asession=asession,
+                content_data=content_data,
+                query_data=query_data,
+                workspace_id=workspace_3_id,
+            )
+
+        assert embedded_texts == [query.query_text for query in query_data[1:]]
+        assert embeddings.shape == (
+            len(query_data) + len(faq_contents_in_workspace_3),
+            int(PGVECTOR_VECTOR_SIZE),
+        )
+        np.testing.assert_array_equal(embeddings[0], search_embedding)
+        assert set(
+            await get_query_embeddings(asession=asession, query_ids=query_ids)
+        ) == set(query_ids)
+    finally:
+        await asession.execute(delete(QueryDB).where(QueryDB.query_id.in_(query_ids)))
+        await asession.commit()
+
+
+async def test_get_raw_queries_aggregates_repeated_texts(
+    asession: AsyncSession, monkeypatch: pytest.MonkeyPatch, workspace_3_id: int
+) -> None:
+    """Test that queries with the same normalized text are aggregated into their
+    earliest query with their count, and that the queries are capped.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    monkeypatch
+        Pytest monkeypatch fixture.
+    workspace_3_id
+        The ID of workspace 3.
+    """
+
+    texts = [
+        "Hello raw queries test",
+        "  hello   RAW queries test ",
+        "HELLO raw queries test",
+        "How do I stay healthy? raw queries test",
+        "how do i stay  healthy? raw queries test",
+        "When is my due date? raw queries test",
+    ]
+    now = datetime.now(timezone.utc)
+    query_ids = []
+    for i, text in enumerate(texts):
+        query_db = QueryDB(
+            feedback_secret_key="abc123",
+            query_datetime_utc=now - timedelta(hours=len(texts) - i),
+            query_generate_llm_response=False,
+            query_metadata={},
+            query_text=text,
+            workspace_id=workspace_3_id,
+        )
+        asession.add(query_db)
+        await asession.flush()
+        query_ids.append(query_db.query_id)
+    await asession.commit()
+    period = dict(
+        asession=asession,
+        end_date=(now + timedelta(days=1)).date(),
+        start_date=(now - timedelta(days=1)).date(),
+        workspace_id=workspace_3_id,
+    )
+
+    try:
+        queries = {
+            query.query_id: query
+            for query in await get_raw_queries(**period)
+            if query.query_text.lower().endswith("raw queries test")
+        }
+        assert {
+            query_id: (query.query_count, query.query_text)
+            for query_id, query in queries.items()
+        } == {
+            query_ids[0]: (3, texts[0]),
+            query_ids[3]: (2, texts[3]),
+            query_ids[5]: (1, texts[5]),
+        }
+
+        monkeypatch.setattr(models, "N_SAMPLES_TOPIC_MODELING", 2)
+        assert len(await get_raw_queries(**period)) == 2
+    finally:
+        await asession.execute(delete(QueryDB).where(QueryDB.query_id.in_(query_ids)))
+        await asession.commit()
+
+
+async def test_get_raw_queries_fills_sample_when_text_spans_days(
+    asession: AsyncSession, monkeypatch: pytest.MonkeyPatch, workspace_3_id: int
+) -> None:
+    """Test that a text repeated over several days does not take the quota of the
+    other days, so that the sample is filled up to `N_SAMPLES_TOPIC_MODELING` texts,
+    and that all texts are returned when there are not more than that.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    monkeypatch
+        Pytest monkeypatch fixture.
+    workspace_3_id
+        The ID of workspace 3.
+    """
+
+    first_day = datetime.combine(
+        (datetime.now(timezone.utc) - timedelta(days=10)).date(),
+        time(12),
+        tzinfo=timezone.utc,
+    )
+    second_day = first_day + timedelta(days=1)
+    texts_and_datetimes = [("Repeated spanning text", first_day)] * 5 + [
+        ("Repeated spanning text", second_day)
+    ] * 5
+    texts_and_datetimes += [
+        (f"Spanning text {i}", second_day + timedelta(minutes=i)) for i in range(4)
+    ]
+    query_ids = []
+    for text, query_datetime_utc in texts_and_datetimes:
+        query_db = QueryDB(
+            feedback_secret_key="abc123",
+            query_datetime_utc=query_datetime_utc,
+            query_generate_llm_response=False,
+            query_metadata={},
+            query_text=text,
+            workspace_id=workspace_3_id,
+        )
+        asession.add(query_db)
+        await asession.flush()
+        query_ids.append(query_db.query_id)
+    await asession.commit()
+    period = dict(
+        asession=asession,
+        end_date=(second_day + timedelta(days=1)).date(),
+        start_date=first_day.date(),
+        workspace_id=workspace_3_id,
+    )
+
+    try:
+        for n_samples in [3, 4]:
+            monkeypatch.setattr(models, "N_SAMPLES_TOPIC_MODELING", n_samples)
+            queries = await get_raw_queries(**period)
+            assert len(queries) == n_samples
+            assert len({query.query_id for query in queries}) == n_samples
+
+        monkeypatch.setattr(models, "N_SAMPLES_TOPIC_MODELING", 5)
+        queries = await get_raw_queries(**period)
+        assert {query.query_text: query.query_count for query in queries} == {
+            "Repeated spanning text": 10,
+            **{f"Spanning text {i}": 1 for i in range(4)},
+        }
+    finally:
+        await asession.execute(delete(QueryDB).where(QueryDB.query_id.in_(query_ids)))
+        await asession.commit()
+
+
+async def test_topic_modeling_jobs_are_single_flight_and_cancellable(
+    redis_client: aioredis.Redis,
+) -> None:
+    """Test that only one refresh runs at a time per workspace, and that a cancelled
+    refresh stops at its next step.
+
+    Parameters
+    ----------
+    redis_client
+        The Redis client, which empties the cache before the test.
+    """
+
+    job = TopicModelingJob(
+        redis=redis_client, timeframe="week", workspace_name="workspace_1"
+    )
+    assert await job.acquire()
+    await job.set_step("Retrieve queries")
+    assert await run_in_process(
+        dict, job=job, process_semaphore=asyncio.Semaphore(1), a=1
+    ) == {"a": 1}
+
+    for timeframe in ("week", "month"):
+        assert not await TopicModelingJob(
+            redis=redis_client, timeframe=timeframe, workspace_name="workspace_1"
+        ).acquire()
+    assert await TopicModelingJob(
+        redis=redis_client, timeframe="week", workspace_name="workspace_2"
+    ).acquire()
+
+    assert not await cancel_topic_modeling(
+        redis=redis_client, timeframe="month", workspace_name="workspace_1"
+    )
+    assert await cancel_topic_modeling(
+        redis=redis_client, timeframe="week", workspace_name="workspace_1"
+    )
+    with pytest.raises(TopicModelingCancelledError):
+        await job.set_step("Get embeddings")
+    assert job.step == "Retrieve queries"
+
+    await job.release()
+    next_job = TopicModelingJob(
+        redis=redis_client, timeframe="month", workspace_name="workspace_1"
+    )
+    assert await next_job.acquire()
+    assert not await next_job.is_cancelled()
+
+
+async def test_topic_modeling_job_refreshes_and_releases_only_its_lock(
+    redis_client: aioredis.Redis,
+) -> None:
+    """Test that a running refresh keeps its lock alive, and that a refresh whose lock
+    was taken by another refresh stops without releasing the other lock.
+
+    Parameters
+    ----------
+    redis_client
+        The Redis client, which empties the cache before the test.
+    """
+
+    job = TopicModelingJob(
+        redis=redis_client, timeframe="week", workspace_name="workspace_1"
+    )
+    assert await job.acquire()
+    await redis_client.expire(job.lock_key, 5)
+    await job.set_step("Retrieve queries")
+    assert await redis_client.ttl(job.lock_key) > 5
+
+    # The lock expires, and another refresh takes it.
+    await redis_client.delete(job.lock_key)
+    next_job = TopicModelingJob(
+        redis=redis_client, timeframe="month", workspace_name="workspace_1"
+    )
+    assert await next_job.acquire()
+
+    with pytest.raises(RuntimeError):
+        await job.set_step("Get embeddings")
+    with pytest.raises(RuntimeError):
+        await run_in_process(dict, job=job, process_semaphore=asyncio.Semaphore(1), a=1)
+    await job.release()
+    assert await redis_client.get(job.lock_key) == next_job.token
+
+
+def test_match_topic_labels_keeps_labels_of_stable_topics() -> None:
+    """Test that a refitted topic keeps the label of a previous topic only if they
+    share most of their queries."""
+
+    old_labels = {
+        0: {"topic_summary": "", "topic_title": "Pregnancy"},
+        1: {"topic_summary": "", "topic_title": "Nutrition"},
+    }
+    old_assignments = {
+        "content_1": 1,
+        "query_1": 0,
+        "query_2": 0,
+        "query_3": 0,
+        "query_4": 1,
+        "query_5": 1,
+    }
+    new_assignments = {
+        "content_1": 7,
+        "query_1": 3,
+        "query_2": 3,
+        "query_3": 4,
+        "query_4": 5,
+        "query_5": 5,
+        "query_6": 7,
+    }
+
+    assert match_topic_labels(
+        new_assignments=new_assignments,
+        old_assignments=old_assignments,
+        old_labels=old_labels,
+    ) == {3: old_labels[0], 5: old_labels[1]}
+
+
+def test_topic_model_state_round_trip(tmp_path: Path) -> None:
+    """Test that the state of a topic model is persisted and its labels updated
+    without a persisted model.
+
+    Parameters
+    ----------
+    tmp_path
+        A temporary directory.
+    """
+
+    model_dir = str(tmp_path / "1" / "week")
+    assert load_topic_model_state(model_dir=model_dir) is None
+
+    state = TopicModelState(
+        assignments={"content_1": (-1, 0.5, 1.5), "query_1": (0, 1.0, 2.0)},
+        embedding_model="openai/embeddings",
+        fit_id="fit_1",
+        fitted_datetime_utc=datetime.now(timezone.utc).isoformat(),
+        outlier_share=0.25,
+        topic_keywords={0: ["pregnancy"]},
+        topic_labels={},
+    )
+    save_topic_model(model_dir=model_dir, state=state)
+    topic_labels = {0: {"topic_summary": "", "topic_title": "Pregnancy"}}
+    save_topic_labels(model_dir=model_dir, topic_labels=topic_labels)
+
+    assert load_topic_model(fit_id="fit_1", model_dir=model_dir) is None
+    assert load_topic_model_state(model_dir=model_dir) == {
+        **state,
+        "topic_labels": topic_labels,
+    }
+
+
+class _StubUMAP:
+    """A stand-in for the UMAP model of a topic model, which reduces an embedding to
+    its first two coordinates."""
+
+    def __init__(self, embeddings: np.ndarray) -> None:
+        """Initialize the stub with the embeddings it was fitted on.
+
+        Parameters
+        ----------
+        embeddings
+            The embeddings of the fit.
+        """
+
+        self.embedding_ = self.transform(embeddings)
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Reduce embeddings to their first two coordinates.
+
+        Parameters
+        ----------
+        embeddings
+            The embeddings to reduce.
+
+        Returns
+        -------
+        np.ndarray
+            The reduced embeddings.
+        """
+
+        return np.asarray(embeddings)[:, :2]
+
+
+class _StubTopicModel:
+    """A picklable stand-in for a fitted BERTopic model, which assigns each text to
+    the topic given by the first coordinate of its embedding."""
+
+    def __init__(self, embeddings: np.ndarray) -> None:
+        """Initialize the stub with the embeddings it was fitted on.
+
+        Parameters
+        ----------
+        embeddings
+            The embeddings of the fit.
+        """
+
+        self.umap_model = _StubUMAP(embeddings)
+
+    @classmethod
+    def load(cls, path: str) -> "_StubTopicModel":
+        """Load a saved stub.
+
+        Parameters
+        ----------
+        path
+            The path of the saved stub.
+
+        Returns
+        -------
+        _StubTopicModel
+            The stub.
+        """
+
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def get_topic(self, topic_id: int) -> list[tuple[str, float]]:
+        """Get the keywords of a topic.
+
+        Parameters
+        ----------
+        topic_id
+            The ID of the topic.
+
+        Returns
+        -------
+        list[tuple[str, float]]
+            The keywords of the topic and their scores.
+        """
+
+        return [(f"keyword_{topic_id}", 1.0)]
+
+    def save(self, path: str, serialization: str) -> None:
+        """Save the stub.
+
+        Parameters
+        ----------
+        path
+            The path to save the stub to.
+        serialization
+            The serialization format. Not used.
+        """
+
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    def transform(
+        self, texts: list[str], embeddings: np.ndarray
+    ) -> tuple[list[int], None]:
+        """Assign texts to topics.
+
+        Parameters
+        ----------
+        texts
+            The texts. Not used.
+        embeddings
+            The embeddings of the texts.
+
+        Returns
+        -------
+        tuple[list[int], None]
+            The topic of each text, and no probabilities.
+        """
+
+        return [int(embedding[0]) for embedding in embeddings], None
+
+
+def test_fit_topics_reuses_or_refits_persisted_model(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test that the persisted topic model is reused to assign new queries, and
+    fitted again when the new queries drift from its topics, when it is stale, or when
+    its file does not match its state.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    tmp_path
+        A temporary directory.
+    """
+
+    fits = []
+
+    def _fit_topic_model(*, embeddings: np.ndarray, texts: list[str]) -> Any:
+        fits.append(texts)
+        return _StubTopicModel(embeddings)
+
+    monkeypatch.setattr(topic_modeling, "fit_topic_model", _fit_topic_model)
+    monkeypatch.setattr(topic_model_store, "BERTopic", _StubTopicModel)
+    model_dir = str(tmp_path / "1" / "week")
+    docs = {
+        "query_1": [0.0, 0.0],
+        "query_2": [0.0, 1.0],
+        "query_3": [1.0, 0.0],
+        "query_4": [1.0, 1.0],
+    }
+
+    def _fit_topics(docs: dict[str, list[float]]) -> topic_modeling.TopicModelOutput:
+        return fit_topics(
+            doc_ids=list(docs),
+            embedding_model="openai/embeddings",
+            embeddings=np.array(list(docs.values())),
+            model_dir=model_dir,
+            refit=False,
+            texts=list(docs),
+            weights=[1] * len(docs),
+        )
+
+    assert _fit_topics(docs).refitted
+    state = load_topic_model_state(model_dir=model_dir)
+    assert state is not None
+    assert sorted(os.listdir(model_dir)) == sorted(
+        [STATE_FILE_NAME, f"model_{state['fit_id']}.pkl"]
+    )
+
+    # A new query in a known topic is assigned with the persisted model.
+    docs["query_5"] = [1.0, 2.0]
+    output = _fit_topics(docs)
+    assert not output.refitted
+    assert output.topic_ids == [0, 0, 1, 1, 1]
+    assert len(fits) == 1
+    assert load_topic_model_state(model_dir=model_dir)["fit_id"] == state["fit_id"]
+
+    # New queries that are mostly outliers drift from the topics of the model.
+    docs["query_6"] = [-1.0, 0.0]
+    docs["query_7"] = [-1.0, 1.0]
+    assert _fit_topics(docs).refitted
+    assert len(fits) == 2
+    state = load_topic_model_state(model_dir=model_dir)
+    assert state is not None
+    assert sorted(os.listdir(model_dir)) == sorted(
+        [STATE_FILE_NAME, f"model_{state['fit_id']}.pkl"]
+    )
+
+    # A model file that does not match the state is never used.
+    os.remove(os.path.join(model_dir, f"model_{state['fit_id']}.pkl"))
+    assert _fit_topics(docs).refitted
+    assert len(fits) == 3
+
+    # A model older than the refit interval is fitted again.
+    monkeypatch.setattr(topic_modeling, "TOPIC_MODELING_REFIT_INTERVAL", 0)
+    assert _fit_topics(docs).refitted
+    assert len(fits) == 4
@@ -0,0 +1,51 @@
+"""This module contains tests for the docmuncher content-hash cache."""
+
+import pytest
+from langchain_core.documents import Document
+from redis import asyncio as aioredis
+
+from core_backend.app.docmuncher import cache
+from core_backend.app.docmuncher.cache import (
+    cache_chunks,
+    cache_processed_chunk,
+    get_cached_chunks,
+    get_cached_processed_chunk,
+    hash_chunk,
+)
+
+
+async def test_cached_chunks_depend_on_models_and_settings(
+    monkeypatch: pytest.MonkeyPatch, redis_client: aioredis.Redis
+) -> None:
+    """Test that processed chunks are not served after the LLM models change, and
+    that the final chunks of a PDF file are not served after the OCR or text layer
+    settings change.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        The Redis client.
+    """
+
+    chunk = Document(metadata={"Header 1": "Intro"}, page_content="Some text")
+    chunk_hash = hash_chunk(chunk)
+    await cache_processed_chunk(chunk=chunk, chunk_hash=chunk_hash, redis=redis_client)
+    await cache_chunks(chunks=[chunk], doc_hash="doc", redis=redis_client)
+
+    assert await get_cached_processed_chunk(
+        chunk_hash=chunk_hash, redis=redis_client
+    ) == (True, chunk)
+    assert await get_cached_chunks(doc_hash="doc", redis=redis_client) == [chunk]
+
+    monkeypatch.setattr(cache, "DOCMUNCHER_TEXT_LAYER_ENABLED", False)
+    assert await get_cached_processed_chunk(
+        chunk_hash=chunk_hash, redis=redis_client
+    ) == (True, chunk)
+    assert await get_cached_chunks(doc_hash="doc", redis=redis_client) is None
+
+    monkeypatch.setattr(cache, "LITELLM_MODEL_DOCMUNCHER_TITLE", "another-model")
+    assert await get_cached_processed_chunk(
+        chunk_hash=chunk_hash, redis=redis_client
+    ) == (False, None)
@@ -0,0 +1,190 @@
+"""This module contains tests for the concurrent processing of docmuncher chunks."""
+
+import asyncio
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core_backend.app.config import REDIS_HOST
+from core_backend.app.docmuncher import dependencies, utils
+from core_backend.app.docmuncher.dependencies import (
+    deal_with_incorrectly_formatted_cards,
+    process_pdf_file,
+)
+from core_backend.app.docmuncher.job_index import save_job_status
+from core_backend.app.docmuncher.schemas import DocIngestionStatusPdf, DocStatusEnum
+
+SINGLE_LINE_MODEL = "single-line-model"
+TITLE_MODEL = "title-model"
+
+
+@pytest.fixture
+def llm_calls(monkeypatch: pytest.MonkeyPatch) -> dict[str, Counter]:
+    """Patch the docmuncher LLM calls with calls that finish in reverse order of the
+    chunks, and track the number of calls in flight for each model.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+
+    Returns
+    -------
+    dict[str, Counter]
+        The number of calls in flight and the peak number of calls in flight for
+        each model.
+    """
+
+    calls: dict[str, Counter] = {"in_flight": Counter(), "peak": Counter()}
+
+    async def _ask_llm_async(
+        *, litellm_model: str, metadata: dict, **kwargs: Any
+    ) -> str:
+        calls["in_flight"][litellm_model] += 1
+        calls["peak"][litellm_model] = max(
+            calls["peak"][litellm_model], calls["in_flight"][litellm_model]
+        )
+        await asyncio.sleep(0.01 * (10 - metadata["chunk"]))
+        calls["in_flight"][litellm_model] -= 1
+        if litellm_model == SINGLE_LINE_MODEL:
+            return "False"
+        return f'"Title {metadata["chunk"]}"'
+
+    monkeypatch.setattr(utils, "_ask_llm_async", _ask_llm_async)
+    monkeypatch.setattr(utils, "DOCMUNCHER_LLM_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(
+        utils, "LITELLM_MODEL_DOCMUNCHER_SINGLE_LINE", SINGLE_LINE_MODEL
+    )
+    monkeypatch.setattr(dependencies, "LITELLM_MODEL_DOCMUNCHER_TITLE", TITLE_MODEL)
+    return calls
+
+
+async def test_chunks_keep_their_order_and_llm_calls_are_capped_per_model(
+    llm_calls: dict[str, Counter],
+) -> None:
+    """Test that chunks whose LLM calls finish out of order are returned in their
+    original order, and that the LLM calls of concurrent jobs sharing the semaphores
+    are capped for each model.
+
+    Parameters
+    ----------
+    llm_calls
+        The tracked LLM calls.
+    """
+
+    llm_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _make_chunks() -> list[Document]:
+        return [
+            Document(metadata={"chunk": i, "page": 0}, page_content=f"Line {i}")
+            for i in range(6)
+        ]
+
+    processed_chunks = await asyncio.gather(
+        *[
+            deal_with_incorrectly_formatted_cards(
+                merged_chunks=_make_chunks(), llm_semaphores=llm_semaphores
+            )
+            for _ in range(2)
+        ]
+    )
+
+    for chunks in processed_chunks:
+        assert [chunk.metadata["title"] for chunk in chunks] == [
+            f"Title {i}" for i in range(6)
+        ]
+    assert llm_calls["peak"] == {SINGLE_LINE_MODEL: 2, TITLE_MODEL: 2}
+    assert set(llm_semaphores) == {SINGLE_LINE_MODEL, TITLE_MODEL}
+
+
+async def test_process_pdf_file_reports_chunk_progress(
+    asession: AsyncSession,
+    llm_calls: dict[str, Counter],
+    monkeypatch: pytest.MonkeyPatch,
+    redis_client: aioredis.Redis,
+    tmp_path: Path,
+) -> None:
+    """Test that the progress of the chunks of a job reaches its status in Redis.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    llm_calls
+        The tracked LLM calls.
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        The Redis client, used to flush the database before the test.
+    tmp_path
+        A temporary directory.
+    """
+
+    saved_titles: list[str] = []
+
+    async def _convert_pages_to_markdown(**kwargs: Any) -> dict:
+        markdown = "\n".join(f"# Header {i}\nLine {i}" for i in range(4))
+        return {
+            "pages": [{"index": 0, "markdown": markdown}],
+            "stats": {"pages_text_layer": 1},
+        }
+
+    async def _create_tag_per_file(**kwargs: Any) -> list:
+        return []
+
+    async def _convert_markdown_chunks_to_cards(
+        *, merged_chunks: list, **kwargs: Any
+    ) -> dict:
+        saved_titles.extend(chunk.metadata["title"] for chunk in merged_chunks)
+        return {}
+
+    monkeypatch.setattr(
+        dependencies, "convert_pages_to_markdown", _convert_pages_to_markdown
+    )
+    monkeypatch.setattr(dependencies, "create_tag_per_file", _create_tag_per_file)
+    monkeypatch.setattr(
+        dependencies,
+        "convert_markdown_chunks_to_cards",
+        _convert_markdown_chunks_to_cards,
+    )
+
+    # The job status is read as bytes, as with the Redis client of the application
+    redis = await aioredis.from_url(REDIS_HOST)
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 chunk progress test")
+    job_status = DocIngestionStatusPdf(
+        created_datetime_utc=datetime.now(timezone.utc),
+        doc_name="test.pdf",
+        pages_total=1,
+        task_id="docmuncher_job_chunk_progress",
+        upload_id="upload_chunk_progress",
+        user_id=1,
+        workspace_id=1,
+    )
+    try:
+        await save_job_status(expire=True, job_status=job_status, redis=redis)
+
+        result = await process_pdf_file(
+            redis=redis,
+            task_id=job_status.task_id,
+            file_name=job_status.doc_name,
+            file_path=str(file_path),
+            workspace_id=job_status.workspace_id,
+            asession=asession,
+            llm_semaphores={},
+        )
+
+        assert result.task_status == DocStatusEnum.success
+        assert saved_titles == [f"Title {i}" for i in range(4)]
+        saved_status = json.loads(await redis.get(job_status.task_id))
+        assert saved_status["chunks_total"] == 4
+        assert saved_status["chunks_processed"] == saved_status["chunks_total"]
+    finally:
+        await redis.aclose()
@@ -0,0 +1,212 @@
+"""This module contains tests for the docmuncher job indexes."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from redis import asyncio as aioredis
+
+from core_backend.app.docmuncher import job_index
+from core_backend.app.docmuncher.job_index import (
+    list_jobs,
+    list_uploads,
+    prune_expired_jobs,
+    save_job_status,
+)
+from core_backend.app.docmuncher.schemas import DocStatusEnum, DocUploadResponsePdf
+
+
+def _make_job(
+    *, minutes_ago: int, task_id: str, upload_id: str = "upload", user_id: int = 1
+) -> DocUploadResponsePdf:
+    """Create the status of a job that has not started.
+
+    Parameters
+    ----------
+    minutes_ago
+        The number of minutes since the job was created.
+    task_id
+        The ID of the job.
+    upload_id
+        The ID of the upload the job belongs to.
+    user_id
+        The ID of the user that created the job.
+
+    Returns
+    -------
+    DocUploadResponsePdf
+        The status of the job.
+    """
+
+    return DocUploadResponsePdf(
+        upload_id=upload_id,
+        user_id=user_id,
+        workspace_id=1,
+        created_datetime_utc=datetime.now(timezone.utc)
+        - timedelta(minutes=minutes_ago),
+        task_id=task_id,
+        doc_name=f"{task_id}.pdf",
+    )
+
+
+class TestJobIndex:
+    """Tests for listing jobs through the job indexes."""
+
+    @pytest.fixture
+    async def jobs(self, redis_client: aioredis.Redis) -> list[DocUploadResponsePdf]:
+        """Save three jobs, the newest of which is in progress.
+
+        Parameters
+        ----------
+        redis_client
+            The Redis client.
+
+        Returns
+        -------
+        list[DocUploadResponsePdf]
+            The status of the jobs, newest first.
+        """
+
+        jobs = [
+            _make_job(minutes_ago=1, task_id="job_c", upload_id="upload_2", user_id=2),
+            _make_job(minutes_ago=2, task_id="job_b"),
+            _make_job(minutes_ago=3, task_id="job_a"),
+        ]
+        for job in jobs:
+            await save_job_status(expire=True, job_status=job, redis=redis_client)
+
+        jobs[0].task_status = DocStatusEnum.in_progress
+        await save_job_status(job_status=jobs[0], redis=redis_client)
+        return jobs
+
+    async def test_list_jobs_is_paginated(
+        self, jobs: list[DocUploadResponsePdf], redis_client: aioredis.Redis
+    ) -> None:
+        """Test that jobs are listed newest first, one page at a time.
+
+        Parameters
+        ----------
+        jobs
+            The saved jobs.
+        redis_client
+            The Redis client.
+        """
+
+        first_page = await list_jobs(limit=2, redis=redis_client, workspace_id=1)
+        second_page = await list_jobs(
+            limit=2, offset=2, redis=redis_client, workspace_id=1
+        )
+
+        assert [job["task_id"] for job in first_page + second_page] == [
+            job.task_id for job in jobs
+        ]
+
+    async def test_list_jobs_by_status_and_user(
+        self, jobs: list[DocUploadResponsePdf], redis_client: aioredis.Redis
+    ) -> None:
+        """Test that jobs can be filtered by status and by user.
+
+        Parameters
+        ----------
+        jobs
+            The saved jobs.
+        redis_client
+            The Redis client.
+        """
+
+        in_progress = await list_jobs(
+            redis=redis_client,
+            task_statuses=[DocStatusEnum.in_progress],
+            workspace_id=1,
+        )
+        not_started = await list_jobs(
+            redis=redis_client,
+            task_statuses=[DocStatusEnum.not_started],
+            user_id=1,
+            workspace_id=1,
+        )
+
+        assert [job["task_id"] for job in in_progress] == ["job_c"]
+        assert [job["task_id"] for job in not_started] == ["job_b", "job_a"]
+
+    async def test_list_jobs_by_status_skips_expired_jobs(
+        self, redis_client: aioredis.Redis
+    ) -> None:
+        """Test that jobs of several statuses are merged newest first when a job in
+        the middle of an index has expired.
+
+        Parameters
+        ----------
+        redis_client
+            The Redis client.
+        """
+
+        jobs = [
+            _make_job(minutes_ago=1, task_id="job_new"),
+            _make_job(minutes_ago=2, task_id="job_expired"),
+            _make_job(minutes_ago=3, task_id="job_running"),
+            _make_job(minutes_ago=4, task_id="job_old"),
+        ]
+        for job in jobs:
+            await save_job_status(expire=True, job_status=job, redis=redis_client)
+        jobs[2].task_status = DocStatusEnum.in_progress
+        await save_job_status(job_status=jobs[2], redis=redis_client)
+        await redis_client.delete("job_expired")
+
+        listed_jobs = await list_jobs(
+            redis=redis_client,
+            task_statuses=[DocStatusEnum.not_started, DocStatusEnum.in_progress],
+            workspace_id=1,
+        )
+
+        assert [job["task_id"] for job in listed_jobs] == [
+            "job_new",
+            "job_running",
+            "job_old",
+        ]
+
+    async def test_list_uploads(
+        self, jobs: list[DocUploadResponsePdf], redis_client: aioredis.Redis
+    ) -> None:
+        """Test that the jobs of each upload are listed oldest job first.
+
+        Parameters
+        ----------
+        jobs
+            The saved jobs.
+        redis_client
+            The Redis client.
+        """
+
+        uploads = await list_uploads(redis=redis_client, workspace_id=1)
+
+        assert list(uploads) == ["upload_2", "upload"]
+        assert [job["task_id"] for job in uploads["upload"]] == ["job_a", "job_b"]
+
+    async def test_prune_expired_jobs(
+        self,
+        jobs: list[DocUploadResponsePdf],
+        monkeypatch: pytest.MonkeyPatch,
+        redis_client: aioredis.Redis,
+    ) -> None:
+        """Test that expired jobs are removed from the indexes.
+
+        Parameters
+        ----------
+        jobs
+            The saved jobs.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        redis_client
+            The Redis client.
+        """
+
+        expired_job = _make_job(minutes_ago=10, task_id="job_expired")
+        monkeypatch.setattr(job_index, "REDIS_DOC_INGEST_EXPIRY_TIME", 1)
+        await save_job_status(expire=True, job_status=expired_job, redis=redis_client)
+        await asyncio.sleep(1.5)
+
+        assert await prune_expired_jobs(redis=redis_client) == 1
+        assert await redis_client.zrange(
+            job_index._workspace_jobs_key(workspace_id=1), 0, -1
+        ) == ["job_a", "job_b", "job_c"]
@@ -0,0 +1,174 @@
+"""This module contains tests for the docmuncher job queue."""
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+from redis import asyncio as aioredis
+
+from core_backend.app.docmuncher import job_queue
+from core_backend.app.docmuncher.job_queue import (
+    JOB_CONSUMER_GROUP,
+    JOB_DELAYED_KEY,
+    JOB_STREAM_KEY,
+    DocmuncherJobWorker,
+    acquire_workspace_slot,
+    enqueue_docmuncher_job,
+    get_retry_delay,
+    promote_delayed_jobs,
+    release_workspace_slot,
+    schedule_docmuncher_job,
+)
+
+
+def test_retry_delay_doubles(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the retry delay doubles with every failed attempt.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    """
+
+    monkeypatch.setattr(job_queue, "DOCMUNCHER_JOB_RETRY_BACKOFF", 10)
+
+    assert [get_retry_delay(attempt=attempt) for attempt in (1, 2, 3)] == [10, 20, 40]
+
+
+async def test_workspace_slots_are_capped(
+    monkeypatch: pytest.MonkeyPatch, redis_client: aioredis.Redis
+) -> None:
+    """Test that a workspace cannot run more jobs than its concurrency cap.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        The Redis client.
+    """
+
+    monkeypatch.setattr(job_queue, "DOCMUNCHER_JOB_WORKSPACE_CONCURRENCY", 2)
+
+    for task_id in ("task_1", "task_2"):
+        assert await acquire_workspace_slot(
+            redis=redis_client, task_id=task_id, workspace_id=1
+        )
+    assert not await acquire_workspace_slot(
+        redis=redis_client, task_id="task_3", workspace_id=1
+    )
+    # Other workspaces and re-acquisition by a running job are not affected
+    assert await acquire_workspace_slot(
+        redis=redis_client, task_id="task_3", workspace_id=2
+    )
+    assert await acquire_workspace_slot(
+        redis=redis_client, task_id="task_1", workspace_id=1
+    )
+
+    await release_workspace_slot(redis=redis_client, task_id="task_1", workspace_id=1)
+    assert await acquire_workspace_slot(
+        redis=redis_client, task_id="task_3", workspace_id=1
+    )
+
+
+async def test_promote_delayed_jobs(
+    monkeypatch: pytest.MonkeyPatch, redis_client: aioredis.Redis
+) -> None:
+    """Test that only jobs that are ready are moved back onto the stream, with their
+    fields, in batches.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        The Redis client.
+    """
+
+    monkeypatch.setattr(job_queue, "PROMOTE_BATCH_SIZE", 1)
+    ready_jobs = [
+        {"attempt": 2, "file_name": f"{task_id}.pdf", "task_id": task_id}
+        for task_id in ("ready_1", "ready_2")
+    ]
+    later_job = {"task_id": "later", "file_name": "b.pdf", "workspace_id": 1}
+    for ready_job in ready_jobs:
+        await schedule_docmuncher_job(delay=-1, job=ready_job, redis=redis_client)
+    await schedule_docmuncher_job(delay=3600, job=later_job, redis=redis_client)
+
+    assert await promote_delayed_jobs(redis=redis_client) == 2
+
+    messages = await redis_client.xrange(JOB_STREAM_KEY)
+    assert sorted(
+        (fields for _, fields in messages), key=lambda fields: fields["task_id"]
+    ) == [
+        {key: str(value) for key, value in ready_job.items()}
+        for ready_job in ready_jobs
+    ]
+    assert await redis_client.zrange(JOB_DELAYED_KEY, 0, -1) == [json.dumps(later_job)]
+
+
+async def test_job_is_acknowledged_only_once_handled(
+    monkeypatch: pytest.MonkeyPatch, redis_client: aioredis.Redis
+) -> None:
+    """Test that a job whose processing raises an unexpected error stays pending, so
+    that it is reclaimed and retried, and that it is acknowledged once processed.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        The Redis client.
+    """
+
+    await enqueue_docmuncher_job(
+        file_name="a.pdf",
+        file_path="temp/docmuncher/a.pdf",
+        redis=redis_client,
+        task_id="task_1",
+        workspace_id=1,
+    )
+    worker = DocmuncherJobWorker(concurrency=1, redis=redis_client)
+    response = await redis_client.xreadgroup(
+        JOB_CONSUMER_GROUP, worker.consumer_name, {JOB_STREAM_KEY: ">"}, count=1
+    )
+    message_id, fields = response[0][1][0]
+
+    async def failing_process_job(**kwargs: Any) -> None:
+        raise RuntimeError("Job status has expired")
+
+    monkeypatch.setattr(worker, "_process_job", failing_process_job)
+    await worker._handle_job(delivery_count=1, fields=fields, message_id=message_id)
+    pending = await redis_client.xpending(JOB_STREAM_KEY, JOB_CONSUMER_GROUP)
+    assert pending["pending"] == 1
+    assert len(await redis_client.xrange(JOB_STREAM_KEY)) == 1
+
+    async def process_job(**kwargs: Any) -> None:
+        return None
+
+    monkeypatch.setattr(worker, "_process_job", process_job)
+    await worker._handle_job(delivery_count=2, fields=fields, message_id=message_id)
+    pending = await redis_client.xpending(JOB_STREAM_KEY, JOB_CONSUMER_GROUP)
+    assert pending["pending"] == 0
+    assert await redis_client.xrange(JOB_STREAM_KEY) == []
+
+
+async def test_read_new_jobs_returns_when_no_slot_is_free(
+    redis_client: aioredis.Redis,
+) -> None:
+    """Test that reading new jobs does not wait for a slot indefinitely, so that the
+    worker keeps promoting and reclaiming jobs and can stop.
+
+    Parameters
+    ----------
+    redis_client
+        The Redis client.
+    """
+
+    worker = DocmuncherJobWorker(concurrency=1, redis=redis_client)
+    await worker._slots.acquire()
+
+    await asyncio.wait_for(worker._read_new_jobs(), timeout=5)
+
+    assert worker._slots.locked()
@@ -0,0 +1,195 @@
+"""This module contains tests for the docmuncher OCR pipeline."""
+
+import asyncio
+from io import BytesIO
+from typing import Any
+
+import pytest
+from PyPDF2 import PdfWriter
+from redis import asyncio as aioredis
+
+from core_backend.app.docmuncher import ocr
+from core_backend.app.docmuncher.cache import cache_ocr_pages, hash_content
+from core_backend.app.docmuncher.ocr import (
+    OCRBackend,
+    convert_pages_to_markdown,
+    split_into_page_ranges,
+)
+
+
+def _make_pdf(*, num_pages: int) -> bytes:
+    """Create a PDF file with blank pages.
+
+    Parameters
+    ----------
+    num_pages
+        The number of pages in the PDF file.
+
+    Returns
+    -------
+    bytes
+        The content of the PDF file.
+    """
+
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(width=72, height=72)
+    pdf_buffer = BytesIO()
+    writer.write(pdf_buffer)
+    return pdf_buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "num_pages, pages_per_range, expected",
+    [
+        (0, 3, []),
+        (3, 3, [[0, 1, 2]]),
+        (5, 2, [[0, 1], [2, 3], [4]]),
+    ],
+)
+def test_split_into_page_ranges(
+    num_pages: int, pages_per_range: int, expected: list[list[int]]
+) -> None:
+    """Test that pages are split into consecutive page ranges.
+
+    Parameters
+    ----------
+    num_pages
+        The number of pages in the document.
+    pages_per_range
+        The maximum number of pages in each range.
+    expected
+        The expected page ranges.
+    """
+
+    assert split_into_page_ranges(num_pages, pages_per_range) == expected
+
+
+def test_ocr_backend_without_ocr_pages_cannot_be_created() -> None:
+    """Test that an OCR backend missing one of the backend methods fails when it is
+    created rather than when it is first used."""
+
+    class PrepareOnlyBackend(OCRBackend):
+        """OCR backend without `ocr_pages`."""
+
+        async def prepare(self, file_name: str, content: bytes) -> Any:
+            """Prepare a PDF file for OCR."""
+            return content
+
+    with pytest.raises(TypeError):
+        PrepareOnlyBackend()  # type: ignore[abstract]
+
+
+async def test_convert_pages_to_markdown_with_stub_backend(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that page ranges are OCR'd and merged back in page order.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    """
+
+    monkeypatch.setattr(ocr, "DOCMUNCHER_OCR_BACKEND", "stub")
+    monkeypatch.setattr(ocr, "DOCMUNCHER_OCR_PAGES_PER_REQUEST", 2)
+
+    markdown_text = await convert_pages_to_markdown(
+        file_name="test.pdf", content=_make_pdf(num_pages=5)
+    )
+
+    assert [page["index"] for page in markdown_text["pages"]] == [0, 1, 2, 3, 4]
+    assert all(isinstance(page["markdown"], str) for page in markdown_text["pages"])
+
+
+async def test_convert_pages_to_markdown_uses_cached_pages(
+    monkeypatch: pytest.MonkeyPatch, redis_client: aioredis.Redis
+) -> None:
+    """Test that only pages missing from the OCR cache are sent to the backend.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        The Redis client.
+    """
+
+    monkeypatch.setattr(ocr, "DOCMUNCHER_OCR_BACKEND", "stub")
+    monkeypatch.setattr(ocr, "DOCMUNCHER_OCR_PAGES_PER_REQUEST", 2)
+    content = _make_pdf(num_pages=3)
+    await cache_ocr_pages(
+        doc_hash=hash_content(content),
+        pages=[{"index": 1, "markdown": "# Cached page"}],
+        redis=redis_client,
+    )
+
+    ocr_requests: list[list[int]] = []
+    stub_backend = ocr.OCR_BACKENDS["stub"]
+    ocr_pages = stub_backend.ocr_pages
+
+    async def _count_ocr_pages(document: Any, pages: list[int]) -> list[dict]:
+        ocr_requests.append(pages)
+        return await ocr_pages(document, pages)
+
+    monkeypatch.setattr(stub_backend, "ocr_pages", _count_ocr_pages)
+
+    markdown_text = await convert_pages_to_markdown(
+        file_name="test.pdf", content=content, redis=redis_client
+    )
+    assert ocr_requests == [[0, 2]]
+    assert markdown_text["pages"][1]["markdown"] == "# Cached page"
+
+    # All pages are cached now, so the PDF is not OCR'd again
+    await convert_pages_to_markdown(
+        file_name="duplicate.pdf", content=content, redis=redis_client
+    )
+    assert ocr_requests == [[0, 2]]
+
+
+async def test_ocr_requests_of_concurrent_files_share_the_semaphore(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the OCR requests of files converted concurrently are capped by the
+    semaphore they share, and that the page ranges are OCR'd by separate readers.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    """
+
+    monkeypatch.setattr(ocr, "DOCMUNCHER_OCR_BACKEND", "stub")
+    monkeypatch.setattr(ocr, "DOCMUNCHER_OCR_PAGES_PER_REQUEST", 1)
+    n_in_flight = 0
+    peak_in_flight = 0
+    stub_backend = ocr.OCR_BACKENDS["stub"]
+    ocr_pages = stub_backend.ocr_pages
+
+    async def _track_ocr_pages(document: Any, pages: list[int]) -> list[dict]:
+        nonlocal n_in_flight, peak_in_flight
+        n_in_flight += 1
+        peak_in_flight = max(peak_in_flight, n_in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await ocr_pages(document, pages)
+        finally:
+            n_in_flight -= 1
+
+    monkeypatch.setattr(stub_backend, "ocr_pages", _track_ocr_pages)
+    ocr_semaphore = asyncio.Semaphore(2)
+
+    markdown_texts = await asyncio.gather(
+        *[
+            convert_pages_to_markdown(
+                file_name=f"test_{i}.pdf",
+                content=_make_pdf(num_pages=4),
+                ocr_semaphore=ocr_semaphore,
+            )
+            for i in range(2)
+        ]
+    )
+
+    assert peak_in_flight == 2
+    for markdown_text in markdown_texts:
+        assert [page["index"] for page in markdown_text["pages"]] == [0, 1, 2, 3]
@@ -0,0 +1,107 @@
+"""This module contains tests for spooling docmuncher uploads to disk."""
+
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PyPDF2 import PdfWriter
+
+from core_backend.app.docmuncher import spool
+from core_backend.app.docmuncher.spool import (
+    count_spooled_pdf_pages,
+    delete_spooled_files,
+    extract_pdf_members,
+    spool_upload,
+)
+
+
+def _make_pdf(*, num_pages: int) -> bytes:
+    """Create a PDF file with blank pages.
+
+    Parameters
+    ----------
+    num_pages
+        The number of pages in the PDF file.
+
+    Returns
+    -------
+    bytes
+        The content of the PDF file.
+    """
+
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(width=72, height=72)
+    pdf_buffer = BytesIO()
+    writer.write(pdf_buffer)
+    return pdf_buffer.getvalue()
+
+
+@pytest.fixture
+def spool_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Spool uploads to a temporary directory.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    tmp_path
+        Pytest temporary directory fixture.
+
+    Returns
+    -------
+    Path
+        The spool directory.
+    """
+
+    monkeypatch.setattr(spool, "DOCMUNCHER_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(spool, "DOCMUNCHER_SPOOL_BLOCK_SIZE", 16)
+    return tmp_path
+
+
+async def test_spool_pdf_upload(spool_dir: Path) -> None:
+    """Test that a PDF upload is spooled to disk and its pages are counted.
+
+    Parameters
+    ----------
+    spool_dir
+        The spool directory.
+    """
+
+    content = _make_pdf(num_pages=3)
+
+    pdf_path = await spool_upload(extension=".pdf", stream=BytesIO(content))
+
+    assert pdf_path.parent == spool_dir
+    assert pdf_path.read_bytes() == content
+    assert await count_spooled_pdf_pages(path=pdf_path) == 3
+
+    delete_spooled_files([pdf_path])
+    assert not pdf_path.exists()
+
+
+async def test_extract_pdf_members(spool_dir: Path) -> None:
+    """Test that only the PDF members of a zip upload are extracted.
+
+    Parameters
+    ----------
+    spool_dir
+        The spool directory.
+    """
+
+    zip_buffer = BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
+        zip_file.writestr("a.pdf", _make_pdf(num_pages=1))
+        zip_file.writestr("notes.txt", "Not a PDF")
+        zip_file.writestr("docs/b.pdf", _make_pdf(num_pages=2))
+    zip_buffer.seek(0)
+    zip_path = await spool_upload(extension=".zip", stream=zip_buffer)
+
+    pdf_files = await extract_pdf_members(zip_path=zip_path)
+
+    assert [name for name, _ in pdf_files] == ["a.pdf", "docs/b.pdf"]
+    assert [await count_spooled_pdf_pages(path=path) for _, path in pdf_files] == [
+        1,
+        2,
+    ]
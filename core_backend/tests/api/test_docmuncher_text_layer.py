@@ -0,0 +1,146 @@
+"""This module contains tests for the docmuncher text-layer fast path."""
+
+import pytest
+
+from core_backend.app.docmuncher import ocr
+from core_backend.app.docmuncher.ocr import convert_pages_to_markdown
+from core_backend.app.docmuncher.text_layer import (
+    convert_lines_to_markdown,
+    extract_text_layer_pages,
+    is_text_layer_usable,
+)
+
+BODY_TEXT = "This page has a text layer that is long enough to be extracted locally."
+
+
+def _make_text_pdf(*, pages: list[list[tuple[int, str]]]) -> bytes:
+    """Create a PDF file with a text layer.
+
+    Parameters
+    ----------
+    pages
+        The font size and text of each line of each page. Pages without lines are
+        blank, like scanned pages without a text layer.
+
+    Returns
+    -------
+    bytes
+        The content of the PDF file.
+    """
+
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        stream = ""
+        y = 750
+        for font_size, text in lines:
+            stream += f"BT /F1 {font_size} Tf 72 {y} Td ({text}) Tj ET\n"
+            y -= 2 * font_size
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}endstream")
+
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += f"{i + 1} 0 obj\n{obj}\nendobj\n"
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    )
+    return pdf.encode("latin-1")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", False),
+        ("Too short", False),
+        (BODY_TEXT, True),
+        ("\ufffd" * 100, False),
+    ],
+)
+def test_is_text_layer_usable(text: str, expected: bool) -> None:
+    """Test that only pages with enough readable text use the text layer.
+
+    Parameters
+    ----------
+    text
+        The text extracted from the page.
+    expected
+        Whether the text layer is expected to be usable.
+    """
+
+    assert is_text_layer_usable(text) == expected
+
+
+def test_convert_lines_to_markdown_detects_headers() -> None:
+    """Test that lines in larger fonts than the body become markdown headers."""
+
+    lines = [
+        (24.0, "Title"),
+        (12.0, BODY_TEXT),
+        (16.0, "Section"),
+        (14.0, "Subsection"),
+        (12.0, BODY_TEXT),
+    ]
+
+    markdown = convert_lines_to_markdown([(text, size) for size, text in lines])
+
+    assert markdown.split("\n") == [
+        "# Title",
+        BODY_TEXT,
+        "## Section",
+        "### Subsection",
+        BODY_TEXT,
+    ]
+
+
+def test_extract_text_layer_pages_skips_scanned_pages() -> None:
+    """Test that pages without a text layer are left for OCR."""
+
+    content = _make_text_pdf(pages=[[(24, "Title"), (12, BODY_TEXT)], []])
+
+    num_pages, text_layer_pages = extract_text_layer_pages(content)
+
+    assert num_pages == 2
+    assert list(text_layer_pages) == [0]
+    assert text_layer_pages[0]["markdown"] == f"# Title\n{BODY_TEXT}"
+
+
+async def test_convert_pages_to_markdown_reports_page_stats(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that only scanned pages are OCR'd and that stats count each path.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    """
+
+    monkeypatch.setattr(ocr, "DOCMUNCHER_OCR_BACKEND", "stub")
+    monkeypatch.setattr(ocr, "DOCMUNCHER_TEXT_LAYER_ENABLED", True)
+    content = _make_text_pdf(pages=[[(12, BODY_TEXT)], [], [(12, BODY_TEXT)]])
+
+    markdown_text = await convert_pages_to_markdown(
+        file_name="test.pdf", content=content
+    )
+
+    assert [page["index"] for page in markdown_text["pages"]] == [0, 1, 2]
+    assert markdown_text["stats"] == {
+        "pages_total": 3,
+        "pages_text_layer": 2,
+        "pages_ocr": 1,
+        "pages_ocr_cached": 0,
+    }
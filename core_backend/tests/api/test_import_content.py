@@ -1,12 +1,21 @@
 """This module contains tests for the import content API endpoint."""
 
+from datetime import datetime, timedelta, timezone
 from io import BytesIO
-from typing import Generator
+from pathlib import Path
+from typing import Any, Generator
 
 import pandas as pd
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
+from redis import asyncio as aioredis
+
+from core_backend.app.contents import csv_import, models
+from core_backend.app.contents.schemas import CsvImportStatus, CsvImportStatusEnum
+from core_backend.app.utils import EmbeddingCallException
+
+from .conftest import async_fake_embedding
 
 
 def _dict_to_csv_bytes(*, data: dict) -> BytesIO:
@@ -31,6 +40,63 @@ def _dict_to_csv_bytes(*, data: dict) -> BytesIO:
     return csv_bytes
 
 
+def _get_csv_import_status(
+    *, access_token: str, client: TestClient, job_id: str
+) -> dict:
+    """Get the status of a CSV import job.
+
+    NB: The test client runs the import job before returning the upload response.
+
+    Parameters
+    ----------
+    access_token
+        The access token of the user that uploaded the CSV file.
+    client
+        The test client.
+    job_id
+        The ID of the CSV import job.
+
+    Returns
+    -------
+    dict
+        The status of the CSV import job.
+    """
+
+    response = client.get(
+        f"/content/csv-upload/{job_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def _delete_contents_by_title(
+    *, access_token: str, client: TestClient, titles: list[str]
+) -> None:
+    """Delete the contents with the given titles.
+
+    Parameters
+    ----------
+    access_token
+        The access token of the user that owns the contents.
+    client
+        The test client.
+    titles
+        The titles of the contents to delete.
+    """
+
+    response = client.get(
+        "/content/", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    for content in response.json():
+        if content["content_title"] in titles:
+            response = client.delete(
+                f"/content/{content['content_id']}",
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+
 class TestImportContentQuota:
     """Tests for the import content quota API endpoint."""
 
@@ -76,17 +142,21 @@ class TestImportContentQuota:
             headers={"Authorization": f"Bearer {temp_workspace_token}"},
             files={"file": ("test.csv", data, "text/csv")},
         )
-        assert response.status_code == status.HTTP_200_OK
+        assert response.status_code == status.HTTP_202_ACCEPTED
 
-        json_response = response.json()
-        contents_list = json_response["contents"]
-        for content in contents_list:
-            content_id = content["content_id"]
-            response = client.delete(
-                f"/content/{content_id}",
-                headers={"Authorization": f"Bearer {temp_workspace_token}"},
-            )
-            assert response.status_code == status.HTTP_200_OK
+        job_status = _get_csv_import_status(
+            access_token=temp_workspace_token,
+            client=client,
+            job_id=response.json()["job_id"],
+        )
+        assert job_status["job_status"] == "Success"
+        assert job_status["contents_created"] == 2
+
+        _delete_contents_by_title(
+            access_token=temp_workspace_token,
+            client=client,
+            titles=["csv title 1", "csv title 2"],
+        )
 
     @pytest.mark.parametrize(
         "temp_workspace_token_and_quota",
@@ -345,20 +415,26 @@ class TestImportContent:
             headers={"Authorization": f"Bearer {access_token_admin_1}"},
             files={"file": ("test.csv", mock_csv_file, "text/csv")},
         )
-        assert response.status_code == status.HTTP_200_OK
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["rows_total"] == 2
+
+        job_status = _get_csv_import_status(
+            access_token=access_token_admin_1,
+            client=client,
+            job_id=response.json()["job_id"],
+        )
+        assert job_status["job_status"] == "Success"
+        assert job_status["rows_processed"] == 2
+        assert job_status["contents_created"] == 2
 
         # Cleanup contents and tags.
-        json_response = response.json()
-        contents_list = json_response["contents"]
-        for content in contents_list:
-            content_id = content["content_id"]
-            response = client.delete(
-                f"/content/{content_id}",
-                headers={"Authorization": f"Bearer {access_token_admin_1}"},
-            )
-            assert response.status_code == status.HTTP_200_OK
+        _delete_contents_by_title(
+            access_token=access_token_admin_1,
+            client=client,
+            titles=["csv title 1", "csv title 2"],
+        )
 
-        tags_list = json_response["tags"]
+        tags_list = job_status["tags_created"]
         for tag in tags_list:
             tag_id = tag["tag_id"]
             response = client.delete(
@@ -367,6 +443,215 @@ class TestImportContent:
             )
             assert response.status_code == status.HTTP_200_OK
 
+    async def test_csv_import_reports_failed_rows(
+        self,
+        access_token_admin_1: str,
+        client: TestClient,
+        data_valid: BytesIO,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that rows that cannot be embedded are reported without aborting the
+        rest of the import.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            The access token for the admin user 1.
+        client
+            The test client.
+        data_valid
+            The valid CSV file in bytes.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        """
+
+        async def _failing_embedding_batch(**kwargs: Any) -> list[list[float]]:
+            raise EmbeddingCallException("Batch embedding failed")
+
+        async def _embedding(*, text_to_embed: str, **kwargs: Any) -> list[float]:
+            if text_to_embed.startswith("csv title 1"):
+                raise EmbeddingCallException("Embedding failed")
+            return await async_fake_embedding()
+
+        monkeypatch.setattr(models, "embedding_batch", _failing_embedding_batch)
+        monkeypatch.setattr(models, "embedding", _embedding)
+
+        response = client.post(
+            "/content/csv-upload",
+            headers={"Authorization": f"Bearer {access_token_admin_1}"},
+            files={"file": ("test.csv", data_valid, "text/csv")},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        job_status = _get_csv_import_status(
+            access_token=access_token_admin_1,
+            client=client,
+            job_id=response.json()["job_id"],
+        )
+        assert job_status["job_status"] == "Success"
+        assert job_status["contents_created"] == 1
+        assert job_status["failures"] == [
+            {"content_title": "csv title 1", "error": "Embedding failed", "index": 0}
+        ]
+
+        _delete_contents_by_title(
+            access_token=access_token_admin_1, client=client, titles=["csv title 2"]
+        )
+
+    async def test_csv_import_reports_failed_rows_across_chunks(
+        self,
+        access_token_admin_1: str,
+        client: TestClient,
+        data_valid: BytesIO,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that the index of a failed row is its index in the whole CSV file
+        when the file is imported in several chunks.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            The access token for the admin user 1.
+        client
+            The test client.
+        data_valid
+            The valid CSV file in bytes.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        """
+
+        async def _failing_embedding_batch(**kwargs: Any) -> list[list[float]]:
+            raise EmbeddingCallException("Batch embedding failed")
+
+        async def _embedding(*, text_to_embed: str, **kwargs: Any) -> list[float]:
+            if text_to_embed.startswith("csv title 2"):
+                raise EmbeddingCallException("Embedding failed")
+            return await async_fake_embedding()
+
+        monkeypatch.setattr(csv_import, "CSV_IMPORT_CHUNK_SIZE", 1)
+        monkeypatch.setattr(models, "embedding_batch", _failing_embedding_batch)
+        monkeypatch.setattr(models, "embedding", _embedding)
+
+        response = client.post(
+            "/content/csv-upload",
+            headers={"Authorization": f"Bearer {access_token_admin_1}"},
+            files={"file": ("test.csv", data_valid, "text/csv")},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["rows_total"] == 2
+
+        job_status = _get_csv_import_status(
+            access_token=access_token_admin_1,
+            client=client,
+            job_id=response.json()["job_id"],
+        )
+        assert job_status["job_status"] == "Success"
+        assert job_status["rows_processed"] == 2
+        assert job_status["contents_created"] == 1
+        assert job_status["failures"] == [
+            {"content_title": "csv title 2", "error": "Embedding failed", "index": 1}
+        ]
+
+        _delete_contents_by_title(
+            access_token=access_token_admin_1, client=client, titles=["csv title 1"]
+        )
+
+    async def test_csv_import_stale_job_is_reported_failed(
+        self,
+        access_token_admin_1: str,
+        client: TestClient,
+        redis_client: aioredis.Redis,
+        tmp_path: Path,
+        workspace_1_id: int,
+    ) -> None:
+        """Test that a job left in progress by a restarted server is reported as
+        failed once its heartbeat is stale, and that its spooled file is deleted,
+        while a job with a recent heartbeat is still reported in progress.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            The access token for the admin user 1.
+        client
+            The test client.
+        redis_client
+            The Redis client.
+        tmp_path
+            A temporary directory.
+        workspace_1_id
+            The ID of workspace 1.
+        """
+
+        now = datetime.now(timezone.utc)
+        file_paths = {}
+        for job_id, heartbeat_age in [("stale_job", 3600), ("running_job", 0)]:
+            file_paths[job_id] = tmp_path / f"{job_id}.csv"
+            file_paths[job_id].write_text("title,text\n")
+            await csv_import.create_csv_import_job(
+                file_path=str(file_paths[job_id]),
+                job_status=CsvImportStatus(
+                    created_datetime_utc=now - timedelta(seconds=heartbeat_age),
+                    file_name="test.csv",
+                    heartbeat_datetime_utc=now - timedelta(seconds=heartbeat_age),
+                    job_id=job_id,
+                    job_status=CsvImportStatusEnum.in_progress,
+                    rows_total=1,
+                    user_id=1,
+                    workspace_id=workspace_1_id,
+                ),
+                redis=redis_client,
+            )
+
+        job_status = _get_csv_import_status(
+            access_token=access_token_admin_1, client=client, job_id="stale_job"
+        )
+        assert job_status["job_status"] == "Failed"
+        assert job_status["finished_datetime_utc"] is not None
+        assert not file_paths["stale_job"].exists()
+
+        job_status = _get_csv_import_status(
+            access_token=access_token_admin_1, client=client, job_id="running_job"
+        )
+        assert job_status["job_status"] == "In progress"
+        assert file_paths["running_job"].exists()
+
+    async def test_csv_import_checks_across_chunks(
+        self,
+        access_token_admin_1: str,
+        client: TestClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that the checks find duplicates across chunks of the CSV file, and
+        report each type of error once, in the order of the checks.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            The access token for the admin user 1.
+        client
+            The test client.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        """
+
+        monkeypatch.setattr(csv_import, "CSV_IMPORT_CHUNK_SIZE", 1)
+        data = {
+            "text": ["chunk text 1", "chunk text 2", "chunk text 1", "chunk text 3"],
+            "title": ["chunk title", "chunk title", "chunk title", None],
+        }
+
+        response = client.post(
+            "/content/csv-upload",
+            files={"file": ("test.csv", _dict_to_csv_bytes(data=data), "text/csv")},
+            headers={"Authorization": f"Bearer {access_token_admin_1}"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error["type"] for error in response.json()["detail"]["errors"]] == [
+            "empty_title",
+            "duplicate_titles",
+            "duplicate_texts",
+        ]
+
     @pytest.mark.parametrize(
         "mock_csv_data, expected_error_type",
         [
@@ -450,6 +735,20 @@ class TestDBDuplicates:
         data = {"text": ["New text"], "title": ["Title in DB"]}
         return _dict_to_csv_bytes(data=data)
 
+    @pytest.fixture
+    def data_title_in_db_spacing(self) -> BytesIO:
+        """Create a CSV file with a title that only differs in whitespace from a title
+        that already exists in the database in bytes.
+
+        Returns
+        -------
+        BytesIO
+            The CSV file with a title that already exists in the database in bytes.
+        """
+
+        data = {"text": ["New text"], "title": ["Title  in\tDB"]}
+        return _dict_to_csv_bytes(data=data)
+
     @pytest.fixture(scope="function")
     def existing_content_in_db(
         self, access_token_admin_1: str, client: TestClient
@@ -490,7 +789,11 @@ class TestDBDuplicates:
 
     @pytest.mark.parametrize(
         "mock_csv_data, expected_error_type",
-        [("data_title_in_db", "title_in_db"), ("data_text_in_db", "text_in_db")],
+        [
+            ("data_title_in_db", "title_in_db"),
+            ("data_title_in_db_spacing", "title_in_db"),
+            ("data_text_in_db", "text_in_db"),
+        ],
     )
     async def test_csv_import_db_duplicates(
         self,
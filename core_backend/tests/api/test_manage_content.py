@@ -1,12 +1,13 @@
 """This module contains tests for the content management API endpoints."""
 
 from datetime import datetime, timezone
-from typing import Generator
+from typing import Any, Generator
 
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from core_backend.app.contents import models
 from core_backend.app.contents.models import ContentDB
 from core_backend.app.contents.routers import _convert_record_to_schema
 
@@ -318,6 +319,109 @@ class TestManageContent:
         edited_metadata = json_response["content_metadata"]
         assert all(edited_metadata[k] == v for k, v in content_metadata.items())
 
+    def test_edit_metadata_reuses_embedding(
+        self,
+        access_token_admin_1: str,
+        client: TestClient,
+        existing_content_id_in_workspace_1: int,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that editing content without changing its title or text does not
+        re-embed it.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            The access token for admin user 1.
+        client
+            The test client.
+        existing_content_id_in_workspace_1
+            The ID of the existing content in workspace 1.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        """
+
+        async def _failing_embedding(*args: str, **kwargs: str) -> list[float]:
+            raise AssertionError("Unchanged content should not be re-embedded")
+
+        response = client.get(
+            f"/content/{existing_content_id_in_workspace_1}",
+            headers={"Authorization": f"Bearer {access_token_admin_1}"},
+        )
+        content = response.json()
+
+        monkeypatch.setattr(models, "embedding", _failing_embedding)
+        response = client.put(
+            f"/content/{existing_content_id_in_workspace_1}",
+            headers={"Authorization": f"Bearer {access_token_admin_1}"},
+            json={
+                "content_metadata": {"new_key": "new_value"},
+                "content_tags": [],
+                "content_text": content["content_text"],
+                "content_title": content["content_title"],
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["content_metadata"] == {"new_key": "new_value"}
+
+    def test_create_content_does_not_reuse_embedding_of_other_workspace(
+        self,
+        access_token_admin_1: str,
+        access_token_admin_2: str,
+        client: TestClient,
+        existing_content_id_in_workspace_1: int,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that stored vectors are only reused within the same workspace.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            The access token for admin user 1.
+        access_token_admin_2
+            The access token for admin user 2.
+        client
+            The test client.
+        existing_content_id_in_workspace_1
+            The ID of the existing content in workspace 1.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        """
+
+        texts_embedded = []
+
+        async def _embedding(*, text_to_embed: str, **kwargs: Any) -> list[float]:
+            texts_embedded.append(text_to_embed)
+            return await async_fake_embedding()
+
+        response = client.get(
+            f"/content/{existing_content_id_in_workspace_1}",
+            headers={"Authorization": f"Bearer {access_token_admin_1}"},
+        )
+        content = response.json()
+
+        monkeypatch.setattr(models, "embedding", _embedding)
+        response = client.post(
+            "/content",
+            headers={"Authorization": f"Bearer {access_token_admin_2}"},
+            json={
+                "content_metadata": {},
+                "content_tags": [],
+                "content_text": content["content_text"],
+                "content_title": content["content_title"],
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(texts_embedded) == 1
+
+        response = client.delete(
+            f"/content/{response.json()['content_id']}",
+            headers={"Authorization": f"Bearer {access_token_admin_2}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
     def test_edit_content_not_found(
         self, access_token_admin_1: str, client: TestClient
     ) -> None:
@@ -369,6 +473,67 @@ class TestManageContent:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.json()) > 0
 
+    def test_list_content_keyset_pagination_and_filters(
+        self,
+        access_token_admin_1: str,
+        client: TestClient,
+        existing_tag_id_in_workspace_1: int,
+    ) -> None:
+        """Test paging through content with a keyset cursor and filtering content.
+
+        Parameters
+        ----------
+        access_token_admin_1
+            The access token for admin user 1.
+        client
+            The test client.
+        existing_tag_id_in_workspace_1
+            The ID of the existing tag in workspace 1.
+        """
+
+        headers = {"Authorization": f"Bearer {access_token_admin_1}"}
+        content_ids = []
+        for i in range(3):
+            response = client.post(
+                "/content",
+                headers=headers,
+                json={
+                    "content_metadata": {},
+                    "content_tags": [existing_tag_id_in_workspace_1] if i == 0 else [],
+                    "content_text": f"Keyset 100% content text {i}",
+                    "content_title": f"Keyset content title {i}",
+                },
+            )
+            content_ids.append(response.json()["content_id"])
+
+        params: dict = {
+            "exclude_unvalidated": False,
+            "limit": 2,
+            "search": "keyset 100%",
+        }
+        first_page = client.get("/content", headers=headers, params=params).json()
+        last = first_page[-1]
+        second_page = client.get(
+            "/content",
+            headers=headers,
+            params={
+                **params,
+                "after_content_id": last["content_id"],
+                "after_display_number": last["display_number"],
+            },
+        ).json()
+        tagged = client.get(
+            "/content",
+            headers=headers,
+            params={**params, "tag_ids": [existing_tag_id_in_workspace_1]},
+        ).json()
+
+        for content_id in content_ids:
+            client.delete(f"/content/{content_id}", headers=headers)
+
+        assert [c["content_id"] for c in first_page + second_page] == content_ids
+        assert [c["content_id"] for c in tagged] == content_ids[:1]
+
     def test_delete_content(
         self,
         access_token_admin_1: str,
@@ -9,6 +9,7 @@ from typing import Any
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core_backend.app.llm_call.llm_prompts import AlignmentScore, IdentifiedLanguage
 from core_backend.app.llm_call.process_input import (
@@ -18,6 +19,8 @@ from core_backend.app.llm_call.process_input import (
 )
 from core_backend.app.llm_call.process_output import _check_align_score
 from core_backend.app.question_answer.config import N_TOP_CONTENT
+from core_backend.app.question_answer.models import get_query_embeddings
+from core_backend.app.question_answer.routers import QUERY_EMBEDDING_TASKS
 from core_backend.app.question_answer.schemas import (
     ErrorType,
     QueryRefined,
@@ -301,6 +304,49 @@ class TestEmbeddingsSearch:
             json_search_results = response.json()["search_results"]
             assert len(json_search_results.keys()) == int(N_TOP_CONTENT)
 
+    async def test_search_saves_query_embedding(
+        self,
+        api_key_workspace_1: str,
+        asession: AsyncSession,
+        client: TestClient,
+        faq_contents_in_workspace_1: list[int],
+    ) -> None:
+        """Test that the embedding of a search query is saved in the background.
+
+        Parameters
+        ----------
+        api_key_workspace_1
+            API key for workspace 1.
+        asession
+            The SQLAlchemy async session to use for all database connections.
+        client
+            FastAPI test client.
+        faq_contents_in_workspace_1
+            FAQ contents in workspace 1.
+        """
+
+        response = client.post(
+            "/search",
+            headers={"Authorization": f"Bearer {api_key_workspace_1}"},
+            json={
+                "generate_llm_response": False,
+                "query_text": "Tell me about a good sport to play",
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        query_id = response.json()["query_id"]
+
+        # The embedding is saved by a background task on the event loop of the app.
+        deadline = time.monotonic() + 10
+        while QUERY_EMBEDDING_TASKS and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert not QUERY_EMBEDDING_TASKS
+
+        query_embeddings = await get_query_embeddings(
+            asession=asession, query_ids=[query_id]
+        )
+        assert list(query_embeddings) == [query_id]
+
     @pytest.fixture
     def question_response(
         self, client: TestClient, api_key_workspace_1: str
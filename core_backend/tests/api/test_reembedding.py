@@ -0,0 +1,356 @@
+"""This module contains tests for the re-embedding job."""
+
+import time
+from typing import Any, AsyncGenerator, Optional
+
+import numpy as np
+import pytest
+from pgvector.sqlalchemy import Vector
+from redis import asyncio as aioredis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from core_backend.app import reembedding
+from core_backend.app.config import PGVECTOR_VECTOR_SIZE
+from core_backend.app.contents.models import get_search_results
+from core_backend.app.reembedding import (
+    EMBEDDING_TARGETS,
+    EmbeddingTarget,
+    ReembeddingIncompleteError,
+    ReembeddingStatus,
+    RequestRateLimiter,
+    _embed_texts,
+    build_shadow_indexes,
+    count_missing_shadow_vectors,
+    drop_shadow_columns,
+    fill_shadow_column,
+    get_reembedding_status,
+    prepare_shadow_columns,
+    run_reembedding,
+    switch_to_shadow_columns,
+)
+from core_backend.app.urgency_rules.models import get_urgency_rule_matrix
+from core_backend.app.utils import EmbeddingCallException
+
+from .conftest import async_fake_embedding_batch
+
+
+async def test_rate_limiter_spaces_out_requests() -> None:
+    """Test that the rate limiter waits between consecutive requests."""
+
+    rate_limiter = RequestRateLimiter(max_requests_per_minute=600)
+
+    start = time.monotonic()
+    for _ in range(3):
+        await rate_limiter.wait()
+
+    assert time.monotonic() - start >= 0.2
+
+
+async def test_embed_texts_falls_back_to_single_calls(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a failed batch is embedded one text at a time, and that texts that
+    still fail are reported as missing instead of failing the whole batch.
+
+    Parameters
+    ----------
+    monkeypatch
+        Pytest monkeypatch fixture.
+    """
+
+    async def _embedding_batch(
+        *,
+        metadata: Optional[dict] = None,
+        model: Optional[str] = None,
+        texts_to_embed: list[str],
+    ) -> list[list[float]]:
+        if len(texts_to_embed) > 1 or texts_to_embed[0] == "bad":
+            raise EmbeddingCallException("Embedding call failed")
+        return [[float(len(texts_to_embed[0]))]]
+
+    monkeypatch.setattr(reembedding, "embedding_batch", _embedding_batch)
+
+    embeddings = await _embed_texts(
+        model="test-model",
+        rate_limiter=RequestRateLimiter(max_requests_per_minute=0),
+        texts=["a", "bad", "abc"],
+    )
+
+    assert embeddings == [[1.0], None, [3.0]]
+
+
+@pytest.fixture(scope="function")
+async def content_shadow_columns(
+    asession: AsyncSession,
+) -> AsyncGenerator[EmbeddingTarget, None]:
+    """Add the shadow columns of the content table, and drop them after the test.
+
+    Parameters
+    ----------
+    asession
+        Async database session.
+
+    Yields
+    ------
+    AsyncGenerator[EmbeddingTarget, None]
+        The re-embedded content table.
+    """
+
+    target = EMBEDDING_TARGETS["content"]
+    await prepare_shadow_columns(
+        asession=asession, target=target, vector_size=int(PGVECTOR_VECTOR_SIZE)
+    )
+
+    yield target
+
+    await asession.rollback()
+    await drop_shadow_columns(asession=asession, target=target)
+
+
+def _new_status() -> ReembeddingStatus:
+    """Create the checkpoint of a new re-embedding job.
+
+    Returns
+    -------
+    ReembeddingStatus
+        The checkpoint.
+    """
+
+    return ReembeddingStatus(
+        last_id=None,
+        model="test-model",
+        rows_embedded=0,
+        rows_failed=0,
+        status="in_progress",
+        updated_datetime_utc="",
+        vector_size=int(PGVECTOR_VECTOR_SIZE),
+    )
+
+
+async def test_fill_shadow_column_resumes_and_reembeds_edited_rows(
+    asession: AsyncSession,
+    content_shadow_columns: EmbeddingTarget,
+    faq_contents_in_workspace_1: list[int],
+    monkeypatch: pytest.MonkeyPatch,
+    redis_client: aioredis.Redis,
+) -> None:
+    """Test that an interrupted fill resumes from its checkpoint, and that a row
+    edited behind the cursor loses its shadow vector and is embedded again.
+
+    Parameters
+    ----------
+    asession
+        Async database session.
+    content_shadow_columns
+        The re-embedded content table.
+    faq_contents_in_workspace_1
+        The IDs of the FAQ contents in workspace 1.
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        Redis client for testing.
+    """
+
+    texts_embedded: list[str] = []
+    job = {"interrupt": True}
+
+    async def _embedding_batch(
+        *, texts_to_embed: list[str], **kwargs: Any
+    ) -> list[list[float]]:
+        if job["interrupt"] and texts_embedded:
+            raise RuntimeError("Job interrupted")
+        texts_embedded.extend(texts_to_embed)
+        return await async_fake_embedding_batch(texts_to_embed=texts_to_embed)
+
+    monkeypatch.setattr(reembedding, "embedding_batch", _embedding_batch)
+    target = content_shadow_columns
+    rate_limiter = RequestRateLimiter(max_requests_per_minute=0)
+
+    with pytest.raises(RuntimeError):
+        await fill_shadow_column(
+            asession=asession,
+            batch_size=2,
+            rate_limiter=rate_limiter,
+            redis=redis_client,
+            status=_new_status(),
+            target=target,
+        )
+    await asession.rollback()
+
+    status = await get_reembedding_status(redis=redis_client, table="content")
+    assert status is not None
+    assert status["rows_embedded"] == 2
+    assert status["last_id"] is not None
+    first_texts = list(texts_embedded)
+
+    # Edit the last row embedded before the interruption.
+    await asession.execute(
+        text(
+            "UPDATE content SET content_text = content_text || ' (edited)' "
+            "WHERE content_id = :content_id"
+        ),
+        {"content_id": status["last_id"]},
+    )
+    await asession.commit()
+    shadow_row = (
+        await asession.execute(
+            text(
+                "SELECT content_embedding_shadow, content_embedding_fingerprint_shadow "
+                "FROM content WHERE content_id = :content_id"
+            ),
+            {"content_id": status["last_id"]},
+        )
+    ).one()
+    assert shadow_row == (None, None)
+
+    job["interrupt"] = False
+    texts_embedded.clear()
+    status = await fill_shadow_column(
+        asession=asession,
+        batch_size=2,
+        rate_limiter=rate_limiter,
+        redis=redis_client,
+        status=status,
+        target=target,
+    )
+
+    assert first_texts[0] not in texts_embedded
+    assert f"{first_texts[1]} (edited)" in texts_embedded
+    assert status["rows_embedded"] == len(first_texts) + len(texts_embedded)
+    assert await count_missing_shadow_vectors(asession=asession, target=target) == 0
+
+
+async def test_switch_to_shadow_columns_keeps_search_working(
+    async_engine: AsyncEngine,
+    asession: AsyncSession,
+    content_shadow_columns: EmbeddingTarget,
+    faq_contents_in_workspace_1: list[int],
+    monkeypatch: pytest.MonkeyPatch,
+    redis_client: aioredis.Redis,
+    workspace_1_id: int,
+) -> None:
+    """Test that the switch is refused until every row has a shadow vector, and that
+    search uses the new vectors once it is done.
+
+    Parameters
+    ----------
+    async_engine
+        Async engine for testing.
+    asession
+        Async database session.
+    content_shadow_columns
+        The re-embedded content table.
+    faq_contents_in_workspace_1
+        The IDs of the FAQ contents in workspace 1.
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        Redis client for testing.
+    workspace_1_id
+        The ID of workspace 1.
+    """
+
+    monkeypatch.setattr(reembedding, "embedding_batch", async_fake_embedding_batch)
+    target = content_shadow_columns
+
+    with pytest.raises(ReembeddingIncompleteError):
+        await switch_to_shadow_columns(asession=asession, target=target)
+
+    await fill_shadow_column(
+        asession=asession,
+        batch_size=10,
+        rate_limiter=RequestRateLimiter(max_requests_per_minute=0),
+        redis=redis_client,
+        status=_new_status(),
+        target=target,
+    )
+    new_vector = (
+        await asession.execute(
+            text(
+                "SELECT content_embedding_shadow FROM content "
+                "WHERE content_id = :content_id"
+            ).columns(content_embedding_shadow=Vector(int(PGVECTOR_VECTOR_SIZE))),
+            {"content_id": faq_contents_in_workspace_1[0]},
+        )
+    ).scalar_one()
+    await asession.commit()
+
+    await build_shadow_indexes(engine=async_engine, target=target)
+    await switch_to_shadow_columns(asession=asession, target=target)
+
+    shadow_columns = (
+        await asession.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = 'content' AND column_name LIKE '%\\_shadow'"
+            )
+        )
+    ).all()
+    assert shadow_columns == []
+
+    search_results = await get_search_results(
+        asession=asession,
+        n_similar=1,
+        question_embedding=new_vector.tolist(),
+        workspace_id=workspace_1_id,
+    )
+    assert search_results[0].id == faq_contents_in_workspace_1[0]
+
+
+async def test_run_reembedding_invalidates_urgency_rule_caches(
+    async_engine: AsyncEngine,
+    asession: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    redis_client: aioredis.Redis,
+    urgency_rules_workspace_1: int,
+    workspace_1_id: int,
+) -> None:
+    """Test that switching the urgency rules to new vectors makes the workers reload
+    their urgency rule matrix.
+
+    Parameters
+    ----------
+    async_engine
+        Async engine for testing.
+    asession
+        Async database session.
+    monkeypatch
+        Pytest monkeypatch fixture.
+    redis_client
+        Redis client for testing.
+    urgency_rules_workspace_1
+        The number of urgency rules in workspace 1.
+    workspace_1_id
+        The ID of workspace 1.
+    """
+
+    monkeypatch.setattr(reembedding, "embedding_batch", async_fake_embedding_batch)
+    monkeypatch.setattr(
+        reembedding, "get_sqlalchemy_async_engine", lambda: async_engine
+    )
+    old_matrix = await get_urgency_rule_matrix(
+        asession=asession, redis=redis_client, workspace_id=workspace_1_id
+    )
+
+    await run_reembedding(
+        batch_size=10,
+        max_requests_per_minute=0,
+        model="test-model",
+        redis=redis_client,
+        tables=["urgency_rule"],
+        vector_size=int(PGVECTOR_VECTOR_SIZE),
+    )
+
+    status = await get_reembedding_status(redis=redis_client, table="urgency_rule")
+    assert status is not None
+    assert status["status"] == "switched"
+    assert status["rows_embedded"] >= urgency_rules_workspace_1
+    assert status["rows_failed"] == 0
+
+    new_matrix = await get_urgency_rule_matrix(
+        asession=asession, redis=redis_client, workspace_id=workspace_1_id
+    )
+    assert new_matrix["version"] == old_matrix["version"] + 1
+    assert new_matrix["rule_texts"] == old_matrix["rule_texts"]
+    assert not np.allclose(new_matrix["rule_matrix"], old_matrix["rule_matrix"])
@@ -2,17 +2,26 @@
 
 from typing import Any, Callable
 
+import numpy as np
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
-from sqlalchemy import delete
+from redis import asyncio as aioredis
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from core_backend.app.urgency_detection.config import URGENCY_CLASSIFIER
+from core_backend.app.llm_call.llm_prompts import UrgencyDetectionEntailment
+from core_backend.app.urgency_detection import routers
+from core_backend.app.urgency_detection.config import (
+    URGENCY_CLASSIFIER,
+    URGENCY_DETECTION_BATCH_MAX_SIZE,
+)
 from core_backend.app.urgency_detection.models import UrgencyQueryDB, UrgencyResponseDB
 from core_backend.app.urgency_detection.routers import ALL_URGENCY_CLASSIFIERS
 from core_backend.app.urgency_detection.schemas import UrgencyQuery, UrgencyResponse
+from core_backend.app.urgency_rules.models import compute_cosine_distances
+from core_backend.app.urgency_rules.schemas import UrgencyRuleCosineDistance
 from core_backend.app.workspaces.utils import get_workspace_by_workspace_name
 from core_backend.tests.api.conftest import TEST_ADMIN_USERNAME_1, TEST_ADMIN_USERNAME_2
 
@@ -129,6 +138,13 @@ class TestUrgencyDetectionToken:
             elif URGENCY_CLASSIFIER == "llm_entailment_classifier":
                 probability = json_response["details"]["probability"]
                 assert 0.0 <= probability <= 1.0
+            elif URGENCY_CLASSIFIER == "cascade_classifier":
+                if "probability" in json_response["details"]:
+                    probability = json_response["details"]["probability"]
+                    assert 0.0 <= probability <= 1.0
+                else:
+                    distance = json_response["details"]["0"]["distance"]
+                    assert 0.0 <= distance <= 1.0
             else:
                 raise ValueError(
                     f"Unsupported urgency classifier: {URGENCY_CLASSIFIER}"
@@ -206,6 +222,246 @@ class TestUrgencyDetectionToken:
         db_session.commit()
 
 
+class TestUrgencyDetectionBatch:
+    """Tests for the batch urgency detection API."""
+
+    def test_ud_batch_response(
+        self,
+        api_key_workspace_1: str,
+        client: TestClient,
+        urgency_rules_workspace_1: pytest.FixtureRequest,
+    ) -> None:
+        """Test that the batch endpoint returns one response per message, in order.
+
+        Parameters
+        ----------
+        api_key_workspace_1
+            API key for workspace 1.
+        client
+            Test client.
+        urgency_rules_workspace_1
+            Urgency rules for workspace 1.
+        """
+
+        message_texts = [
+            "has trouble breathing",
+            "Is it normal to feel bloated after 2 burgers and a milkshake?",
+            "When should I start taking folic acid?",
+        ]
+        response = client.post(
+            "/urgency-detect/batch",
+            headers={"Authorization": f"Bearer {api_key_workspace_1}"},
+            json={
+                "urgency_queries": [
+                    {"message_text": message_text} for message_text in message_texts
+                ]
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        urgency_responses = response.json()["urgency_responses"]
+        assert len(urgency_responses) == len(message_texts)
+        for urgency_response in urgency_responses:
+            assert isinstance(urgency_response["is_urgent"], bool)
+
+    def test_ud_batch_keeps_order_and_saves_each_message(
+        self,
+        api_key_workspace_1: str,
+        client: TestClient,
+        db_session: Session,
+        monkeypatch: pytest.MonkeyPatch,
+        workspace_1_id: int,
+    ) -> None:
+        """Test that the batch endpoint returns the responses in the order of the
+        messages, and saves one query and one response per message.
+
+        Parameters
+        ----------
+        api_key_workspace_1
+            API key for workspace 1.
+        client
+            Test client.
+        db_session
+            Database session.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        workspace_1_id
+            The ID of workspace 1.
+        """
+
+        async def _get_cosine_distances_from_rules_batch(
+            *, message_texts: list[str], **kwargs: Any
+        ) -> list[dict[int, UrgencyRuleCosineDistance]]:
+            return [
+                {
+                    0: UrgencyRuleCosineDistance(
+                        distance=0.1 if "urgent" in message_text else 0.9,
+                        urgency_rule=f"Rule for {message_text}",
+                    )
+                }
+                for message_text in message_texts
+            ]
+
+        monkeypatch.setattr(
+            routers,
+            "get_cosine_distances_from_rules_batch",
+            _get_cosine_distances_from_rules_batch,
+        )
+        monkeypatch.setattr(routers, "URGENCY_CLASSIFIER", "cosine_distance_classifier")
+        message_texts = [
+            "Batch order message 0 urgent",
+            "Batch order message 1",
+            "Batch order message 2 urgent",
+            "Batch order message 3",
+        ]
+
+        response = client.post(
+            "/urgency-detect/batch",
+            headers={"Authorization": f"Bearer {api_key_workspace_1}"},
+            json={
+                "urgency_queries": [
+                    {"message_text": message_text} for message_text in message_texts
+                ]
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        expected = [
+            (
+                "urgent" in message_text,
+                [f"Rule for {message_text}"] if "urgent" in message_text else [],
+            )
+            for message_text in message_texts
+        ]
+        assert [
+            (urgency_response["is_urgent"], urgency_response["matched_rules"])
+            for urgency_response in response.json()["urgency_responses"]
+        ] == expected
+
+        urgency_queries_db = (
+            db_session.execute(
+                select(UrgencyQueryDB)
+                .where(
+                    (UrgencyQueryDB.workspace_id == workspace_1_id)
+                    & UrgencyQueryDB.message_text.in_(message_texts)
+                )
+                .order_by(UrgencyQueryDB.urgency_query_id)
+            )
+            .scalars()
+            .all()
+        )
+        urgency_query_ids = [
+            urgency_query_db.urgency_query_id for urgency_query_db in urgency_queries_db
+        ]
+        try:
+            assert [
+                urgency_query_db.message_text for urgency_query_db in urgency_queries_db
+            ] == message_texts
+
+            urgency_responses_db = (
+                db_session.execute(
+                    select(UrgencyResponseDB).where(
+                        UrgencyResponseDB.query_id.in_(urgency_query_ids)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            assert sorted(
+                (
+                    urgency_query_ids.index(urgency_response_db.query_id),
+                    urgency_response_db.is_urgent,
+                    urgency_response_db.matched_rules,
+                )
+                for urgency_response_db in urgency_responses_db
+            ) == [
+                (i, is_urgent, matched_rules)
+                for i, (is_urgent, matched_rules) in enumerate(expected)
+            ]
+        finally:
+            db_session.execute(
+                delete(UrgencyResponseDB).where(
+                    UrgencyResponseDB.query_id.in_(urgency_query_ids)
+                )
+            )
+            db_session.execute(
+                delete(UrgencyQueryDB).where(
+                    UrgencyQueryDB.urgency_query_id.in_(urgency_query_ids)
+                )
+            )
+            db_session.commit()
+
+    @pytest.mark.parametrize(
+        "temp_workspace_api_key_and_api_quota",
+        [
+            {
+                "api_daily_quota": 5,
+                "username": "temp_user_ud_batch_api_limit_5",
+                "workspace_name": "temp_workspace_ud_batch_api_limit_5",
+            }
+        ],
+        indirect=True,
+    )
+    def test_ud_batch_charges_one_call_per_message(
+        self, client: TestClient, temp_workspace_api_key_and_api_quota: tuple[str, int]
+    ) -> None:
+        """Test that each message of a batch is charged against the daily API quota.
+
+        Parameters
+        ----------
+        client
+            Test client.
+        temp_workspace_api_key_and_api_quota
+            Temporary workspace API key and API quota.
+        """
+
+        temp_api_key, _ = temp_workspace_api_key_and_api_quota
+
+        for batch_size in [3, 2]:
+            response = client.post(
+                "/urgency-detect/batch",
+                headers={"Authorization": f"Bearer {temp_api_key}"},
+                json={
+                    "urgency_queries": [
+                        {"message_text": "Test question"} for _ in range(batch_size)
+                    ]
+                },
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        response = client.post(
+            "/urgency-detect",
+            headers={"Authorization": f"Bearer {temp_api_key}"},
+            json={"message_text": "Test question"},
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_ud_batch_too_large(
+        self, api_key_workspace_1: str, client: TestClient
+    ) -> None:
+        """Test that batches larger than the maximum batch size are rejected.
+
+        Parameters
+        ----------
+        api_key_workspace_1
+            API key for workspace 1.
+        client
+            Test client.
+        """
+
+        response = client.post(
+            "/urgency-detect/batch",
+            headers={"Authorization": f"Bearer {api_key_workspace_1}"},
+            json={
+                "urgency_queries": [
+                    {"message_text": "Test question"}
+                    for _ in range(URGENCY_DETECTION_BATCH_MAX_SIZE + 1)
+                ]
+            },
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 class TestUrgencyClassifiers:
     """Tests for the urgency classifiers."""
 
@@ -215,6 +471,7 @@ class TestUrgencyClassifiers:
         admin_user_1_in_workspace_1: dict[str, Any],
         asession: AsyncSession,
         classifier: Callable,
+        redis_client: aioredis.Redis,
     ) -> None:
         """Test the urgency classifier.
 
@@ -226,6 +483,8 @@ class TestUrgencyClassifiers:
             Async session.
         classifier
             Urgency classifier.
+        redis_client
+            Redis client.
         """
 
         workspace_db = await get_workspace_by_workspace_name(
@@ -237,7 +496,119 @@ class TestUrgencyClassifiers:
             message_text="Is it normal to feel bloated after 2 burgers and a milkshake?"
         )
         classifier_response = await classifier(
-            asession=asession, urgency_query=urgency_query, workspace_id=workspace_id
+            asession=asession,
+            redis=redis_client,
+            urgency_query=urgency_query,
+            workspace_id=workspace_id,
         )
 
         assert isinstance(classifier_response, UrgencyResponse)
+
+    @pytest.mark.parametrize(
+        "distances, expected_llm_rules, expected_is_urgent, expected_matched_rules",
+        [
+            ([0.1, 0.15, 0.5, 0.8], None, True, ["rule_0", "rule_1"]),
+            ([0.75, 0.8, 0.9], None, False, []),
+            ([0.3, 0.4, 0.5, 0.6], ["rule_0", "rule_1"], True, ["rule_0"]),
+        ],
+    )
+    async def test_cascade_classifier_only_calls_llm_when_ambiguous(
+        self,
+        distances: list[float],
+        expected_is_urgent: bool,
+        expected_llm_rules: list[str] | None,
+        expected_matched_rules: list[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that the cascade classifier decides clearly urgent and clearly not
+        urgent messages without the LLM, and sends only the closest rules of an
+        ambiguous message to the LLM.
+
+        Parameters
+        ----------
+        distances
+            The cosine distance of the message from each rule, in ascending order.
+        expected_is_urgent
+            Specifies whether the message is expected to be urgent.
+        expected_llm_rules
+            The rules expected to be sent to the LLM, or `None` if the LLM is
+            expected to be skipped.
+        expected_matched_rules
+            The rules expected to be matched.
+        monkeypatch
+            Pytest monkeypatch fixture.
+        """
+
+        llm_rules: list[list[str]] = []
+
+        async def _get_cosine_distances_from_rules(
+            **kwargs: Any,
+        ) -> dict[int, UrgencyRuleCosineDistance]:
+            return {
+                i: UrgencyRuleCosineDistance(
+                    distance=distance, urgency_rule=f"rule_{i}"
+                )
+                for i, distance in enumerate(distances)
+            }
+
+        async def _detect_urgency(
+            *, urgency_rules: list[str], **kwargs: Any
+        ) -> UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult:
+            llm_rules.append(urgency_rules)
+            return UrgencyDetectionEntailment.UrgencyDetectionEntailmentResult(
+                best_matching_rule=urgency_rules[0], probability=0.9, reason="Test"
+            )
+
+        monkeypatch.setattr(
+            routers,
+            "get_cosine_distances_from_rules",
+            _get_cosine_distances_from_rules,
+        )
+        monkeypatch.setattr(routers, "detect_urgency", _detect_urgency)
+        monkeypatch.setattr(routers, "URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE", 0.7)
+        monkeypatch.setattr(routers, "URGENCY_CASCADE_TOP_K", 2)
+        monkeypatch.setattr(routers, "URGENCY_CASCADE_URGENT_MAX_DISTANCE", 0.2)
+
+        urgency_response = await routers.cascade_classifier(
+            asession=None,  # type: ignore[arg-type]
+            redis=None,  # type: ignore[arg-type]
+            urgency_query=UrgencyQuery(message_text="Test message"),
+            workspace_id=1,
+        )
+
+        assert llm_rules == ([] if expected_llm_rules is None else [expected_llm_rules])
+        assert urgency_response.is_urgent == expected_is_urgent
+        assert urgency_response.matched_rules == expected_matched_rules
+
+
+class TestCosineDistances:
+    """Tests for the in-memory cosine distance computation."""
+
+    def test_compute_cosine_distances(self) -> None:
+        """Test that the vectorized distances match the pairwise cosine distances."""
+
+        rng = np.random.default_rng(seed=0)
+        rule_vectors = rng.normal(size=(5, 8)).astype(np.float32)
+        message_vector = rng.normal(size=8).astype(np.float32)
+
+        rule_matrix = rule_vectors / np.linalg.norm(rule_vectors, axis=1)[:, None]
+        distances = compute_cosine_distances(
+            message_vector=message_vector.tolist(), rule_matrix=rule_matrix
+        )
+
+        expected = [
+            1
+            - np.dot(rule, message_vector)
+            / (np.linalg.norm(rule) * np.linalg.norm(message_vector))
+            for rule in rule_vectors
+        ]
+        assert np.allclose(distances, expected, atol=1e-5)
+
+    def test_compute_cosine_distances_no_rules(self) -> None:
+        """Test that an empty rule matrix yields no distances."""
+
+        distances = compute_cosine_distances(
+            message_vector=[1.0, 0.0], rule_matrix=np.empty((0, 2), dtype=np.float32)
+        )
+
+        assert distances.shape == (0,)
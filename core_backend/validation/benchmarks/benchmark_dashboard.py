@@ -0,0 +1,215 @@
+"""Benchmark of the dashboard overview queries, run one after another or concurrently.
+
+`retrieve_overview` runs its independent queries concurrently, each on its own pooled
+session. It is compared with the same queries awaited one after another on a single
+session, as they were before, for each predefined timeframe of the dashboard.
+
+The queries run on the existing data of a workspace, e.g. after
+`python add_dummy_data_to_db.py`. The dashboard rollups are disabled to time the raw
+queries. Run from the repository root, with the environment variables of the backend
+set:
+
+    python -m core_backend.validation.benchmarks.benchmark_dashboard --workspace-id 1
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, datetime, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core_backend.app.dashboard import models
+from core_backend.app.dashboard.models import (
+    get_content_feedback_stats,
+    get_heatmap,
+    get_query_count_stats,
+    get_response_feedback_stats,
+    get_timeseries_query,
+    get_timeseries_urgency,
+    get_top_content,
+    get_urgency_stats,
+)
+from core_backend.app.dashboard.routers import (
+    DashboardTimeFilter,
+    get_freq_start_end_date,
+    retrieve_overview,
+)
+from core_backend.app.dashboard.schemas import (
+    DashboardOverview,
+    OverviewTimeSeries,
+    StatsCards,
+    TimeFrequency,
+)
+from core_backend.app.database import get_sqlalchemy_async_engine
+
+OverviewFunction = Callable[..., Awaitable[DashboardOverview]]
+TIMEFRAMES: tuple[DashboardTimeFilter, ...] = ("day", "week", "month", "year")
+
+
+async def retrieve_overview_sequentially(
+    *,
+    asession: AsyncSession,
+    end_date: date,
+    frequency: TimeFrequency,
+    start_date: date,
+    top_n: int = 4,
+    workspace_id: int,
+) -> DashboardOverview:
+    """Retrieve the dashboard overview with each query awaited one after another on
+    a single session.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    end_date
+        The ending date for the statistics.
+    frequency
+        The frequency at which to retrieve the statistics.
+    start_date
+        The starting date for the statistics.
+    top_n
+        The number of top content to retrieve.
+    workspace_id
+        The ID of the workspace to retrieve the statistics for.
+
+    Returns
+    -------
+    DashboardOverview
+        The dashboard overview statistics.
+    """
+
+    period = dict(
+        asession=asession,
+        end_date=end_date,
+        start_date=start_date,
+        workspace_id=workspace_id,
+    )
+    stats_cards = StatsCards(
+        content_feedback_stats=await get_content_feedback_stats(**period),
+        query_stats=await get_query_count_stats(**period),
+        response_feedback_stats=await get_response_feedback_stats(**period),
+        urgency_stats=await get_urgency_stats(**period),
+    )
+    heatmap = await get_heatmap(**period)
+    query_ts = await get_timeseries_query(frequency=frequency, **period)
+    urgency_ts = await get_timeseries_urgency(frequency=frequency, **period)
+    top_content = await get_top_content(
+        asession=asession, top_n=top_n, workspace_id=workspace_id
+    )
+
+    return DashboardOverview(
+        heatmap=heatmap,
+        refreshTimeStamp=datetime.now(timezone.utc).isoformat(),
+        stats_cards=stats_cards,
+        time_series=OverviewTimeSeries(
+            downvoted=query_ts["escalated"],
+            normal=query_ts["not_escalated"],
+            urgent=urgency_ts,
+        ),
+        top_content=top_content,
+    )
+
+
+async def time_overview(
+    *,
+    n_runs: int,
+    overview_function: OverviewFunction,
+    timeframe: DashboardTimeFilter,
+    workspace_id: int,
+) -> list[float]:
+    """Time an overview function, with a new session for each run like a request.
+
+    Parameters
+    ----------
+    n_runs
+        The number of runs.
+    overview_function
+        The overview function to time.
+    timeframe
+        The dashboard timeframe.
+    workspace_id
+        The ID of the workspace.
+
+    Returns
+    -------
+    list[float]
+        The duration of each run, in milliseconds.
+    """
+
+    durations = []
+    for _ in range(n_runs):
+        frequency, start_date, end_date = get_freq_start_end_date(timeframe=timeframe)
+        async with AsyncSession(
+            get_sqlalchemy_async_engine(), expire_on_commit=False
+        ) as asession:
+            start = time.perf_counter()
+            await overview_function(
+                asession=asession,
+                end_date=end_date,
+                frequency=frequency,
+                start_date=start_date,
+                workspace_id=workspace_id,
+            )
+            durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+async def run_benchmark(*, n_runs: int, workspace_id: int) -> None:
+    """Run the benchmark and print the wall-clock time of both overview functions
+    for each timeframe.
+
+    Parameters
+    ----------
+    n_runs
+        The number of runs of each overview function per timeframe.
+    workspace_id
+        The ID of an existing workspace with dashboard data.
+    """
+
+    models.DASHBOARD_ROLLUPS_ENABLED = False
+    overview_functions: dict[str, OverviewFunction] = {
+        "sequential": retrieve_overview_sequentially,
+        "concurrent": retrieve_overview,
+    }
+
+    for timeframe in TIMEFRAMES:
+        results = {}
+        # Warm up the connection pool and the compiled caches.
+        for overview_function in overview_functions.values():
+            await time_overview(
+                n_runs=1,
+                overview_function=overview_function,
+                timeframe=timeframe,
+                workspace_id=workspace_id,
+            )
+        for name, overview_function in overview_functions.items():
+            results[name] = await time_overview(
+                n_runs=n_runs,
+                overview_function=overview_function,
+                timeframe=timeframe,
+                workspace_id=workspace_id,
+            )
+
+        for name, durations in results.items():
+            print(
+                f"{timeframe:>5} {name:>10}: mean {statistics.mean(durations):.1f} ms, "
+                f"median {statistics.median(durations):.1f} ms"
+            )
+        speedup = statistics.mean(results["sequential"]) / statistics.mean(
+            results["concurrent"]
+        )
+        print(f"{timeframe:>5} speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the dashboard overview queries."
+    )
+    parser.add_argument("--workspace-id", required=True, type=int)
+    parser.add_argument("--n-runs", default=20, type=int)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(n_runs=args.n_runs, workspace_id=args.workspace_id))
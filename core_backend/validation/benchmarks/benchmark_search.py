@@ -0,0 +1,226 @@
+"""Micro-benchmark of the vector search query of `get_search_results`.
+
+The lean search statement, which selects only the columns of the search results and
+is built once, is compared with the previous query, which selected the whole
+`ContentDB` entity, including its embedding, and was built for every request.
+
+Synthetic contents are inserted into an existing workspace in a transaction that is
+rolled back at the end, so the database is left unchanged. Run from the repository
+root, with the environment variables of the backend set:
+
+    python -m core_backend.validation.benchmarks.benchmark_search --workspace-id 1
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import numpy as np
+from sqlalchemy import false, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from core_backend.app.config import PGVECTOR_VECTOR_SIZE
+from core_backend.app.contents.models import ContentDB, get_search_results
+from core_backend.app.database import get_sqlalchemy_async_engine
+from core_backend.app.schemas import QuerySearchResult
+
+SearchFunction = Callable[..., Awaitable[dict[int, QuerySearchResult]]]
+
+
+async def search_with_entity(
+    *,
+    asession: AsyncSession,
+    n_similar: int,
+    question_embedding: list[float],
+    workspace_id: int,
+) -> dict[int, QuerySearchResult]:
+    """Run the search query as it was before the lean projection.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    n_similar
+        The number of similar content items to retrieve.
+    question_embedding
+        The embedding vector of the question to search for.
+    workspace_id
+        The ID of the workspace to search for similar content in.
+
+    Returns
+    -------
+    dict[int, QuerySearchResult]
+        The search results.
+    """
+
+    distance = ContentDB.content_embedding.cosine_distance(question_embedding).label(
+        "distance"
+    )
+    query = (
+        select(ContentDB, distance)
+        .options(undefer(ContentDB.content_embedding))
+        .where(ContentDB.workspace_id == workspace_id)
+        .where(ContentDB.is_archived == false())
+        .where(ContentDB.is_validated == true())
+        .order_by(distance)
+        .limit(n_similar)
+    )
+    search_result = (await asession.execute(query)).all()
+    return {
+        i: QuerySearchResult(
+            distance=r[1],
+            id=r[0].content_id,
+            text=r[0].content_text,
+            title=r[0].content_title,
+        )
+        for i, r in enumerate(search_result)
+    }
+
+
+async def time_search(
+    *,
+    asession: AsyncSession,
+    n_similar: int,
+    question_embeddings: list[list[float]],
+    search_function: SearchFunction,
+    workspace_id: int,
+) -> list[float]:
+    """Time a search function over a list of questions.
+
+    Parameters
+    ----------
+    asession
+        The SQLAlchemy async session to use for all database connections.
+    n_similar
+        The number of similar content items to retrieve.
+    question_embeddings
+        The embedding vectors of the questions to search for.
+    search_function
+        The search function to time.
+    workspace_id
+        The ID of the workspace to search for similar content in.
+
+    Returns
+    -------
+    list[float]
+        The duration of each search, in milliseconds.
+    """
+
+    durations = []
+    for question_embedding in question_embeddings:
+        start = time.perf_counter()
+        await search_function(
+            asession=asession,
+            n_similar=n_similar,
+            question_embedding=question_embedding,
+            workspace_id=workspace_id,
+        )
+        durations.append((time.perf_counter() - start) * 1000)
+        # Each request has its own session, without the ORM objects of the last one.
+        asession.expunge_all()
+    return durations
+
+
+async def run_benchmark(
+    *, n_contents: int, n_queries: int, n_similar: int, workspace_id: int
+) -> None:
+    """Run the benchmark and print the per-query durations of both queries.
+
+    Parameters
+    ----------
+    n_contents
+        The number of synthetic contents to insert.
+    n_queries
+        The number of queries to time with each search function.
+    n_similar
+        The number of similar content items to retrieve per query.
+    workspace_id
+        The ID of an existing workspace to insert the synthetic contents into.
+    """
+
+    rng = np.random.default_rng(0)
+    vector_size = int(PGVECTOR_VECTOR_SIZE)
+    now = datetime.now(timezone.utc)
+
+    async with AsyncSession(get_sqlalchemy_async_engine()) as asession:
+        asession.add_all(
+            ContentDB(
+                content_embedding=rng.random(vector_size).tolist(),
+                content_metadata={"source": "benchmark"},
+                content_text=f"Benchmark content text {i} " * 20,
+                content_title=f"Benchmark content title {i}",
+                created_datetime_utc=now,
+                display_number=i,
+                is_archived=False,
+                is_validated=True,
+                positive_votes=0,
+                negative_votes=0,
+                query_count=0,
+                related_contents_id=[],
+                updated_datetime_utc=now,
+                workspace_id=workspace_id,
+            )
+            for i in range(n_contents)
+        )
+        await asession.flush()
+        asession.expunge_all()
+
+        question_embeddings = [
+            rng.random(vector_size).tolist() for _ in range(n_queries)
+        ]
+        search_functions: dict[str, SearchFunction] = {
+            "entity": search_with_entity,
+            "lean": get_search_results,
+        }
+        results = {}
+        try:
+            # Warm up the connection, the compiled caches and the prepared statements.
+            for search_function in search_functions.values():
+                await time_search(
+                    asession=asession,
+                    n_similar=n_similar,
+                    question_embeddings=question_embeddings[:10],
+                    search_function=search_function,
+                    workspace_id=workspace_id,
+                )
+            for name, search_function in search_functions.items():
+                results[name] = await time_search(
+                    asession=asession,
+                    n_similar=n_similar,
+                    question_embeddings=question_embeddings,
+                    search_function=search_function,
+                    workspace_id=workspace_id,
+                )
+        finally:
+            await asession.rollback()
+
+    for name, durations in results.items():
+        print(
+            f"{name:>6}: mean {statistics.mean(durations):.2f} ms, "
+            f"median {statistics.median(durations):.2f} ms"
+        )
+    saving = statistics.mean(results["entity"]) - statistics.mean(results["lean"])
+    print(f"saving: {saving:.2f} ms per query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the vector search query of `get_search_results`."
+    )
+    parser.add_argument("--workspace-id", required=True, type=int)
+    parser.add_argument("--n-contents", default=2000, type=int)
+    parser.add_argument("--n-queries", default=200, type=int)
+    parser.add_argument("--n-similar", default=10, type=int)
+    args = parser.parse_args()
+    asyncio.run(
+        run_benchmark(
+            n_contents=args.n_contents,
+            n_queries=args.n_queries,
+            n_similar=args.n_similar,
+            workspace_id=args.workspace_id,
+        )
+    )
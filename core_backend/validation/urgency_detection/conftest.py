@@ -51,6 +51,13 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         type=str,
         help="The column in UD rules data that has the urgency rules",
     )
+    parser.addoption(
+        "--cascade_target_precision",
+        type=float,
+        help="Target precision of the cosine distance thresholds recommended for "
+        "the cascade classifier",
+        default=0.95,
+    )
     parser.addoption(
         "--notification_topic",
         type=str,
@@ -117,6 +124,7 @@ def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
         "validation_data_question_col",
         "validation_data_label_col",
         "ud_rules_col",
+        "cascade_target_precision",
         "notification_topic",
         "aws_profile",
     ]
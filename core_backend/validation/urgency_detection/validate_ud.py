@@ -13,6 +13,7 @@ from httpx import AsyncClient
 from core_backend.app.config import (
     LITELLM_MODEL_EMBEDDING,
 )
+from core_backend.app.urgency_detection.config import URGENCY_CLASSIFIER
 from core_backend.app.utils import setup_logger
 
 logger = setup_logger(name="UDValidation")
@@ -107,6 +108,101 @@ class TestUDPerformance:
         if notification_topic is not None and aws_profile is not None:
             self._notify_results(metrics, notification_topic, aws_profile)
 
+    @pytest.mark.skipif(
+        URGENCY_CLASSIFIER != "cosine_distance_classifier",
+        reason="Cascade calibration needs the cosine distance classifier",
+    )
+    async def test_cascade_calibration(
+        self,
+        client: AsyncClient,
+        validation_data: pd.DataFrame,
+        api_key: str,
+        cascade_target_precision: float,
+    ) -> None:
+        """Recommend cosine distance thresholds for the cascade classifier"""
+        tasks = [
+            self._get_min_distance(client, row, api_key)
+            for row_idx, row in validation_data.iterrows()
+        ]
+        min_distances = await asyncio.gather(*tasks)
+
+        min_distances = pd.Series(min_distances, index=validation_data.index)
+        labels = validation_data["label"]
+        thresholds = self._calibrate_cascade_thresholds(
+            min_distances, labels, cascade_target_precision
+        )
+        urgent_max_distance = thresholds["URGENCY_CASCADE_URGENT_MAX_DISTANCE"]
+        not_urgent_min_distance = thresholds["URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE"]
+
+        is_urgent = pd.Series(False, index=min_distances.index)
+        if urgent_max_distance is not None:
+            is_urgent = min_distances < urgent_max_distance
+            assert labels[is_urgent].mean() >= cascade_target_precision
+        is_not_urgent = pd.Series(False, index=min_distances.index)
+        if not_urgent_min_distance is not None:
+            is_not_urgent = min_distances > not_urgent_min_distance
+            assert 1 - labels[is_not_urgent].mean() >= cascade_target_precision
+        if urgent_max_distance is not None and not_urgent_min_distance is not None:
+            assert urgent_max_distance <= not_urgent_min_distance
+
+        # The estimate must match the messages that the cascade sends to the LLM.
+        assert thresholds["llm_fraction"] == pytest.approx(
+            float((~is_urgent & ~is_not_urgent).mean())
+        )
+
+    @staticmethod
+    def _calibrate_cascade_thresholds(
+        min_distances: pd.Series, labels: pd.Series, target_precision: float
+    ) -> Dict[str, float | None]:
+        """Find the cascade thresholds that keep decisions taken without the LLM at
+        `target_precision` or better.
+
+        The urgent threshold is the largest distance below which at least
+        `target_precision` of messages are urgent. The not-urgent threshold is the
+        smallest distance above which at least `target_precision` of messages are
+        not urgent. It is never below the urgent threshold, since the cascade checks
+        the urgent threshold first, so that the two never overlap.
+        """
+        candidates = sorted(min_distances.unique())
+
+        urgent_max_distance = None
+        for threshold in candidates:
+            selected = labels[min_distances < threshold]
+            if len(selected) > 0 and selected.mean() >= target_precision:
+                urgent_max_distance = float(threshold)
+
+        not_urgent_min_distance = None
+        for threshold in reversed(candidates):
+            if urgent_max_distance is not None and threshold < urgent_max_distance:
+                break
+            selected = labels[min_distances > threshold]
+            if len(selected) > 0 and 1 - selected.mean() >= target_precision:
+                not_urgent_min_distance = float(threshold)
+
+        llm_fraction = 1.0
+        if urgent_max_distance is not None or not_urgent_min_distance is not None:
+            lower = urgent_max_distance if urgent_max_distance is not None else 0.0
+            upper = (
+                not_urgent_min_distance
+                if not_urgent_min_distance is not None
+                else float("inf")
+            )
+            llm_fraction = float(
+                ((min_distances >= lower) & (min_distances <= upper)).mean()
+            )
+
+        logger.info(
+            f"URGENCY_CASCADE_URGENT_MAX_DISTANCE: {urgent_max_distance}\n"
+            f"URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE: {not_urgent_min_distance}\n"
+            f"Fraction of messages sent to the LLM: {llm_fraction:.1%}\n"
+        )
+
+        return {
+            "URGENCY_CASCADE_URGENT_MAX_DISTANCE": urgent_max_distance,
+            "URGENCY_CASCADE_NOT_URGENT_MIN_DISTANCE": not_urgent_min_distance,
+            "llm_fraction": llm_fraction,
+        }
+
     @staticmethod
     def _calculate_metrics(validation_data: pd.DataFrame) -> Dict[str, float | int]:
         """Calculate metrics for UD performance"""
@@ -166,6 +262,22 @@ class TestUDPerformance:
         )
         return response.json()["is_urgent"]
 
+    @staticmethod
+    async def _get_min_distance(
+        client: AsyncClient,
+        row: pd.Series,
+        token: str,
+    ) -> float:
+        """Get the cosine distance to the closest urgency rule for a single query"""
+        response = await client.post(
+            "/urgency-detect",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "message_text": row["question"],
+            },
+        )
+        return response.json()["details"]["0"]["distance"]
+
     @staticmethod
     def _make_markdown_table(metrics: Dict[str, float | int]) -> str:
         """Generate markdown table for UD performance"""